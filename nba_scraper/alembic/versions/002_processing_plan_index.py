@@ -0,0 +1,35 @@
+"""Covering index for the season processing plan
+
+Revision ID: 002_processing_plan_index
+Revises: 001_baseline_schema
+Create Date: 2026-10-18
+
+SeasonPipeline.build_processing_plan aggregates pbp_events per requested game
+(event count, field-goal count, located shots, latest ingest). On PostgreSQL the
+index carries those columns so the lateral aggregate is an index-only scan.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "002_processing_plan_index"
+down_revision = "001_baseline_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the processing plan covering index"""
+    if op.get_context().dialect.name == "postgresql":
+        op.create_index(
+            "idx_pbp_processing_plan",
+            "pbp_events",
+            ["game_id"],
+            postgresql_include=["event_type", "shot_x", "ingested_at_utc"],
+        )
+    else:
+        op.create_index("idx_pbp_processing_plan", "pbp_events", ["game_id", "event_type"])
+
+
+def downgrade() -> None:
+    """Drop the processing plan covering index"""
+    op.drop_index("idx_pbp_processing_plan", table_name="pbp_events")
@@ -0,0 +1,41 @@
+"""Per-game ingestion state
+
+Revision ID: 003_game_ingest_state
+Revises: 002_processing_plan_index
+Create Date: 2026-10-18
+
+One row per (game_id, stage) recording the stage's input fingerprint, code
+version and last outcome (see nba_scraper.state.game_state). The stage index
+serves "which games need <stage>" scans.
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "003_game_ingest_state"
+down_revision = "002_processing_plan_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the game ingest state table"""
+    op.create_table(
+        "game_ingest_state",
+        sa.Column("game_id", sa.String(), nullable=False),
+        sa.Column("stage", sa.String(), nullable=False),
+        sa.Column("input_sha1", sa.String(), nullable=True),
+        sa.Column("version", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("game_id", "stage", name="pk_game_ingest_state"),
+    )
+    op.create_index("idx_game_ingest_state_stage", "game_ingest_state", ["stage", "status"])
+
+
+def downgrade() -> None:
+    """Drop the game ingest state table"""
+    op.drop_index("idx_game_ingest_state_stage", table_name="game_ingest_state")
+    op.drop_table("game_ingest_state")
@@ -0,0 +1,41 @@
+"""Season-level team rating aggregates
+
+Revision ID: 004_team_season_aggregates
+Revises: 003_game_ingest_state
+Create Date: 2026-10-18
+
+Running count, sum and sum of squares of team-game pace and ratings per
+season. Incremental team analytics roll these forward with per-game deltas
+instead of re-aggregating the season (see AnalyticsPipeline).
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "004_team_season_aggregates"
+down_revision = "003_game_ingest_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the team season aggregates table"""
+    op.create_table(
+        "team_season_aggregates",
+        sa.Column("season", sa.Text(), nullable=False),
+        sa.Column("team_games", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("off_rating_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("off_rating_sumsq", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("def_rating_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("def_rating_sumsq", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("pace_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("pace_sumsq", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("NOW()")),
+        sa.PrimaryKeyConstraint("season", name="pk_team_season_aggregates"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the team season aggregates table"""
+    op.drop_table("team_season_aggregates")
@@ -0,0 +1,58 @@
+"""Per-game player on-court impact
+
+Revision ID: 005_player_game_impact
+Revises: 004_team_season_aggregates
+Create Date: 2026-10-18
+
+On-court sums per player and game from the play-by-play interval sweep
+(see transformers.player_impact): possessions and points for/against while
+on court, the team's whole-game totals for the off-court split, individual
+shooting and turnovers, and the usage, true shooting and on/off metrics
+derived from them. The sums add up across games for season figures.
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "005_player_game_impact"
+down_revision = "004_team_season_aggregates"
+branch_labels = None
+depends_on = None
+
+COUNT_COLUMNS = (
+    "seconds_on",
+    "possessions_on", "opp_possessions_on",
+    "points_for_on", "points_against_on",
+    "team_usage_on",
+    "team_possessions", "opp_possessions",
+    "team_points", "opp_points",
+    "points", "field_goals_attempted", "free_throws_attempted", "turnovers",
+)
+
+METRIC_COLUMNS = (
+    "usage_pct", "true_shooting_pct",
+    "offensive_rating_on", "defensive_rating_on", "net_rating_on", "net_rating_off", "on_off_net_rating",
+    "plus_minus_on", "plus_minus_off",
+)
+
+
+def upgrade() -> None:
+    """Create the player game impact table"""
+    op.create_table(
+        "player_game_impact",
+        sa.Column("game_id", sa.Text(), nullable=False),
+        sa.Column("player_id", sa.Text(), nullable=False),
+        sa.Column("team_tricode", sa.Text(), nullable=False),
+        *[sa.Column(name, sa.Float(), nullable=False, server_default="0") for name in COUNT_COLUMNS],
+        *[sa.Column(name, sa.Float(), nullable=True) for name in METRIC_COLUMNS],
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("NOW()")),
+        sa.PrimaryKeyConstraint("game_id", "player_id", name="pk_player_game_impact"),
+    )
+    op.create_index("idx_player_game_impact_player", "player_game_impact", ["player_id"])
+
+
+def downgrade() -> None:
+    """Drop the player game impact table"""
+    op.drop_index("idx_player_game_impact_player", table_name="player_game_impact")
+    op.drop_table("player_game_impact")
@@ -0,0 +1,35 @@
+"""Lineup stint plus/minus
+
+Revision ID: 006_lineup_stint_plus_minus
+Revises: 005_player_game_impact
+Create Date: 2026-10-18
+
+Stints rebuilt from play-by-play substitutions (transformers.stints) carry
+the points scored minus allowed while each lineup was on court. Endpoint
+lineups leave it NULL. lineup_stints is created by the foundation SQL rather
+than the baseline, so the column is only added where the table exists.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "006_lineup_stint_plus_minus"
+down_revision = "005_player_game_impact"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add plus_minus to lineup_stints"""
+    op.execute("""
+        DO $$
+        BEGIN
+            IF to_regclass('public.lineup_stints') IS NOT NULL THEN
+                ALTER TABLE lineup_stints ADD COLUMN IF NOT EXISTS plus_minus INT;
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    """Drop plus_minus from lineup_stints"""
+    op.execute("ALTER TABLE IF EXISTS lineup_stints DROP COLUMN IF EXISTS plus_minus")
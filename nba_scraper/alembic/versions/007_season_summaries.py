@@ -0,0 +1,130 @@
+"""Materialized season summaries
+
+Revision ID: 007_season_summaries
+Revises: 006_lineup_stint_plus_minus
+Create Date: 2026-10-18
+
+Per-game results and player box counts derived from pbp_events, and the
+season summaries aggregated from them: team records with home/away splits,
+rolling last-N form, head-to-head pairs and player totals. Loaders refresh
+only the keys a game touches (see loaders.summaries), so serving queries
+read one row instead of re-scanning games.
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "007_season_summaries"
+down_revision = "006_lineup_stint_plus_minus"
+branch_labels = None
+depends_on = None
+
+PLAYER_COUNTS = (
+    "points", "field_goals_made", "field_goals_attempted", "three_pointers_made", "three_pointers_attempted",
+    "free_throws_made", "free_throws_attempted", "rebounds", "assists", "steals", "blocks", "turnovers", "fouls",
+)
+
+
+def _counts(*names: str) -> list:
+    return [sa.Column(name, sa.Integer(), nullable=False, server_default="0") for name in names]
+
+
+def _updated_at() -> sa.Column:
+    return sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("NOW()"))
+
+
+def upgrade() -> None:
+    """Create the per-game and season summary tables"""
+    op.create_table(
+        "game_results",
+        sa.Column("game_id", sa.Text(), nullable=False),
+        sa.Column("season", sa.Text(), nullable=False),
+        sa.Column("game_date", sa.Date(), nullable=False),
+        sa.Column("home_team_tricode", sa.Text(), nullable=False),
+        sa.Column("away_team_tricode", sa.Text(), nullable=False),
+        sa.Column("home_team_id", sa.Text(), nullable=True),
+        sa.Column("away_team_id", sa.Text(), nullable=True),
+        *_counts("home_points", "away_points"),
+        _updated_at(),
+        sa.PrimaryKeyConstraint("game_id", name="pk_game_results"),
+    )
+    op.create_index("idx_game_results_home", "game_results", ["season", "home_team_tricode", "game_date"])
+    op.create_index("idx_game_results_away", "game_results", ["season", "away_team_tricode", "game_date"])
+    op.create_index("idx_game_results_team_ids", "game_results", ["home_team_id", "away_team_id", "game_date"])
+
+    op.create_table(
+        "player_game_box",
+        sa.Column("game_id", sa.Text(), nullable=False),
+        sa.Column("player_id", sa.Text(), nullable=False),
+        sa.Column("season", sa.Text(), nullable=False),
+        sa.Column("game_date", sa.Date(), nullable=False),
+        sa.Column("team_tricode", sa.Text(), nullable=True),
+        *_counts(*PLAYER_COUNTS),
+        _updated_at(),
+        sa.PrimaryKeyConstraint("game_id", "player_id", name="pk_player_game_box"),
+    )
+    op.create_index("idx_player_game_box_player", "player_game_box", ["season", "player_id"])
+
+    op.create_table(
+        "team_season_summary",
+        sa.Column("season", sa.Text(), nullable=False),
+        sa.Column("team_tricode", sa.Text(), nullable=False),
+        sa.Column("team_id", sa.Text(), nullable=True),
+        *_counts("games", "wins", "losses", "points_for", "points_against",
+                 "home_games", "home_wins", "away_games", "away_wins"),
+        sa.Column("last_game_date", sa.Date(), nullable=True),
+        _updated_at(),
+        sa.PrimaryKeyConstraint("season", "team_tricode", name="pk_team_season_summary"),
+    )
+
+    op.create_table(
+        "team_rolling_form",
+        sa.Column("season", sa.Text(), nullable=False),
+        sa.Column("team_tricode", sa.Text(), nullable=False),
+        sa.Column("window_size", sa.Integer(), nullable=False),
+        *_counts("games", "wins", "losses", "points_for", "points_against"),
+        sa.Column("first_game_date", sa.Date(), nullable=True),
+        sa.Column("last_game_date", sa.Date(), nullable=True),
+        _updated_at(),
+        sa.PrimaryKeyConstraint("season", "team_tricode", "window_size", name="pk_team_rolling_form"),
+    )
+
+    op.create_table(
+        "head_to_head_summary",
+        sa.Column("season", sa.Text(), nullable=False),
+        sa.Column("team_a", sa.Text(), nullable=False),
+        sa.Column("team_b", sa.Text(), nullable=False),
+        sa.Column("team_a_id", sa.Text(), nullable=True),
+        sa.Column("team_b_id", sa.Text(), nullable=True),
+        *_counts("games", "team_a_wins", "team_b_wins", "team_a_points", "team_b_points", "margin_sum"),
+        sa.Column("last_game_date", sa.Date(), nullable=True),
+        _updated_at(),
+        sa.PrimaryKeyConstraint("season", "team_a", "team_b", name="pk_head_to_head_summary"),
+    )
+    op.create_index("idx_head_to_head_team_ids", "head_to_head_summary", ["team_a_id", "team_b_id"])
+
+    op.create_table(
+        "player_season_summary",
+        sa.Column("season", sa.Text(), nullable=False),
+        sa.Column("player_id", sa.Text(), nullable=False),
+        sa.Column("team_tricode", sa.Text(), nullable=True),
+        *_counts("games", *PLAYER_COUNTS),
+        _updated_at(),
+        sa.PrimaryKeyConstraint("season", "player_id", name="pk_player_season_summary"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the per-game and season summary tables"""
+    op.drop_table("player_season_summary")
+    op.drop_index("idx_head_to_head_team_ids", table_name="head_to_head_summary")
+    op.drop_table("head_to_head_summary")
+    op.drop_table("team_rolling_form")
+    op.drop_table("team_season_summary")
+    op.drop_index("idx_player_game_box_player", table_name="player_game_box")
+    op.drop_table("player_game_box")
+    op.drop_index("idx_game_results_team_ids", table_name="game_results")
+    op.drop_index("idx_game_results_away", table_name="game_results")
+    op.drop_index("idx_game_results_home", table_name="game_results")
+    op.drop_table("game_results")
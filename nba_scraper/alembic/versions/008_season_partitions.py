@@ -0,0 +1,154 @@
+"""Partition pbp_events and shot_events by season
+
+Revision ID: 008_season_partitions
+Revises: 007_season_summaries
+Create Date: 2026-10-18
+
+Rebuilds the event tables as LIST partitions on a new ``season`` column
+(taken from games, else derived from the game ID), with one partition per
+season present, named ``<table>_<yyyy>_<yy>``, and a default partition for
+the rest. Queries that name a season then read one partition, and season
+rebuilds truncate or detach whole partitions (see loaders.partitions).
+
+The primary key keeps its columns with ``season`` appended, so lookups by
+game still use each partition's index. Secondary indexes and foreign keys
+are recreated from their definitions. PostgreSQL only; other dialects are
+left as they are.
+"""
+import re
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "008_season_partitions"
+down_revision = "007_season_summaries"
+branch_labels = None
+depends_on = None
+
+TABLES = ("pbp_events", "shot_events")
+
+# Same rule as utils.season.derive_season_from_game_id; 'unknown' goes to the default partition
+SEASON_EXPR = """COALESCE(
+    g.season,
+    CASE WHEN o.game_id ~ '^00[1-9][0-9]{7}$'
+         THEN '20' || substr(o.game_id, 4, 2) || '-'
+              || lpad(((substr(o.game_id, 4, 2)::int + 1) % 100)::text, 2, '0')
+    END,
+    'unknown'
+)"""
+
+
+def _is_partitioned(bind, table: str):
+    """True/False for an existing table, None when it does not exist."""
+    kind = bind.execute(sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}).scalar()
+    return None if kind is None else kind == "p"
+
+
+def _definitions(bind, table: str):
+    """(primary key name, key columns, other index definitions, foreign key definitions)."""
+    pk = bind.execute(sa.text("""
+        SELECT con.conname, array_agg(att.attname ORDER BY k.ord)
+        FROM pg_constraint con
+        CROSS JOIN LATERAL unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = k.attnum
+        WHERE con.conrelid = to_regclass(:t) AND con.contype = 'p'
+        GROUP BY con.conname
+    """), {"t": table}).one()
+    indexes = bind.execute(sa.text("""
+        SELECT pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        WHERE i.indrelid = to_regclass(:t) AND NOT i.indisprimary
+    """), {"t": table}).scalars().all()
+    foreign_keys = bind.execute(sa.text("""
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = to_regclass(:t) AND contype = 'f'
+    """), {"t": table}).all()
+    return pk[0], list(pk[1]), indexes, foreign_keys
+
+
+def _with_season(indexdef: str, add: bool) -> str:
+    """Unique indexes on a partitioned table must contain the partition key."""
+    if not indexdef.startswith("CREATE UNIQUE INDEX"):
+        return indexdef
+    if add:
+        return re.sub(r"USING (\w+) \(([^)]*)\)", r"USING \1 (\2, season)", indexdef, count=1)
+    return indexdef.replace(", season)", ")", 1)
+
+
+def _recreate(table: str, indexes, foreign_keys, add_season: bool) -> None:
+    for indexdef in indexes:
+        op.execute(_with_season(indexdef, add_season))
+    for name, definition in foreign_keys:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+
+def _partition(bind, table: str) -> None:
+    pk_name, pk_columns, indexes, foreign_keys = _definitions(bind, table)
+    old = f"{table}_unpartitioned"
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"""
+        CREATE TABLE {table} (
+            LIKE {old} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING COMMENTS,
+            season TEXT NOT NULL
+        ) PARTITION BY LIST (season)
+    """)
+    seasons = bind.execute(sa.text(
+        f"SELECT DISTINCT {SEASON_EXPR} FROM {old} o LEFT JOIN games g ON g.game_id = o.game_id"
+    )).scalars().all()
+    for season in sorted(s for s in seasons if re.fullmatch(r"\d{4}-\d{2}", s)):
+        op.execute(f"CREATE TABLE {table}_{season.replace('-', '_')} "
+                   f"PARTITION OF {table} FOR VALUES IN ('{season}')")
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    op.execute(f"INSERT INTO {table} SELECT o.*, {SEASON_EXPR} FROM {old} o "
+               f"LEFT JOIN games g ON g.game_id = o.game_id")
+    op.execute(f"DROP TABLE {old}")
+
+    # Keys and indexes are built after the load, one bulk build per partition
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {pk_name} PRIMARY KEY ({', '.join(pk_columns + ['season'])})")
+    _recreate(table, indexes, foreign_keys, add_season=True)
+
+
+def _unpartition(bind, table: str) -> None:
+    pk_name, pk_columns, indexes, foreign_keys = _definitions(bind, table)
+    columns = bind.execute(sa.text("""
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = to_regclass(:t) AND attnum > 0 AND NOT attisdropped AND attname <> 'season'
+        ORDER BY attnum
+    """), {"t": table}).scalars().all()
+    old = f"{table}_partitioned"
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING COMMENTS)")
+    op.execute(f"ALTER TABLE {table} DROP COLUMN season")
+    column_list = ", ".join(columns)
+    op.execute(f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {old}")
+    op.execute(f"DROP TABLE {old} CASCADE")
+
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {pk_name} "
+               f"PRIMARY KEY ({', '.join(c for c in pk_columns if c != 'season')})")
+    _recreate(table, indexes, foreign_keys, add_season=False)
+
+
+def upgrade() -> None:
+    """Rebuild the event tables as season partitions"""
+    if op.get_context().dialect.name != "postgresql":
+        return
+    bind = op.get_bind()
+    for table in TABLES:
+        if _is_partitioned(bind, table) is False:
+            _partition(bind, table)
+
+
+def downgrade() -> None:
+    """Fold the season partitions back into plain tables"""
+    if op.get_context().dialect.name != "postgresql":
+        return
+    bind = op.get_bind()
+    for table in TABLES:
+        if _is_partitioned(bind, table):
+            _unpartition(bind, table)
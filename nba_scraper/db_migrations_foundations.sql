@@ -33,8 +33,12 @@ CREATE TABLE IF NOT EXISTS pbp_events (
     shot_distance_ft NUMERIC,
     
     created_at TIMESTAMPTZ DEFAULT NOW(),
-    PRIMARY KEY (game_id, event_num)
-);
+    season TEXT NOT NULL,
+    PRIMARY KEY (game_id, event_num, season)
+) PARTITION BY LIST (season);
+
+-- One partition per season is created by the loaders on first write
+CREATE TABLE IF NOT EXISTS pbp_events_default PARTITION OF pbp_events DEFAULT;
 
 -- Lineup stints with array-based player tracking
 CREATE TABLE IF NOT EXISTS lineup_stints (
@@ -43,6 +47,7 @@ CREATE TABLE IF NOT EXISTS lineup_stints (
     period INT NOT NULL,
     lineup_player_ids INT[] NOT NULL,
     seconds_played INT NOT NULL,
+    plus_minus INT,
     lineup_hash TEXT GENERATED ALWAYS AS (md5(array_to_string(lineup_player_ids, ','))) STORED,
     created_at TIMESTAMPTZ DEFAULT NOW(),
     PRIMARY KEY (game_id, team_id, period, lineup_hash)
@@ -59,8 +64,11 @@ CREATE TABLE IF NOT EXISTS shot_events (
     loc_y INT NOT NULL,
     event_num INT,
     created_at TIMESTAMPTZ DEFAULT NOW(),
-    PRIMARY KEY (game_id, player_id, period, loc_x, loc_y)
-);
+    season TEXT NOT NULL,
+    PRIMARY KEY (game_id, player_id, period, loc_x, loc_y, season)
+) PARTITION BY LIST (season);
+
+CREATE TABLE IF NOT EXISTS shot_events_default PARTITION OF shot_events DEFAULT;
 
 -- Add deferrable foreign key constraints
 -- These allow loading child records before parent records within a transaction
@@ -143,5 +151,7 @@ COMMENT ON TABLE lineup_stints IS 'Lineup stints with array-based player trackin
 COMMENT ON COLUMN lineup_stints.lineup_player_ids IS 'Array of 5 player IDs in the lineup';
 COMMENT ON COLUMN lineup_stints.lineup_hash IS 'MD5 hash of lineup for uniqueness';
 
+COMMENT ON COLUMN pbp_events.season IS 'Partition key; derived from game_id by the loaders';
+
 COMMENT ON TABLE shot_events IS 'Shot chart coordinate data for Tranche 2 analytics';
 COMMENT ON COLUMN shot_events.event_num IS 'Links to pbp_events.event_num when available';
\ No newline at end of file
@@ -22,8 +22,8 @@ def schedule_daily() -> None:
     Example:
         nba-scraper schedule daily
     """
-    from nba_scraper.schedule.jobs import run_daily
-    raise SystemExit(run_daily())
+    from nba_scraper.schedule.jobs import run_daily_async
+    raise SystemExit(asyncio.run(_run_scheduled(run_daily_async())))
 
 
 @schedule_app.command("backfill")
@@ -31,20 +31,36 @@ def schedule_backfill(
     season: Annotated[str, typer.Option(help="Season to backfill (e.g., '2024-25')")],
     since: Annotated[Optional[str], typer.Option(help="Resume from specific game ID")] = None,
     chunk_days: Annotated[int, typer.Option(help="Days per chunk")] = 7,
+    max_concurrent: Annotated[int, typer.Option(help="Date chunks processed at once")] = 4,
+    commit_every: Annotated[int, typer.Option(help="Finished chunks per watermark commit")] = 4,
 ) -> None:
     """
     Run backfill job for a season with resumable watermarks.
     
-    Processes games in date chunks, updates watermark after each chunk.
-    Automatically resumes from last watermark on restart.
+    Processes date chunks concurrently and commits per-game state and the
+    watermark every few finished chunks. Automatically resumes from last
+    watermark on restart.
     
     Examples:
         nba-scraper schedule backfill --season 2024-25
         nba-scraper schedule backfill --season 2024-25 --since 0022400001
-        nba-scraper schedule backfill --season 2024-25 --chunk-days 7
+        nba-scraper schedule backfill --season 2024-25 --chunk-days 7 --max-concurrent 8
     """
-    from nba_scraper.schedule.jobs import run_backfill
-    raise SystemExit(run_backfill(season=season, since_game_id=since, chunk_days=chunk_days))
+    from nba_scraper.schedule.jobs import run_backfill_async
+    raise SystemExit(asyncio.run(_run_scheduled(run_backfill_async(
+        season=season, since_game_id=since, chunk_days=chunk_days,
+        max_concurrent=max_concurrent, commit_every=commit_every,
+    ))))
+
+
+async def _run_scheduled(job) -> int:
+    """Await a scheduler job, then close the connection pool."""
+    from .db import close_engine
+
+    try:
+        return await job
+    finally:
+        await close_engine()
 
 
 # Register scheduler subcommand
@@ -185,6 +201,103 @@ async def _run_backfill(
         raise typer.Exit(1)
 
 
+@app.command("season-plan")
+def season_plan(
+    season: Annotated[str, typer.Option(help="Season to inspect (e.g., '2024-25')")],
+    show_games: Annotated[bool, typer.Option("--show-games", help="List every game needing work")] = False,
+):
+    """Dry run: report which games of a season need processing, and why."""
+    asyncio.run(_run_season_plan(season, show_games))
+
+
+async def _run_season_plan(season: str, show_games: bool):
+    """Build and print the season processing plan without fetching or writing data."""
+    # Planning only queries the database; the game pipeline is never imported
+    from .state.processing_plan import plan_season
+
+    try:
+        report = await plan_season(season)
+    except Exception as e:
+        typer.echo(f"❌ Failed to build processing plan: {e}", err=True)
+        raise typer.Exit(1)
+
+    typer.echo(f"🔍 Processing plan for {season} (dry run)")
+    typer.echo(f"   Total games: {report['total_games']}")
+    typer.echo(f"   Needing processing: {report['games_needing_processing']}")
+    typer.echo(f"   Up to date: {report['games_up_to_date']}")
+    for reason, count in sorted(report['reasons'].items()):
+        typer.echo(f"   - {reason}: {count}")
+
+    if show_games:
+        for game in report['games']:
+            typer.echo(f"   {game['game_id']} [{game['status'] or '-'}]: {', '.join(game['reasons'])}")
+
+
+@app.command("export")
+def export(
+    table: Annotated[Optional[str], typer.Argument(help="Table to export (e.g. pbp_events)")] = None,
+    out: Annotated[str, typer.Option(help="Output directory")] = "exports",
+    fmt: Annotated[str, typer.Option("--format", help="auto, parquet, arrow or npz")] = "auto",
+    season: Annotated[Optional[List[str]], typer.Option(help="Season to include (repeatable)")] = None,
+    start_date: Annotated[Optional[str], typer.Option("--start-date", help="First game date (YYYY-MM-DD)")] = None,
+    end_date: Annotated[Optional[str], typer.Option("--end-date", help="Last game date (YYYY-MM-DD)")] = None,
+    team: Annotated[Optional[str], typer.Option(help="Only games involving this team tricode")] = None,
+    query: Annotated[Optional[str], typer.Option(help="Export the rows of this SELECT instead of a table")] = None,
+    name: Annotated[Optional[str], typer.Option(help="Output name for --query exports")] = None,
+    chunk_rows: Annotated[int, typer.Option("--chunk-rows", help="Rows per cursor fetch and row group")] = 50_000,
+    workers: Annotated[int, typer.Option(help="Season partitions exported concurrently")] = 4,
+):
+    """Stream a table or query to Parquet, Arrow IPC or .npz files.
+
+    Examples:
+        nba-scraper export pbp_events --season 2023-24 --season 2024-25
+        nba-scraper export games --team BOS --format npz
+        nba-scraper export --query "SELECT * FROM outcomes" --name outcomes
+    """
+    if (table is None) == (query is None):
+        typer.echo("Error: give either a table or --query", err=True)
+        raise typer.Exit(1)
+    if query is not None and not name:
+        typer.echo("Error: --name is required with --query", err=True)
+        raise typer.Exit(1)
+    asyncio.run(_run_export(table, out, fmt, season or [], start_date, end_date, team,
+                            query, name, chunk_rows, workers))
+
+
+async def _run_export(table: Optional[str], out: str, fmt: str, seasons: List[str],
+                      start_date: Optional[str], end_date: Optional[str], team: Optional[str],
+                      query: Optional[str], name: Optional[str], chunk_rows: int, workers: int):
+    """Run the export and print where the files went."""
+    from datetime import date
+    from pathlib import Path
+
+    from .db import close_engine
+    from .tools.export_tables import ExportError, ExportFilter, TableExporter
+
+    try:
+        exporter = TableExporter(Path(out), fmt=fmt, chunk_rows=chunk_rows, workers=workers)
+        if query is not None:
+            result = await exporter.export_query(name, query)
+        else:
+            filters = ExportFilter(
+                seasons=tuple(seasons),
+                start_date=date.fromisoformat(start_date) if start_date else None,
+                end_date=date.fromisoformat(end_date) if end_date else None,
+                team=team,
+            )
+            result = await exporter.export_table(table, filters)
+    except (ExportError, ValueError) as e:
+        typer.echo(f"❌ Export failed: {e}", err=True)
+        raise typer.Exit(1)
+    finally:
+        await close_engine()
+
+    typer.echo(f"📦 Exported {result.rows} rows of {result.name} as {result.format} "
+               f"in {result.duration_seconds:.1f}s")
+    for exported in result.files:
+        typer.echo(f"   {exported.path}: {exported.rows} rows, {len(exported.row_groups)} row groups")
+
+
 def main():
     """Entry point for the CLI."""
     app()
@@ -124,6 +124,10 @@ class AppSettings(BaseSettings):
         default=True,
         description='Enable pipeline checkpointing'
     )
+    REFRESH_SUMMARIES: bool = Field(
+        default=False,
+        description='Refresh materialized season summaries as games and play-by-play are upserted'
+    )
     
     # ===================
     # Feature Flags
@@ -131,6 +135,10 @@ class AppSettings(BaseSettings):
     DEBUG: bool = Field(default=False, description='Debug mode')
     ENABLE_METRICS: bool = Field(default=False, description='Enable metrics collection')
     ENABLE_EXPERIMENTAL: bool = Field(default=False, description='Enable experimental features')
+    STRICT_ROW_VALIDATION: bool = Field(
+        default=False,
+        description='Validate every extracted row with full Pydantic validation (debug)'
+    )
     
     # ===================
     # Data Paths
@@ -143,6 +151,10 @@ class AppSettings(BaseSettings):
         default=Path('venues.csv'),
         description='Path to venues file'
     )
+    FEATURE_STORE_PATH: Optional[Path] = Field(
+        default=None,
+        description='Feature store file refreshed by the derive pipeline (unset: disabled)'
+    )
 
     @field_validator('LOG_LEVEL')
     @classmethod
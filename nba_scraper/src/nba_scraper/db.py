@@ -1,7 +1,8 @@
 """Database connection and session management with performance optimization."""
 
 import asyncpg
-from typing import AsyncGenerator, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Optional
 
 from sqlalchemy import MetaData, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
@@ -105,6 +106,14 @@ async def get_connection():
     return await pool.acquire()
 
 
+@asynccontextmanager
+async def pooled_connection() -> AsyncIterator[asyncpg.Connection]:
+    """Acquire a pool connection for the block and release it afterwards."""
+    pool = await get_performance_pool()
+    async with pool.acquire() as conn:
+        yield conn
+
+
 async def close_engine() -> None:
     """Close the database engine and performance pool."""
     global _engine, _session_factory, _performance_pool
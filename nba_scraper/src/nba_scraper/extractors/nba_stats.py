@@ -1,8 +1,9 @@
 """NBA Stats API extraction functions."""
 
 from datetime import datetime, UTC
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+from ..config import get_settings
 from ..models import GameRow, PbpEventRow, StartingLineupRow
 from ..models.utils import preprocess_nba_stats_data
 from ..nba_logging import get_logger
@@ -75,17 +76,23 @@ def extract_games_from_scoreboard(
 def extract_pbp_from_response(
     pbp_data: Dict[str, Any],
     game_id: str,
-    source_url: str
+    source_url: str,
+    strict: Optional[bool] = None
 ) -> List[PbpEventRow]:
     """Extract play-by-play events from NBA Stats response.
     
+    Rows are built in bulk from the PlayByPlay resultSet; full per-row
+    validation runs only in strict (debug) mode or for rows the bulk path
+    cannot coerce.
+    
     Args:
         pbp_data: Raw PBP JSON response  
         game_id: Game identifier
         source_url: Source URL for provenance
+        strict: Validate every row (defaults to the STRICT_ROW_VALIDATION setting)
         
     Returns:
-        List of validated PbpEventRow instances
+        List of PbpEventRow instances
     """
     events = []
     
@@ -94,8 +101,11 @@ def extract_pbp_from_response(
             logger.warning("No resultSets in PBP data", game_id=game_id)
             return events
 
-        # Preprocess the entire PBP response to handle mixed data types
-        pbp_data = preprocess_nba_stats_data(pbp_data)
+        if strict is None:
+            strict = get_settings().STRICT_ROW_VALIDATION
+        if strict:
+            # Preprocess the entire PBP response to handle mixed data types
+            pbp_data = preprocess_nba_stats_data(pbp_data)
         
         # Find PlayByPlay result set
         pbp_set = None
@@ -108,25 +118,13 @@ def extract_pbp_from_response(
             logger.warning("No PlayByPlay found in response", game_id=game_id)
             return events
         
-        headers = pbp_set.get('headers', [])
-        rows = pbp_set.get('rowSet', [])
+        def log_failed_event(idx: int, error: Exception) -> None:
+            logger.warning("Failed to extract PBP event", 
+                          game_id=game_id, event_idx=idx, error=str(error))
         
-        for idx, row in enumerate(rows):
-            try:
-                # Convert row to dictionary
-                event_dict = dict(zip(headers, row))
-                
-                # Additional preprocessing for the individual event data
-                event_dict = preprocess_nba_stats_data(event_dict)
-                
-                # Create PbpEventRow using the from_nba_stats class method
-                event_row = PbpEventRow.from_nba_stats(game_id, event_dict, source_url)
-                events.append(event_row)
-                
-            except Exception as e:
-                logger.warning("Failed to extract PBP event", 
-                              game_id=game_id, event_idx=idx, error=str(e))
-                continue
+        events = PbpEventRow.bulk_from_nba_stats(
+            game_id, pbp_set, source_url, strict=strict, on_error=log_failed_event
+        )
         
         logger.info("Extracted PBP events", game_id=game_id, count=len(events))
         
@@ -0,0 +1,25 @@
+"""Per-(game, team) feature matrix for modeling, built from the derived tables."""
+
+from .columns import (
+    FEATURE_COLUMNS,
+    FEATURE_NAMES,
+    FEATURE_SCHEMA_HASH,
+    FEATURE_SCHEMA_VERSION,
+    FeatureColumn,
+    fetch_feature_rows,
+)
+from .store import FeatureMatrix, FeatureStore, FeatureStoreError, read_features, write_features
+
+__all__ = [
+    "FEATURE_COLUMNS",
+    "FEATURE_NAMES",
+    "FEATURE_SCHEMA_HASH",
+    "FEATURE_SCHEMA_VERSION",
+    "FeatureColumn",
+    "fetch_feature_rows",
+    "FeatureMatrix",
+    "FeatureStore",
+    "FeatureStoreError",
+    "read_features",
+    "write_features",
+]
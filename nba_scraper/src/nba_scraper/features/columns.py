@@ -0,0 +1,145 @@
+"""Per-(game, team) feature columns drawn from the derived tables.
+
+Each game yields two rows, one from each team's side. Columns from
+home/away tables (``q1_window_12_8``, ``outcomes``) are mapped onto the
+team's side, and the per-team tables (``schedule_travel``, ``early_shocks``,
+``advanced_team_stats``) are joined once for the team and once for the
+opponent (``opp_`` prefix). Feature columns come first and label columns
+(``label_`` prefix, from ``outcomes``) last, so either group is a
+contiguous slice of the matrix.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import asyncpg
+
+# Bump when a column's meaning changes without its name or kind changing
+FEATURE_SCHEMA_VERSION = 1
+
+ROLE_FEATURE = "feature"
+ROLE_LABEL = "label"
+
+
+@dataclass(frozen=True)
+class FeatureColumn:
+    """One matrix column: its name, logical kind (float, int, bool), role and SQL expression."""
+    name: str
+    kind: str
+    sql: str
+    role: str = ROLE_FEATURE
+
+
+def _sided(name: str, kind: str, home: str, away: str, role: str = ROLE_FEATURE,
+           opponent: bool = True) -> List[FeatureColumn]:
+    """Columns from a home/away pair, seen from the team's side."""
+    columns = [FeatureColumn(name, kind, f"CASE WHEN s.is_home THEN {home} ELSE {away} END", role)]
+    if opponent:
+        columns.append(FeatureColumn(f"opp_{name}", kind, f"CASE WHEN s.is_home THEN {away} ELSE {home} END", role))
+    return columns
+
+
+def _per_team(name: str, kind: str, expr: str) -> List[FeatureColumn]:
+    """A per-team table column for the team (alias ``{t}`` -> t) and its opponent (-> ot)."""
+    return [
+        FeatureColumn(name, kind, expr.format(t="t")),
+        FeatureColumn(f"opp_{name}", kind, expr.format(t="ot")),
+    ]
+
+
+def _q1(name: str, kind: str = "float") -> List[FeatureColumn]:
+    return _sided(f"q1_{name}", kind, f"q.home_{name}", f"q.away_{name}")
+
+
+_SHOCK_TYPES = ("EARLY_FOUL_TROUBLE", "TECHNICAL", "FLAGRANT", "INJURY_EXIT")
+
+_TRAVEL = (
+    ("days_rest", "int", "days_rest"),
+    ("back_to_back", "bool", "is_back_to_back"),
+    ("three_in_four", "bool", "is_3_in_4"),
+    ("five_in_seven", "bool", "is_5_in_7"),
+    ("timezone_shift_hours", "float", "timezone_shift_hours"),
+    ("circadian_index", "float", "circadian_index"),
+    ("altitude_change_m", "float", "altitude_change_m"),
+    ("distance_km", "float", "travel_distance_km"),
+)
+
+_ADVANCED = (
+    "offensive_rating", "defensive_rating", "net_rating", "assist_percentage", "assist_ratio",
+    "offensive_rebound_pct", "defensive_rebound_pct", "turnover_ratio", "effective_fg_pct",
+    "true_shooting_pct", "pace", "pie",
+)
+
+FEATURE_COLUMNS: Tuple[FeatureColumn, ...] = tuple(
+    [
+        FeatureColumn("q1_possessions", "int", "q.possessions_elapsed"),
+        FeatureColumn("q1_pace48_actual", "float", "q.pace48_actual"),
+        FeatureColumn("q1_pace48_expected", "float", "q.pace48_expected"),
+        FeatureColumn("q1_transition_rate", "float", "q.transition_rate"),
+        FeatureColumn("q1_early_clock_rate", "float", "q.early_clock_rate"),
+    ]
+    + _q1("efg_actual") + _q1("efg_expected") + _q1("to_rate") + _q1("ft_rate")
+    + _q1("orb_pct") + _q1("drb_pct")
+    + _sided("q1_bonus_time_sec", "float", "q.bonus_time_home_sec", "q.bonus_time_away_sec")
+    + [column for name, kind, source in _TRAVEL for column in _per_team(f"travel_{name}", kind, f"{{t}}.{source}")]
+    + [column for shock in _SHOCK_TYPES
+       for column in _per_team(f"shocks_{shock.lower()}", "int",
+                               f"COALESCE({{t}}s.{shock.lower()}, 0)")]
+    + [column for name in _ADVANCED for column in _per_team(f"adv_{name}", "float", f"{{t}}a.{name}")]
+    + _sided("label_points", "int", "o.final_home_points", "o.final_away_points", ROLE_LABEL, opponent=False)
+    + _sided("label_opp_points", "int", "o.final_away_points", "o.final_home_points", ROLE_LABEL, opponent=False)
+    + _sided("label_q1_points", "int", "o.q1_home_points", "o.q1_away_points", ROLE_LABEL, opponent=False)
+    + _sided("label_q1_opp_points", "int", "o.q1_away_points", "o.q1_home_points", ROLE_LABEL, opponent=False)
+    + [
+        FeatureColumn("label_win", "bool", "CASE WHEN s.is_home THEN o.home_win ELSE NOT o.home_win END", ROLE_LABEL),
+        FeatureColumn("label_overtime_periods", "int", "o.overtime_periods", ROLE_LABEL),
+    ]
+)
+
+FEATURE_NAMES: Tuple[str, ...] = tuple(column.name for column in FEATURE_COLUMNS)
+
+# Identifies the column layout a stored matrix was written with
+FEATURE_SCHEMA_HASH = hashlib.sha1(
+    repr((FEATURE_SCHEMA_VERSION, [(c.name, c.kind, c.role) for c in FEATURE_COLUMNS])).encode()
+).hexdigest()[:16]
+
+_SHOCK_COUNTS = ",\n           ".join(
+    f"COUNT(*) FILTER (WHERE event_type = '{shock}') AS {shock.lower()}" for shock in _SHOCK_TYPES
+)
+
+# One row per game side; key columns first, then FEATURE_COLUMNS in order
+FEATURE_ROWS_QUERY = f"""
+WITH sides AS (
+    SELECT g.game_id, g.season, g.game_date_local AS game_date, side.is_home,
+           CASE WHEN side.is_home THEN g.home_team_tricode ELSE g.away_team_tricode END AS team_tricode,
+           CASE WHEN side.is_home THEN g.away_team_tricode ELSE g.home_team_tricode END AS opponent_tricode
+    FROM games g
+    CROSS JOIN (VALUES (TRUE), (FALSE)) AS side(is_home)
+    WHERE g.game_id = ANY($1::text[])
+),
+shocks AS (
+    SELECT game_id, team_tricode,
+           {_SHOCK_COUNTS}
+    FROM early_shocks
+    WHERE game_id = ANY($1::text[])
+    GROUP BY game_id, team_tricode
+)
+SELECT s.game_id, s.season, s.game_date, s.team_tricode, s.opponent_tricode, s.is_home,
+       {", ".join(f"{column.sql} AS {column.name}" for column in FEATURE_COLUMNS)}
+FROM sides s
+LEFT JOIN q1_window_12_8 q ON q.game_id = s.game_id
+LEFT JOIN outcomes o ON o.game_id = s.game_id
+LEFT JOIN schedule_travel t ON t.game_id = s.game_id AND t.team_tricode = s.team_tricode
+LEFT JOIN schedule_travel ot ON ot.game_id = s.game_id AND ot.team_tricode = s.opponent_tricode
+LEFT JOIN shocks ts ON ts.game_id = s.game_id AND ts.team_tricode = s.team_tricode
+LEFT JOIN shocks ots ON ots.game_id = s.game_id AND ots.team_tricode = s.opponent_tricode
+LEFT JOIN advanced_team_stats ta ON ta.game_id = s.game_id AND ta.team_abbreviation = s.team_tricode
+LEFT JOIN advanced_team_stats ota ON ota.game_id = s.game_id AND ota.team_abbreviation = s.opponent_tricode
+ORDER BY s.game_date, s.game_id, s.team_tricode
+"""
+
+
+async def fetch_feature_rows(conn: asyncpg.Connection, game_ids: Sequence[str]) -> List[asyncpg.Record]:
+    """Feature rows (two per game) for ``game_ids`` from the derived tables."""
+    return await conn.fetch(FEATURE_ROWS_QUERY, list(game_ids))
@@ -0,0 +1,311 @@
+"""Memory-mapped columnar feature store.
+
+A store is one file: an 8-byte magic, a little-endian uint32 header length,
+a JSON header, then the arrays, each aligned to 64 bytes. The header
+records the format and schema versions, the feature columns (name, kind,
+role), each array's dtype, shape and offset, and the row range of every
+season. Rows are sorted by (game_date, game_id, team_tricode), so a season
+or a run of consecutive seasons is a contiguous slice.
+
+``FeatureStore.load`` maps the file read-only and returns views into it, so
+nothing is copied or parsed beyond the header. ``FeatureStore.update``
+replaces the rows of the games it is given, holding an exclusive lock on a
+sidecar ``.<name>.lock`` file so concurrent writers cannot lose each
+other's rows. Every update writes a new file and renames it over the old
+one, so readers that still map the old file keep a consistent copy and
+never need the lock.
+"""
+
+import fcntl
+import json
+import os
+import struct
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..nba_logging import get_logger
+from .columns import (
+    FEATURE_COLUMNS,
+    FEATURE_SCHEMA_HASH,
+    FEATURE_SCHEMA_VERSION,
+    ROLE_FEATURE,
+    ROLE_LABEL,
+    FeatureColumn,
+)
+
+logger = get_logger(__name__)
+
+MAGIC = b"NBAFEAT\x00"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct("<8sI")
+
+# Key arrays and their dtypes; values are one float32 (rows, columns) block
+KEY_DTYPES: Dict[str, str] = {
+    "game_id": "S16",
+    "season": "S8",
+    "game_date": "datetime64[D]",
+    "team_tricode": "S4",
+    "opponent_tricode": "S4",
+    "is_home": "bool",
+}
+VALUE_DTYPE = "float32"
+
+
+class FeatureStoreError(Exception):
+    """A feature store file that cannot be read with this version."""
+
+
+@dataclass
+class FeatureMatrix:
+    """Dense per-(game, team) features with their key arrays.
+
+    ``values`` holds every column as float32 (missing values are NaN,
+    booleans 0/1); ``columns``, ``kinds`` and ``roles`` describe its columns.
+    """
+    keys: Dict[str, np.ndarray]
+    values: np.ndarray
+    columns: Tuple[str, ...]
+    kinds: Tuple[str, ...]
+    roles: Tuple[str, ...]
+    schema_hash: str = FEATURE_SCHEMA_HASH
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Any], columns: Sequence[FeatureColumn] = FEATURE_COLUMNS) -> "FeatureMatrix":
+        """Matrix from ``fetch_feature_rows`` records (or mappings with the same fields)."""
+        keys = {
+            name: np.array([row[name] for row in rows], dtype=dtype).reshape(len(rows))
+            for name, dtype in KEY_DTYPES.items()
+        }
+        names = [column.name for column in columns]
+        values = np.array(
+            [[_number(row[name]) for name in names] for row in rows], dtype=VALUE_DTYPE
+        ).reshape(len(rows), len(names))
+        return cls(
+            keys=keys, values=values, columns=tuple(names),
+            kinds=tuple(column.kind for column in columns),
+            roles=tuple(column.role for column in columns),
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        """One column as a (strided) view."""
+        return self.values[:, self.columns.index(name)]
+
+    def _role_slice(self, role: str) -> slice:
+        positions = [i for i, r in enumerate(self.roles) if r == role]
+        return slice(positions[0], positions[-1] + 1) if positions else slice(0, 0)
+
+    @property
+    def features(self) -> np.ndarray:
+        """Feature columns as a view (they precede the labels)."""
+        return self.values[:, self._role_slice(ROLE_FEATURE)]
+
+    @property
+    def labels(self) -> np.ndarray:
+        """Label columns as a view."""
+        return self.values[:, self._role_slice(ROLE_LABEL)]
+
+    def take(self, index: Union[slice, np.ndarray]) -> "FeatureMatrix":
+        """Rows by slice (a view) or index/mask array (a copy)."""
+        return FeatureMatrix(
+            keys={name: array[index] for name, array in self.keys.items()},
+            values=self.values[index], columns=self.columns, kinds=self.kinds,
+            roles=self.roles, schema_hash=self.schema_hash,
+        )
+
+    def sorted(self) -> "FeatureMatrix":
+        order = np.lexsort((self.keys["team_tricode"], self.keys["game_id"], self.keys["game_date"]))
+        return self.take(order)
+
+    def season_ranges(self) -> Dict[str, Tuple[int, int]]:
+        """Row range of each season, for rows in store order."""
+        seasons = self.keys["season"]
+        if not len(seasons):
+            return {}
+        starts = np.flatnonzero(np.r_[True, seasons[1:] != seasons[:-1]])
+        stops = np.r_[starts[1:], len(seasons)]
+        return {seasons[a].decode(): (int(a), int(b)) for a, b in zip(starts, stops)}
+
+
+def _number(value: Any) -> float:
+    return np.nan if value is None else float(value)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_features(path: Union[str, Path], matrix: FeatureMatrix) -> None:
+    """Write ``matrix`` (rows in store order) to ``path`` atomically."""
+    path = Path(path)
+    arrays = [(name, np.ascontiguousarray(matrix.keys[name], dtype=dtype)) for name, dtype in KEY_DTYPES.items()]
+    arrays.append(("values", np.ascontiguousarray(matrix.values, dtype=VALUE_DTYPE)))
+
+    header: Dict[str, Any] = {
+        "format_version": FORMAT_VERSION,
+        "schema_version": FEATURE_SCHEMA_VERSION,
+        "schema_hash": matrix.schema_hash,
+        "rows": len(matrix),
+        "columns": [
+            {"name": name, "kind": kind, "role": role}
+            for name, kind, role in zip(matrix.columns, matrix.kinds, matrix.roles)
+        ],
+        "seasons": matrix.season_ranges(),
+        "written_at": datetime.now(UTC).isoformat(),
+        "arrays": [],
+    }
+    # Offsets depend on the header length, which depends on the offsets' digits:
+    # size the header with placeholder offsets padded to a fixed width
+    placeholder = 10 ** 15
+    header["arrays"] = [
+        {"name": name, "dtype": array.dtype.str, "shape": list(array.shape), "offset": placeholder}
+        for name, array in arrays
+    ]
+    data_start = _aligned(_PREAMBLE.size + len(json.dumps(header).encode()))
+    offset = data_start
+    for entry, (_, array) in zip(header["arrays"], arrays):
+        entry["offset"] = offset
+        offset = _aligned(offset + array.nbytes)
+    encoded = json.dumps(header).encode()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, len(encoded)))
+            f.write(encoded)
+            for entry, (_, array) in zip(header["arrays"], arrays):
+                f.write(b"\0" * (entry["offset"] - f.tell()))
+                f.write(array.tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+@contextmanager
+def _write_lock(path: Path) -> Iterator[None]:
+    """Exclusive advisory lock serialising the writers of ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f".{path.name}.lock"), "ab") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def read_header(buffer: Union[bytes, np.ndarray]) -> Dict[str, Any]:
+    """Parse and check the header at the start of a store file."""
+    raw = bytes(buffer[:_PREAMBLE.size])
+    if len(raw) < _PREAMBLE.size:
+        raise FeatureStoreError("Truncated feature store header")
+    magic, length = _PREAMBLE.unpack(raw)
+    if magic != MAGIC:
+        raise FeatureStoreError("Not a feature store file")
+    header = json.loads(bytes(buffer[_PREAMBLE.size:_PREAMBLE.size + length]))
+    if header.get("format_version") != FORMAT_VERSION:
+        raise FeatureStoreError(f"Unsupported feature store format {header.get('format_version')}")
+    return header
+
+
+def read_features(path: Union[str, Path]) -> Tuple[FeatureMatrix, Dict[str, Any]]:
+    """Map a store file read-only; arrays are views into the mapping."""
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    header = read_header(buffer)
+    arrays = {}
+    for entry in header["arrays"]:
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        start = entry["offset"]
+        arrays[entry["name"]] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=start
+        ).reshape(entry["shape"])
+    columns = header["columns"]
+    matrix = FeatureMatrix(
+        keys={name: arrays[name] for name in KEY_DTYPES},
+        values=arrays["values"],
+        columns=tuple(c["name"] for c in columns),
+        kinds=tuple(c["kind"] for c in columns),
+        roles=tuple(c["role"] for c in columns),
+        schema_hash=header["schema_hash"],
+    )
+    return matrix, header
+
+
+class FeatureStore:
+    """Per-(game, team) feature matrix persisted in one memory-mappable file.
+
+    Args:
+        path: Store file path
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self, seasons: Optional[Sequence[str]] = None) -> FeatureMatrix:
+        """The stored matrix, or the rows of ``seasons``.
+
+        Consecutive seasons are one slice of the mapping (no copy); a
+        selection with gaps is gathered into a copy.
+        """
+        matrix, header = read_features(self.path)
+        if seasons is None:
+            return matrix
+        ranges = sorted(tuple(header["seasons"][s]) for s in set(seasons) if s in header["seasons"])
+        if not ranges:
+            return matrix.take(slice(0, 0))
+        if all(prev[1] == nxt[0] for prev, nxt in zip(ranges, ranges[1:])):
+            return matrix.take(slice(ranges[0][0], ranges[-1][1]))
+        return matrix.take(np.concatenate([np.arange(a, b) for a, b in ranges]))
+
+    def update(self, matrix: FeatureMatrix, game_ids: Optional[Sequence[str]] = None) -> int:
+        """Replace the rows of ``game_ids`` (default: the games in ``matrix``) with ``matrix``.
+
+        A store written with another column schema is replaced outright,
+        and the games it held need a rebuild.
+        """
+        replaced = np.unique(matrix.keys["game_id"] if game_ids is None
+                             else np.asarray(list(game_ids), dtype=KEY_DTYPES["game_id"]))
+        with _write_lock(self.path):
+            current = self._current(matrix)
+            keep = current.take(~np.isin(current.keys["game_id"], replaced))
+            merged = FeatureMatrix(
+                keys={name: np.concatenate([keep.keys[name], matrix.keys[name]]) for name in KEY_DTYPES},
+                values=np.concatenate([keep.values, matrix.values]),
+                columns=matrix.columns, kinds=matrix.kinds, roles=matrix.roles,
+                schema_hash=matrix.schema_hash,
+            ).sorted()
+            write_features(self.path, merged)
+        logger.debug("Feature store updated", path=str(self.path), rows=len(merged),
+                     games_replaced=len(replaced), rows_written=len(matrix))
+        return len(matrix)
+
+    def _current(self, matrix: FeatureMatrix) -> FeatureMatrix:
+        """Stored rows to merge with ``matrix``; none when the store is missing or has another schema."""
+        nothing = matrix.take(slice(0, 0))
+        if not self.exists():
+            return nothing
+        try:
+            current, _ = read_features(self.path)
+        except FeatureStoreError as e:
+            logger.warning("Unreadable feature store replaced", path=str(self.path), error=str(e))
+            return nothing
+        if current.schema_hash != matrix.schema_hash or current.columns != matrix.columns:
+            logger.warning("Feature schema changed; stored rows dropped", path=str(self.path),
+                           stored=current.schema_hash, current=matrix.schema_hash, rows=len(current))
+            return nothing
+        return current
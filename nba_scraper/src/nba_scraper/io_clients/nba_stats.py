@@ -7,7 +7,7 @@ import json
 
 from ..config import get_settings
 from ..nba_logging import get_logger
-from ..models.utils import preprocess_nba_stats_data
+from ..utils.column_coercion import coerce_response
 from ..cache import get_cache_manager
 from .http import HttpClient
 
@@ -87,47 +87,20 @@ class NBAStatsClient:
                 # Otherwise parse as JSON
                 raw_data = json.loads(response)
             
-            return self._preprocess_api_response(raw_data)
+            return self._preprocess_api_response(raw_data, endpoint)
             
         except Exception as e:
             logger.error(f"NBA Stats API request failed: {e}", endpoint=endpoint, params=params)
             raise
 
-    def _preprocess_api_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Preprocess NBA Stats API response to handle type inconsistencies."""
+    def _preprocess_api_response(self, data: Dict[str, Any], endpoint: Optional[str] = None) -> Dict[str, Any]:
+        """Coerce NBA Stats API response values using the endpoint's column schema.
+        
+        Each resultSet is coerced in one pass with per-column types; columns the
+        schema doesn't know fall back to heuristic scalar coercion.
+        """
         try:
-            # Apply comprehensive preprocessing to the entire response
-            processed_data = preprocess_nba_stats_data(data)
-            
-            # Additional preprocessing for nested resultSets structure
-            if 'resultSets' in processed_data:
-                processed_result_sets = []
-                for result_set in processed_data['resultSets']:
-                    processed_result_set = preprocess_nba_stats_data(result_set)
-                    
-                    # Process the rowSet data which contains the actual API values
-                    if 'rowSet' in processed_result_set and isinstance(processed_result_set['rowSet'], list):
-                        processed_rows = []
-                        for row in processed_result_set['rowSet']:
-                            if isinstance(row, list):
-                                # Convert each value in the row to prevent type comparison issues
-                                processed_row = []
-                                for value in row:
-                                    # Convert potentially problematic values to strings
-                                    if isinstance(value, (int, float)) and value is not None:
-                                        # Special handling for certain numeric fields that might be compared as enums
-                                        processed_row.append(str(value))
-                                    else:
-                                        processed_row.append(value)
-                                processed_rows.append(processed_row)
-                            else:
-                                processed_rows.append(row)
-                        processed_result_set['rowSet'] = processed_rows
-                    
-                    processed_result_sets.append(processed_result_set)
-                processed_data['resultSets'] = processed_result_sets
-            
-            return processed_data
+            return coerce_response(data, endpoint)
             
         except Exception as e:
             logger.warning("Failed to preprocess API response, returning raw data", error=str(e))
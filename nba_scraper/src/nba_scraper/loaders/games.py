@@ -1,24 +1,28 @@
 """Game loaders with idempotent upserts."""
 
 import asyncpg
+from typing import Optional
 from ..models.games import Game
+from .summaries import refresh_enabled, refresh_summaries
+from .upsert import TableSpec, upsert_rows
 
+GAMES_SPEC = TableSpec.from_model(
+    "games",
+    Game,
+    conflict_keys=("game_id",),
+    types={"game_date": "date"},
+    insert_exprs=(("created_at", "NOW()"), ("updated_at", "NOW()")),
+    update_exprs=(("updated_at", "NOW()"),),
+)
 
-async def upsert_game(conn: asyncpg.Connection, game: Game) -> None:
-    """Upsert a single game with idempotent behavior."""
-    await conn.execute("""
-        INSERT INTO games (
-            game_id, season, game_date, home_team_id, 
-            away_team_id, status, created_at, updated_at
-        )
-        VALUES ($1, $2, $3, $4, $5, $6, NOW(), NOW())
-        ON CONFLICT (game_id) 
-        DO UPDATE SET
-            season = EXCLUDED.season,
-            game_date = EXCLUDED.game_date,
-            home_team_id = EXCLUDED.home_team_id,
-            away_team_id = EXCLUDED.away_team_id,
-            status = EXCLUDED.status,
-            updated_at = NOW()
-    """, game.game_id, game.season, game.game_date, 
-        game.home_team_id, game.away_team_id, game.status)
\ No newline at end of file
+
+async def upsert_game(conn: asyncpg.Connection, game: Game, refresh: Optional[bool] = None) -> None:
+    """Upsert a single game with idempotent behavior.
+
+    ``updated_at`` only moves when a column actually changed. A changed game
+    refreshes its season summaries when ``refresh`` (default: the
+    REFRESH_SUMMARIES setting) is on.
+    """
+    result = await upsert_rows(conn, GAMES_SPEC, [game])
+    if refresh_enabled(refresh) and (result.changed or not result.exact):
+        await refresh_summaries(conn, [game.game_id])
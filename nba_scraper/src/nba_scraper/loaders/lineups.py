@@ -3,29 +3,25 @@
 import asyncpg
 from typing import List
 from ..models.lineups import LineupStint
+from .upsert import TableSpec, upsert_rows
+
+# The primary key is (game_id, team_id, period, lineup_hash) where lineup_hash is a
+# generated md5 of lineup_player_ids, so duplicates are collapsed on the array itself.
+LINEUP_STINTS_SPEC = TableSpec.from_model(
+    "lineup_stints",
+    LineupStint,
+    conflict_keys=("game_id", "team_id", "period", "lineup_hash"),
+    dedupe_keys=("game_id", "team_id", "period", "lineup_player_ids"),
+    rename={"lineup": "lineup_player_ids"},
+    types={"lineup_player_ids": "int4[]"},
+    update_columns=("seconds_played", "plus_minus"),
+    insert_exprs=(("created_at", "NOW()"),),
+)
 
 
 async def upsert_lineups(conn: asyncpg.Connection, rows: List[LineupStint]) -> None:
     """Upsert lineup stints in batch with array-based primary key."""
     if not rows:
         return
-    
-    # Prepare batch data
-    values = [
-        (
-            row.game_id, row.team_id, row.period, 
-            row.lineup, row.seconds_played
-        ) 
-        for row in rows
-    ]
-    
-    await conn.executemany("""
-        INSERT INTO lineup_stints (
-            game_id, team_id, period, lineup_player_ids, 
-            seconds_played, created_at
-        )
-        VALUES ($1, $2, $3, $4, $5, NOW())
-        ON CONFLICT (game_id, team_id, period, lineup_player_ids) 
-        DO UPDATE SET
-            seconds_played = EXCLUDED.seconds_played
-    """, values)
\ No newline at end of file
+
+    await upsert_rows(conn, LINEUP_STINTS_SPEC, rows)
@@ -0,0 +1,186 @@
+"""Season partitions of the high-volume event tables.
+
+``pbp_events`` and ``shot_events`` are LIST-partitioned on ``season``
+(migration 008): each season lives in its own table, ``<table>_<yyyy>_<yy>``,
+so a query that names a season reads one partition and a season rebuild can
+truncate or detach a whole partition instead of deleting row by row. Rows
+whose season cannot be derived from the game ID land in ``<table>_default``.
+
+Loaders create a season's partition the first time they write to it (see
+``TableSpec.partition_key`` in :mod:`.upsert`), and write batches straight
+into it rather than routing each row through the parent. Rows of that
+season already sitting in the default partition (written before the
+partition existed) are moved into it as it is created.
+
+Which partitions exist is cached per process. Every function here that
+detaches, drops or empties a partition clears its entry, and a write that
+finds its partition gone clears the table's entries, so the next write
+creates the partition again.
+"""
+
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import asyncpg
+
+from ..nba_logging import get_logger
+from ..utils.season import derive_season_from_game_id, validate_season_format
+
+logger = get_logger(__name__)
+
+SEASON_PARTITIONED_TABLES: Tuple[str, ...] = ("pbp_events", "shot_events")
+# Stored for rows whose game ID carries no season; lives in the default partition
+UNKNOWN_SEASON = "unknown"
+
+PARTITIONS_QUERY = """
+SELECT c.relname AS partition, pg_get_expr(c.relpartbound, c.oid) AS bound
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = to_regclass($1)
+ORDER BY c.relname
+"""
+
+# (table, season) pairs known to have a partition in this process
+_ensured: Set[Tuple[str, str]] = set()
+
+
+def partition_name(table: str, season: str) -> str:
+    """Partition table holding ``season`` of ``table``, e.g. ``pbp_events_2023_24``."""
+    if not validate_season_format(season):
+        raise ValueError(f"Not a season: {season!r}")
+    return f"{table}_{season.strip().replace('-', '_')}"
+
+
+def season_for_row(row: Any) -> str:
+    """Partition key for a row: its ``season`` if it has one, else derived from ``game_id``."""
+    season = row.get("season") if isinstance(row, Mapping) else getattr(row, "season", None)
+    if season:
+        return season
+    game_id = row.get("game_id") if isinstance(row, Mapping) else getattr(row, "game_id", None)
+    return derive_season_from_game_id(game_id) or UNKNOWN_SEASON
+
+
+def routes_to_partition(season: Optional[str]) -> bool:
+    """Whether rows of ``season`` get their own partition (otherwise the default one)."""
+    return bool(season) and validate_season_format(season)
+
+
+async def ensure_partition(conn: asyncpg.Connection, table: str, season: str) -> str:
+    """Create ``season``'s partition of ``table`` if needed and return its name."""
+    name = partition_name(table, season)
+    if (table, season) in _ensured:
+        return name
+    try:
+        # Savepoint: a concurrent creator must not abort the caller's transaction
+        async with conn.transaction():
+            await conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES IN ('{season}')"
+            )
+    except (asyncpg.exceptions.DuplicateTableError, asyncpg.exceptions.UniqueViolationError):
+        pass
+    except asyncpg.exceptions.CheckViolationError:
+        # The default partition already holds rows of this season
+        await _split_from_default(conn, table, season, name)
+    _ensured.add((table, season))
+    return name
+
+
+async def _split_from_default(conn: asyncpg.Connection, table: str, season: str, name: str) -> None:
+    """Create ``name`` holding the rows of ``season`` moved out of the default partition.
+
+    The rows go into a standalone table that is then attached, all in one
+    savepoint; attaching checks the default partition no longer has any.
+    """
+    default = next((row["partition"] for row in await conn.fetch(PARTITIONS_QUERY, table)
+                    if row["bound"] == "DEFAULT"), None)
+    if default is None:
+        raise RuntimeError(f"{table} rejected partition {name} but has no default partition")
+    try:
+        async with conn.transaction():
+            await conn.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+            moved = await conn.execute(
+                f"WITH moved AS (DELETE FROM {default} WHERE season = $1 RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved", season
+            )
+            await conn.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES IN ('{season}')")
+    except asyncpg.exceptions.DuplicateTableError:
+        return  # a concurrent writer moved them
+    logger.info("Season rows moved out of the default partition", table=table, season=season,
+                partition=name, rows=int(moved.split()[-1]))
+
+
+def forget_partition(table: str, season: Optional[str] = None) -> None:
+    """Clear the cached partition of ``table`` for ``season`` (default: every season)."""
+    if season is not None:
+        _ensured.discard((table, season))
+    else:
+        _ensured.difference_update({key for key in _ensured if key[0] == table})
+
+
+async def season_partitions(conn: asyncpg.Connection, table: str) -> Dict[str, str]:
+    """Season -> partition name for the partitions attached to ``table`` (default excluded)."""
+    partitions = {}
+    for row in await conn.fetch(PARTITIONS_QUERY, table):
+        bound = row["bound"] or ""
+        if bound.startswith("FOR VALUES IN ('"):
+            partitions[bound[len("FOR VALUES IN ('"):bound.index("')")]] = row["partition"]
+    return partitions
+
+
+async def truncate_season(
+    conn: asyncpg.Connection, season: str, tables: Sequence[str] = SEASON_PARTITIONED_TABLES
+) -> List[str]:
+    """Empty ``season``'s partitions; returns the partitions truncated."""
+    truncated = []
+    for table in tables:
+        name = (await season_partitions(conn, table)).get(season)
+        if name:
+            await conn.execute(f"TRUNCATE {name}")
+            forget_partition(table, season)
+            truncated.append(name)
+    logger.info("Season partitions truncated", season=season, partitions=truncated)
+    return truncated
+
+
+async def detach_season(
+    conn: asyncpg.Connection, season: str, tables: Sequence[str] = SEASON_PARTITIONED_TABLES
+) -> Dict[str, str]:
+    """Detach ``season``'s partitions and keep them as standalone backup tables.
+
+    Loaders recreate an empty partition on their next write, so the season
+    can be rebuilt while the old rows stay available to
+    :func:`restore_season`. Returns table -> backup table name.
+    """
+    stamp = datetime.now(UTC).strftime("%Y%m%d%H%M%S")
+    backups = {}
+    for table in tables:
+        name = (await season_partitions(conn, table)).get(season)
+        if not name:
+            continue
+        backup = f"{name}_detached_{stamp}"
+        await conn.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+        await conn.execute(f"ALTER TABLE {name} RENAME TO {backup}")
+        forget_partition(table, season)
+        backups[table] = backup
+    logger.info("Season partitions detached", season=season, backups=backups)
+    return backups
+
+
+async def restore_season(conn: asyncpg.Connection, season: str, backups: Mapping[str, str]) -> None:
+    """Swap detached backups back in, dropping whatever partition replaced them."""
+    for table, backup in backups.items():
+        name = partition_name(table, season)
+        if name in (await season_partitions(conn, table)).values():
+            await conn.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            await conn.execute(f"DROP TABLE {name}")
+        await conn.execute(f"ALTER TABLE {backup} RENAME TO {name}")
+        await conn.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES IN ('{season}')")
+        forget_partition(table, season)
+    logger.info("Season partitions restored", season=season, tables=sorted(backups))
+
+
+async def drop_detached(conn: asyncpg.Connection, backups: Mapping[str, str]) -> None:
+    """Drop backup tables left by :func:`detach_season` once a rebuild is accepted."""
+    for table, backup in backups.items():
+        await conn.execute(f"DROP TABLE IF EXISTS {backup}")
+        forget_partition(table)
@@ -1,40 +1,44 @@
 """PBP loaders with idempotent upserts and clock_seconds support."""
 
 import asyncpg
-from typing import List
+from typing import List, Optional
 from ..models.pbp import PbpEvent
+from .partitions import season_for_row
+from .summaries import refresh_enabled, refresh_summaries
+from .upsert import Column, TableSpec, upsert_rows
 
 
-async def upsert_pbp(conn: asyncpg.Connection, rows: List[PbpEvent]) -> None:
-    """Upsert PBP events in batch with clock_seconds support."""
+def _clock_seconds(row: PbpEvent):
+    if row.clock_ms_remaining is None:
+        return None
+    return row.clock_ms_remaining / 1000.0
+
+
+PBP_EVENTS_SPEC = TableSpec.from_model(
+    "pbp_events",
+    PbpEvent,
+    conflict_keys=("game_id", "event_num", "season"),
+    exclude=("clock_ms_remaining",),
+    extra=(
+        Column("clock_seconds", "float8", getter=_clock_seconds),
+        Column("season", "text", getter=season_for_row),
+    ),
+    insert_exprs=(("created_at", "NOW()"),),
+    partition_key="season",
+)
+
+
+async def upsert_pbp(conn: asyncpg.Connection, rows: List[PbpEvent], refresh: Optional[bool] = None) -> None:
+    """Upsert PBP events in batch with clock_seconds support.
+
+    Events are written straight into their season's partition.
+
+    Games with changed events refresh their season summaries when
+    ``refresh`` (default: the REFRESH_SUMMARIES setting) is on.
+    """
     if not rows:
         return
-    
-    # Prepare batch data
-    values = [
-        (
-            row.game_id, row.event_num, row.period, row.clock,
-            row.team_id, row.player1_id, row.action_type, 
-            row.action_subtype, row.description, row.clock_seconds
-        ) 
-        for row in rows
-    ]
-    
-    await conn.executemany("""
-        INSERT INTO pbp_events (
-            game_id, event_num, period, clock, team_id, 
-            player1_id, action_type, action_subtype, description,
-            clock_seconds, created_at
-        )
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, NOW())
-        ON CONFLICT (game_id, event_num) 
-        DO UPDATE SET
-            period = EXCLUDED.period,
-            clock = EXCLUDED.clock,
-            team_id = EXCLUDED.team_id,
-            player1_id = EXCLUDED.player1_id,
-            action_type = EXCLUDED.action_type,
-            action_subtype = EXCLUDED.action_subtype,
-            description = EXCLUDED.description,
-            clock_seconds = EXCLUDED.clock_seconds
-    """, values)
\ No newline at end of file
+
+    result = await upsert_rows(conn, PBP_EVENTS_SPEC, rows)
+    if refresh_enabled(refresh) and (result.changed or not result.exact):
+        await refresh_summaries(conn, sorted({row.game_id for row in rows}))
@@ -3,31 +3,23 @@
 import asyncpg
 from typing import List
 from ..models.shots import ShotEvent
+from .partitions import season_for_row
+from .upsert import Column, TableSpec, upsert_rows
+
+SHOT_EVENTS_SPEC = TableSpec.from_model(
+    "shot_events",
+    ShotEvent,
+    conflict_keys=("game_id", "player_id", "period", "loc_x", "loc_y", "season"),
+    exclude=("clock_ms_remaining",),
+    extra=(Column("season", "text", getter=season_for_row),),
+    insert_exprs=(("created_at", "NOW()"),),
+    partition_key="season",
+)
 
 
 async def upsert_shots(conn: asyncpg.Connection, rows: List[ShotEvent]) -> None:
-    """Upsert shot events in batch with coordinate data."""
+    """Upsert shot events in batch with coordinate data, per season partition."""
     if not rows:
         return
-    
-    # Prepare batch data
-    values = [
-        (
-            row.game_id, row.player_id, row.team_id, row.period,
-            row.shot_made_flag, row.loc_x, row.loc_y, row.event_num
-        ) 
-        for row in rows
-    ]
-    
-    await conn.executemany("""
-        INSERT INTO shot_events (
-            game_id, player_id, team_id, period,
-            shot_made_flag, loc_x, loc_y, event_num, created_at
-        )
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW())
-        ON CONFLICT (game_id, player_id, period, loc_x, loc_y) 
-        DO UPDATE SET
-            team_id = EXCLUDED.team_id,
-            shot_made_flag = EXCLUDED.shot_made_flag,
-            event_num = EXCLUDED.event_num
-    """, values)
\ No newline at end of file
+
+    await upsert_rows(conn, SHOT_EVENTS_SPEC, rows)
@@ -0,0 +1,427 @@
+"""Materialized season summaries for the serving layer.
+
+Two per-game tables are derived straight from games and pbp_events:
+``game_results`` (final points per side) and ``player_game_box`` (box counts
+per player). The season summaries aggregate those small tables:
+
+- ``team_season_summary``: record, points and home/away splits per team
+- ``team_rolling_form``: the same over each team's last N games
+- ``head_to_head_summary``: record per team pair, tricodes ordered
+- ``player_season_summary``: box totals per player
+
+The per-game queries come in two layouts, picked from the pbp_events columns
+the database actually has: the full schema (schema.sql) with tricodes and
+event_type, and the foundation schema (db_migrations_foundations.sql) that
+``upsert_game``/``upsert_pbp`` write, with integer team ids and NBA Stats
+action_type codes.
+
+``refresh_summaries`` rebuilds the per-game rows of the games it is given.
+It then recomputes only the summary keys those games touch, before and after
+the change, so a single game costs a few indexed aggregates rather than a
+season scan. ``check_summaries`` recomputes every table from its source and
+reports the keys whose stored rows differ.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import asyncpg
+
+from ..config import get_settings
+from ..nba_logging import get_logger
+from ..state.processing_plan import PBP_COLUMNS_QUERY
+from ..utils.team_crosswalk import get_team_index
+
+logger = get_logger(__name__)
+
+ROLLING_WINDOWS = (5, 10)
+
+_BOX_EVENTS = (
+    "SHOT_MADE", "SHOT_MISSED", "FREE_THROW_MADE", "FREE_THROW_MISSED", "REBOUND",
+    "ASSIST", "STEAL", "BLOCK", "TURNOVER", "FOUL", "PERSONAL_FOUL",
+)
+
+_POINTS = """CASE
+    WHEN e.event_type = 'SHOT_MADE' AND e.shot_value IN (1, 2, 3) THEN e.shot_value
+    WHEN e.event_type = 'FREE_THROW_MADE' THEN 1
+    ELSE 0
+END"""
+
+# Summary keys held by the given games' per-game rows
+GAME_KEYS_QUERY = """
+SELECT season, home_team_tricode, away_team_tricode, NULL::text AS player_id
+FROM game_results WHERE game_id = ANY($1::text[])
+UNION
+SELECT season, NULL, NULL, player_id
+FROM player_game_box WHERE game_id = ANY($1::text[])
+"""
+
+# One row per team per game
+_TEAM_GAMES = """(
+    SELECT season, game_id, game_date, home_team_tricode AS team_tricode, home_team_id AS team_id,
+           TRUE AS is_home, home_points AS points_for, away_points AS points_against
+    FROM game_results
+    UNION ALL
+    SELECT season, game_id, game_date, away_team_tricode, away_team_id,
+           FALSE, away_points, home_points
+    FROM game_results
+) tg"""
+
+# One row per game with the pair's tricodes in sorted order
+_PAIR_GAMES = """(
+    SELECT season, game_id, game_date,
+           LEAST(home_team_tricode, away_team_tricode) AS team_a,
+           GREATEST(home_team_tricode, away_team_tricode) AS team_b,
+           CASE WHEN home_team_tricode < away_team_tricode THEN home_team_id ELSE away_team_id END AS team_a_id,
+           CASE WHEN home_team_tricode < away_team_tricode THEN away_team_id ELSE home_team_id END AS team_b_id,
+           CASE WHEN home_team_tricode < away_team_tricode THEN home_points ELSE away_points END AS a_points,
+           CASE WHEN home_team_tricode < away_team_tricode THEN away_points ELSE home_points END AS b_points
+    FROM game_results
+) pg"""
+
+
+@dataclass(frozen=True)
+class SummaryTable:
+    """A summary table and the query that recomputes it.
+
+    ``select`` yields ``columns`` in order and filters its source rows with
+    a ``{scope}`` condition over ``scope_keys``, which are also the keys the
+    incremental refresh deletes and recomputes. ``season_source`` is the
+    season column as ``select`` must name it (qualified where its sources
+    join several tables that carry one).
+    """
+    name: str
+    scope_keys: Tuple[str, ...]
+    columns: Tuple[str, ...]
+    select: str
+    season_source: str = "season"
+
+    def scoped(self, scope: str) -> str:
+        return self.select.format(scope=scope)
+
+    def key_scope(self) -> str:
+        arrays = ", ".join(f"${i}::text[]" for i in range(1, len(self.scope_keys) + 1))
+        return f"({', '.join(self.scope_keys)}) IN (SELECT * FROM unnest({arrays}))"
+
+    @property
+    def delete_sql(self) -> str:
+        return f"DELETE FROM {self.name} WHERE {self.key_scope()}"
+
+    @property
+    def insert_sql(self) -> str:
+        return f"INSERT INTO {self.name} ({', '.join(self.columns)})\n{self.scoped(self.key_scope())}"
+
+    @property
+    def check_sql(self) -> str:
+        """Keys whose stored rows differ from a full recompute (``$1``: seasons or NULL)."""
+        scope = "($1::text[] IS NULL OR {season} = ANY($1::text[]))"
+        columns = ", ".join(self.columns)
+        return f"""
+WITH expected AS ({self.scoped(scope.format(season=self.season_source))}),
+     stored AS (SELECT {columns} FROM {self.name} WHERE {scope.format(season="season")}),
+     diff AS ((SELECT * FROM expected EXCEPT SELECT * FROM stored)
+              UNION ALL
+              (SELECT * FROM stored EXCEPT SELECT * FROM expected))
+SELECT DISTINCT {', '.join(self.scope_keys)} FROM diff
+"""
+
+
+GAME_RESULTS = SummaryTable(
+    "game_results",
+    ("game_id",),
+    ("game_id", "season", "game_date", "home_team_tricode", "away_team_tricode",
+     "home_team_id", "away_team_id", "home_points", "away_points"),
+    f"""SELECT game_id, g.season, g.game_date_local, g.home_team_tricode, g.away_team_tricode,
+       g.home_team_id, g.away_team_id,
+       COALESCE(SUM({_POINTS}) FILTER (WHERE e.team_tricode = g.home_team_tricode), 0),
+       COALESCE(SUM({_POINTS}) FILTER (WHERE e.team_tricode = g.away_team_tricode), 0)
+FROM games g
+JOIN pbp_events e USING (game_id)
+WHERE {{scope}} AND g.status = 'FINAL'
+GROUP BY game_id, g.season, g.game_date_local, g.home_team_tricode, g.away_team_tricode,
+         g.home_team_id, g.away_team_id""",
+    season_source="g.season",
+)
+
+_PLAYER_COUNTS = (
+    "points", "field_goals_made", "field_goals_attempted", "three_pointers_made", "three_pointers_attempted",
+    "free_throws_made", "free_throws_attempted", "rebounds", "assists", "steals", "blocks", "turnovers", "fouls",
+)
+
+PLAYER_GAME_BOX = SummaryTable(
+    "player_game_box",
+    ("game_id",),
+    ("game_id", "player_id", "season", "game_date", "team_tricode") + _PLAYER_COUNTS,
+    f"""SELECT game_id, e.player1_id, g.season, g.game_date_local,
+       MODE() WITHIN GROUP (ORDER BY e.team_tricode),
+       SUM({_POINTS}),
+       COUNT(*) FILTER (WHERE e.event_type = 'SHOT_MADE' AND e.shot_value IN (2, 3)),
+       COUNT(*) FILTER (WHERE e.event_type IN ('SHOT_MADE', 'SHOT_MISSED') AND e.shot_value IN (2, 3)),
+       COUNT(*) FILTER (WHERE e.event_type = 'SHOT_MADE' AND e.shot_value = 3),
+       COUNT(*) FILTER (WHERE e.event_type IN ('SHOT_MADE', 'SHOT_MISSED') AND e.shot_value = 3),
+       COUNT(*) FILTER (WHERE e.event_type = 'FREE_THROW_MADE'),
+       COUNT(*) FILTER (WHERE e.event_type IN ('FREE_THROW_MADE', 'FREE_THROW_MISSED')),
+       COUNT(*) FILTER (WHERE e.event_type = 'REBOUND'),
+       COUNT(*) FILTER (WHERE e.event_type = 'ASSIST'),
+       COUNT(*) FILTER (WHERE e.event_type = 'STEAL'),
+       COUNT(*) FILTER (WHERE e.event_type = 'BLOCK'),
+       COUNT(*) FILTER (WHERE e.event_type = 'TURNOVER'),
+       COUNT(*) FILTER (WHERE e.event_type IN ('FOUL', 'PERSONAL_FOUL'))
+FROM games g
+JOIN pbp_events e USING (game_id)
+WHERE {{scope}} AND g.status = 'FINAL'
+  AND e.player1_id IS NOT NULL
+  AND e.event_type IN ({", ".join(f"'{event}'" for event in _BOX_EVENTS)})
+GROUP BY game_id, e.player1_id, g.season, g.game_date_local""",
+    season_source="g.season",
+)
+
+# NBA Stats action_type codes (EVENTMSGTYPE) in the foundation pbp_events
+_MADE_FG, _MISSED_FG, _FREE_THROW, _REBOUND, _TURNOVER, _FOUL = 1, 2, 3, 4, 5, 6
+
+_THREE = "e.description ILIKE '%3PT%'"
+_FT_MADE = f"e.action_type = {_FREE_THROW} AND e.description NOT ILIKE '%MISS%'"
+
+_FOUNDATION_POINTS = f"""CASE
+    WHEN e.action_type = {_MADE_FG} AND {_THREE} THEN 3
+    WHEN e.action_type = {_MADE_FG} THEN 2
+    WHEN {_FT_MADE} THEN 1
+    ELSE 0
+END"""
+
+
+def _team_tricodes(alias: str) -> str:
+    """Team id -> canonical tricode, from the team crosswalk."""
+    tricodes: Dict[int, str] = {}
+    for tricode, team_id in get_team_index().items():
+        tricodes.setdefault(team_id, tricode)
+    values = ", ".join(f"({team_id}, '{tricode}')" for team_id, tricode in sorted(tricodes.items()))
+    return f"(VALUES {values}) AS {alias}(team_id, tricode)"
+
+
+# The per-game tables over the foundation games/pbp_events. Unknown team ids
+# keep their id as tricode. Assists, steals and blocks are credited to
+# player2/player3, which that layout does not store, so they stay 0.
+FOUNDATION_GAME_RESULTS = SummaryTable(
+    "game_results",
+    GAME_RESULTS.scope_keys,
+    GAME_RESULTS.columns,
+    f"""SELECT game_id, g.season, g.game_date,
+       COALESCE(home_team.tricode, g.home_team_id::text), COALESCE(away_team.tricode, g.away_team_id::text),
+       g.home_team_id::text, g.away_team_id::text,
+       COALESCE(SUM({_FOUNDATION_POINTS}) FILTER (WHERE e.team_id = g.home_team_id), 0),
+       COALESCE(SUM({_FOUNDATION_POINTS}) FILTER (WHERE e.team_id = g.away_team_id), 0)
+FROM games g
+JOIN pbp_events e USING (game_id)
+LEFT JOIN {_team_tricodes("home_team")} ON home_team.team_id = g.home_team_id
+LEFT JOIN {_team_tricodes("away_team")} ON away_team.team_id = g.away_team_id
+WHERE {{scope}} AND UPPER(g.status) = 'FINAL'
+GROUP BY game_id, g.season, g.game_date, home_team.tricode, away_team.tricode,
+         g.home_team_id, g.away_team_id""",
+    season_source="g.season",
+)
+
+FOUNDATION_PLAYER_GAME_BOX = SummaryTable(
+    "player_game_box",
+    PLAYER_GAME_BOX.scope_keys,
+    PLAYER_GAME_BOX.columns,
+    f"""SELECT game_id, e.player1_id::text, g.season, g.game_date,
+       MODE() WITHIN GROUP (ORDER BY COALESCE(player_team.tricode, e.team_id::text)),
+       SUM({_FOUNDATION_POINTS}),
+       COUNT(*) FILTER (WHERE e.action_type = {_MADE_FG}),
+       COUNT(*) FILTER (WHERE e.action_type IN ({_MADE_FG}, {_MISSED_FG})),
+       COUNT(*) FILTER (WHERE e.action_type = {_MADE_FG} AND {_THREE}),
+       COUNT(*) FILTER (WHERE e.action_type IN ({_MADE_FG}, {_MISSED_FG}) AND {_THREE}),
+       COUNT(*) FILTER (WHERE {_FT_MADE}),
+       COUNT(*) FILTER (WHERE e.action_type = {_FREE_THROW}),
+       COUNT(*) FILTER (WHERE e.action_type = {_REBOUND}),
+       0, 0, 0,
+       COUNT(*) FILTER (WHERE e.action_type = {_TURNOVER}),
+       COUNT(*) FILTER (WHERE e.action_type = {_FOUL})
+FROM games g
+JOIN pbp_events e USING (game_id)
+LEFT JOIN {_team_tricodes("player_team")} ON player_team.team_id = e.team_id
+WHERE {{scope}} AND UPPER(g.status) = 'FINAL'
+  AND e.player1_id IS NOT NULL
+  AND e.action_type IN ({_MADE_FG}, {_MISSED_FG}, {_FREE_THROW}, {_REBOUND}, {_TURNOVER}, {_FOUL})
+GROUP BY game_id, e.player1_id, g.season, g.game_date""",
+    season_source="g.season",
+)
+
+TEAM_SEASON_SUMMARY = SummaryTable(
+    "team_season_summary",
+    ("season", "team_tricode"),
+    ("season", "team_tricode", "team_id", "games", "wins", "losses", "points_for", "points_against",
+     "home_games", "home_wins", "away_games", "away_wins", "last_game_date"),
+    f"""SELECT season, team_tricode, MAX(team_id), COUNT(*),
+       COUNT(*) FILTER (WHERE points_for > points_against),
+       COUNT(*) FILTER (WHERE points_for < points_against),
+       SUM(points_for), SUM(points_against),
+       COUNT(*) FILTER (WHERE is_home),
+       COUNT(*) FILTER (WHERE is_home AND points_for > points_against),
+       COUNT(*) FILTER (WHERE NOT is_home),
+       COUNT(*) FILTER (WHERE NOT is_home AND points_for > points_against),
+       MAX(game_date)
+FROM {_TEAM_GAMES}
+WHERE {{scope}}
+GROUP BY season, team_tricode""",
+)
+
+TEAM_ROLLING_FORM = SummaryTable(
+    "team_rolling_form",
+    ("season", "team_tricode"),
+    ("season", "team_tricode", "window_size", "games", "wins", "losses", "points_for", "points_against",
+     "first_game_date", "last_game_date"),
+    f"""SELECT season, team_tricode, w.window_size, COUNT(*),
+       COUNT(*) FILTER (WHERE points_for > points_against),
+       COUNT(*) FILTER (WHERE points_for < points_against),
+       SUM(points_for), SUM(points_against), MIN(game_date), MAX(game_date)
+FROM (
+    SELECT season, team_tricode, game_date, points_for, points_against,
+           ROW_NUMBER() OVER (PARTITION BY season, team_tricode ORDER BY game_date DESC, game_id DESC) AS recency
+    FROM {_TEAM_GAMES}
+    WHERE {{scope}}
+) recent
+JOIN unnest(ARRAY[{", ".join(str(n) for n in ROLLING_WINDOWS)}]) AS w(window_size) ON recent.recency <= w.window_size
+GROUP BY season, team_tricode, w.window_size""",
+)
+
+HEAD_TO_HEAD_SUMMARY = SummaryTable(
+    "head_to_head_summary",
+    ("season", "team_a", "team_b"),
+    ("season", "team_a", "team_b", "team_a_id", "team_b_id", "games", "team_a_wins", "team_b_wins",
+     "team_a_points", "team_b_points", "margin_sum", "last_game_date"),
+    f"""SELECT season, team_a, team_b, MAX(team_a_id), MAX(team_b_id), COUNT(*),
+       COUNT(*) FILTER (WHERE a_points > b_points),
+       COUNT(*) FILTER (WHERE b_points > a_points),
+       SUM(a_points), SUM(b_points), SUM(ABS(a_points - b_points)), MAX(game_date)
+FROM {_PAIR_GAMES}
+WHERE {{scope}}
+GROUP BY season, team_a, team_b""",
+)
+
+PLAYER_SEASON_SUMMARY = SummaryTable(
+    "player_season_summary",
+    ("season", "player_id"),
+    ("season", "player_id", "team_tricode", "games") + _PLAYER_COUNTS,
+    f"""SELECT season, player_id, (ARRAY_AGG(team_tricode ORDER BY game_date DESC, game_id DESC))[1], COUNT(*),
+       {", ".join(f"SUM({column})" for column in _PLAYER_COUNTS)}
+FROM player_game_box
+WHERE {{scope}}
+GROUP BY season, player_id""",
+)
+
+TEAM_SUMMARIES = (TEAM_SEASON_SUMMARY, TEAM_ROLLING_FORM)
+PER_GAME_TABLES = (GAME_RESULTS, PLAYER_GAME_BOX)
+FOUNDATION_PER_GAME_TABLES = (FOUNDATION_GAME_RESULTS, FOUNDATION_PLAYER_GAME_BOX)
+SUMMARY_TABLES = (TEAM_SEASON_SUMMARY, TEAM_ROLLING_FORM, HEAD_TO_HEAD_SUMMARY, PLAYER_SEASON_SUMMARY)
+
+
+@dataclass
+class SummaryRefreshResult:
+    """Keys recomputed by an incremental summary refresh."""
+    games: int = 0
+    team_keys: int = 0
+    pair_keys: int = 0
+    player_keys: int = 0
+    duration_seconds: Optional[float] = None
+
+
+@dataclass
+class SummaryKeys:
+    """Season summary keys held by a set of games' per-game rows."""
+    teams: Set[Tuple[str, str]] = field(default_factory=set)
+    pairs: Set[Tuple[str, str, str]] = field(default_factory=set)
+    players: Set[Tuple[str, str]] = field(default_factory=set)
+
+
+@dataclass
+class SummaryCheckResult:
+    """Keys whose stored summary rows differ from a full recompute, by table."""
+    mismatches: Dict[str, List[Tuple[str, ...]]] = field(default_factory=dict)
+
+    @property
+    def consistent(self) -> bool:
+        return not any(self.mismatches.values())
+
+
+def refresh_enabled(refresh: Optional[bool] = None) -> bool:
+    """Whether loaders refresh summaries (defaults to the REFRESH_SUMMARIES setting)."""
+    return get_settings().REFRESH_SUMMARIES if refresh is None else refresh
+
+
+async def per_game_tables(conn: asyncpg.Connection) -> Tuple[SummaryTable, ...]:
+    """The per-game tables matching the pbp_events layout the database actually has."""
+    columns = {row['column_name'] for row in await conn.fetch(PBP_COLUMNS_QUERY)}
+    return PER_GAME_TABLES if 'event_type' in columns else FOUNDATION_PER_GAME_TABLES
+
+
+async def summary_keys(conn: asyncpg.Connection, game_ids: Sequence[str],
+                       keys: Optional[SummaryKeys] = None) -> SummaryKeys:
+    """Add the summary keys held by the per-game rows of ``game_ids`` to ``keys``."""
+    keys = keys if keys is not None else SummaryKeys()
+    for season, home, away, player_id in await conn.fetch(GAME_KEYS_QUERY, list(game_ids)):
+        if player_id is not None:
+            keys.players.add((season, player_id))
+            continue
+        keys.teams.update(((season, home), (season, away)))
+        keys.pairs.add((season, min(home, away), max(home, away)))
+    return keys
+
+
+async def _recompute(conn: asyncpg.Connection, table: SummaryTable, keys: Set[Tuple[str, ...]]) -> None:
+    if not keys:
+        return
+    columns = [list(column) for column in zip(*sorted(keys))]
+    await conn.execute(table.delete_sql, *columns)
+    await conn.execute(table.insert_sql, *columns)
+
+
+async def recompute_summary_keys(conn: asyncpg.Connection, keys: SummaryKeys) -> None:
+    """Recompute the season summary rows of ``keys`` from the per-game tables."""
+    for table in TEAM_SUMMARIES:
+        await _recompute(conn, table, keys.teams)
+    await _recompute(conn, HEAD_TO_HEAD_SUMMARY, keys.pairs)
+    await _recompute(conn, PLAYER_SEASON_SUMMARY, keys.players)
+
+
+async def refresh_summaries(conn: asyncpg.Connection, game_ids: Sequence[str]) -> SummaryRefreshResult:
+    """Rebuild the per-game rows of ``game_ids`` and the summary keys they touch."""
+    start_time = time.perf_counter()
+    result = SummaryRefreshResult()
+    game_ids = sorted(set(game_ids))
+    if not game_ids:
+        return result
+
+    tables = await per_game_tables(conn)
+    async with conn.transaction():
+        # Keys before and after the rebuild: a corrected team or player loses the game too
+        keys = await summary_keys(conn, game_ids)
+        for table in tables:
+            await _recompute(conn, table, {(game_id,) for game_id in game_ids})
+        await recompute_summary_keys(conn, await summary_keys(conn, game_ids, keys))
+
+    result.games = len(game_ids)
+    result.team_keys, result.pair_keys, result.player_keys = (
+        len(keys.teams), len(keys.pairs), len(keys.players))
+    result.duration_seconds = time.perf_counter() - start_time
+    logger.debug("Summaries refreshed", games=result.games, team_keys=result.team_keys,
+                 pair_keys=result.pair_keys, player_keys=result.player_keys,
+                 duration=result.duration_seconds)
+    return result
+
+
+async def check_summaries(
+    conn: asyncpg.Connection,
+    seasons: Optional[Sequence[str]] = None
+) -> SummaryCheckResult:
+    """Compare stored summaries with a full recompute from the per-game tables."""
+    result = SummaryCheckResult()
+    season_list = list(seasons) if seasons is not None else None
+    for table in (await per_game_tables(conn)) + SUMMARY_TABLES:
+        rows = await conn.fetch(table.check_sql, season_list)
+        result.mismatches[table.name] = [tuple(row) for row in rows]
+        if rows:
+            logger.warning("Summary drift", table=table.name, keys=len(rows))
+    return result
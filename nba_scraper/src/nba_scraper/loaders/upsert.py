@@ -0,0 +1,640 @@
+"""Metadata-driven upsert compiler shared by the loaders.
+
+A :class:`TableSpec` describes a target table once: its columns (usually derived
+from a Pydantic row model in ``models/*_rows.py``), their wire types and the
+conflict key. From a spec the compiler emits diff-aware
+``INSERT ... ON CONFLICT DO UPDATE ... WHERE <something changed>`` SQL exactly once
+per strategy, and :func:`upsert_rows` executes it through per-connection prepared
+statements, choosing the bulk strategy from the batch size:
+
+- ``values``: one row through a prepared single-row statement
+- ``unnest``: one statement per batch, each column bound as one typed array
+- ``copy``: binary COPY into a session temp table, then one merge statement
+- ``executemany``: untyped specs (no column types known) fall back to pipelined
+  ``executemany`` with the classic ``VALUES ($1, ...)`` form
+
+All typed strategies report inserted/updated counts through
+``RETURNING (xmax = 0)``, so callers can tell rows that actually changed from
+rows that were merely re-submitted.
+
+Specs with a ``partition_key`` split each call by season and run the chosen
+strategy against each season's partition directly (see :mod:`.partitions`).
+"""
+
+from __future__ import annotations
+
+import types
+import weakref
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import asyncpg
+
+from ..nba_logging import get_logger
+from ..utils.coerce import to_bool_or_none, to_float_or_none, to_int_or_none
+from .partitions import ensure_partition, forget_partition, partition_name, routes_to_partition
+
+logger = get_logger(__name__)
+
+# Provenance columns are refreshed whenever a row changes but never trigger a change.
+PROVENANCE_COLUMNS: Tuple[str, ...] = ("source", "source_url", "ingested_at_utc")
+
+# Strategy thresholds (rows per batch).
+UNNEST_MIN_ROWS = 2
+COPY_MIN_ROWS = 20_000
+DEFAULT_BATCH_SIZE = 50_000
+
+STRATEGIES = ("values", "unnest", "copy", "executemany")
+
+
+# ---------------------------------------------------------------------------
+# Specs
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Column:
+    """One target column.
+
+    Attributes:
+        name: Column name in the table
+        pg_type: PostgreSQL type used on the wire (``text``, ``int8``, ``float8``,
+            ``numeric``, ``bool``, ``date``, ``timestamptz`` or ``<type>[]``);
+            ``None`` for untyped specs
+        attr: Attribute/key read from each row (defaults to ``name``)
+        default: Value, or zero-arg callable, used when the row value is ``None``
+        getter: Computes the value from the whole row instead of reading ``attr``
+    """
+
+    name: str
+    pg_type: Optional[str]
+    attr: Optional[str] = None
+    default: Any = None
+    getter: Optional[Callable[[Any], Any]] = None
+
+    @property
+    def is_array(self) -> bool:
+        return bool(self.pg_type and self.pg_type.endswith("[]"))
+
+    @property
+    def wire_type(self) -> Optional[str]:
+        # Arrays travel as text literals: unnest() would flatten a 2-D array.
+        return "text" if self.is_array else self.pg_type
+
+    @property
+    def select_expr(self) -> str:
+        return f"{self.name}::{self.pg_type}" if self.is_array else self.name
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """Everything the compiler needs to know about one upsert target."""
+
+    table: str
+    columns: Tuple[Column, ...]
+    conflict_keys: Tuple[str, ...]
+    # Columns refreshed on change but excluded from the IS DISTINCT FROM check.
+    compare_exclude: Tuple[str, ...] = PROVENANCE_COLUMNS
+    # Server-side expressions written on insert / on change, e.g. ("updated_at", "NOW()").
+    insert_exprs: Tuple[Tuple[str, str], ...] = ()
+    update_exprs: Tuple[Tuple[str, str], ...] = ()
+    # Columns updated on conflict; defaults to every non-key column.
+    update_columns: Optional[Tuple[str, ...]] = None
+    # Row identity used to collapse duplicates client-side; defaults to the conflict
+    # key. Needed when the conflict target is a generated column (e.g. a hash).
+    dedupe_keys: Optional[Tuple[str, ...]] = None
+    # Column the table is LIST-partitioned on (see loaders.partitions); batches are
+    # split by its value and written straight into each season's partition.
+    partition_key: Optional[str] = None
+
+    @property
+    def column_names(self) -> Tuple[str, ...]:
+        return tuple(column.name for column in self.columns)
+
+    @property
+    def typed(self) -> bool:
+        return all(column.pg_type for column in self.columns)
+
+    @property
+    def effective_update_columns(self) -> Tuple[str, ...]:
+        if self.update_columns is not None:
+            return self.update_columns
+        return tuple(name for name in self.column_names if name not in self.conflict_keys)
+
+    @property
+    def compared_columns(self) -> Tuple[str, ...]:
+        return tuple(
+            name for name in self.effective_update_columns if name not in self.compare_exclude
+        )
+
+    @classmethod
+    def from_columns(
+        cls,
+        table: str,
+        columns: Sequence[Union[Column, Tuple[str, Optional[str]]]],
+        conflict_keys: Sequence[str],
+        **options: Any,
+    ) -> "TableSpec":
+        """Build a spec from explicit ``(name, pg_type)`` pairs or :class:`Column` objects."""
+        cols = tuple(c if isinstance(c, Column) else Column(c[0], c[1]) for c in columns)
+        return cls(table=table, columns=cols, conflict_keys=tuple(conflict_keys), **_tupled(options))
+
+    @classmethod
+    def from_model(
+        cls,
+        table: str,
+        model: type,
+        conflict_keys: Sequence[str],
+        *,
+        exclude: Sequence[str] = (),
+        rename: Optional[Mapping[str, str]] = None,
+        types: Optional[Mapping[str, str]] = None,
+        extra: Sequence[Column] = (),
+        **options: Any,
+    ) -> "TableSpec":
+        """Build a spec from a Pydantic model's fields.
+
+        Args:
+            table: Target table name
+            model: Pydantic model class whose fields map onto table columns
+            conflict_keys: Columns of the unique/primary key used for ON CONFLICT
+            exclude: Model fields that have no table column
+            rename: Model field -> column name where they differ
+            types: Column name -> pg type overrides (e.g. ``{"game_date": "date"}``)
+            extra: Additional computed columns
+        """
+        rename = dict(rename or {})
+        types = dict(types or {})
+        columns: List[Column] = []
+        for field_name, info in model.model_fields.items():
+            if field_name in exclude:
+                continue
+            name = rename.get(field_name, field_name)
+            pg_type = types.get(name) or pg_type_for(info.annotation)
+            columns.append(Column(name, pg_type, attr=field_name))
+        columns.extend(extra)
+        return cls(
+            table=table,
+            columns=tuple(columns),
+            conflict_keys=tuple(conflict_keys),
+            **_tupled(options),
+        )
+
+
+def _tupled(options: Mapping[str, Any]) -> Dict[str, Any]:
+    """Normalize sequence options to tuples so specs stay hashable."""
+    out: Dict[str, Any] = {}
+    for key, value in options.items():
+        if key in ("insert_exprs", "update_exprs"):
+            value = tuple(tuple(pair) for pair in value)
+        elif isinstance(value, (list, tuple)):
+            value = tuple(value)
+        out[key] = value
+    return out
+
+
+def pg_type_for(annotation: Any) -> str:
+    """Map a Python/Pydantic field annotation to a PostgreSQL wire type."""
+    origin = get_origin(annotation)
+    if origin is Union or origin is types.UnionType:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return pg_type_for(args[0])
+    elif origin in (list, List, tuple, Tuple):
+        args = get_args(annotation)
+        if args:
+            return f"{pg_type_for(args[0])}[]"
+    elif isinstance(annotation, type):
+        # Order matters: bool is an int, str-Enums are str, datetime is a date.
+        if issubclass(annotation, bool):
+            return "bool"
+        if issubclass(annotation, Enum):
+            return "text"
+        if issubclass(annotation, int):
+            return "int8"
+        if issubclass(annotation, float):
+            return "float8"
+        if issubclass(annotation, Decimal):
+            return "numeric"
+        if issubclass(annotation, str):
+            return "text"
+        if issubclass(annotation, datetime):
+            return "timestamptz"
+        if issubclass(annotation, date):
+            return "date"
+    raise TypeError(f"No PostgreSQL type mapping for annotation {annotation!r}")
+
+
+# ---------------------------------------------------------------------------
+# Value coercion
+# ---------------------------------------------------------------------------
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, Enum):
+        return str(value.value)
+    return value if isinstance(value, str) else str(value)
+
+
+def _integer(value: Any) -> Optional[int]:
+    if value is None or (isinstance(value, int) and not isinstance(value, bool)):
+        return value
+    return to_int_or_none(value.value if isinstance(value, Enum) else value)
+
+
+def _numeric(value: Any) -> Optional[Decimal]:
+    if value is None or isinstance(value, Decimal):
+        return value
+    number = to_float_or_none(value)
+    return None if number is None else Decimal(str(number))
+
+
+def _date(value: Any) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _array_literal(value: Any) -> Optional[str]:
+    """Render a Python sequence as a PostgreSQL array literal."""
+    if value is None:
+        return None
+    items = []
+    for item in value:
+        if item is None:
+            items.append("NULL")
+        elif isinstance(item, (int, float, Decimal)) and not isinstance(item, bool):
+            items.append(str(item))
+        else:
+            escaped = _text(item).replace("\\", "\\\\").replace('"', '\\"')
+            items.append(f'"{escaped}"')
+    return "{" + ",".join(items) + "}"
+
+
+_COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "text": _text,
+    "int2": _integer,
+    "int4": _integer,
+    "int8": _integer,
+    "float4": to_float_or_none,
+    "float8": to_float_or_none,
+    "numeric": _numeric,
+    "bool": to_bool_or_none,
+    "date": _date,
+    "timestamptz": lambda value: value,
+}
+
+
+def _coercer_for(column: Column) -> Callable[[Any], Any]:
+    if column.is_array:
+        return _array_literal
+    if column.pg_type is None:
+        return lambda value: value.value if isinstance(value, Enum) else value
+    return _COERCERS.get(column.pg_type, lambda value: value)
+
+
+def _read(row: Any, column: Column) -> Any:
+    if column.getter is not None:
+        value = column.getter(row)
+    else:
+        key = column.attr or column.name
+        value = row.get(key) if isinstance(row, Mapping) else getattr(row, key, None)
+    if value is None and column.default is not None:
+        value = column.default() if callable(column.default) else column.default
+    return value
+
+
+def row_values(spec: TableSpec, row: Any) -> Tuple[Any, ...]:
+    """Extract and coerce one row (dict or model) into wire values in column order."""
+    return tuple(_coercer_for(column)(_read(row, column)) for column in spec.columns)
+
+
+def _identity(spec: TableSpec, row: Any) -> Tuple[Any, ...]:
+    by_name = {column.name: column for column in spec.columns}
+    keys = spec.dedupe_keys or spec.conflict_keys
+    return tuple(_coercer_for(by_name[key])(_read(row, by_name[key])) for key in keys)
+
+
+def dedupe_rows(spec: TableSpec, rows: Sequence[Any]) -> List[Any]:
+    """Collapse rows sharing a conflict key, keeping the last occurrence.
+
+    ``ON CONFLICT DO UPDATE`` cannot touch the same row twice in one statement, and
+    duplicates split across batches would flip-flop the stored value.
+    """
+    deduped: Dict[Tuple[Any, ...], Any] = {}
+    for row in rows:
+        deduped[_identity(spec, row)] = row
+    return list(deduped.values())
+
+
+# ---------------------------------------------------------------------------
+# SQL compilation (cached per spec and strategy)
+# ---------------------------------------------------------------------------
+
+
+def stage_table_name(spec: TableSpec) -> str:
+    return f"_upsert_stage_{spec.table}"
+
+
+def _on_conflict_clause(spec: TableSpec) -> str:
+    conflict = ", ".join(spec.conflict_keys)
+    assignments = [f"{name} = EXCLUDED.{name}" for name in spec.effective_update_columns]
+    assignments += [f"{name} = {expr}" for name, expr in spec.update_exprs]
+    if not assignments:
+        return f"ON CONFLICT ({conflict}) DO NOTHING"
+
+    sql = f"ON CONFLICT ({conflict}) DO UPDATE SET\n    " + ",\n    ".join(assignments)
+    compared = spec.compared_columns
+    if compared:
+        sql += "\nWHERE (\n    " + " OR\n    ".join(
+            f"EXCLUDED.{name} IS DISTINCT FROM {spec.table}.{name}" for name in compared
+        ) + "\n)"
+    return sql
+
+
+def _merge_sql(spec: TableSpec, source: str) -> str:
+    """INSERT ... SELECT FROM ``source`` with diff-aware conflict handling and counts."""
+    names = list(spec.column_names) + [name for name, _ in spec.insert_exprs]
+    select = [column.select_expr for column in spec.columns] + [
+        expr for _, expr in spec.insert_exprs
+    ]
+    return (
+        "WITH changed AS (\n"
+        f"INSERT INTO {spec.table} ({', '.join(names)})\n"
+        f"SELECT {', '.join(select)}\n"
+        f"FROM {source}\n"
+        f"{_on_conflict_clause(spec)}\n"
+        "RETURNING (xmax = 0) AS inserted\n"
+        ")\n"
+        "SELECT\n"
+        "    COUNT(*) FILTER (WHERE inserted) AS inserted,\n"
+        "    COUNT(*) FILTER (WHERE NOT inserted) AS updated\n"
+        "FROM changed"
+    )
+
+
+@lru_cache(maxsize=None)
+def compile_upsert(spec: TableSpec, strategy: str) -> str:
+    """Return the upsert SQL for ``spec`` under ``strategy`` (compiled once)."""
+    names = spec.column_names
+    alias = f"src({', '.join(names)})"
+
+    if strategy == "executemany":
+        all_names = list(names) + [name for name, _ in spec.insert_exprs]
+        placeholders = [f"${i}" for i in range(1, len(names) + 1)]
+        placeholders += [expr for _, expr in spec.insert_exprs]
+        return (
+            f"INSERT INTO {spec.table} ({', '.join(all_names)})\n"
+            f"VALUES ({', '.join(placeholders)})\n"
+            f"{_on_conflict_clause(spec)}"
+        )
+
+    if not spec.typed:
+        raise ValueError(f"Strategy {strategy!r} needs column types for table {spec.table}")
+
+    if strategy == "values":
+        params = ", ".join(
+            f"${i}::{column.wire_type}" for i, column in enumerate(spec.columns, start=1)
+        )
+        return _merge_sql(spec, f"(VALUES ({params})) AS {alias}")
+    if strategy == "unnest":
+        params = ", ".join(
+            f"${i}::{column.wire_type}[]" for i, column in enumerate(spec.columns, start=1)
+        )
+        return _merge_sql(spec, f"unnest({params}) AS {alias}")
+    if strategy == "copy":
+        return _merge_sql(spec, f"{stage_table_name(spec)} AS {alias}")
+    raise ValueError(f"Unknown upsert strategy: {strategy!r}")
+
+
+@lru_cache(maxsize=None)
+def partition_spec(spec: TableSpec, season: str) -> TableSpec:
+    """``spec`` retargeted at the partition holding ``season``."""
+    return replace(spec, table=partition_name(spec.table, season), partition_key=None)
+
+
+@lru_cache(maxsize=None)
+def compile_stage_ddl(spec: TableSpec) -> str:
+    """Session temp table used by the COPY strategy, emptied before each batch."""
+    stage = stage_table_name(spec)
+    columns = ", ".join(f"{column.name} {column.wire_type}" for column in spec.columns)
+    return f"CREATE TEMP TABLE IF NOT EXISTS {stage} ({columns});\nTRUNCATE {stage};"
+
+
+def choose_strategy(spec: TableSpec, row_count: int) -> str:
+    """Pick the cheapest strategy for a batch of ``row_count`` rows."""
+    if not spec.typed:
+        return "executemany"
+    if row_count >= COPY_MIN_ROWS:
+        return "copy"
+    if row_count >= UNNEST_MIN_ROWS:
+        return "unnest"
+    return "values"
+
+
+# ---------------------------------------------------------------------------
+# Prepared statement cache
+# ---------------------------------------------------------------------------
+
+
+class StatementCache:
+    """Prepared upsert statements cached per connection and (spec, strategy).
+
+    Pool proxies are unwrapped so statements survive release/re-acquire of the same
+    physical connection; entries disappear with the connection object.
+    """
+
+    def __init__(self) -> None:
+        self._statements: "weakref.WeakKeyDictionary[Any, Dict[Tuple[TableSpec, str], Any]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @staticmethod
+    def _owner(conn: Any) -> Any:
+        return getattr(conn, "_con", None) or conn
+
+    async def prepare(self, conn: Any, spec: TableSpec, strategy: str) -> Any:
+        sql = compile_upsert(spec, strategy)
+        try:
+            per_conn = self._statements.setdefault(self._owner(conn), {})
+        except TypeError:  # connection type does not support weak references
+            return await conn.prepare(sql)
+
+        statement = per_conn.get((spec, strategy))
+        if statement is None:
+            statement = await conn.prepare(sql)
+            per_conn[(spec, strategy)] = statement
+        return statement
+
+    def invalidate(self, conn: Any, spec: Optional[TableSpec] = None) -> None:
+        per_conn = self._statements.get(self._owner(conn))
+        if not per_conn:
+            return
+        for key in [key for key in per_conn if spec is None or key[0] == spec]:
+            del per_conn[key]
+
+    def size(self, conn: Any) -> int:
+        return len(self._statements.get(self._owner(conn), {}))
+
+
+statement_cache = StatementCache()
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class UpsertResult:
+    """Counts from an upsert; ``exact`` is False when the strategy cannot report them."""
+
+    submitted: int = 0
+    inserted: int = 0
+    updated: int = 0
+    exact: bool = True
+    strategies: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated
+
+    @property
+    def unchanged(self) -> int:
+        return self.submitted - self.changed
+
+
+async def _fetch_counts(conn: Any, spec: TableSpec, strategy: str, *args: Any) -> Any:
+    statement = await statement_cache.prepare(conn, spec, strategy)
+    try:
+        return await statement.fetchrow(*args)
+    except asyncpg.exceptions.InvalidCachedStatementError:
+        # Table definition changed under a cached plan; re-prepare once.
+        statement_cache.invalidate(conn, spec)
+        statement = await statement_cache.prepare(conn, spec, strategy)
+        return await statement.fetchrow(*args)
+
+
+async def _run_batch(conn: Any, spec: TableSpec, batch: Sequence[Any], strategy: str) -> Any:
+    records = [row_values(spec, row) for row in batch]
+
+    if strategy == "executemany":
+        await conn.executemany(compile_upsert(spec, strategy), records)
+        return None
+    if strategy == "values":
+        return await _fetch_counts(conn, spec, strategy, *records[0])
+    if strategy == "unnest":
+        arrays = [list(column) for column in zip(*records)]
+        return await _fetch_counts(conn, spec, strategy, *arrays)
+    if strategy == "copy":
+        await conn.execute(compile_stage_ddl(spec))
+        await conn.copy_records_to_table(
+            stage_table_name(spec), records=records, columns=list(spec.column_names)
+        )
+        return await _fetch_counts(conn, spec, strategy)
+    raise ValueError(f"Unknown upsert strategy: {strategy!r}")
+
+
+async def _partition_targets(
+    conn: Any, spec: TableSpec, rows: List[Any]
+) -> List[Tuple[TableSpec, List[Any]]]:
+    """Rows grouped by the partition they belong to, each with the spec that writes it.
+
+    Unpartitioned specs, and rows without a season, go through the parent table.
+    """
+    if spec.partition_key is None:
+        return [(spec, rows)]
+    key = next(column for column in spec.columns if column.name == spec.partition_key)
+    groups: Dict[Any, List[Any]] = {}
+    for row in rows:
+        groups.setdefault(_read(row, key), []).append(row)
+
+    targets = []
+    for season in sorted(groups, key=str):
+        if routes_to_partition(season):
+            await ensure_partition(conn, spec.table, season)
+            targets.append((partition_spec(spec, season), groups[season]))
+        else:
+            targets.append((spec, groups[season]))
+    return targets
+
+
+async def upsert_rows(
+    conn: Any,
+    spec: TableSpec,
+    rows: Sequence[Any],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    strategy: Optional[str] = None,
+) -> UpsertResult:
+    """Upsert ``rows`` (dicts or models) into ``spec.table``.
+
+    The caller owns the transaction; batches run sequentially on ``conn``.
+
+    Args:
+        conn: asyncpg connection (or pool proxy)
+        spec: Target table description
+        rows: Rows to write; duplicates on the conflict key collapse to the last one
+        batch_size: Maximum rows per statement
+        strategy: Force a strategy instead of choosing by batch size
+
+    Returns:
+        UpsertResult with submitted/inserted/updated counts
+    """
+    result = UpsertResult()
+    if not rows:
+        return result
+
+    unique_rows = dedupe_rows(spec, rows)
+    for target, target_rows in await _partition_targets(conn, spec, unique_rows):
+        for start in range(0, len(target_rows), batch_size):
+            batch = target_rows[start:start + batch_size]
+            chosen = strategy or choose_strategy(target, len(batch))
+            try:
+                counts = await _run_batch(conn, target, batch, chosen)
+            except asyncpg.exceptions.UndefinedTableError:
+                if target is not spec:
+                    # The partition was dropped, or its creation rolled back, after it was cached
+                    forget_partition(spec.table)
+                raise
+
+            result.submitted += len(batch)
+            result.strategies[chosen] = result.strategies.get(chosen, 0) + 1
+            if counts is None:
+                result.exact = False
+                result.inserted += len(batch)
+            else:
+                result.inserted += counts["inserted"] or 0
+                result.updated += counts["updated"] or 0
+
+    logger.debug(
+        "Upserted rows",
+        table=spec.table,
+        submitted=result.submitted,
+        inserted=result.inserted,
+        updated=result.updated,
+        strategies=result.strategies,
+    )
+    return result
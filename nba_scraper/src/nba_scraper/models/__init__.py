@@ -7,6 +7,7 @@ from .ref_rows import RefAssignmentRow, RefAlternateRow
 from .lineup_rows import StartingLineupRow
 from .injury_rows import InjuryStatusRow
 from .pbp_rows import PbpEventRow
+from .pbp_frame import PbpFrame
 from .derived_rows import (
     Q1WindowRow,
     EarlyShockRow,
@@ -43,4 +44,6 @@ __all__ = [
     "EarlyShockRow",
     "ScheduleTravelRow",
     "OutcomesRow",
+    # Columnar frames
+    "PbpFrame",
 ]
\ No newline at end of file
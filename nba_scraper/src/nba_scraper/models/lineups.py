@@ -1,7 +1,7 @@
 """Lineup stint model for foundation data."""
 
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 
 class LineupStint(BaseModel):
@@ -11,4 +11,5 @@ class LineupStint(BaseModel):
     team_id: int = Field(..., description="Team ID")
     period: int = Field(..., ge=1, le=10)
     lineup: List[int] = Field(..., min_length=5, max_length=5, description="Player IDs in lineup")
-    seconds_played: int = Field(..., ge=0, description="Seconds this lineup was on court")
\ No newline at end of file
+    seconds_played: int = Field(..., ge=0, description="Seconds this lineup was on court")
+    plus_minus: Optional[int] = Field(None, description="Points scored minus allowed while on court")
\ No newline at end of file
@@ -0,0 +1,464 @@
+"""Columnar play-by-play frame for analytics transformers.
+
+``PbpFrame`` holds one game or a batch of games as parallel NumPy arrays
+(struct-of-arrays) instead of a list of ``PbpEventRow`` models. Strings that
+repeat (game ids, team tricodes, player slugs) are interned into small tables
+and stored as integer codes; free-text descriptions are reduced to the keyword
+flags the transformers actually test. Window filters become array masks.
+
+Missing values: integer codes and ``clock_ms`` use ``-1``, floats use ``NaN``,
+``shot_made`` uses ``-1`` and ``shot_value`` uses ``0``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.clock import parse_clocks
+from .enums import EventType
+from .ref_rows import normalize_name_slug
+
+# Event type codes are positions in the enum
+EVENT_TYPES: Tuple[EventType, ...] = tuple(EventType)
+_EVENT_CODE: Dict[str, int] = {event_type.value: code for code, event_type in enumerate(EVENT_TYPES)}
+
+# NBA Stats EVENTMSGTYPE -> EventType (same mapping as PbpEventRow.from_nba_stats)
+NBA_STATS_EVENT_TYPES: Dict[int, EventType] = {
+    1: EventType.SHOT_MADE,
+    2: EventType.SHOT_MISSED,
+    3: EventType.FREE_THROW_MADE,
+    4: EventType.FREE_THROW_MISSED,
+    5: EventType.REBOUND,
+    6: EventType.TURNOVER,
+    7: EventType.FOUL,
+    8: EventType.SUBSTITUTION,
+    9: EventType.TIMEOUT,
+    10: EventType.JUMP_BALL,
+    11: EventType.EJECTION,
+    12: EventType.PERIOD_BEGIN,
+    13: EventType.PERIOD_END,
+    18: EventType.INSTANT_REPLAY,
+}
+
+# Description keyword flags (bit mask per event)
+DESC_TECHNICAL = 1 << 0
+DESC_FLAGRANT = 1 << 1
+DESC_FLAGRANT_1 = 1 << 2
+DESC_FLAGRANT_2 = 1 << 3
+DESC_UNSPORTSMANLIKE = 1 << 4
+DESC_INJURY = 1 << 5
+DESC_OFFENSIVE = 1 << 6
+DESC_DEFENSIVE = 1 << 7
+
+INJURY_KEYWORDS = ('injury', 'hurt', 'twisted', 'sprain', 'strain', 'collision')
+
+_DESC_KEYWORDS: Tuple[Tuple[int, Tuple[str, ...]], ...] = (
+    (DESC_TECHNICAL, ('technical',)),
+    (DESC_FLAGRANT, ('flagrant',)),
+    (DESC_FLAGRANT_1, ('flagrant 1',)),
+    (DESC_FLAGRANT_2, ('flagrant 2',)),
+    (DESC_UNSPORTSMANLIKE, ('unsportsmanlike',)),
+    (DESC_INJURY, INJURY_KEYWORDS),
+    (DESC_OFFENSIVE, ('offensive',)),
+    (DESC_DEFENSIVE, ('defensive',)),
+)
+
+
+def description_flags(description: Optional[str]) -> int:
+    """Keyword flags for an event description (case-insensitive)."""
+    if not description:
+        return 0
+    desc = description.lower()
+    flags = 0
+    for flag, keywords in _DESC_KEYWORDS:
+        if any(keyword in desc for keyword in keywords):
+            flags |= flag
+    return flags
+
+
+def event_type_code(event_type: Any) -> int:
+    """Code of an EventType (or its string value); unknown values map to SHOT_MADE."""
+    value = event_type.value if isinstance(event_type, EventType) else str(event_type)
+    return _EVENT_CODE.get(value, _EVENT_CODE[EventType.SHOT_MADE.value])
+
+
+def event_type_codes(*event_types: EventType) -> np.ndarray:
+    """Codes for a set of event types, for use with ``np.isin``."""
+    return np.array([_EVENT_CODE[event_type.value] for event_type in event_types], dtype=np.int8)
+
+
+class StringTable:
+    """Interned strings addressed by integer code (``-1`` = missing)."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: Optional[str]) -> int:
+        """Code for ``value``, interning it on first use."""
+        if not value:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Optional[str]) -> int:
+        """Code for ``value`` without interning (``-1`` if unknown)."""
+        return self._codes.get(value, -1) if value else -1
+
+    def __getitem__(self, code: int) -> Optional[str]:
+        return self.values[code] if code >= 0 else None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def remap_from(self, other: "StringTable") -> np.ndarray:
+        """Array mapping ``other``'s codes to codes in this table (interning as needed)."""
+        return np.array([self.code(value) for value in other.values], dtype=np.int32)
+
+
+def _remap(codes: np.ndarray, mapping: np.ndarray) -> np.ndarray:
+    if not len(mapping):
+        return np.full(len(codes), -1, dtype=codes.dtype)
+    return np.where(codes >= 0, mapping[np.maximum(codes, 0)], -1).astype(codes.dtype)
+
+
+def _int_or(value: Any, default: int) -> int:
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return default
+
+
+def _float_or_nan(value: Any) -> float:
+    if value is None or value == "":
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+# Per-event array columns and their dtypes
+_COLUMNS: Dict[str, Any] = {
+    "game": np.int32,
+    "period": np.int16,
+    "event_idx": np.int32,
+    "clock_ms": np.int32,
+    "seconds_elapsed": np.float64,
+    "event_type": np.int8,
+    "team": np.int16,
+    "player1": np.int32,
+    "player2": np.int32,
+    "player3": np.int32,
+    "player1_id": np.int64,
+    "player2_id": np.int64,
+    "player3_id": np.int64,
+    "shot_made": np.int8,
+    "shot_value": np.int8,
+    "shot_x": np.float32,
+    "shot_y": np.float32,
+    "shot_distance_ft": np.float32,
+    "desc_flags": np.uint16,
+    "is_transition": np.bool_,
+    "is_early_clock": np.bool_,
+    # Possession annotations (``transformers.possessions``); -1 until annotated
+    "possession": np.int32,
+    "offense": np.int16,
+    "possession_start_ms": np.int32,
+}
+
+# Columns holding codes into each string table
+_TABLE_COLUMNS = {"games": ("game",), "teams": ("team", "offense"), "players": ("player1", "player2", "player3")}
+
+
+@dataclass
+class PbpFrame:
+    """Struct-of-arrays play-by-play events for one game or a batch of games."""
+
+    game: np.ndarray
+    period: np.ndarray
+    event_idx: np.ndarray
+    clock_ms: np.ndarray
+    seconds_elapsed: np.ndarray
+    event_type: np.ndarray
+    team: np.ndarray
+    player1: np.ndarray
+    player2: np.ndarray
+    player3: np.ndarray
+    player1_id: np.ndarray
+    player2_id: np.ndarray
+    player3_id: np.ndarray
+    shot_made: np.ndarray
+    shot_value: np.ndarray
+    shot_x: np.ndarray
+    shot_y: np.ndarray
+    shot_distance_ft: np.ndarray
+    desc_flags: np.ndarray
+    is_transition: np.ndarray
+    is_early_clock: np.ndarray
+    possession: np.ndarray
+    offense: np.ndarray
+    possession_start_ms: np.ndarray
+    games: StringTable
+    teams: StringTable
+    players: StringTable
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _from_columns(cls, columns: Mapping[str, Sequence[Any]], games: StringTable,
+                      teams: StringTable, players: StringTable) -> "PbpFrame":
+        arrays = {name: np.asarray(columns[name], dtype=dtype) for name, dtype in _COLUMNS.items()}
+        return cls(**arrays, games=games, teams=teams, players=players)
+
+    @classmethod
+    def empty(cls) -> "PbpFrame":
+        """A frame with no events."""
+        return cls._from_columns({name: [] for name in _COLUMNS}, StringTable(), StringTable(), StringTable())
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> "PbpFrame":
+        """Build from silver rows: ``PbpEventRow`` models or ``pbp_events`` mappings/records."""
+        games, teams, players = StringTable(), StringTable(), StringTable()
+        columns: Dict[str, List[Any]] = {name: [] for name in _COLUMNS}
+        append = {name: values.append for name, values in columns.items()}
+
+        for row in rows:
+            # Mappings and database records (asyncpg.Record) expose .get
+            get = row.get if isinstance(row, Mapping) or hasattr(row, "keys") else (
+                lambda name, _row=row: getattr(_row, name, None)
+            )
+            period = _int_or(get("period"), 0)
+            clock_ms = get("clock_ms_remaining")
+            seconds_elapsed = get("seconds_elapsed")
+            shot_made = get("shot_made")
+
+            append["game"](games.code(get("game_id")))
+            append["period"](period)
+            append["event_idx"](_int_or(get("event_idx"), 0))
+            append["clock_ms"](-1 if clock_ms is None else int(clock_ms))
+            append["seconds_elapsed"](_float_or_nan(seconds_elapsed))
+            append["event_type"](event_type_code(get("event_type")))
+            append["team"](teams.code(get("team_tricode")))
+            append["player1"](players.code(get("player1_name_slug")))
+            append["player2"](players.code(get("player2_name_slug")))
+            append["player3"](players.code(get("player3_name_slug")))
+            append["player1_id"](_int_or(get("player1_id"), -1))
+            append["player2_id"](_int_or(get("player2_id"), -1))
+            append["player3_id"](_int_or(get("player3_id"), -1))
+            append["shot_made"](-1 if shot_made is None else int(bool(shot_made)))
+            append["shot_value"](_int_or(get("shot_value"), 0))
+            append["shot_x"](_float_or_nan(get("shot_x")))
+            append["shot_y"](_float_or_nan(get("shot_y")))
+            append["shot_distance_ft"](_float_or_nan(get("shot_distance_ft")))
+            append["desc_flags"](description_flags(get("description")))
+            append["is_transition"](bool(get("is_transition")))
+            append["is_early_clock"](bool(get("is_early_clock")))
+            append["possession"](-1)
+            append["offense"](-1)
+            append["possession_start_ms"](-1)
+
+        return cls._from_columns(columns, games, teams, players)
+
+    @classmethod
+    def from_result_set(cls, game_id: str, result_set: Mapping[str, Any]) -> "PbpFrame":
+        """Build from a raw NBA Stats PlayByPlayV2 resultSet (``headers`` + ``rowSet``).
+
+        Follows ``PbpEventRow.from_nba_stats`` (event type, shot value from "3PT",
+        clock from PCTIMESTRING); the team comes from PLAYER1_TEAM_ABBREVIATION.
+        """
+        headers = [str(header).upper() for header in result_set.get("headers", [])]
+        rows = result_set.get("rowSet", [])
+        position = {header: i for i, header in enumerate(headers)}
+
+        def column(name: str) -> List[Any]:
+            i = position.get(name)
+            return [row[i] if i < len(row) else None for row in rows] if i is not None else [None] * len(rows)
+
+        games, teams, players = StringTable(), StringTable(), StringTable()
+        n = len(rows)
+
+        period = np.array([_int_or(value, 1) for value in column("PERIOD")], dtype=np.int16)
+        msg_types = [_int_or(value, 1) for value in column("EVENTMSGTYPE")]
+        event_types = [NBA_STATS_EVENT_TYPES.get(msg_type, EventType.SHOT_MADE) for msg_type in msg_types]
+        descriptions = [home or visitor for home, visitor in
+                        zip(column("HOMEDESCRIPTION"), column("VISITORDESCRIPTION"))]
+
+        clocks = parse_clocks(column("PCTIMESTRING"), period)
+        clock_ms = clocks.clock_ms_remaining.astype(np.int32)
+        seconds_elapsed = clocks.seconds_elapsed
+
+        shot_made = np.full(n, -1, dtype=np.int8)
+        shot_value = np.zeros(n, dtype=np.int8)
+        for i, (event_type, desc) in enumerate(zip(event_types, descriptions)):
+            if event_type in (EventType.SHOT_MADE, EventType.SHOT_MISSED):
+                shot_made[i] = event_type == EventType.SHOT_MADE
+                shot_value[i] = 3 if desc and "3PT" in desc else 2
+            elif event_type in (EventType.FREE_THROW_MADE, EventType.FREE_THROW_MISSED):
+                shot_made[i] = event_type == EventType.FREE_THROW_MADE
+                shot_value[i] = 1
+
+        def player_codes(name_column: str) -> List[int]:
+            return [players.code(normalize_name_slug(name) if name else None) for name in column(name_column)]
+
+        columns = {
+            "game": [games.code(game_id)] * n,
+            "period": period,
+            "event_idx": [_int_or(value, 0) for value in column("EVENTNUM")],
+            "clock_ms": clock_ms,
+            "seconds_elapsed": seconds_elapsed,
+            "event_type": [_EVENT_CODE[event_type.value] for event_type in event_types],
+            "team": [teams.code(str(value).upper() if value else None)
+                     for value in column("PLAYER1_TEAM_ABBREVIATION")],
+            "player1": player_codes("PLAYER1_NAME"),
+            "player2": player_codes("PLAYER2_NAME"),
+            "player3": player_codes("PLAYER3_NAME"),
+            "player1_id": [_int_or(value, -1) or -1 for value in column("PLAYER1_ID")],
+            "player2_id": [_int_or(value, -1) or -1 for value in column("PLAYER2_ID")],
+            "player3_id": [_int_or(value, -1) or -1 for value in column("PLAYER3_ID")],
+            "shot_made": shot_made,
+            "shot_value": shot_value,
+            "shot_x": np.full(n, np.nan),
+            "shot_y": np.full(n, np.nan),
+            "shot_distance_ft": np.full(n, np.nan),
+            "desc_flags": [description_flags(desc) for desc in descriptions],
+            "is_transition": np.zeros(n, dtype=bool),
+            "is_early_clock": np.zeros(n, dtype=bool),
+            "possession": np.full(n, -1),
+            "offense": np.full(n, -1),
+            "possession_start_ms": np.full(n, -1),
+        }
+        return cls._from_columns(columns, games, teams, players)
+
+    @classmethod
+    def concat(cls, frames: Sequence["PbpFrame"]) -> "PbpFrame":
+        """Stack frames (e.g. one per game) into a batch frame with merged string tables."""
+        frames = [frame for frame in frames if len(frame)]
+        if not frames:
+            return cls.empty()
+        if len(frames) == 1:
+            return frames[0]
+
+        tables = {name: StringTable() for name in _TABLE_COLUMNS}
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in _COLUMNS}
+        for frame in frames:
+            remapped = {}
+            for table_name, column_names in _TABLE_COLUMNS.items():
+                mapping = tables[table_name].remap_from(getattr(frame, table_name))
+                for name in column_names:
+                    remapped[name] = _remap(getattr(frame, name), mapping)
+            for name in _COLUMNS:
+                parts[name].append(remapped.get(name, getattr(frame, name)))
+
+        arrays = {name: np.concatenate(values) for name, values in parts.items()}
+        return cls(**arrays, **tables)
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.event_idx)
+
+    def take(self, index: np.ndarray) -> "PbpFrame":
+        """Subset by boolean mask or integer positions (string tables are shared)."""
+        return replace(self, **{name: getattr(self, name)[index] for name in _COLUMNS})
+
+    def sorted(self) -> "PbpFrame":
+        """Events ordered by game, then event_idx (stable)."""
+        order = np.lexsort((self.event_idx, self.game))
+        return self.take(order)
+
+    def split_games(self) -> Iterator[Tuple[str, "PbpFrame"]]:
+        """Yield ``(game_id, frame)`` per game, preserving event order within each game."""
+        if not len(self):
+            return
+        order = np.argsort(self.game, kind="stable")
+        codes = self.game[order]
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        for chunk in np.split(order, boundaries):
+            yield self.games[int(self.game[chunk[0]])], self.take(chunk)
+
+    def for_game(self, game_id: str) -> "PbpFrame":
+        """Events of one game."""
+        return self.take(self.game == self.games.lookup(game_id))
+
+    def for_games(self, game_ids: Iterable[str]) -> "PbpFrame":
+        """Events of several games (row order kept)."""
+        codes = [self.games.lookup(game_id) for game_id in game_ids]
+        return self.take(np.isin(self.game, codes))
+
+    # ------------------------------------------------------------------
+    # Masks
+    # ------------------------------------------------------------------
+
+    def type_mask(self, *event_types: EventType) -> np.ndarray:
+        """Events whose type is any of ``event_types``."""
+        return np.isin(self.event_type, event_type_codes(*event_types))
+
+    def flag_mask(self, flags: int) -> np.ndarray:
+        """Events whose description carries any of ``flags``."""
+        return (self.desc_flags & flags) != 0
+
+    def clock_window_mask(self, start_ms, end_ms) -> np.ndarray:
+        """Vectorized ``pbp_windows.is_in_clock_window`` (events without a clock are out).
+
+        ``start_ms``/``end_ms`` may be scalars or per-event arrays.
+        """
+        hi, lo = np.maximum(start_ms, end_ms), np.minimum(start_ms, end_ms)
+        clock = self.clock_ms
+        return (clock >= 0) & (clock <= hi) & ((clock == lo) | (clock >= lo + 1000))
+
+    def valid_clock_mask(self) -> np.ndarray:
+        """Events in periods 1-10 whose clock lies within the period bounds."""
+        period_ms = np.where(self.period <= 4, 720_000, 300_000)
+        return ((self.period >= 1) & (self.period <= 10) &
+                (self.clock_ms >= 0) & (self.clock_ms <= period_ms))
+
+    # ------------------------------------------------------------------
+    # Accessors
+    # ------------------------------------------------------------------
+
+    def event_type_at(self, i: int) -> EventType:
+        return EVENT_TYPES[int(self.event_type[i])]
+
+    def team_at(self, i: int) -> Optional[str]:
+        return self.teams[int(self.team[i])]
+
+    def game_id_at(self, i: int) -> Optional[str]:
+        return self.games[int(self.game[i])]
+
+    def player_at(self, i: int, slot: int = 1) -> Optional[str]:
+        return self.players[int(getattr(self, f"player{slot}")[i])]
+
+    def seconds_at(self, i: int) -> Optional[float]:
+        value = float(self.seconds_elapsed[i])
+        return None if np.isnan(value) else value
+
+    @property
+    def has_possessions(self) -> bool:
+        """Whether every event carries possession annotations."""
+        return not len(self) or bool(self.possession.min() >= 0)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the arrays and string tables."""
+        strings = sum(len(value) for table in (self.games, self.teams, self.players) for value in table.values)
+        return sum(getattr(self, name).nbytes for name in _COLUMNS) + strings
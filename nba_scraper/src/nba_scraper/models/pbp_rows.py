@@ -1,13 +1,36 @@
 """Play-by-play event row Pydantic model."""
 
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
-from ..utils.clock import parse_clock_to_ms, period_length_ms
+from ..utils.clock import parse_clock_to_ms, parse_clocks, period_length_ms
 from .enums import EventSubtype, EventType, ShotType, ShotZone
 from .ref_rows import normalize_name_slug
 
+# NBA Stats EVENTMSGTYPE (as string) -> EventType
+NBA_STATS_EVENT_MAP: Dict[str, EventType] = {
+    "1": EventType.SHOT_MADE,
+    "2": EventType.SHOT_MISSED,
+    "3": EventType.FREE_THROW_MADE,
+    "4": EventType.FREE_THROW_MISSED,
+    "5": EventType.REBOUND,
+    "6": EventType.TURNOVER,
+    "7": EventType.FOUL,
+    "8": EventType.SUBSTITUTION,
+    "9": EventType.TIMEOUT,
+    "10": EventType.JUMP_BALL,
+    "11": EventType.EJECTION,
+    "12": EventType.PERIOD_BEGIN,
+    "13": EventType.PERIOD_END,
+    "18": EventType.INSTANT_REPLAY,
+}
+
+# Headers a PlayByPlay resultSet must carry for the trusted bulk path
+PBP_REQUIRED_HEADERS: Tuple[str, ...] = ("EVENTNUM", "EVENTMSGTYPE", "PERIOD")
+
+_MISSING = object()
+
 
 class PbpEventRow(BaseModel):
     """Play-by-play event row model."""
@@ -205,26 +228,8 @@ class PbpEventRow(BaseModel):
         raw_event_type = pbp_data.get("EVENTMSGTYPE", "")
         event_type_id = str(raw_event_type).strip() if raw_event_type is not None else "1"
 
-        # Map NBA Stats event types to our enum (using the mapping from normalize_event_type)
-        event_map = {
-            "1": EventType.SHOT_MADE,
-            "2": EventType.SHOT_MISSED,
-            "3": EventType.FREE_THROW_MADE,
-            "4": EventType.FREE_THROW_MISSED,
-            "5": EventType.REBOUND,
-            "6": EventType.TURNOVER,
-            "7": EventType.FOUL,
-            "8": EventType.SUBSTITUTION,
-            "9": EventType.TIMEOUT,
-            "10": EventType.JUMP_BALL,
-            "11": EventType.EJECTION,
-            "12": EventType.PERIOD_BEGIN,
-            "13": EventType.PERIOD_END,
-            "18": EventType.INSTANT_REPLAY,
-        }
-
         # CRITICAL FIX: Ensure we always get an EventType enum, never an integer
-        event_type = event_map.get(event_type_id, EventType.SHOT_MADE)
+        event_type = NBA_STATS_EVENT_MAP.get(event_type_id, EventType.SHOT_MADE)
 
         # Verify event_type is actually an EventType enum (additional safety check)
         if not isinstance(event_type, EventType):
@@ -311,6 +316,61 @@ class PbpEventRow(BaseModel):
             source_url=source_url,
         )
 
+    @classmethod
+    def bulk_from_nba_stats(
+        cls,
+        game_id: str,
+        result_set: Mapping[str, Any],
+        source_url: str,
+        *,
+        strict: bool = False,
+        on_error: Optional[Callable[[int, Exception], None]] = None,
+    ) -> List["PbpEventRow"]:
+        """Create rows for a whole PlayByPlay resultSet (``headers`` + ``rowSet``).
+
+        The trusted path checks the resultSet schema once, coerces each column in
+        bulk (clock strings and player names are parsed once per distinct value)
+        and builds rows with ``model_construct``/``model_copy``, skipping per-row
+        validation.
+        Rows it cannot coerce, and every row when the schema does not match or
+        ``strict`` is set, go through ``from_nba_stats`` with full validation.
+
+        Args:
+            game_id: Game identifier
+            result_set: PlayByPlay resultSet from the NBA Stats API
+            source_url: Source URL for provenance
+            strict: Validate every row (debug mode)
+            on_error: Called with (row index, exception) for rows that fail strict
+                validation; those rows are skipped. Without it the error is raised.
+
+        Returns:
+            Rows in resultSet order
+        """
+        headers = list(result_set.get("headers") or [])
+        rows = result_set.get("rowSet") or []
+        trusted = not strict and _trusted_schema(headers, rows)
+
+        fields = _coerce_pbp_columns(game_id, headers, rows, source_url) if trusted else [None] * len(rows)
+
+        events: List[PbpEventRow] = []
+        template: Optional[PbpEventRow] = None
+        for idx, (row, values) in enumerate(zip(rows, fields)):
+            if values is not None:
+                # Copying a constructed row skips model_construct's per-field default lookup
+                if template is None:
+                    template = cls.model_construct(**values)
+                    events.append(template)
+                else:
+                    events.append(template.model_copy(update=values))
+                continue
+            try:
+                events.append(cls.from_nba_stats(game_id, dict(zip(headers, row)), source_url))
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(idx, e)
+        return events
+
     @classmethod
     def enrich_with_shot_chart(
         cls, pbp_row: "PbpEventRow", shot_data: Dict[str, Any]
@@ -351,3 +411,160 @@ class PbpEventRow(BaseModel):
         else:
             # Could further classify corner vs above break 3s using x,y coordinates
             return ShotZone.ABOVE_BREAK_3
+
+
+def _trusted_schema(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> bool:
+    """Whether a resultSet has the headers and row shape the bulk path relies on."""
+    width = len(headers)
+    return (
+        all(header in headers for header in PBP_REQUIRED_HEADERS)
+        and all(isinstance(row, (list, tuple)) and len(row) == width for row in rows)
+    )
+
+
+def _coerce_pbp_columns(
+    game_id: str, headers: Sequence[str], rows: Sequence[Sequence[Any]], source_url: str
+) -> List[Optional[Dict[str, Any]]]:
+    """Column-wise equivalent of ``from_nba_stats`` + validation for a trusted resultSet.
+
+    Returns validated field values per row, or ``None`` for rows that need the
+    strict path (values ``from_nba_stats`` would reject or that validation
+    would coerce differently).
+    """
+    position = {header: i for i, header in enumerate(headers)}
+
+    def column(name: str, default: Any = None) -> List[Any]:
+        i = position.get(name)
+        return [default] * len(rows) if i is None else [row[i] for row in rows]
+
+    def int_column(name: str) -> List[Any]:
+        values = []
+        for value in column(name, _MISSING):
+            try:
+                values.append(int(value) if value is not _MISSING else _MISSING)
+            except (TypeError, ValueError):
+                values.append(None)
+        return values
+
+    periods = [1 if value is _MISSING else value for value in int_column("PERIOD")]
+    event_idxs = [0 if value is _MISSING else value for value in int_column("EVENTNUM")]
+    event_types = [
+        NBA_STATS_EVENT_MAP.get("1" if value is None else str(value).strip(), EventType.SHOT_MADE)
+        for value in column("EVENTMSGTYPE", "")
+    ]
+    action_types = [str(value) for value in column("EVENTMSGACTIONTYPE", "")]
+    home_descs = column("HOMEDESCRIPTION", _MISSING)
+    visitor_descs = column("VISITORDESCRIPTION", _MISSING)
+    clocks = column("PCTIMESTRING", "")
+    scores = column("SCORE", "")
+
+    parsed_clocks = parse_clocks(clocks, [0 if value is None else value for value in periods])
+    clock_cache: Dict[Tuple[Any, int], Tuple[Optional[int], Optional[float]]] = {}
+    slug_cache: Dict[Any, Optional[str]] = {}
+
+    def clock_fields(i: int, time_str: Any, period: int) -> Tuple[Optional[int], Optional[float]]:
+        if parsed_clocks.valid[i]:
+            return int(parsed_clocks.clock_ms_remaining[i]), float(parsed_clocks.seconds_elapsed[i])
+        # Same fallback as from_nba_stats for clocks parse_clock_to_ms rejects
+        key = (time_str, period)
+        if key not in clock_cache:
+            seconds = None
+            try:
+                minutes, secs = map(int, time_str.split(":"))
+                seconds = float((12 * 60) - (minutes * 60 + secs))
+            except (ValueError, AttributeError):
+                pass
+            clock_cache[key] = (None, seconds)
+        return clock_cache[key]
+
+    def slug(name: Any) -> Any:
+        if name not in slug_cache:
+            try:
+                value = normalize_name_slug(name)
+                slug_cache[name] = normalize_name_slug(value) if value else None
+            except Exception:
+                slug_cache[name] = _MISSING  # left to the strict path
+        return slug_cache[name]
+
+    players = {}
+    for n in (1, 2):
+        names = column(f"PLAYER{n}_NAME", _MISSING)
+        ids = column(f"PLAYER{n}_ID")
+        players[n] = (
+            [slug("" if name is _MISSING else name) for name in names],
+            [None if name is _MISSING else name for name in names],
+            [str(value) if value else None for value in ids],
+        )
+
+    fields: List[Optional[Dict[str, Any]]] = []
+    for i in range(len(rows)):
+        period, event_idx, event_type = periods[i], event_idxs[i], event_types[i]
+        home, visitor = home_descs[i], visitor_descs[i]
+        description = (None if home is _MISSING else home) or (None if visitor is _MISSING else visitor)
+        shot_desc = ("" if home is _MISSING else home) or ("" if visitor is _MISSING else visitor)
+        if period is None or event_idx is None or not isinstance(description, (str, type(None))):
+            fields.append(None)
+            continue
+
+        shot_made = shot_value = shot_type = None
+        if event_type in (EventType.SHOT_MADE, EventType.SHOT_MISSED):
+            if not isinstance(shot_desc, str):
+                fields.append(None)
+                continue
+            shot_made = event_type == EventType.SHOT_MADE
+            if "3PT" in shot_desc:
+                shot_value, shot_type = 3, ShotType.THREE_POINT
+            else:
+                shot_value, shot_type = 2, ShotType.TWO_POINT
+        elif event_type in (EventType.FREE_THROW_MADE, EventType.FREE_THROW_MISSED):
+            shot_made = event_type == EventType.FREE_THROW_MADE
+            shot_value, shot_type = 1, ShotType.FREE_THROW
+
+        time_str = clocks[i]
+        if time_str is not None and not isinstance(time_str, str):
+            fields.append(None)
+            continue
+        clock_ms = seconds_elapsed = None
+        if time_str:
+            clock_ms, seconds_elapsed = clock_fields(i, time_str, period)
+
+        score_home = score_away = None
+        score_str = scores[i]
+        if score_str and isinstance(score_str, str) and " - " in score_str:
+            try:
+                home_str, away_str = score_str.strip().split(" - ", 1)
+                score_home, score_away = int(home_str.strip()), int(away_str.strip())
+            except (ValueError, AttributeError):
+                score_home = score_away = None
+
+        slugs1, names1, ids1 = players[1]
+        slugs2, names2, ids2 = players[2]
+        if not all(isinstance(v, (str, type(None))) for v in (names1[i], names2[i], slugs1[i], slugs2[i])):
+            fields.append(None)
+            continue
+
+        fields.append({
+            "game_id": game_id,
+            "period": period,
+            "event_idx": event_idx,
+            "event_id": action_types[i],
+            "time_remaining": time_str,
+            "clock_ms_remaining": clock_ms,
+            "seconds_elapsed": seconds_elapsed,
+            "score_home": score_home,
+            "score_away": score_away,
+            "event_type": event_type,
+            "description": description,
+            "player1_name_slug": slugs1[i],
+            "player1_display_name": names1[i],
+            "player1_id": ids1[i],
+            "player2_name_slug": slugs2[i],
+            "player2_display_name": names2[i],
+            "player2_id": ids2[i],
+            "shot_made": shot_made,
+            "shot_value": shot_value,
+            "shot_type": shot_type,
+            "source": "nba_stats",
+            "source_url": source_url,
+        })
+    return fields
@@ -14,4 +14,7 @@ class ShotEvent(BaseModel):
     shot_made_flag: int = Field(..., ge=0, le=1, description="1 if made, 0 if missed")
     loc_x: int = Field(..., description="X coordinate on court")
     loc_y: int = Field(..., description="Y coordinate on court")
-    event_num: Optional[int] = Field(None, description="PBP event number for linking")
\ No newline at end of file
+    event_num: Optional[int] = Field(None, description="PBP event number for linking")
+    clock_ms_remaining: Optional[int] = Field(
+        None, ge=0, description="Game clock when the shot was taken (time-based PBP linking)"
+    )
\ No newline at end of file
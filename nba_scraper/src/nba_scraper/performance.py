@@ -15,6 +15,7 @@ from asyncpg import Connection, Pool
 
 from .config import get_settings
 from .nba_logging import get_logger, metrics, monitor_function
+from .loaders.upsert import TableSpec, compile_upsert
 
 logger = get_logger(__name__)
 
@@ -310,36 +311,16 @@ class BulkOperationOptimizer:
         if not data:
             return 0
         
-        if update_columns is None:
-            update_columns = [col for col in columns if col not in conflict_columns]
-        
-        # Build the upsert query
-        placeholders = ", ".join([f"${i+1}" for i in range(len(columns))])
-        column_list = ", ".join(columns)
-        conflict_list = ", ".join(conflict_columns)
-        
-        # Build UPDATE SET clause with DISTINCT FROM condition for efficiency
-        update_clauses = []
-        for col in update_columns:
-            update_clauses.append(f"{col} = EXCLUDED.{col}")
-        
-        # Add condition to only update when values are actually different
-        if update_columns:
-            distinct_conditions = " OR ".join([
-                f"EXCLUDED.{col} IS DISTINCT FROM {table_name}.{col}"
-                for col in update_columns
-            ])
-            where_clause = f"WHERE {distinct_conditions}"
-        else:
-            where_clause = ""
-        
-        upsert_query = f"""
-            INSERT INTO {table_name} ({column_list})
-            VALUES ({placeholders})
-            ON CONFLICT ({conflict_list})
-            DO UPDATE SET {', '.join(update_clauses)}
-            {where_clause}
-        """
+        # Compiled once per (table, columns, keys) by the shared upsert compiler;
+        # asyncpg's statement cache then reuses the server-side prepared plan.
+        spec = TableSpec.from_columns(
+            table_name,
+            [(col, None) for col in columns],
+            conflict_columns,
+            update_columns=update_columns,
+            compare_exclude=(),
+        )
+        upsert_query = compile_upsert(spec, "executemany")
         
         total_processed = 0
         
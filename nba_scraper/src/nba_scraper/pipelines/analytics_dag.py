@@ -0,0 +1,208 @@
+"""Dependency-aware concurrent executor for derived analytics."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from graphlib import CycleError, TopologicalSorter
+from typing import Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from ..nba_logging import get_logger
+
+logger = get_logger(__name__)
+
+NODE_OK = 'ok'
+NODE_FAILED = 'failed'
+NODE_SKIPPED = 'skipped'  # an upstream node failed
+
+# Runs one unit of nodes; returns the nodes that failed (None when all succeeded)
+UnitRunner = Callable[[Tuple[str, ...]], Awaitable[Optional[Iterable[str]]]]
+
+
+@dataclass
+class NodeRun:
+    """Timing and status of one node, in seconds from the start of the run."""
+    node: str
+    status: str
+    start: float = 0.0
+    end: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class DagRunReport:
+    """Outcome of one DAG run with its critical path."""
+    nodes: Dict[str, NodeRun] = field(default_factory=dict)
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    def with_status(self, status: str) -> List[str]:
+        return [node for node, run in self.nodes.items() if run.status == status]
+
+    def summary(self) -> Dict[str, object]:
+        """Log-friendly view of the run."""
+        return {
+            'critical_path': self.critical_path,
+            'critical_path_seconds': round(self.critical_path_seconds, 3),
+            'wall_seconds': round(self.wall_seconds, 3),
+            'node_seconds': {
+                node: round(run.duration, 3) for node, run in self.nodes.items() if run.status != NODE_SKIPPED
+            },
+            'failed': self.with_status(NODE_FAILED),
+            'skipped': self.with_status(NODE_SKIPPED),
+        }
+
+
+class AnalyticsDag:
+    """Analytics and the analytics each one reads from.
+
+    Nodes run as units: a unit is a group of nodes executed by one runner call
+    (e.g. analytics sharing one pass over their inputs) or a single node. A
+    unit starts as soon as every node it depends on has finished, with at most
+    ``max_workers`` units running at once. Dependents of a failed node are
+    skipped.
+    """
+
+    def __init__(self, dependencies: Mapping[str, Iterable[str]]):
+        self.dependencies: Dict[str, Tuple[str, ...]] = {
+            node: tuple(upstream) for node, upstream in dependencies.items()
+        }
+        for node, upstream in self.dependencies.items():
+            unknown = [d for d in upstream if d not in self.dependencies]
+            if unknown:
+                raise ValueError(f"Analytic {node} depends on unknown analytics: {unknown}")
+        try:
+            self.order = tuple(TopologicalSorter(self.dependencies).static_order())
+        except CycleError as e:
+            raise ValueError(f"Analytics dependency cycle: {e.args[1]}") from e
+
+        self.dependents: Dict[str, Set[str]] = {node: set() for node in self.dependencies}
+        for node, upstream in self.dependencies.items():
+            for d in upstream:
+                self.dependents[d].add(node)
+
+    def downstream(self, nodes: Iterable[str]) -> Set[str]:
+        """``nodes`` and every node that transitively depends on them."""
+        seen: Set[str] = set()
+        stack = [node for node in nodes if node in self.dependencies]
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(self.dependents[node])
+        return seen
+
+    def _units(self, nodes: Set[str], groups: Iterable[Sequence[str]]) -> List[Tuple[str, ...]]:
+        units: List[Tuple[str, ...]] = []
+        grouped: Set[str] = set()
+        for group in groups:
+            members = tuple(node for node in self.order if node in group and node in nodes)
+            if not members:
+                continue
+            if any((self.downstream([node]) - {node}) & set(members) for node in members):
+                raise ValueError(f"Grouped analytics depend on each other: {members}")
+            units.append(members)
+            grouped.update(members)
+        units.extend((node,) for node in self.order if node in nodes and node not in grouped)
+        return units
+
+    async def run(
+        self,
+        runner: UnitRunner,
+        nodes: Optional[Iterable[str]] = None,
+        groups: Iterable[Sequence[str]] = (),
+        max_workers: int = 4
+    ) -> DagRunReport:
+        """Run ``nodes`` (default: all) in dependency order, concurrently where possible.
+
+        Dependencies on nodes outside ``nodes`` are treated as already
+        satisfied, so a subset such as ``downstream(changed)`` re-derives only
+        those analytics.
+        """
+        selected = set(self.dependencies if nodes is None else nodes)
+        unknown = selected - set(self.dependencies)
+        if unknown:
+            raise ValueError(f"Unknown analytics: {sorted(unknown)}")
+
+        units = self._units(selected, groups)
+        upstream = {
+            unit: {d for node in unit for d in self.dependencies[node] if d in selected}
+            for unit in units
+        }
+
+        report = DagRunReport()
+        semaphore = asyncio.Semaphore(max_workers)
+        started = time.perf_counter()
+
+        async def execute(unit: Tuple[str, ...]) -> Set[str]:
+            async with semaphore:
+                unit_start = time.perf_counter() - started
+                try:
+                    failed = set(await runner(unit) or ()) & set(unit)
+                except Exception as e:
+                    logger.error("Analytics unit failed", analytics=list(unit), error=str(e))
+                    failed = set(unit)
+                unit_end = time.perf_counter() - started
+            for node in unit:
+                report.nodes[node] = NodeRun(
+                    node, NODE_FAILED if node in failed else NODE_OK, unit_start, unit_end
+                )
+            return failed
+
+        waiting = list(units)
+        finished: Set[str] = set()
+        blocked: Set[str] = set()  # failed or skipped
+        running: Dict[asyncio.Task, Tuple[str, ...]] = {}
+
+        while waiting or running:
+            progressed = False
+            for unit in list(waiting):
+                if not upstream[unit] <= finished:
+                    continue
+                waiting.remove(unit)
+                progressed = True
+                if upstream[unit] & blocked:
+                    logger.warning("Skipping analytics with failed dependencies",
+                                 analytics=list(unit), failed=sorted(upstream[unit] & blocked))
+                    now = time.perf_counter() - started
+                    for node in unit:
+                        report.nodes[node] = NodeRun(node, NODE_SKIPPED, now, now)
+                    finished.update(unit)
+                    blocked.update(unit)
+                else:
+                    running[asyncio.create_task(execute(unit))] = unit
+            if not running:
+                if not progressed:
+                    break
+                continue  # skips can unblock further skips
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                unit = running.pop(task)
+                finished.update(unit)
+                blocked.update(task.result())
+
+        report.wall_seconds = time.perf_counter() - started
+        report.critical_path, report.critical_path_seconds = self._critical_path(report)
+        return report
+
+    def _critical_path(self, report: DagRunReport) -> Tuple[List[str], float]:
+        """Longest chain of dependent nodes by run time."""
+        best: Dict[str, Tuple[float, List[str]]] = {}
+        for node in self.order:
+            run = report.nodes.get(node)
+            if run is None or run.status == NODE_SKIPPED:
+                continue
+            before = max(
+                (best[d] for d in self.dependencies[node] if d in best),
+                key=lambda entry: entry[0],
+                default=(0.0, []),
+            )
+            best[node] = (before[0] + run.duration, before[1] + [node])
+        if not best:
+            return [], 0.0
+        seconds, path = max(best.values(), key=lambda entry: entry[0])
+        return path, seconds
@@ -1,16 +1,221 @@
 """Pipeline for computing derived analytics and advanced metrics."""
 
 import asyncio
+import time
 from datetime import datetime, date, UTC
-from typing import Optional, Dict, Any, List, Set
-from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Set, Tuple
+from dataclasses import dataclass, field
 
 from ..models import GameStatus
+from ..models.pbp_frame import PbpFrame
 from ..nba_logging import get_logger
-from ..db import get_connection
+from ..db import get_connection, pooled_connection
+from ..loaders.upsert import TableSpec, upsert_rows
+from ..state.game_state import (
+    GameStageState,
+    fetch_stage_states,
+    fingerprint,
+    save_stage_states,
+    stage_needs_work,
+)
+from ..transformers.player_impact import IMPACT_COUNT_COLUMNS, IMPACT_METRIC_COLUMNS, PlayerImpactAccumulator
+from ..transformers.possessions import annotate_possessions, possessions_by_team
+from ..transformers.team_game_stats import COUNT_COLUMNS, DERIVED_COLUMNS, TeamGameStatsAccumulator
+from ..utils.clock import parse_clocks
 
 logger = get_logger(__name__)
 
+# Events for the possession engine, in game order
+TRACKED_EVENTS_QUERY = """
+SELECT game_id, period, event_idx, time_remaining, seconds_elapsed,
+       event_type, team_tricode, description
+FROM pbp_events
+WHERE game_id = ANY($1::text[])
+ORDER BY game_id, period, event_idx
+"""
+
+# Keyed by team tricode, like team_game_stats and possessions_by_team
+TRACKED_POSSESSIONS_UPDATE = """
+UPDATE team_game_stats tgs
+SET possessions_estimated = u.possessions,
+    pace = u.possessions * 48.0 / u.minutes,
+    offensive_rating = tgs.points * 100.0 / GREATEST(1, u.possessions),
+    updated_at = CURRENT_TIMESTAMP
+FROM unnest($1::text[], $2::text[], $3::int[], $4::float8[])
+     AS u(game_id, team_tricode, possessions, minutes)
+WHERE tgs.game_id = u.game_id AND tgs.team_tricode = u.team_tricode
+"""
+
+# Events for the player impact sweep, in game order
+PLAYER_EVENTS_QUERY = """
+SELECT game_id, period, event_idx, time_remaining, seconds_elapsed,
+       event_type, team_tricode, description, shot_value, player1_id, player2_id
+FROM pbp_events
+WHERE game_id = ANY($1::text[])
+ORDER BY game_id, period, event_idx
+"""
+
+# Players listed per period in lineup_stints, by team tricode
+LINEUP_PLAYERS_QUERY = """
+SELECT ls.game_id, ls.period,
+       CASE WHEN ls.team_id::text = g.home_team_id THEN g.home_team_tricode
+            ELSE g.away_team_tricode END AS team_tricode,
+       array_agg(DISTINCT p.player_id) AS player_ids
+FROM lineup_stints ls
+JOIN games g ON g.game_id = ls.game_id
+CROSS JOIN LATERAL unnest(ls.lineup_player_ids) AS p(player_id)
+WHERE ls.game_id = ANY($1::text[])
+GROUP BY 1, 2, 3
+"""
+
+PLAYER_GAME_IMPACT_SPEC = TableSpec.from_columns(
+    "player_game_impact",
+    [("game_id", "text"), ("player_id", "text"), ("team_tricode", "text")]
+    + [(column, "float8") for column in IMPACT_COUNT_COLUMNS + IMPACT_METRIC_COLUMNS],
+    ("game_id", "player_id"),
+    update_exprs=[("updated_at", "CURRENT_TIMESTAMP")],
+)
+
+# Head-to-head record from the materialized pair summaries, team1 first
+MATCHUP_SUMMARY_QUERY = """
+SELECT COALESCE(SUM(games), 0) AS total_games,
+       COALESCE(SUM(CASE WHEN team_a_id = $1 THEN team_a_wins ELSE team_b_wins END), 0) AS team1_wins,
+       COALESCE(SUM(CASE WHEN team_a_id = $1 THEN team_b_wins ELSE team_a_wins END), 0) AS team2_wins,
+       SUM(CASE WHEN team_a_id = $1 THEN team_a_points ELSE team_b_points END)::float8
+           / NULLIF(SUM(games), 0) AS team1_avg_points,
+       SUM(CASE WHEN team_a_id = $1 THEN team_b_points ELSE team_a_points END)::float8
+           / NULLIF(SUM(games), 0) AS team2_avg_points,
+       SUM(margin_sum)::float8 / NULLIF(SUM(games), 0) AS avg_margin
+FROM head_to_head_summary
+WHERE ((team_a_id = $1 AND team_b_id = $2) OR (team_a_id = $2 AND team_b_id = $1))
+  AND ($3::text IS NULL OR season = $3)
+"""
+
+# Head-to-head record over the pair's last N games
+MATCHUP_RECENT_QUERY = """
+SELECT COUNT(*) AS total_games,
+       COUNT(*) FILTER (WHERE team1_points > team2_points) AS team1_wins,
+       COUNT(*) FILTER (WHERE team2_points > team1_points) AS team2_wins,
+       AVG(team1_points)::float8 AS team1_avg_points,
+       AVG(team2_points)::float8 AS team2_avg_points,
+       AVG(ABS(team1_points - team2_points))::float8 AS avg_margin
+FROM (
+    SELECT CASE WHEN home_team_id = $1 THEN home_points ELSE away_points END AS team1_points,
+           CASE WHEN home_team_id = $1 THEN away_points ELSE home_points END AS team2_points
+    FROM game_results
+    WHERE ((home_team_id = $1 AND away_team_id = $2) OR (home_team_id = $2 AND away_team_id = $1))
+      AND ($3::text IS NULL OR season = $3)
+    ORDER BY game_date DESC, game_id DESC
+    LIMIT $4
+) recent
+"""
+
+# Engines that can compute team_game_stats
+TEAM_STATS_ENGINES = ('sql', 'numpy')
+
+# Rows per server-side cursor fetch of the NumPy engine
+TEAM_STATS_STREAM_ROWS = 50_000
+
+# Regulation plus five minutes per overtime period
+GAME_MINUTES_SQL = "48.0 + 5.0 * GREATEST(COALESCE(g.period, 4) - 4, 0)"
+
+TEAM_STATS_GAMES_QUERY = f"""
+SELECT g.game_id, g.home_team_tricode, g.away_team_tricode, g.home_team_id, g.away_team_id,
+       {GAME_MINUTES_SQL} AS duration_minutes
+FROM games g
+WHERE {{where_clause}}
+ORDER BY g.game_id
+"""
+
+# Only what the aggregation reads; the home/away split matches the SQL engine's CASE
+TEAM_STATS_EVENTS_QUERY = """
+SELECT p.game_id, COALESCE(p.team_tricode = g.home_team_tricode, false) AS is_home,
+       p.event_type, p.shot_value, p.event_subtype AS rebound_type
+FROM pbp_events p
+JOIN games g ON g.game_id = p.game_id
+WHERE p.game_id = ANY($1::text[])
+"""
+
+TEAM_GAME_STATS_SPEC = TableSpec.from_columns(
+    "team_game_stats",
+    [("game_id", "text"), ("team_tricode", "text"), ("team_id", "text")]
+    + [(column, "int8") for column in COUNT_COLUMNS]
+    + [("possessions_estimated", "int8"), ("pace", "float8"),
+       ("offensive_rating", "float8"), ("defensive_rating", "float8")],
+    ("game_id", "team_tricode"),
+    # defensive_rating is only written on insert; the pace/efficiency step owns it
+    update_columns=("team_id",) + COUNT_COLUMNS + ("possessions_estimated", "pace", "offensive_rating"),
+    update_exprs=[("updated_at", "CURRENT_TIMESTAMP")],
+)
+
+# Change log stage for team analytics; bump the version to recompute every game once
+TEAM_ANALYTICS_STAGE = 'derived:team_analytics'
+TEAM_ANALYTICS_VERSION = '1'
+
+# Running per-season sums behind the league-relative z-scores, in table order
+SEASON_AGGREGATE_COLUMNS = (
+    'team_games',
+    'off_rating_sum', 'off_rating_sumsq',
+    'def_rating_sum', 'def_rating_sumsq',
+    'pace_sum', 'pace_sumsq',
+)
+
+_SEASON_SUMS = """
+    COUNT(*)::int AS team_games,
+    SUM(COALESCE(tgs.offensive_rating, 0))::float8 AS off_rating_sum,
+    SUM(COALESCE(tgs.offensive_rating, 0) ^ 2)::float8 AS off_rating_sumsq,
+    SUM(COALESCE(tgs.defensive_rating, 0))::float8 AS def_rating_sum,
+    SUM(COALESCE(tgs.defensive_rating, 0) ^ 2)::float8 AS def_rating_sumsq,
+    SUM(COALESCE(tgs.pace, 0))::float8 AS pace_sum,
+    SUM(COALESCE(tgs.pace, 0) ^ 2)::float8 AS pace_sumsq
+"""
+
+# What the given games contribute to their seasons' sums
+SEASON_CONTRIBUTIONS_QUERY = f"""
+SELECT g.season, {_SEASON_SUMS}
+FROM team_game_stats tgs
+JOIN games g ON g.game_id = tgs.game_id
+WHERE tgs.game_id = ANY($1::text[])
+GROUP BY g.season
+"""
+
+SEASON_AGGREGATES_SEASONS_QUERY = """
+SELECT season FROM team_season_aggregates WHERE season = ANY($1::text[])
+"""
+
+# Roll seasons forward by per-season deltas
+SEASON_AGGREGATES_ADD = """
+INSERT INTO team_season_aggregates (
+    season, {columns}, updated_at
+)
+SELECT u.*, CURRENT_TIMESTAMP
+FROM unnest($1::text[], $2::int[], $3::float8[], $4::float8[], $5::float8[],
+            $6::float8[], $7::float8[], $8::float8[]) AS u(season, {columns})
+ON CONFLICT (season) DO UPDATE SET
+    {additive},
+    updated_at = CURRENT_TIMESTAMP
+""".format(
+    columns=', '.join(SEASON_AGGREGATE_COLUMNS),
+    additive=',\n    '.join(
+        f"{c} = team_season_aggregates.{c} + EXCLUDED.{c}" for c in SEASON_AGGREGATE_COLUMNS
+    ),
+)
+
+# Recompute seasons from every team game they hold
+SEASON_AGGREGATES_REBUILD = f"""
+INSERT INTO team_season_aggregates (
+    season, {', '.join(SEASON_AGGREGATE_COLUMNS)}, updated_at
+)
+SELECT g.season, {_SEASON_SUMS}, CURRENT_TIMESTAMP
+FROM team_game_stats tgs
+JOIN games g ON g.game_id = tgs.game_id
+WHERE g.season = ANY($1::text[])
+GROUP BY g.season
+ON CONFLICT (season) DO UPDATE SET
+    {', '.join(f"{c} = EXCLUDED.{c}" for c in SEASON_AGGREGATE_COLUMNS)},
+    updated_at = CURRENT_TIMESTAMP
+"""
+
 
 @dataclass
 class AnalyticsPipelineResult:
@@ -20,26 +225,77 @@ class AnalyticsPipelineResult:
     games_analyzed: int
     duration_seconds: Optional[float] = None
     error: Optional[str] = None
+    games_skipped: int = 0  # unchanged since the last incremental run
+    player_season: List[Dict[str, Any]] = field(default_factory=list)  # per (player, team)
+
+
+@dataclass
+class TeamStatsEngineComparison:
+    """Timings and disagreements of the team_game_stats engines on one workload."""
+    games: int
+    seconds: Dict[str, float]
+    mismatches: List[Dict[str, Any]]
+    
+    @property
+    def faster(self) -> str:
+        return min(self.seconds, key=self.seconds.get)
+
+
+def diff_team_game_stats(
+    expected: Dict[tuple, Dict[str, Any]],
+    actual: Dict[tuple, Dict[str, Any]],
+    tolerance: float = 1e-6
+) -> List[Dict[str, Any]]:
+    """Column-level differences between two sets of team_game_stats rows keyed by (game_id, team_tricode)."""
+    mismatches = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        left, right = expected.get(key), actual.get(key)
+        if left is None or right is None:
+            mismatches.append({'game_id': key[0], 'team_tricode': key[1], 'column': None,
+                               'expected': left is not None, 'actual': right is not None})
+            continue
+        for column in COUNT_COLUMNS + DERIVED_COLUMNS[:3]:
+            a, b = left.get(column), right.get(column)
+            if a is None or b is None:
+                same = a is None and b is None
+            else:
+                same = abs(float(a) - float(b)) <= tolerance
+            if not same:
+                mismatches.append({'game_id': key[0], 'team_tricode': key[1], 'column': column,
+                                   'expected': a, 'actual': b})
+    return mismatches
 
 
 class AnalyticsPipeline:
     """Computes advanced analytics and derived metrics from raw NBA data."""
     
-    def __init__(self, batch_size: int = 50):
+    def __init__(self, batch_size: int = 50, team_stats_engine: str = 'sql'):
+        if team_stats_engine not in TEAM_STATS_ENGINES:
+            raise ValueError(f"Unknown team stats engine: {team_stats_engine}")
         self.batch_size = batch_size
+        self.team_stats_engine = team_stats_engine
     
     async def compute_team_analytics(
         self,
         season: Optional[str] = None,
         team_ids: Optional[List[int]] = None,
-        date_range: Optional[tuple[date, date]] = None
+        date_range: Optional[tuple[date, date]] = None,
+        full_rebuild: bool = False
     ) -> AnalyticsPipelineResult:
         """Compute team-level advanced analytics.
         
+        By default only games whose silver state moved since their last team
+        analytics run are recomputed, and the season aggregates behind the
+        z-scores are rolled forward by those games' deltas. Z-scores of
+        unchanged games keep the season averages of their last run until the
+        next full rebuild.
+        
         Args:
             season: Season to analyze (e.g., '2023-24')
             team_ids: Specific teams to analyze
             date_range: Date range to limit analysis
+            full_rebuild: Recompute every matching game and rebuild its seasons'
+                          aggregates (also used when game state is unavailable)
             
         Returns:
             AnalyticsPipelineResult with computation summary
@@ -53,7 +309,8 @@ class AnalyticsPipeline:
         )
         
         try:
-            logger.info("Starting team analytics computation", season=season, team_ids=team_ids)
+            logger.info("Starting team analytics computation", season=season, team_ids=team_ids,
+                       full_rebuild=full_rebuild)
             
             conn = await get_connection()
             
@@ -79,22 +336,50 @@ class AnalyticsPipeline:
             
             where_clause = " AND ".join(where_conditions)
             
-            # Compute basic team stats per game
-            await self._compute_team_game_stats(conn, where_clause, params)
-            result.metrics_computed.add("team_game_stats")
-            
-            # Compute advanced team metrics
-            await self._compute_team_advanced_metrics(conn, where_clause, params)
-            result.metrics_computed.add("team_advanced_metrics")
-            
-            # Compute team pace and efficiency
-            await self._compute_team_pace_efficiency(conn, where_clause, params)
-            result.metrics_computed.add("team_pace_efficiency")
-            
-            # Get count of games analyzed
-            count_query = f"SELECT COUNT(DISTINCT g.game_id) FROM games g WHERE {where_clause}"
-            count_row = await conn.fetchrow(count_query, *params)
-            result.games_analyzed = count_row[0] if count_row else 0
+            game_rows = await conn.fetch(
+                f"SELECT g.game_id FROM games g WHERE {where_clause} ORDER BY g.game_id", *params
+            )
+            game_ids = [row["game_id"] for row in game_rows]
+            
+            plan = None if full_rebuild else await self._plan_team_games(conn, game_ids)
+            fingerprints: Dict[str, str] = {}
+            if plan is not None:
+                changed, fingerprints = plan
+                result.games_skipped = len(game_ids) - len(changed)
+                if not changed:
+                    result.success = True
+                    result.duration_seconds = (datetime.now(UTC) - start_time).total_seconds()
+                    logger.info("Team analytics up to date", games_skipped=result.games_skipped)
+                    return result
+                
+                # Every statement below only touches the changed games
+                game_ids = changed
+                where_clause += f" AND g.game_id = ANY(${len(params) + 1}::text[])"
+                params = [*params, changed]
+            
+            async with conn.transaction():
+                # Season sums of the changed games before they are recomputed
+                before = None if plan is None else await self._season_contributions(conn, game_ids)
+                
+                # Compute basic team stats per game
+                await self._compute_team_game_stats(conn, where_clause, params)
+                result.metrics_computed.add("team_game_stats")
+                
+                # Replace estimated possessions with tracked ones
+                await self._compute_tracked_possessions(conn, where_clause, params)
+                result.metrics_computed.add("tracked_possessions")
+                
+                # Compute advanced team metrics
+                await self._compute_team_advanced_metrics(conn, where_clause, params)
+                result.metrics_computed.add("team_advanced_metrics")
+                
+                # Compute team pace and efficiency
+                await self._compute_team_pace_efficiency(conn, where_clause, params, game_ids, before)
+                result.metrics_computed.add("team_pace_efficiency")
+            
+            result.games_analyzed = len(game_ids)
+            if plan is not None:
+                await self._record_team_states(conn, game_ids, fingerprints)
             
             result.success = True
             result.duration_seconds = (datetime.now(UTC) - start_time).total_seconds()
@@ -102,6 +387,8 @@ class AnalyticsPipeline:
             logger.info("Team analytics computation completed",
                        metrics=len(result.metrics_computed),
                        games=result.games_analyzed,
+                       games_skipped=result.games_skipped,
+                       incremental=plan is not None,
                        duration=result.duration_seconds)
             
         except Exception as e:
@@ -111,6 +398,49 @@ class AnalyticsPipeline:
         
         return result
     
+    async def _plan_team_games(
+        self, conn, game_ids: List[str]
+    ) -> Optional[Tuple[List[str], Dict[str, str]]]:
+        """Games whose team analytics are stale, and their silver fingerprints.
+        
+        Returns None (full rebuild) when the game state cannot be read.
+        """
+        try:
+            silver = await fetch_stage_states(conn, stage='silver', game_ids=game_ids)
+            done = await fetch_stage_states(conn, stage=TEAM_ANALYTICS_STAGE, game_ids=game_ids)
+        except Exception as e:
+            logger.warning("Game state unavailable, rebuilding team analytics", error=str(e))
+            return None
+        
+        fingerprints = {
+            game_id: fingerprint(state.input_sha1, state.version)
+            for game_id, state in silver.items()
+        }
+        changed = [
+            game_id for game_id in game_ids
+            if stage_needs_work(
+                done.get(game_id),
+                input_sha1=fingerprints.get(game_id),
+                version=TEAM_ANALYTICS_VERSION,
+            )
+        ]
+        return changed, fingerprints
+    
+    async def _record_team_states(self, conn, game_ids: List[str], fingerprints: Dict[str, str]) -> None:
+        """Mark games as current for team analytics."""
+        try:
+            await save_stage_states(conn, [
+                GameStageState(
+                    game_id=game_id,
+                    stage=TEAM_ANALYTICS_STAGE,
+                    input_sha1=fingerprints.get(game_id),
+                    version=TEAM_ANALYTICS_VERSION,
+                )
+                for game_id in game_ids
+            ])
+        except Exception as e:
+            logger.warning("Failed to record team analytics state", games=len(game_ids), error=str(e))
+    
     async def compute_player_analytics(
         self,
         season: Optional[str] = None,
@@ -147,17 +477,9 @@ class AnalyticsPipeline:
             
             where_clause = " AND ".join(where_conditions)
             
-            # Compute player usage rates
-            await self._compute_player_usage_rates(conn, where_clause, params, player_ids)
-            result.metrics_computed.add("player_usage_rates")
-            
-            # Compute player efficiency metrics
-            await self._compute_player_efficiency_metrics(conn, where_clause, params, player_ids)
-            result.metrics_computed.add("player_efficiency")
-            
-            # Compute plus/minus metrics
-            await self._compute_player_plus_minus(conn, where_clause, params, player_ids)
-            result.metrics_computed.add("player_plus_minus")
+            # Usage, efficiency and on/off plus/minus come from one sweep over the events
+            result.player_season = await self._compute_player_impact(conn, where_clause, params, player_ids)
+            result.metrics_computed.update({"player_usage_rates", "player_efficiency", "player_plus_minus"})
             
             # Get count of games analyzed
             count_query = f"SELECT COUNT(DISTINCT g.game_id) FROM games g WHERE {where_clause}"
@@ -180,113 +502,216 @@ class AnalyticsPipeline:
         return result
     
     async def _compute_team_game_stats(self, conn, where_clause: str, params: List):
-        """Compute basic team statistics per game."""
+        """Compute basic team statistics per game with the configured engine."""
+        if self.team_stats_engine == 'numpy':
+            await self._compute_team_game_stats_numpy(conn, where_clause, params)
+        else:
+            await self._compute_team_game_stats_sql(conn, where_clause, params)
+    
+    async def _aggregate_team_game_stats(self, conn, where_clause: str, params: List) -> List[Dict[str, Any]]:
+        """team_game_stats rows from events streamed through a server-side cursor."""
+        games = await conn.fetch(TEAM_STATS_GAMES_QUERY.format(where_clause=where_clause), *params)
+        accumulator = TeamGameStatsAccumulator(games)
+        if accumulator.game_ids:
+            # Cursors live inside a transaction (a savepoint when one is open)
+            async with conn.transaction():
+                cursor = await conn.cursor(TEAM_STATS_EVENTS_QUERY, accumulator.game_ids)
+                while True:
+                    records = await cursor.fetch(TEAM_STATS_STREAM_ROWS)
+                    if not records:
+                        break
+                    accumulator.add_records(records)
+        return accumulator.rows()
+    
+    async def _compute_team_game_stats_numpy(self, conn, where_clause: str, params: List):
+        """Compute basic team statistics per game with grouped NumPy reductions."""
+        rows = await self._aggregate_team_game_stats(conn, where_clause, params)
+        result = await upsert_rows(conn, TEAM_GAME_STATS_SPEC, rows)
+        logger.info("Team game stats computed", engine="numpy", rows=len(rows),
+                   inserted=result.inserted, updated=result.updated)
+    
+    async def compare_team_stats_engines(
+        self,
+        season: Optional[str] = None,
+        date_range: Optional[tuple[date, date]] = None
+    ) -> TeamStatsEngineComparison:
+        """Time both team_game_stats engines on one workload and diff their rows.
+        
+        Each engine runs in a transaction that is rolled back, so nothing is
+        written. Use ``faster`` to pick ``team_stats_engine`` for that kind of
+        workload; ``mismatches`` should be empty.
+        """
+        where_conditions = ["g.status = 'FINAL'"]
+        params: List[Any] = []
+        if season:
+            where_conditions.append(f"g.season = ${len(params) + 1}")
+            params.append(season)
+        if date_range:
+            where_conditions.append(f"g.game_date >= ${len(params) + 1}")
+            params.append(date_range[0])
+            where_conditions.append(f"g.game_date <= ${len(params) + 1}")
+            params.append(date_range[1])
+        where_clause = " AND ".join(where_conditions)
         
-        # This would aggregate play-by-play data to compute team stats per game
-        # Including field goals, rebounds, assists, turnovers, etc.
+        async with pooled_connection() as conn:
+            game_ids = [row["game_id"] for row in await conn.fetch(
+                f"SELECT g.game_id FROM games g WHERE {where_clause}", *params
+            )]
+            seconds: Dict[str, float] = {}
+            stored: Dict[str, Dict[tuple, Dict[str, Any]]] = {}
+            columns = ("game_id", "team_tricode") + COUNT_COLUMNS + DERIVED_COLUMNS[:3]
+            for engine in TEAM_STATS_ENGINES:
+                transaction = conn.transaction()
+                await transaction.start()
+                try:
+                    start = time.perf_counter()
+                    if engine == 'numpy':
+                        await self._compute_team_game_stats_numpy(conn, where_clause, params)
+                    else:
+                        await self._compute_team_game_stats_sql(conn, where_clause, params)
+                    seconds[engine] = time.perf_counter() - start
+                    rows = await conn.fetch(
+                        f"SELECT {', '.join(columns)} FROM team_game_stats WHERE game_id = ANY($1::text[])",
+                        game_ids,
+                    )
+                    stored[engine] = {(row["game_id"], row["team_tricode"]): dict(row) for row in rows}
+                finally:
+                    await transaction.rollback()
         
+        mismatches = diff_team_game_stats(stored['sql'], stored['numpy'])
+        comparison = TeamStatsEngineComparison(len(game_ids), seconds, mismatches)
+        logger.info("Team stats engines compared", games=len(game_ids), seconds=seconds,
+                   faster=comparison.faster, mismatches=len(mismatches))
+        return comparison
+    
+    async def _compute_team_game_stats_sql(self, conn, where_clause: str, params: List):
+        """Compute basic team statistics per game in one SQL statement."""
+        
+        # Events without a team count for the away side, as in the NumPy engine
         upsert_query = """
         INSERT INTO team_game_stats (
-            game_id, team_id, points, field_goals_made, field_goals_attempted,
-            three_pointers_made, three_pointers_attempted, free_throws_made,
-            free_throws_attempted, offensive_rebounds, defensive_rebounds,
-            assists, turnovers, steals, blocks, personal_fouls,
+            game_id, team_tricode, team_id, points, fgm, fga, fg3m, fg3a, ftm, fta,
+            oreb, dreb, reb, ast, stl, blk, tov, pf,
             possessions_estimated, pace, offensive_rating, defensive_rating
         )
-        SELECT 
-            g.game_id,
-            CASE WHEN p.team_id = g.home_team_id THEN g.home_team_id ELSE g.away_team_id END as team_id,
-            
-            -- Points (from scoring events)
-            COALESCE(SUM(CASE 
-                WHEN p.event_type = 'SHOT_MADE' AND p.shot_value = 1 THEN 1
-                WHEN p.event_type = 'SHOT_MADE' AND p.shot_value = 2 THEN 2  
-                WHEN p.event_type = 'SHOT_MADE' AND p.shot_value = 3 THEN 3
-                WHEN p.event_type = 'FREE_THROW_MADE' THEN 1
-                ELSE 0
-            END), 0) as points,
-            
-            -- Field Goals
-            COALESCE(SUM(CASE WHEN p.event_type = 'SHOT_MADE' AND p.shot_value IN (2,3) THEN 1 ELSE 0 END), 0) as field_goals_made,
-            COALESCE(SUM(CASE WHEN p.event_type IN ('SHOT_MADE', 'SHOT_MISSED') AND p.shot_value IN (2,3) THEN 1 ELSE 0 END), 0) as field_goals_attempted,
-            
-            -- Three Pointers  
-            COALESCE(SUM(CASE WHEN p.event_type = 'SHOT_MADE' AND p.shot_value = 3 THEN 1 ELSE 0 END), 0) as three_pointers_made,
-            COALESCE(SUM(CASE WHEN p.event_type IN ('SHOT_MADE', 'SHOT_MISSED') AND p.shot_value = 3 THEN 1 ELSE 0 END), 0) as three_pointers_attempted,
-            
-            -- Free Throws
-            COALESCE(SUM(CASE WHEN p.event_type = 'FREE_THROW_MADE' THEN 1 ELSE 0 END), 0) as free_throws_made,
-            COALESCE(SUM(CASE WHEN p.event_type IN ('FREE_THROW_MADE', 'FREE_THROW_MISSED') THEN 1 ELSE 0 END), 0) as free_throws_attempted,
-            
-            -- Rebounds
-            COALESCE(SUM(CASE WHEN p.event_type = 'REBOUND' AND p.rebound_type = 'OFFENSIVE' THEN 1 ELSE 0 END), 0) as offensive_rebounds,
-            COALESCE(SUM(CASE WHEN p.event_type = 'REBOUND' AND p.rebound_type = 'DEFENSIVE' THEN 1 ELSE 0 END), 0) as defensive_rebounds,
-            
-            -- Other stats
-            COALESCE(SUM(CASE WHEN p.event_type = 'ASSIST' THEN 1 ELSE 0 END), 0) as assists,
-            COALESCE(SUM(CASE WHEN p.event_type = 'TURNOVER' THEN 1 ELSE 0 END), 0) as turnovers,
-            COALESCE(SUM(CASE WHEN p.event_type = 'STEAL' THEN 1 ELSE 0 END), 0) as steals,
-            COALESCE(SUM(CASE WHEN p.event_type = 'BLOCK' THEN 1 ELSE 0 END), 0) as blocks,
-            COALESCE(SUM(CASE WHEN p.event_type = 'FOUL' THEN 1 ELSE 0 END), 0) as personal_fouls,
+        SELECT
+            game_id, team_tricode, team_id, points, fgm, fga, fg3m, fg3a, ftm, fta,
+            oreb, dreb, oreb + dreb, ast, stl, blk, tov, pf,
             
             -- Estimated possessions (will be refined)
-            GREATEST(1, COALESCE(SUM(CASE WHEN p.event_type IN ('SHOT_MADE', 'SHOT_MISSED') AND p.shot_value IN (2,3) THEN 1 ELSE 0 END), 0) + 
-                       COALESCE(SUM(CASE WHEN p.event_type = 'TURNOVER' THEN 1 ELSE 0 END), 0)) as possessions_estimated,
+            GREATEST(1, fga + tov) as possessions_estimated,
             
-            -- Pace (possessions per 48 minutes) 
-            CASE WHEN g.duration_minutes > 0 THEN 
-                (GREATEST(1, COALESCE(SUM(CASE WHEN p.event_type IN ('SHOT_MADE', 'SHOT_MISSED') AND p.shot_value IN (2,3) THEN 1 ELSE 0 END), 0) + 
-                           COALESCE(SUM(CASE WHEN p.event_type = 'TURNOVER' THEN 1 ELSE 0 END), 0)) * 48.0 / g.duration_minutes)
-                ELSE 0 
-            END as pace,
+            -- Pace (possessions per 48 minutes)
+            CASE WHEN minutes > 0 THEN GREATEST(1, fga + tov) * 48.0 / minutes ELSE 0 END as pace,
             
             -- Offensive Rating (points per 100 possessions)
-            CASE WHEN GREATEST(1, COALESCE(SUM(CASE WHEN p.event_type IN ('SHOT_MADE', 'SHOT_MISSED') AND p.shot_value IN (2,3) THEN 1 ELSE 0 END), 0) + 
-                                 COALESCE(SUM(CASE WHEN p.event_type = 'TURNOVER' THEN 1 ELSE 0 END), 0)) > 0 THEN
-                (COALESCE(SUM(CASE 
-                    WHEN p.event_type = 'SHOT_MADE' AND p.shot_value = 1 THEN 1
-                    WHEN p.event_type = 'SHOT_MADE' AND p.shot_value = 2 THEN 2  
-                    WHEN p.event_type = 'SHOT_MADE' AND p.shot_value = 3 THEN 3
-                    WHEN p.event_type = 'FREE_THROW_MADE' THEN 1
-                    ELSE 0
-                END), 0) * 100.0 / GREATEST(1, COALESCE(SUM(CASE WHEN p.event_type IN ('SHOT_MADE', 'SHOT_MISSED') AND p.shot_value IN (2,3) THEN 1 ELSE 0 END), 0) + 
-                                               COALESCE(SUM(CASE WHEN p.event_type = 'TURNOVER' THEN 1 ELSE 0 END), 0)))
-                ELSE 0 
-            END as offensive_rating,
+            points * 100.0 / GREATEST(1, fga + tov) as offensive_rating,
             
-            -- Defensive Rating (opponent points per 100 possessions - placeholder)
+            -- Defensive Rating (opponent points per 100 possessions - set by the pace/efficiency step)
             0 as defensive_rating
-            
-        FROM games g
-        LEFT JOIN pbp_events p ON g.game_id = p.game_id 
-        WHERE {where_clause}
-        GROUP BY g.game_id, g.home_team_id, g.away_team_id, g.duration_minutes,
-                 CASE WHEN p.team_id = g.home_team_id THEN g.home_team_id ELSE g.away_team_id END
-        HAVING CASE WHEN p.team_id = g.home_team_id THEN g.home_team_id ELSE g.away_team_id END IS NOT NULL
+        FROM (
+            SELECT 
+                g.game_id,
+                CASE WHEN p.team_tricode = g.home_team_tricode THEN g.home_team_tricode ELSE g.away_team_tricode END as team_tricode,
+                CASE WHEN p.team_tricode = g.home_team_tricode THEN g.home_team_id ELSE g.away_team_id END as team_id,
+                {minutes} as minutes,
+                
+                -- Points (from scoring events)
+                COALESCE(SUM(CASE 
+                    WHEN p.event_type = 'SHOT_MADE' AND p.shot_value IN (1, 2, 3) THEN p.shot_value
+                    WHEN p.event_type = 'FREE_THROW_MADE' THEN 1
+                    ELSE 0
+                END), 0) as points,
+                
+                -- Field Goals
+                COALESCE(SUM(CASE WHEN p.event_type = 'SHOT_MADE' AND p.shot_value IN (2,3) THEN 1 ELSE 0 END), 0) as fgm,
+                COALESCE(SUM(CASE WHEN p.event_type IN ('SHOT_MADE', 'SHOT_MISSED') AND p.shot_value IN (2,3) THEN 1 ELSE 0 END), 0) as fga,
+                
+                -- Three Pointers  
+                COALESCE(SUM(CASE WHEN p.event_type = 'SHOT_MADE' AND p.shot_value = 3 THEN 1 ELSE 0 END), 0) as fg3m,
+                COALESCE(SUM(CASE WHEN p.event_type IN ('SHOT_MADE', 'SHOT_MISSED') AND p.shot_value = 3 THEN 1 ELSE 0 END), 0) as fg3a,
+                
+                -- Free Throws
+                COALESCE(SUM(CASE WHEN p.event_type = 'FREE_THROW_MADE' THEN 1 ELSE 0 END), 0) as ftm,
+                COALESCE(SUM(CASE WHEN p.event_type IN ('FREE_THROW_MADE', 'FREE_THROW_MISSED') THEN 1 ELSE 0 END), 0) as fta,
+                
+                -- Rebounds (the rebound subtype says which side of the floor)
+                COALESCE(SUM(CASE WHEN p.event_type = 'REBOUND' AND p.event_subtype = 'OFFENSIVE' THEN 1 ELSE 0 END), 0) as oreb,
+                COALESCE(SUM(CASE WHEN p.event_type = 'REBOUND' AND p.event_subtype = 'DEFENSIVE' THEN 1 ELSE 0 END), 0) as dreb,
+                
+                -- Other stats
+                COALESCE(SUM(CASE WHEN p.event_type = 'ASSIST' THEN 1 ELSE 0 END), 0) as ast,
+                COALESCE(SUM(CASE WHEN p.event_type = 'STEAL' THEN 1 ELSE 0 END), 0) as stl,
+                COALESCE(SUM(CASE WHEN p.event_type = 'BLOCK' THEN 1 ELSE 0 END), 0) as blk,
+                COALESCE(SUM(CASE WHEN p.event_type = 'TURNOVER' THEN 1 ELSE 0 END), 0) as tov,
+                COALESCE(SUM(CASE WHEN p.event_type = 'FOUL' THEN 1 ELSE 0 END), 0) as pf
+            FROM games g
+            LEFT JOIN pbp_events p ON g.game_id = p.game_id 
+            WHERE {where_clause}
+            GROUP BY 1, 2, 3, 4
+        ) team_events
         
-        ON CONFLICT (game_id, team_id) DO UPDATE SET
+        ON CONFLICT (game_id, team_tricode) DO UPDATE SET
+            team_id = EXCLUDED.team_id,
             points = EXCLUDED.points,
-            field_goals_made = EXCLUDED.field_goals_made,
-            field_goals_attempted = EXCLUDED.field_goals_attempted,
-            three_pointers_made = EXCLUDED.three_pointers_made,
-            three_pointers_attempted = EXCLUDED.three_pointers_attempted,
-            free_throws_made = EXCLUDED.free_throws_made,
-            free_throws_attempted = EXCLUDED.free_throws_attempted,
-            offensive_rebounds = EXCLUDED.offensive_rebounds,
-            defensive_rebounds = EXCLUDED.defensive_rebounds,
-            assists = EXCLUDED.assists,
-            turnovers = EXCLUDED.turnovers,
-            steals = EXCLUDED.steals,
-            blocks = EXCLUDED.blocks,
-            personal_fouls = EXCLUDED.personal_fouls,
+            fgm = EXCLUDED.fgm,
+            fga = EXCLUDED.fga,
+            fg3m = EXCLUDED.fg3m,
+            fg3a = EXCLUDED.fg3a,
+            ftm = EXCLUDED.ftm,
+            fta = EXCLUDED.fta,
+            oreb = EXCLUDED.oreb,
+            dreb = EXCLUDED.dreb,
+            reb = EXCLUDED.reb,
+            ast = EXCLUDED.ast,
+            stl = EXCLUDED.stl,
+            blk = EXCLUDED.blk,
+            tov = EXCLUDED.tov,
+            pf = EXCLUDED.pf,
             possessions_estimated = EXCLUDED.possessions_estimated,
             pace = EXCLUDED.pace,
             offensive_rating = EXCLUDED.offensive_rating,
             updated_at = CURRENT_TIMESTAMP
-        """.format(where_clause=where_clause)
+        """.format(where_clause=where_clause, minutes=GAME_MINUTES_SQL)
         
         await conn.execute(upsert_query, *params)
-        logger.info("Team game stats computed")
+        logger.info("Team game stats computed", engine="sql")
+    
+    async def _compute_tracked_possessions(self, conn, where_clause: str, params: List):
+        """Refine possessions, pace and offensive rating from the possession engine.
+        
+        Games are read ``batch_size`` at a time; each batch's events are
+        annotated once and the per-team counts written back in one statement.
+        """
+        game_rows = await conn.fetch(
+            f"SELECT g.game_id FROM games g WHERE {where_clause} ORDER BY g.game_id", *params
+        )
+        game_ids = [row["game_id"] for row in game_rows]
+        
+        for start in range(0, len(game_ids), self.batch_size):
+            batch = game_ids[start:start + self.batch_size]
+            rows = [dict(row) for row in await conn.fetch(TRACKED_EVENTS_QUERY, batch)]
+            if not rows:
+                continue
+            
+            clocks = parse_clocks([row["time_remaining"] for row in rows], [row["period"] for row in rows])
+            for row, clock_ms in zip(rows, clocks.clock_ms_remaining.tolist()):
+                row["clock_ms_remaining"] = clock_ms if clock_ms >= 0 else None
+            frame = annotate_possessions(PbpFrame.from_rows(rows))
+            
+            # Regulation plus five minutes per overtime period
+            last_period = {game_id: int(part.period.max()) for game_id, part in frame.split_games()}
+            counts = possessions_by_team(frame)
+            keys = list(counts)
+            await conn.execute(
+                TRACKED_POSSESSIONS_UPDATE,
+                [game_id for game_id, _ in keys],
+                [team for _, team in keys],
+                [counts[key] for key in keys],
+                [48.0 + 5.0 * max(0, last_period[game_id] - 4) for game_id, _ in keys],
+            )
+        
+        logger.info("Tracked possessions computed", games=len(game_ids))
     
     async def _compute_team_advanced_metrics(self, conn, where_clause: str, params: List):
         """Compute advanced team metrics like effective field goal percentage, true shooting, etc."""
@@ -294,29 +719,28 @@ class AnalyticsPipeline:
         update_query = """
         UPDATE team_game_stats 
         SET 
+            fg_pct = CASE WHEN fga > 0 THEN fgm::NUMERIC / fga END,
+            fg3_pct = CASE WHEN fg3a > 0 THEN fg3m::NUMERIC / fg3a END,
+            ft_pct = CASE WHEN fta > 0 THEN ftm::NUMERIC / fta END,
+            
             effective_fg_pct = CASE 
-                WHEN field_goals_attempted > 0 THEN 
-                    (field_goals_made + 0.5 * three_pointers_made) / field_goals_attempted 
+                WHEN fga > 0 THEN (fgm + 0.5 * fg3m) / fga 
                 ELSE 0 
             END,
             
             true_shooting_pct = CASE 
-                WHEN (field_goals_attempted + 0.44 * free_throws_attempted) > 0 THEN 
-                    points / (2 * (field_goals_attempted + 0.44 * free_throws_attempted))
+                WHEN (fga + 0.44 * fta) > 0 THEN 
+                    points / (2 * (fga + 0.44 * fta))
                 ELSE 0 
             END,
             
-            assist_turnover_ratio = CASE 
-                WHEN turnovers > 0 THEN assists::FLOAT / turnovers 
-                ELSE assists 
-            END,
-            
-            rebound_pct_estimated = CASE 
-                WHEN (offensive_rebounds + defensive_rebounds) > 0 THEN 
-                    (offensive_rebounds + defensive_rebounds)::FLOAT / 
-                    GREATEST(1, (offensive_rebounds + defensive_rebounds) * 2)  -- Rough estimate
+            -- Four factors (orb_pct needs the opponent's rebounds and stays unset here)
+            efg_pct = CASE WHEN fga > 0 THEN (fgm + 0.5 * fg3m) / fga ELSE 0 END,
+            tov_rate = CASE 
+                WHEN (fga + 0.44 * fta + tov) > 0 THEN tov / (fga + 0.44 * fta + tov)
                 ELSE 0 
-            END
+            END,
+            ft_rate = CASE WHEN fga > 0 THEN fta::NUMERIC / fga ELSE 0 END
             
         WHERE EXISTS (
             SELECT 1 FROM games g 
@@ -328,19 +752,35 @@ class AnalyticsPipeline:
         await conn.execute(update_query, *params)
         logger.info("Team advanced metrics computed")
     
-    async def _compute_team_pace_efficiency(self, conn, where_clause: str, params: List):
-        """Compute team pace and efficiency ratings."""
+    async def _compute_team_pace_efficiency(
+        self,
+        conn,
+        where_clause: str,
+        params: List,
+        game_ids: Optional[List[str]] = None,
+        before: Optional[Dict[str, Tuple[float, ...]]] = None
+    ):
+        """Compute team pace and efficiency ratings.
         
-        # First update defensive ratings using opponent data
+        ``game_ids`` are the games matched by ``where_clause`` (looked up when
+        omitted). ``before`` holds their season sums before this run; when
+        given, the season aggregates are rolled forward by the difference,
+        otherwise the seasons of ``game_ids`` are rebuilt.
+        """
+        if game_ids is None:
+            game_rows = await conn.fetch(f"SELECT g.game_id FROM games g WHERE {where_clause}", *params)
+            game_ids = [row["game_id"] for row in game_rows]
+        
+        # First update defensive ratings using opponent data (teams keyed by tricode, as everywhere here)
         defensive_rating_query = """
         WITH opponent_stats AS (
             SELECT 
                 tgs1.game_id,
-                tgs1.team_id,
+                tgs1.team_tricode,
                 tgs2.points as opp_points,
                 tgs2.possessions_estimated as opp_possessions
             FROM team_game_stats tgs1
-            JOIN team_game_stats tgs2 ON tgs1.game_id = tgs2.game_id AND tgs1.team_id != tgs2.team_id
+            JOIN team_game_stats tgs2 ON tgs1.game_id = tgs2.game_id AND tgs1.team_tricode != tgs2.team_tricode
             WHERE EXISTS (
                 SELECT 1 FROM games g 
                 WHERE g.game_id = tgs1.game_id AND {where_clause}
@@ -353,26 +793,26 @@ class AnalyticsPipeline:
         END
         FROM opponent_stats os
         WHERE team_game_stats.game_id = os.game_id 
-        AND team_game_stats.team_id = os.team_id
+        AND team_game_stats.team_tricode = os.team_tricode
         """.format(where_clause=where_clause)
         
         await conn.execute(defensive_rating_query, *params)
         
-        # Compute league-relative efficiency metrics
+        await self._roll_season_aggregates(conn, game_ids, before)
+        
+        # Compute league-relative efficiency metrics against the season aggregates
         efficiency_query = """
         WITH league_averages AS (
             SELECT 
-                AVG(offensive_rating) as avg_off_rating,
-                AVG(defensive_rating) as avg_def_rating,
-                AVG(pace) as avg_pace,
-                STDDEV(offensive_rating) as std_off_rating,
-                STDDEV(defensive_rating) as std_def_rating,
-                STDDEV(pace) as std_pace
-            FROM team_game_stats tgs
-            WHERE EXISTS (
-                SELECT 1 FROM games g 
-                WHERE g.game_id = tgs.game_id AND {where_clause}
-            )
+                season,
+                off_rating_sum / team_games as avg_off_rating,
+                def_rating_sum / team_games as avg_def_rating,
+                pace_sum / team_games as avg_pace,
+                {std_off_rating} as std_off_rating,
+                {std_def_rating} as std_def_rating,
+                {std_pace} as std_pace
+            FROM team_season_aggregates
+            WHERE team_games > 0
         )
         UPDATE team_game_stats 
         SET 
@@ -395,34 +835,114 @@ class AnalyticsPipeline:
             
             updated_at = CURRENT_TIMESTAMP
             
-        FROM league_averages la
-        WHERE EXISTS (
-            SELECT 1 FROM games g 
-            WHERE g.game_id = team_game_stats.game_id AND {where_clause}
+        FROM games g
+        JOIN league_averages la ON la.season = g.season
+        WHERE g.game_id = team_game_stats.game_id AND {where_clause}
+        """.format(
+            where_clause=where_clause,
+            # Sample standard deviation (as STDDEV) from count, sum and sum of squares
+            **{
+                f"std_{metric}": (
+                    f"CASE WHEN team_games > 1 THEN SQRT(GREATEST(0, "
+                    f"({metric}_sumsq - {metric}_sum * {metric}_sum / team_games) / (team_games - 1))) "
+                    f"ELSE 0 END"
+                )
+                for metric in ("off_rating", "def_rating", "pace")
+            },
         )
-        """.format(where_clause=where_clause)
         
         await conn.execute(efficiency_query, *params)
         
         logger.info("Team pace and efficiency metrics computed with league-relative z-scores")
     
-    async def _compute_player_usage_rates(self, conn, where_clause: str, params: List, player_ids: Optional[List[int]]):
-        """Compute player usage rates and involvement metrics."""
+    async def _season_contributions(self, conn, game_ids: List[str]) -> Dict[str, Tuple[float, ...]]:
+        """Per-season sums (``SEASON_AGGREGATE_COLUMNS``) of the games' team rows."""
+        rows = await conn.fetch(SEASON_CONTRIBUTIONS_QUERY, game_ids)
+        return {
+            row["season"]: tuple(float(row[column] or 0) for column in SEASON_AGGREGATE_COLUMNS)
+            for row in rows
+        }
+    
+    async def _roll_season_aggregates(
+        self,
+        conn,
+        game_ids: List[str],
+        before: Optional[Dict[str, Tuple[float, ...]]]
+    ) -> None:
+        """Bring the season aggregates up to date with the games just computed.
+        
+        Seasons already aggregated get ``after - before`` added; seasons
+        without aggregates yet (or every season, without ``before``) are
+        rebuilt from their team game rows.
+        """
+        after = await self._season_contributions(conn, game_ids)
+        seasons = sorted(set(after) | set(before or {}))
+        if not seasons:
+            return
         
-        # Player usage rate = (Player possessions used) / (Team possessions while player on court)
-        # This requires lineup data to determine when players were on court
+        if before is None:
+            known: Set[str] = set()
+        else:
+            known = {row["season"] for row in await conn.fetch(SEASON_AGGREGATES_SEASONS_QUERY, seasons)}
         
-        logger.info("Player usage rates computed")
-    
-    async def _compute_player_efficiency_metrics(self, conn, where_clause: str, params: List, player_ids: Optional[List[int]]):
-        """Compute player efficiency metrics like PER, win shares, etc."""
+        rebuild = [season for season in seasons if season not in known]
+        if rebuild:
+            await conn.execute(SEASON_AGGREGATES_REBUILD, rebuild)
         
-        logger.info("Player efficiency metrics computed")
+        zero = (0.0,) * len(SEASON_AGGREGATE_COLUMNS)
+        deltas = {
+            season: [a - b for a, b in zip(after.get(season, zero), before.get(season, zero))]
+            for season in seasons if season in known
+        }
+        if deltas:
+            keys = list(deltas)
+            columns = [[deltas[season][i] for season in keys] for i in range(len(SEASON_AGGREGATE_COLUMNS))]
+            columns[0] = [int(value) for value in columns[0]]  # team_games
+            await conn.execute(SEASON_AGGREGATES_ADD, keys, *columns)
+        
+        logger.info("Season aggregates updated", rolled_forward=len(deltas), rebuilt=len(rebuild))
     
-    async def _compute_player_plus_minus(self, conn, where_clause: str, params: List, player_ids: Optional[List[int]]):
-        """Compute player plus/minus metrics."""
+    async def _compute_player_impact(
+        self,
+        conn,
+        where_clause: str,
+        params: List,
+        player_ids: Optional[List[int]]
+    ) -> List[Dict[str, Any]]:
+        """Per-game player usage, true shooting and on/off plus/minus; returns season rows.
         
-        logger.info("Player plus/minus metrics computed")
+        Games are read ``batch_size`` at a time, so memory holds one batch of
+        events plus a row of season sums per player. Each batch's per-game rows
+        are written to player_game_impact before the next is read.
+        """
+        game_rows = await conn.fetch(
+            f"SELECT g.game_id FROM games g WHERE {where_clause} ORDER BY g.game_id", *params
+        )
+        game_ids = [row["game_id"] for row in game_rows]
+        accumulator = PlayerImpactAccumulator(player_ids)
+        written = 0
+        
+        for start in range(0, len(game_ids), self.batch_size):
+            batch = game_ids[start:start + self.batch_size]
+            rows = [dict(row) for row in await conn.fetch(PLAYER_EVENTS_QUERY, batch)]
+            if not rows:
+                continue
+            
+            clocks = parse_clocks([row["time_remaining"] for row in rows], [row["period"] for row in rows])
+            for row, clock_ms in zip(rows, clocks.clock_ms_remaining.tolist()):
+                row["clock_ms_remaining"] = clock_ms if clock_ms >= 0 else None
+            stint_players = {
+                (row["game_id"], row["period"], row["team_tricode"]): row["player_ids"]
+                for row in await conn.fetch(LINEUP_PLAYERS_QUERY, batch)
+            }
+            
+            impact_rows = accumulator.add_frame(PbpFrame.from_rows(rows), stint_players)
+            await upsert_rows(conn, PLAYER_GAME_IMPACT_SPEC, impact_rows)
+            written += len(impact_rows)
+        
+        logger.info("Player impact computed", games=len(game_ids), rows=written,
+                   players=len(accumulator.keys))
+        return accumulator.rows()
     
     async def compute_matchup_analytics(
         self,
@@ -435,42 +955,13 @@ class AnalyticsPipeline:
         
         try:
             conn = await get_connection()
-            
-            # Build conditions for head-to-head games
-            where_conditions = [
-                "g.status = 'FINAL'",
-                "((g.home_team_id = $1 AND g.away_team_id = $2) OR (g.home_team_id = $2 AND g.away_team_id = $1))"
-            ]
-            params = [team1_id, team2_id]
-            
-            if season:
-                where_conditions.append(f"g.season = ${len(params) + 1}")
-                params.append(season)
-            
-            where_clause = " AND ".join(where_conditions)
-            
-            # Add ordering and limit for recent games
-            order_limit = "ORDER BY g.game_date DESC"
+            teams = (str(team1_id), str(team2_id))
+
+            # One summary row per season; the last N games come from the per-game results
             if last_n_games:
-                order_limit += f" LIMIT ${len(params) + 1}"
-                params.append(last_n_games)
-            
-            # Get head-to-head record
-            h2h_query = f"""
-            SELECT 
-                COUNT(*) as total_games,
-                COUNT(CASE WHEN 
-                    (g.home_team_id = $1 AND g.home_score > g.away_score) OR 
-                    (g.away_team_id = $1 AND g.away_score > g.home_score) 
-                THEN 1 END) as team1_wins,
-                AVG(CASE WHEN g.home_team_id = $1 THEN g.home_score ELSE g.away_score END) as team1_avg_points,
-                AVG(CASE WHEN g.home_team_id = $2 THEN g.home_score ELSE g.away_score END) as team2_avg_points,
-                AVG(ABS(g.home_score - g.away_score)) as avg_margin
-            FROM games g 
-            WHERE {where_clause}
-            """
-            
-            h2h_row = await conn.fetchrow(h2h_query, *params[:2] + ([season] if season else []))
+                h2h_row = await conn.fetchrow(MATCHUP_RECENT_QUERY, *teams, season, last_n_games)
+            else:
+                h2h_row = await conn.fetchrow(MATCHUP_SUMMARY_QUERY, *teams, season)
             
             return {
                 'team1_id': team1_id,
@@ -479,7 +970,7 @@ class AnalyticsPipeline:
                 'head_to_head': {
                     'total_games': h2h_row['total_games'] if h2h_row else 0,
                     'team1_wins': h2h_row['team1_wins'] if h2h_row else 0,
-                    'team2_wins': (h2h_row['total_games'] - h2h_row['team1_wins']) if h2h_row else 0,
+                    'team2_wins': h2h_row['team2_wins'] if h2h_row else 0,
                     'team1_avg_points': float(h2h_row['team1_avg_points']) if h2h_row and h2h_row['team1_avg_points'] else 0,
                     'team2_avg_points': float(h2h_row['team2_avg_points']) if h2h_row and h2h_row['team2_avg_points'] else 0,
                     'avg_margin': float(h2h_row['avg_margin']) if h2h_row and h2h_row['avg_margin'] else 0,
@@ -1,19 +1,94 @@
 """Pipeline for deriving analytics tables from raw NBA data with source awareness."""
 
 import asyncio
-from datetime import datetime, date, UTC
-from typing import List, Optional, Dict, Any, Set
-from dataclasses import dataclass
+import time
+from collections import defaultdict
+from datetime import datetime, date, timedelta, UTC
+from typing import List, Optional, Dict, Any, Set, Tuple
+from dataclasses import dataclass, field
 
+from ..config import get_settings
+from ..features import FeatureMatrix, FeatureStore, fetch_feature_rows
+from ..models.derived_rows import ScheduleTravelRow
+from ..models.game_rows import GameRow
+from ..models.pbp_frame import PbpFrame
+from ..transformers.possessions import ensure_possessions
 from ..transformers.q1_window import Q1WindowTransformer
 from ..transformers.early_shocks import EarlyShocksTransformer
 from ..transformers.schedule_travel import ScheduleTravelTransformer
 from ..loaders.derived import DerivedLoader
+from .analytics_dag import NODE_SKIPPED, AnalyticsDag, DagRunReport
 from ..nba_logging import get_logger
-from ..db import get_connection
+from ..db import pooled_connection
+from ..state.game_state import (
+    STATUS_FAILED,
+    STATUS_OK,
+    GameStageState,
+    fetch_stage_states,
+    fingerprint,
+    save_stage_states,
+    stage_needs_work,
+)
 
 logger = get_logger(__name__)
 
+# Per-game analytics run by the fused executor: records_updated key and loader method
+FUSED_ANALYTICS: Dict[str, Tuple[str, str]] = {
+    'q1_window': ('q1_window_12_8', 'upsert_q1_windows'),
+    'early_shocks': ('early_shocks', 'upsert_early_shocks'),
+    'schedule_travel': ('schedule_travel', 'upsert_schedule_travel'),
+}
+
+ANALYTIC_SOURCE_URLS = {analytic: f'nba_scraper://{analytic}' for analytic in FUSED_ANALYTICS}
+
+# Schedule loaded before the range so rest days and 5-in-7 windows see earlier games
+SCHEDULE_LOOKBACK_DAYS = 14
+
+_PBP_COLUMNS = """
+    p.game_id, p.period, p.event_idx, p.seconds_elapsed, p.event_type,
+    p.description, p.team_tricode,
+    p.player1_name_slug, p.player2_name_slug, p.player3_name_slug,
+    p.player1_id, p.player2_id, p.player3_id,
+    p.shot_made, p.shot_value, p.shot_x, p.shot_y, p.shot_distance_ft,
+    p.is_transition, p.is_early_clock
+"""
+
+# First-period events of each game
+Q1_EVENTS_QUERY = f"""
+SELECT {_PBP_COLUMNS}
+FROM pbp_events p
+WHERE p.game_id = ANY($1::text[])
+  AND p.period = 1
+ORDER BY p.game_id, p.event_idx
+"""
+
+# First-period events of each game up to its last event inside the Q1 window
+Q1_WINDOW_EVENTS_QUERY = f"""
+WITH window_end AS (
+    SELECT game_id, MAX(event_idx) AS last_event_idx
+    FROM pbp_events
+    WHERE game_id = ANY($1::text[])
+      AND period = 1
+      AND seconds_elapsed <= $2::float8
+    GROUP BY game_id
+)
+SELECT {_PBP_COLUMNS}
+FROM pbp_events p
+JOIN window_end w ON w.game_id = p.game_id
+WHERE p.period = 1
+  AND p.event_idx <= w.last_event_idx
+ORDER BY p.game_id, p.event_idx
+"""
+
+SCHEDULE_QUERY = """
+SELECT game_id, season, game_date_utc, game_date_local, arena_tz,
+       home_team_tricode, away_team_tricode, source, source_url
+FROM games
+WHERE game_date_local >= $1
+  AND game_date_local <= $2
+ORDER BY game_date_utc, game_id
+"""
+
 
 @dataclass
 class DerivePipelineResult:
@@ -26,6 +101,17 @@ class DerivePipelineResult:
     success: bool = False
     error: Optional[str] = None
     duration_seconds: Optional[float] = None
+    cpu_seconds: Dict[str, float] = field(default_factory=dict)  # per analytic, plus shared 'inputs'
+    dag_report: Optional[DagRunReport] = None  # per-analytic timings and critical path
+    games_derived: Set[str] = field(default_factory=set)  # games with rows written this run
+
+
+@dataclass
+class DeriveInputs:
+    """Inputs of one derive batch, each loaded once and shared by every analytic."""
+    game_ids: List[str]
+    pbp: Optional[PbpFrame] = None  # first-period events, possession-annotated
+    travel: Optional[Dict[str, List[ScheduleTravelRow]]] = None  # travel rows by game_id
 
 
 class AnalyticsRegistry:
@@ -36,31 +122,64 @@ class AnalyticsRegistry:
         """Return analytics and their data source dependencies."""
         return {
             'q1_window': {
+                'version': '1',  # Bump to re-derive every game once
                 'required_sources': ['nba_stats'],  # Needs PBP data
                 'required_data_types': {'pbp_events', 'games'},
                 'fallback_sources': [],  # No fallback for PBP analytics
+                'depends_on': [],  # Derived tables read before this one
                 'description': 'Q1 12:00-8:00 window analytics requiring play-by-play data'
             },
             'early_shocks': {
+                'version': '1',  # Bump to re-derive every game once
                 'required_sources': ['nba_stats'],  # Needs PBP data
                 'required_data_types': {'pbp_events', 'games'},
                 'fallback_sources': [],  # No fallback for PBP analytics
+                'depends_on': [],
                 'description': 'Early game disruption events requiring play-by-play data'
             },
             'schedule_travel': {
+                'version': '1',  # Bump to re-derive every game once
                 'required_sources': ['bref', 'nba_stats'],  # Can use either
                 'required_data_types': {'games'},
                 'fallback_sources': ['gamebooks'],  # Basic game data
+                'depends_on': [],
                 'description': 'Schedule and travel analytics using basic game data'
             },
             'outcomes': {
                 'required_sources': ['bref'],  # B-Ref preferred for accuracy
                 'required_data_types': {'games'},
                 'fallback_sources': ['nba_stats', 'gamebooks'],
+                'depends_on': [],
                 'description': 'Game outcomes with B-Ref as preferred source'
             }
         }
     
+    @staticmethod
+    def get_analytic_version(analytic: str) -> Optional[str]:
+        """Return the code version of a per-game analytic (None if untracked)."""
+        return AnalyticsRegistry.get_analytics_dependencies().get(analytic, {}).get('version')
+    
+    @staticmethod
+    def get_analytics_dag() -> AnalyticsDag:
+        """Return the analytics dependency graph."""
+        return AnalyticsDag({
+            analytic: deps.get('depends_on', [])
+            for analytic, deps in AnalyticsRegistry.get_analytics_dependencies().items()
+        })
+    
+    @staticmethod
+    def get_downstream_analytics(changed_sources: Set[str]) -> Set[str]:
+        """Return analytics reading any changed source or data type, plus their dependents."""
+        dependencies = AnalyticsRegistry.get_analytics_dependencies()
+        direct = [
+            analytic for analytic, deps in dependencies.items()
+            if changed_sources & (
+                set(deps['required_sources']) | set(deps.get('fallback_sources', []))
+                | set(deps['required_data_types'])
+            )
+        ]
+        return AnalyticsRegistry.get_analytics_dag().downstream(direct)
+    
     @staticmethod
     def get_processable_analytics(available_sources: Set[str]) -> List[str]:
         """Return analytics that can be processed with available data sources."""
@@ -91,8 +210,18 @@ class AnalyticsRegistry:
 class DerivePipeline:
     """Pipeline for deriving analytics tables from raw NBA data."""
     
-    def __init__(self):
-        """Initialize derive pipeline."""
+    def __init__(self, max_workers: int = 4, feature_store: Optional[FeatureStore] = None):
+        """Initialize derive pipeline.
+        
+        Args:
+            max_workers: Maximum number of independent analytics derived at once
+            feature_store: Feature store refreshed with the games each run derives
+                           (default: FEATURE_STORE_PATH, when set)
+        """
+        self.max_workers = max_workers
+        if feature_store is None and get_settings().FEATURE_STORE_PATH:
+            feature_store = FeatureStore(get_settings().FEATURE_STORE_PATH)
+        self.feature_store = feature_store
         self.q1_transformer = Q1WindowTransformer()
         self.early_shocks_transformer = EarlyShocksTransformer()
         self.schedule_travel_transformer = ScheduleTravelTransformer()
@@ -106,7 +235,8 @@ class DerivePipeline:
         tables: Optional[List[str]] = None,
         force: bool = False,
         dry_run: bool = False,
-        available_sources: Optional[Set[str]] = None
+        available_sources: Optional[Set[str]] = None,
+        changed_sources: Optional[Set[str]] = None
     ) -> DerivePipelineResult:
         """Derive analytics with source availability awareness.
         
@@ -118,6 +248,12 @@ class DerivePipeline:
             dry_run: Don't actually write to database
             available_sources: Set of data sources that have been processed
                              If None, assumes all sources are available
+            changed_sources: Sources or data types that changed (e.g. {'pbp_events'});
+                             only analytics downstream of them are re-derived
+        
+        Analytics run as a dependency DAG: independent analytics run
+        concurrently (up to ``max_workers``) and a dependent starts once
+        everything it reads has been committed.
         """
         start_time = datetime.now(UTC)
         
@@ -140,6 +276,10 @@ class DerivePipeline:
                              unprocessable=unprocessable,
                              available_sources=available_sources)
         
+        if changed_sources is not None:
+            downstream = self.analytics_registry.get_downstream_analytics(changed_sources)
+            tables_to_process = [t for t in tables_to_process if t in downstream]
+        
         result = DerivePipelineResult(
             start_date=start_date,
             end_date=end_date,
@@ -158,36 +298,34 @@ class DerivePipeline:
                        force=force,
                        dry_run=dry_run)
             
-            # Process each table
-            for table in tables_to_process:
+            # Independent per-game analytics share one pass over the games and
+            # their inputs; every other analytic is its own DAG node
+            dag = self.analytics_registry.get_analytics_dag()
+            fused = [t for t in tables_to_process if t in FUSED_ANALYTICS]
+            shared = [t for t in fused if not any(t in dag.downstream([u]) - {u} for u in fused)]
+            
+            async def run_unit(analytics: Tuple[str, ...]) -> Set[str]:
+                return await self._derive_unit(list(analytics), start_date, end_date, force, dry_run, result)
+            
+            result.dag_report = await dag.run(
+                run_unit,
+                nodes=tables_to_process,
+                groups=[shared],
+                max_workers=self.max_workers,
+            )
+            for table in result.dag_report.with_status(NODE_SKIPPED):
+                result.tables_failed.append(table)
+            
+            logger.info("Analytics critical path", **result.dag_report.summary())
+            
+            if self.feature_store is not None and result.games_derived and not dry_run:
                 try:
-                    if table == 'q1_window':
-                        count = await self._derive_q1_window(start_date, end_date, force, dry_run)
-                        result.records_updated['q1_window_12_8'] = count
-                        result.tables_processed.append(table)
-                        
-                    elif table == 'early_shocks':
-                        count = await self._derive_early_shocks(start_date, end_date, force, dry_run)
-                        result.records_updated['early_shocks'] = count
-                        result.tables_processed.append(table)
-                        
-                    elif table == 'schedule_travel':
-                        count = await self._derive_schedule_travel(start_date, end_date, force, dry_run)
-                        result.records_updated['schedule_travel'] = count
-                        result.tables_processed.append(table)
-                        
-                    elif table == 'outcomes':
-                        count = await self._derive_outcomes(start_date, end_date, force, dry_run)
-                        result.records_updated['outcomes'] = count
-                        result.tables_processed.append(table)
-                        
-                    else:
-                        logger.warning("Unknown table for derivation", table=table)
-                        result.tables_failed.append(table)
-                        
+                    result.records_updated['features'] = await self._refresh_features(
+                        sorted(result.games_derived)
+                    )
                 except Exception as e:
-                    logger.error("Failed to derive table", table=table, error=str(e))
-                    result.tables_failed.append(table)
+                    logger.error("Failed to refresh feature store", error=str(e))
+                    result.tables_failed.append('features')
             
             result.success = len(result.tables_processed) > 0
             result.duration_seconds = (datetime.now(UTC) - start_time).total_seconds()
@@ -196,7 +334,8 @@ class DerivePipeline:
                        tables_processed=len(result.tables_processed),
                        tables_failed=len(result.tables_failed),
                        total_records=sum(result.records_updated.values()),
-                       duration=result.duration_seconds)
+                       duration=result.duration_seconds,
+                       cpu_seconds=result.cpu_seconds)
             
         except Exception as e:
             result.error = str(e)
@@ -205,32 +344,71 @@ class DerivePipeline:
         
         return result
     
+    async def _derive_unit(
+        self,
+        analytics: List[str],
+        start_date: date,
+        end_date: date,
+        force: bool,
+        dry_run: bool,
+        result: DerivePipelineResult
+    ) -> Set[str]:
+        """Derive one DAG unit and return the analytics that failed."""
+        fused = [a for a in analytics if a in FUSED_ANALYTICS]
+        if fused:
+            try:
+                await self._derive_fused(fused, start_date, end_date, force, dry_run, result)
+            except Exception as e:
+                logger.error("Failed to derive tables", tables=fused, error=str(e))
+                result.tables_failed.extend(t for t in fused if t not in result.tables_failed)
+        
+        for table in analytics:
+            if table in FUSED_ANALYTICS:
+                continue
+            try:
+                if table == 'outcomes':
+                    count = await self._derive_outcomes(start_date, end_date, force, dry_run)
+                    result.records_updated['outcomes'] = count
+                    result.tables_processed.append(table)
+                    if count and not dry_run:
+                        games = await self._get_games_in_range(start_date, end_date, force=False)
+                        result.games_derived.update(game['game_id'] for game in games)
+                    
+                else:
+                    logger.warning("Unknown table for derivation", table=table)
+                    result.tables_failed.append(table)
+                    
+            except Exception as e:
+                logger.error("Failed to derive table", table=table, error=str(e))
+                result.tables_failed.append(table)
+        
+        return {table for table in analytics if table in result.tables_failed}
+    
     async def _detect_available_sources(self, start_date: date, end_date: date) -> Set[str]:
         """Detect which data sources have data for the given date range."""
         try:
-            conn = await get_connection()
-            
             # Check which sources have game data
             available_sources = set()
             
-            sources_query = """
-                SELECT DISTINCT source 
-                FROM games 
-                WHERE game_date_local >= $1 AND game_date_local <= $2
-            """
-            rows = await conn.fetch(sources_query, start_date, end_date)
-            game_sources = {row['source'] for row in rows}
-            
-            # Check for PBP data (NBA Stats specialty)
-            pbp_query = """
-                SELECT COUNT(*) as count 
-                FROM pbp_events p
-                JOIN games g ON p.game_id = g.game_id 
-                WHERE g.game_date_local >= $1 AND g.game_date_local <= $2
-                  AND p.source = 'nba_stats'
-            """
-            pbp_row = await conn.fetchrow(pbp_query, start_date, end_date)
-            has_pbp = pbp_row['count'] > 0
+            async with pooled_connection() as conn:
+                sources_query = """
+                    SELECT DISTINCT source 
+                    FROM games 
+                    WHERE game_date_local >= $1 AND game_date_local <= $2
+                """
+                rows = await conn.fetch(sources_query, start_date, end_date)
+                game_sources = {row['source'] for row in rows}
+            
+                # Check for PBP data (NBA Stats specialty)
+                pbp_query = """
+                    SELECT COUNT(*) as count 
+                    FROM pbp_events p
+                    JOIN games g ON p.game_id = g.game_id 
+                    WHERE g.game_date_local >= $1 AND g.game_date_local <= $2
+                      AND p.source = 'nba_stats'
+                """
+                pbp_row = await conn.fetchrow(pbp_query, start_date, end_date)
+                has_pbp = pbp_row['count'] > 0
             
             # Add sources based on available data
             if 'bref' in game_sources:
@@ -239,7 +417,7 @@ class DerivePipeline:
                 available_sources.add('nba_stats')
             if 'gamebooks' in game_sources:
                 available_sources.add('gamebooks')
-                
+            
             # Only include NBA Stats if we actually have PBP data
             if has_pbp:
                 available_sources.add('nba_stats')
@@ -259,151 +437,192 @@ class DerivePipeline:
             # Return empty set to be safe
             return set()
 
-    async def _derive_q1_window(
+    async def _derive_fused(
         self,
+        analytics: List[str],
         start_date: date,
         end_date: date,
         force: bool,
-        dry_run: bool
-    ) -> int:
-        """Derive Q1 window analytics."""
-        try:
-            # Get games in date range
-            games = await self._get_games_in_range(start_date, end_date, force)
-            
-            if not games:
-                logger.info("No games found for Q1 window derivation",
-                           start_date=start_date, end_date=end_date)
-                return 0
-            
-            logger.info("Deriving Q1 window analytics", game_count=len(games))
-            
-            total_updated = 0
-            
-            # Process games in batches
-            batch_size = 50
-            for i in range(0, len(games), batch_size):
-                batch = games[i:i + batch_size]
+        dry_run: bool,
+        result: DerivePipelineResult
+    ) -> None:
+        """Derive several per-game analytics in one pass over the games.
+        
+        Games are listed once. The schedule and each batch's first-period PBP
+        are loaded once and shared by every analytic that needs them. A
+        batch's analytics run concurrently in worker threads, then each table
+        gets one upsert per batch. Per-game failures go to the derived game
+        state; a table whose upserts fail is reported in ``tables_failed``.
+        """
+        games = await self._get_games_in_range(start_date, end_date, force)
+        
+        pending: Dict[str, Set[str]] = {}
+        fingerprints: Dict[str, Dict[str, str]] = {}
+        for analytic in analytics:
+            planned, fingerprints[analytic] = await self._plan_derived_games(analytic, games, force)
+            pending[analytic] = {game['game_id'] for game in planned}
+        
+        cpu = result.cpu_seconds
+        cpu.setdefault('inputs', 0.0)
+        for analytic in analytics:
+            cpu.setdefault(analytic, 0.0)
+            result.records_updated.setdefault(FUSED_ANALYTICS[analytic][0], 0)
+        
+        game_ids = [game['game_id'] for game in games
+                    if any(game['game_id'] in ids for ids in pending.values())]
+        if not game_ids:
+            logger.info("No games found for derivation", analytics=analytics,
+                       start_date=start_date, end_date=end_date)
+            result.tables_processed.extend(analytics)
+            return
+        
+        logger.info("Deriving analytics", analytics=analytics, game_count=len(game_ids),
+                   pending={analytic: len(ids) for analytic, ids in pending.items()})
+        
+        dependencies = self.analytics_registry.get_analytics_dependencies()
+        pbp_analytics = [a for a in analytics if 'pbp_events' in dependencies[a]['required_data_types']]
+        
+        travel = None
+        if 'schedule_travel' in analytics:
+            travel, cpu['schedule_travel'] = await self._load_travel_rows(start_date, end_date)
+        
+        upsert_failed: Set[str] = set()
+        batch_size = 250
+        for i in range(0, len(game_ids), batch_size):
+            batch = game_ids[i:i + batch_size]
+            batch_pending = {a: [g for g in batch if g in pending[a]] for a in analytics}
+            failed: Dict[str, Dict[str, str]] = {a: {} for a in analytics}
+            inputs = DeriveInputs(game_ids=batch, travel=travel)
+            
+            pbp_ids = [g for g in batch if any(g in pending[a] for a in pbp_analytics)]
+            if pbp_ids:
+                try:
+                    inputs.pbp, seconds = await self._load_pbp_frame(
+                        pbp_ids, window_only='early_shocks' not in pbp_analytics
+                    )
+                    cpu['inputs'] += seconds
+                except Exception as e:
+                    logger.error("Failed to load PBP batch", games=len(pbp_ids), error=str(e))
+                    for a in pbp_analytics:
+                        failed[a] = {g: str(e) for g in batch_pending[a]}
+            
+            runnable = [a for a in analytics if batch_pending[a] and not failed[a]]
+            outcomes = await asyncio.gather(
+                *(asyncio.to_thread(self._run_analytic, a, inputs, batch_pending[a]) for a in runnable),
+                return_exceptions=True,
+            )
+            
+            for analytic, outcome in zip(runnable, outcomes):
+                if isinstance(outcome, BaseException):
+                    failed[analytic] = {g: str(outcome) for g in batch_pending[analytic]}
+                    logger.error("Failed to transform batch", analytic=analytic,
+                               games=len(batch_pending[analytic]), error=str(outcome))
+                    continue
+                rows, seconds = outcome
+                cpu[analytic] += seconds
                 
-                # Transform batch
-                q1_windows = []
-                for game in batch:
+                # Load batch: one upsert per table
+                records_key, upsert = FUSED_ANALYTICS[analytic]
+                if rows and not dry_run:
                     try:
-                        windows = await self.q1_transformer.transform_game_q1_window(game['game_id'])
-                        q1_windows.extend(windows)
+                        result.records_updated[records_key] += await getattr(self.derived_loader, upsert)(rows)
                     except Exception as e:
-                        logger.error("Failed to transform Q1 window",
-                                   game_id=game['game_id'], error=str(e))
-                
-                # Load batch
-                if q1_windows and not dry_run:
-                    batch_updated = await self.derived_loader.upsert_q1_windows(q1_windows)
-                    total_updated += batch_updated
-                elif q1_windows and dry_run:
-                    logger.info("Dry run: would upsert Q1 windows", count=len(q1_windows))
-                    total_updated += len(q1_windows)
+                        upsert_failed.add(analytic)
+                        failed[analytic] = {g: str(e) for g in batch_pending[analytic]}
+                        logger.error("Failed to upsert batch", analytic=analytic, error=str(e))
+                elif rows and dry_run:
+                    logger.info("Dry run: would upsert", analytic=analytic, count=len(rows))
+                    result.records_updated[records_key] += len(rows)
             
-            return total_updated
-            
-        except Exception as e:
-            logger.error("Failed to derive Q1 window analytics", error=str(e))
-            raise
+            if not dry_run:
+                for analytic in analytics:
+                    result.games_derived.update(g for g in batch_pending[analytic] if g not in failed[analytic])
+                    if batch_pending[analytic]:
+                        await self._record_derived_states(
+                            analytic,
+                            [{'game_id': g} for g in batch_pending[analytic]],
+                            failed[analytic],
+                            fingerprints[analytic],
+                        )
+        
+        result.tables_processed.extend(a for a in analytics if a not in upsert_failed)
+        result.tables_failed.extend(a for a in analytics if a in upsert_failed)
     
-    async def _derive_early_shocks(
-        self,
-        start_date: date,
-        end_date: date,
-        force: bool,
-        dry_run: bool
-    ) -> int:
-        """Derive early shocks analytics."""
-        try:
-            games = await self._get_games_in_range(start_date, end_date, force)
-            
-            if not games:
-                logger.info("No games found for early shocks derivation",
-                           start_date=start_date, end_date=end_date)
-                return 0
-            
-            logger.info("Deriving early shocks analytics", game_count=len(games))
-            
-            total_updated = 0
-            batch_size = 50
-            
-            for i in range(0, len(games), batch_size):
-                batch = games[i:i + batch_size]
-                
-                # Transform batch
-                early_shocks = []
-                for game in batch:
-                    try:
-                        shocks = await self.early_shocks_transformer.transform_game_early_shocks(game['game_id'])
-                        early_shocks.extend(shocks)
-                    except Exception as e:
-                        logger.error("Failed to transform early shocks",
-                                   game_id=game['game_id'], error=str(e))
-                
-                # Load batch
-                if early_shocks and not dry_run:
-                    batch_updated = await self.derived_loader.upsert_early_shocks(early_shocks)
-                    total_updated += batch_updated
-                elif early_shocks and dry_run:
-                    logger.info("Dry run: would upsert early shocks", count=len(early_shocks))
-                    total_updated += len(early_shocks)
-            
-            return total_updated
-            
-        except Exception as e:
-            logger.error("Failed to derive early shocks analytics", error=str(e))
-            raise
+    def _run_analytic(
+        self, analytic: str, inputs: DeriveInputs, game_ids: List[str]
+    ) -> Tuple[List[Any], float]:
+        """Rows of one analytic for ``game_ids`` and the thread CPU seconds it took."""
+        start = time.thread_time()
+        if analytic == 'q1_window':
+            rows = self.q1_transformer.transform_batch(
+                inputs.pbp.for_games(game_ids), ANALYTIC_SOURCE_URLS[analytic]
+            )
+        elif analytic == 'early_shocks':
+            rows = self.early_shocks_transformer.transform_batch(
+                inputs.pbp.for_games(game_ids), ANALYTIC_SOURCE_URLS[analytic]
+            )
+        elif analytic == 'schedule_travel':
+            rows = [row for game_id in game_ids for row in inputs.travel.get(game_id, ())]
+        else:
+            raise ValueError(f"Unknown analytic: {analytic}")
+        return rows, time.thread_time() - start
     
-    async def _derive_schedule_travel(
-        self,
-        start_date: date,
-        end_date: date,
-        force: bool,
-        dry_run: bool
-    ) -> int:
-        """Derive schedule travel analytics."""
-        try:
-            games = await self._get_games_in_range(start_date, end_date, force)
-            
-            if not games:
-                logger.info("No games found for schedule travel derivation",
-                           start_date=start_date, end_date=end_date)
-                return 0
-            
-            logger.info("Deriving schedule travel analytics", game_count=len(games))
-            
-            total_updated = 0
-            batch_size = 50
-            
-            for i in range(0, len(games), batch_size):
-                batch = games[i:i + batch_size]
-                
-                # Transform batch
-                travel_rows = []
-                for game in batch:
-                    try:
-                        travel = await self.schedule_travel_transformer.transform_game_travel(game['game_id'])
-                        travel_rows.extend(travel)
-                    except Exception as e:
-                        logger.error("Failed to transform schedule travel",
-                                   game_id=game['game_id'], error=str(e))
-                
-                # Load batch
-                if travel_rows and not dry_run:
-                    batch_updated = await self.derived_loader.upsert_schedule_travel(travel_rows)
-                    total_updated += batch_updated
-                elif travel_rows and dry_run:
-                    logger.info("Dry run: would upsert schedule travel", count=len(travel_rows))
-                    total_updated += len(travel_rows)
-            
-            return total_updated
-            
-        except Exception as e:
-            logger.error("Failed to derive schedule travel analytics", error=str(e))
-            raise
+    async def _load_pbp_frame(self, game_ids: List[str], window_only: bool = False) -> Tuple[PbpFrame, float]:
+        """First-period PBP of many games as one possession-annotated frame.
+        
+        With ``window_only`` each game is cut after its last event inside the
+        Q1 window; possession tracking still sees everything before it.
+        Returns the frame and the CPU seconds spent building it.
+        """
+        async with pooled_connection() as conn:
+            if window_only:
+                rows = await conn.fetch(Q1_WINDOW_EVENTS_QUERY, game_ids, self.q1_transformer.window_end_sec)
+            else:
+                rows = await conn.fetch(Q1_EVENTS_QUERY, game_ids)
+        
+        def build() -> Tuple[PbpFrame, float]:
+            start = time.thread_time()
+            frame = ensure_possessions(PbpFrame.from_rows(rows))
+            return frame, time.thread_time() - start
+        
+        return await asyncio.to_thread(build)
+    
+    async def _refresh_features(self, game_ids: List[str]) -> int:
+        """Rebuild the feature rows of ``game_ids`` and write them to the feature store."""
+        rows = []
+        batch_size = 1000
+        async with pooled_connection() as conn:
+            for i in range(0, len(game_ids), batch_size):
+                rows.extend(await fetch_feature_rows(conn, game_ids[i:i + batch_size]))
+        
+        def write() -> int:
+            return self.feature_store.update(FeatureMatrix.from_rows(rows), game_ids)
+        
+        count = await asyncio.to_thread(write)
+        logger.info("Feature store refreshed", games=len(game_ids), rows=count,
+                   path=str(self.feature_store.path))
+        return count
+    
+    async def _load_travel_rows(
+        self, start_date: date, end_date: date
+    ) -> Tuple[Dict[str, List[ScheduleTravelRow]], float]:
+        """Schedule travel rows for the range, by game_id, and their CPU seconds.
+        
+        The schedule is loaded once (with a lookback before ``start_date``) and
+        derived in one vectorized pass.
+        """
+        async with pooled_connection() as conn:
+            rows = await conn.fetch(
+                SCHEDULE_QUERY, start_date - timedelta(days=SCHEDULE_LOOKBACK_DAYS), end_date
+            )
+        
+        start = time.thread_time()
+        # Stored games were validated on the way in
+        games = [GameRow.model_construct(**dict(row)) for row in rows]
+        by_game: Dict[str, List[ScheduleTravelRow]] = defaultdict(list)
+        for row in self.schedule_travel_transformer.transform(games, ANALYTIC_SOURCE_URLS['schedule_travel']):
+            by_game[row.game_id].append(row)
+        return by_game, time.thread_time() - start
     
     async def _derive_outcomes(
         self,
@@ -414,91 +633,166 @@ class DerivePipeline:
     ) -> int:
         """Derive game outcomes."""
         try:
-            conn = await get_connection()
-            
-            # Query to upsert outcomes from games table
-            if not dry_run:
-                query = """
-                INSERT INTO outcomes (
-                    game_id, q1_home_points, q1_away_points, 
-                    final_home_points, final_away_points, total_points,
-                    home_win, margin, overtime_periods,
-                    source, source_url, ingested_at_utc
-                )
-                SELECT 
-                    g.game_id,
-                    g.q1_home_points,
-                    g.q1_away_points,
-                    g.home_score as final_home_points,
-                    g.away_score as final_away_points,
-                    g.home_score + g.away_score as total_points,
-                    g.home_score > g.away_score as home_win,
-                    ABS(g.home_score - g.away_score) as margin,
-                    COALESCE(g.overtime_periods, 0) as overtime_periods,
-                    'derived_pipeline' as source,
-                    'nba_scraper://outcomes' as source_url,
-                    NOW() as ingested_at_utc
-                FROM games g
-                WHERE g.game_date_local >= $1 
-                  AND g.game_date_local <= $2
-                  AND g.status = 'FINAL'
-                  AND g.home_score IS NOT NULL 
-                  AND g.away_score IS NOT NULL
-                ON CONFLICT (game_id) DO UPDATE SET
-                    q1_home_points = CASE 
-                        WHEN excluded.q1_home_points IS DISTINCT FROM outcomes.q1_home_points 
-                        THEN excluded.q1_home_points ELSE outcomes.q1_home_points END,
-                    q1_away_points = CASE 
-                        WHEN excluded.q1_away_points IS DISTINCT FROM outcomes.q1_away_points 
-                        THEN excluded.q1_away_points ELSE outcomes.q1_away_points END,
-                    final_home_points = excluded.final_home_points,
-                    final_away_points = excluded.final_away_points,
-                    total_points = excluded.total_points,
-                    home_win = excluded.home_win,
-                    margin = excluded.margin,
-                    overtime_periods = excluded.overtime_periods,
-                    source = excluded.source,
-                    source_url = excluded.source_url,
-                    ingested_at_utc = excluded.ingested_at_utc
-                WHERE (
-                    excluded.q1_home_points IS DISTINCT FROM outcomes.q1_home_points OR
-                    excluded.q1_away_points IS DISTINCT FROM outcomes.q1_away_points OR
-                    excluded.final_home_points IS DISTINCT FROM outcomes.final_home_points OR
-                    excluded.final_away_points IS DISTINCT FROM outcomes.final_away_points OR
-                    excluded.overtime_periods IS DISTINCT FROM outcomes.overtime_periods
-                )
-                """
+            async with pooled_connection() as conn:
+                # Query to upsert outcomes from games table
+                if not dry_run:
+                    query = """
+                    INSERT INTO outcomes (
+                        game_id, q1_home_points, q1_away_points, 
+                        final_home_points, final_away_points, total_points,
+                        home_win, margin, overtime_periods,
+                        source, source_url, ingested_at_utc
+                    )
+                    SELECT 
+                        g.game_id,
+                        g.q1_home_points,
+                        g.q1_away_points,
+                        g.home_score as final_home_points,
+                        g.away_score as final_away_points,
+                        g.home_score + g.away_score as total_points,
+                        g.home_score > g.away_score as home_win,
+                        ABS(g.home_score - g.away_score) as margin,
+                        COALESCE(g.overtime_periods, 0) as overtime_periods,
+                        'derived_pipeline' as source,
+                        'nba_scraper://outcomes' as source_url,
+                        NOW() as ingested_at_utc
+                    FROM games g
+                    WHERE g.game_date_local >= $1 
+                      AND g.game_date_local <= $2
+                      AND g.status = 'FINAL'
+                      AND g.home_score IS NOT NULL 
+                      AND g.away_score IS NOT NULL
+                    ON CONFLICT (game_id) DO UPDATE SET
+                        q1_home_points = CASE 
+                            WHEN excluded.q1_home_points IS DISTINCT FROM outcomes.q1_home_points 
+                            THEN excluded.q1_home_points ELSE outcomes.q1_home_points END,
+                        q1_away_points = CASE 
+                            WHEN excluded.q1_away_points IS DISTINCT FROM outcomes.q1_away_points 
+                            THEN excluded.q1_away_points ELSE outcomes.q1_away_points END,
+                        final_home_points = excluded.final_home_points,
+                        final_away_points = excluded.final_away_points,
+                        total_points = excluded.total_points,
+                        home_win = excluded.home_win,
+                        margin = excluded.margin,
+                        overtime_periods = excluded.overtime_periods,
+                        source = excluded.source,
+                        source_url = excluded.source_url,
+                        ingested_at_utc = excluded.ingested_at_utc
+                    WHERE (
+                        excluded.q1_home_points IS DISTINCT FROM outcomes.q1_home_points OR
+                        excluded.q1_away_points IS DISTINCT FROM outcomes.q1_away_points OR
+                        excluded.final_home_points IS DISTINCT FROM outcomes.final_home_points OR
+                        excluded.final_away_points IS DISTINCT FROM outcomes.final_away_points OR
+                        excluded.overtime_periods IS DISTINCT FROM outcomes.overtime_periods
+                    )
+                    """
                 
-                result = await conn.execute(query, start_date, end_date)
+                    result = await conn.execute(query, start_date, end_date)
                 
-                # Extract count from result string like "INSERT 0 5" or "UPDATE 3"
-                if result.startswith('INSERT'):
-                    return int(result.split()[-1])
-                elif result.startswith('UPDATE'):
-                    return int(result.split()[1])
+                    # Extract count from result string like "INSERT 0 5" or "UPDATE 3"
+                    if result.startswith('INSERT'):
+                        return int(result.split()[-1])
+                    elif result.startswith('UPDATE'):
+                        return int(result.split()[1])
+                    else:
+                        return 0
                 else:
-                    return 0
-            else:
-                # Dry run: just count potential updates
-                count_query = """
-                SELECT COUNT(*)
-                FROM games g
-                WHERE g.game_date_local >= $1 
-                  AND g.game_date_local <= $2
-                  AND g.status = 'FINAL'
-                  AND g.home_score IS NOT NULL 
-                  AND g.away_score IS NOT NULL
-                """
+                    # Dry run: just count potential updates
+                    count_query = """
+                    SELECT COUNT(*)
+                    FROM games g
+                    WHERE g.game_date_local >= $1 
+                      AND g.game_date_local <= $2
+                      AND g.status = 'FINAL'
+                      AND g.home_score IS NOT NULL 
+                      AND g.away_score IS NOT NULL
+                    """
                 
-                row = await conn.fetchrow(count_query, start_date, end_date)
-                count = row[0] if row else 0
-                logger.info("Dry run: would upsert outcomes", count=count)
-                return count
+                    row = await conn.fetchrow(count_query, start_date, end_date)
+                    count = row[0] if row else 0
+                    logger.info("Dry run: would upsert outcomes", count=count)
+                    return count
                 
         except Exception as e:
             logger.error("Failed to derive outcomes", error=str(e))
             raise
     
+    async def _plan_derived_games(
+        self,
+        analytic: str,
+        games: List[Dict[str, Any]],
+        force: bool
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """Drop games whose derived state is current for this analytic.
+        
+        A game is re-derived when it has no successful run at the current analytic
+        version or its silver state moved since. Returns the games to derive and
+        their input fingerprints (recorded with the result).
+        """
+        if not games:
+            return games, {}
+        
+        game_ids = [game['game_id'] for game in games]
+        try:
+            async with pooled_connection() as conn:
+                silver = await fetch_stage_states(conn, stage='silver', game_ids=game_ids)
+                derived = {} if force else await fetch_stage_states(
+                    conn, stage=f'derived:{analytic}', game_ids=game_ids
+                )
+        except Exception as e:
+            logger.warning("Game state unavailable, deriving all games",
+                         analytic=analytic, error=str(e))
+            return games, {}
+        
+        fingerprints = {
+            game_id: fingerprint(state.input_sha1, state.version)
+            for game_id, state in silver.items()
+        }
+        if force:
+            return games, fingerprints
+        
+        version = self.analytics_registry.get_analytic_version(analytic)
+        pending = [
+            game for game in games
+            if stage_needs_work(
+                derived.get(game['game_id']),
+                input_sha1=fingerprints.get(game['game_id']),
+                version=version,
+            )
+        ]
+        if len(pending) < len(games):
+            logger.info("Skipping games with current derived state",
+                       analytic=analytic, skipped=len(games) - len(pending), pending=len(pending))
+        return pending, fingerprints
+    
+    async def _record_derived_states(
+        self,
+        analytic: str,
+        batch: List[Dict[str, Any]],
+        failed: Dict[str, str],
+        fingerprints: Dict[str, str]
+    ) -> None:
+        """Record per-game outcomes of a derived batch in one upsert."""
+        version = self.analytics_registry.get_analytic_version(analytic)
+        states = []
+        for game in batch:
+            game_id = game['game_id']
+            error = failed.get(game_id)
+            states.append(GameStageState(
+                game_id=game_id,
+                stage=f'derived:{analytic}',
+                status=STATUS_FAILED if error is not None else STATUS_OK,
+                input_sha1=fingerprints.get(game_id),
+                version=version,
+                last_error=error,
+            ))
+        try:
+            async with pooled_connection() as conn:
+                await save_stage_states(conn, states)
+        except Exception as e:
+            logger.warning("Failed to record derived game state",
+                         analytic=analytic, games=len(states), error=str(e))
+    
     async def _get_games_in_range(
         self,
         start_date: date,
@@ -507,8 +801,6 @@ class DerivePipeline:
     ) -> List[Dict[str, Any]]:
         """Get games in the specified date range."""
         try:
-            conn = await get_connection()
-            
             # Base query for games in range
             query = """
             SELECT game_id, game_date_local, status, season
@@ -523,7 +815,8 @@ class DerivePipeline:
             
             query += " ORDER BY game_date_local, game_id"
             
-            rows = await conn.fetch(query, start_date, end_date)
+            async with pooled_connection() as conn:
+                rows = await conn.fetch(query, start_date, end_date)
             
             games = []
             for row in rows:
@@ -0,0 +1,117 @@
+"""Bulk rebuild of lineup_stints from stored play-by-play.
+
+Reads games ``batch_size`` at a time. Starters come from starting_lineups,
+matched by player id or name slug. Each batch's stints are replaced in one
+transaction, so no lineup endpoint is called.
+"""
+
+import time
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..loaders.lineups import upsert_lineups
+from ..nba_logging import get_logger
+from ..transformers.stints import StintBuilder, player_ids_by_slug
+from ..utils.clock import parse_clocks
+from ..utils.coerce import to_int_or_none
+
+logger = get_logger(__name__)
+
+STINT_GAMES_QUERY = """
+SELECT game_id, home_team_tricode, away_team_tricode, home_team_id, away_team_id
+FROM games
+WHERE game_id = ANY($1::text[])
+"""
+
+# Only what the stint builder reads, in game order
+STINT_EVENTS_QUERY = """
+SELECT game_id, period, event_idx, time_remaining, seconds_elapsed, event_type, team_tricode,
+       description, shot_value, player1_id, player1_name_slug, player2_id, player2_name_slug
+FROM pbp_events
+WHERE game_id = ANY($1::text[])
+ORDER BY game_id, period, event_idx
+"""
+
+STINT_STARTERS_QUERY = """
+SELECT game_id, team_tricode, player_id, player_name_slug
+FROM starting_lineups
+WHERE game_id = ANY($1::text[])
+"""
+
+DELETE_STINTS = "DELETE FROM lineup_stints WHERE game_id = ANY($1::text[])"
+
+
+@dataclass
+class LineupStintsRebuildResult:
+    """Outcome of a lineup_stints rebuild."""
+    games: int = 0
+    stints: int = 0
+    games_skipped: int = 0  # no events or no team ids
+    inferred_subs: int = 0
+    duration_seconds: Optional[float] = None
+
+
+def _game_starters(starters: Sequence[Any], slug_ids: Dict[str, int]) -> Dict[str, List[int]]:
+    by_team: Dict[str, List[int]] = {}
+    for row in starters:
+        player_id = to_int_or_none(row["player_id"])
+        if player_id is None:
+            player_id = slug_ids.get(row["player_name_slug"])
+        if player_id is not None:
+            by_team.setdefault(row["team_tricode"], []).append(player_id)
+    return by_team
+
+
+async def rebuild_lineup_stints(conn, game_ids: Sequence[str], batch_size: int = 50) -> LineupStintsRebuildResult:
+    """Replace the lineup_stints of ``game_ids`` with stints rebuilt from their play-by-play."""
+    start_time = time.perf_counter()
+    result = LineupStintsRebuildResult()
+
+    for start in range(0, len(game_ids), batch_size):
+        batch = list(game_ids[start:start + batch_size])
+        games = {row["game_id"]: row for row in await conn.fetch(STINT_GAMES_QUERY, batch)}
+        events = [dict(row) for row in await conn.fetch(STINT_EVENTS_QUERY, batch)]
+        starters: Dict[str, List[Any]] = {}
+        for row in await conn.fetch(STINT_STARTERS_QUERY, batch):
+            starters.setdefault(row["game_id"], []).append(row)
+
+        clocks = parse_clocks([row["time_remaining"] for row in events], [row["period"] for row in events])
+        for row, clock_ms in zip(events, clocks.clock_ms_remaining.tolist()):
+            row["clock_ms_remaining"] = clock_ms if clock_ms >= 0 else None
+
+        stints = []
+        built = []
+        for game_id, game_events in groupby(events, key=lambda row: row["game_id"]):
+            game = games.get(game_id)
+            team_ids = {
+                game[f"{side}_team_tricode"]: to_int_or_none(game[f"{side}_team_id"])
+                for side in ("home", "away")
+            } if game else {}
+            if not team_ids or None in team_ids.values():
+                result.games_skipped += 1
+                continue
+            game_events = list(game_events)
+            builder = StintBuilder(
+                game_id, team_ids,
+                _game_starters(starters.get(game_id, []), player_ids_by_slug(game_events)),
+            )
+            for event in game_events:
+                builder.add(event)
+            stints.extend(builder.finish())
+            result.inferred_subs += builder.inferred_subs
+            built.append(game_id)
+        result.games_skipped += len(set(batch) - {row["game_id"] for row in events})
+
+        if built:
+            async with conn.transaction():
+                await conn.execute(DELETE_STINTS, built)
+                await upsert_lineups(conn, stints)
+        result.games += len(built)
+        result.stints += len(stints)
+
+    result.duration_seconds = time.perf_counter() - start_time
+    logger.info("Lineup stints rebuilt", games=result.games, stints=result.stints,
+               skipped=result.games_skipped, inferred_subs=result.inferred_subs,
+               duration=result.duration_seconds)
+    return result
@@ -9,6 +9,15 @@ from ..db import get_connection
 from ..nba_logging import get_logger
 from ..io_clients import IoFacade
 from ..rate_limit import RateLimiter
+from ..state.game_state import (
+    STAGE_VERSIONS,
+    STATUS_FAILED,
+    GameStageState,
+    fetch_stage_states,
+    payload_fingerprint,
+    save_stage_states,
+    stage_needs_work,
+)
 
 # Import extractors (IO → Python dicts)
 from ..extractors.boxscore import extract_game_from_boxscore
@@ -20,13 +29,25 @@ from ..extractors.shots import extract_shot_chart_detail
 from ..transformers.games import transform_game
 from ..transformers.pbp import transform_pbp
 from ..transformers.lineups import transform_lineups
-from ..transformers.shots import transform_shots
+from ..transformers.shots import match_shots_to_pbp, shot_distances_ft, transform_shots
 
 # Import loaders
 from ..loaders import upsert_game, upsert_pbp, upsert_lineups, upsert_shots, upsert_adv_metrics
 
 logger = get_logger(__name__)
 
+# Set-based shot coordinate write; rows whose coordinates are already current are skipped.
+_MAP_SHOTS_SQL = """
+    UPDATE pbp_events AS p
+    SET shot_x = s.shot_x, shot_y = s.shot_y, shot_distance_ft = s.shot_distance_ft
+    FROM unnest($1::text[], $2::int[], $3::float8[], $4::float8[], $5::float8[])
+        AS s(game_id, event_num, shot_x, shot_y, shot_distance_ft)
+    WHERE p.game_id = s.game_id
+      AND p.event_num = s.event_num
+      AND (p.shot_x, p.shot_y, p.shot_distance_ft)
+          IS DISTINCT FROM (s.shot_x::numeric, s.shot_y::numeric, s.shot_distance_ft::numeric)
+"""
+
 
 @asynccontextmanager
 async def _maybe_transaction(conn):
@@ -69,6 +90,7 @@ class NBAStatsPipeline:
             Results dictionary with processing statistics
         """
         start_time = dt.now(UTC)
+        conn = None
         
         try:
             # Use provided db connection or get new one
@@ -92,6 +114,11 @@ class NBAStatsPipeline:
             
         except Exception as e:
             logger.error("Game processing failed", game_id=game_id, error=str(e), exc_info=True)
+            if conn is not None:
+                await self._save_game_states(conn, [GameStageState(
+                    game_id=game_id, stage="silver", status=STATUS_FAILED,
+                    version=STAGE_VERSIONS["silver"], last_error=str(e)[:2000],
+                )])
             return {
                 "success": False,
                 "game_id": game_id,
@@ -126,6 +153,20 @@ class NBAStatsPipeline:
             logger.warning("Shots fetch failed", game_id=game_id, error=str(shots_resp))
             shots_resp = {}
         
+        # Skip the load when the raw payloads match the last successful silver load
+        bronze_sha1 = payload_fingerprint(boxscore_resp, pbp_resp, lineups_resp, shots_resp)
+        silver_state = await self._get_silver_state(conn, game_id)
+        if not stage_needs_work(silver_state, input_sha1=bronze_sha1, version=STAGE_VERSIONS["silver"]):
+            logger.info("Skipping unchanged game", game_id=game_id, bronze_sha1=bronze_sha1)
+            return {
+                "success": True,
+                "skipped": True,
+                "game_id": game_id,
+                "season": season,
+                "duration_seconds": (dt.now(UTC) - start_time).total_seconds(),
+                "records": {}
+            }
+        
         # STEP 2: Extract → Transform data
         game_meta_raw = extract_game_from_boxscore(boxscore_resp)
         game = transform_game(game_meta_raw)
@@ -166,6 +207,14 @@ class NBAStatsPipeline:
         if upsert_adv_metrics:
             await upsert_adv_metrics(conn, [])  # Placeholder for advanced metrics
         
+        # Record what this load consumed (same transaction as the load)
+        await self._save_game_states(conn, [
+            GameStageState(game_id=game_id, stage="bronze", input_sha1=bronze_sha1,
+                           version=STAGE_VERSIONS["bronze"]),
+            GameStageState(game_id=game_id, stage="silver", input_sha1=bronze_sha1,
+                           version=STAGE_VERSIONS["silver"]),
+        ])
+        
         # Transaction commits here - all FKs will be validated
         
         duration = (dt.now(UTC) - start_time).total_seconds()
@@ -184,50 +233,69 @@ class NBAStatsPipeline:
             }
         }
     
+    async def _get_silver_state(self, conn, game_id: str) -> Optional[GameStageState]:
+        """Last recorded silver state for a game (None when unknown or unavailable)."""
+        try:
+            # Savepoint: a failed lookup must not abort the surrounding load transaction
+            async with _maybe_transaction(conn):
+                states = await fetch_stage_states(conn, stage="silver", game_ids=[game_id])
+        except Exception as e:
+            logger.warning("Game state lookup failed", game_id=game_id, error=str(e))
+            return None
+        return states.get(game_id)
+    
+    async def _save_game_states(self, conn, states: List[GameStageState]) -> None:
+        """Record game states; bookkeeping failures never fail the load."""
+        try:
+            async with _maybe_transaction(conn):
+                await save_stage_states(conn, states)
+        except Exception as e:
+            logger.warning("Game state write failed",
+                           game_ids=sorted({state.game_id for state in states}), error=str(e))
+    
     async def _map_shots_to_pbp(self, conn, game_id: str, shot_rows: List, pbp_rows: List) -> int:
         """Map shot coordinates to PBP events using event numbers and timing.
         
         This implements Tranche 2 functionality by linking shot chart data
-        to play-by-play events for enhanced analytics.
+        to play-by-play events for enhanced analytics. Shots are matched in
+        memory (event number first, then game clock) and written with a single
+        set-based UPDATE.
         """
         if not shot_rows or not pbp_rows:
             return 0
         
-        mappings = 0
-        
-        # Create lookup of PBP events by event_num for shots that have event_num
-        pbp_by_event_num = {
-            pbp.event_num: pbp for pbp in pbp_rows 
-            if hasattr(pbp, 'event_num')
-        }
+        matches = match_shots_to_pbp(shot_rows, pbp_rows)
+        if not matches:
+            return 0
         
-        for shot in shot_rows:
-            if hasattr(shot, 'event_num') and shot.event_num and shot.event_num in pbp_by_event_num:
-                # Direct mapping via event number
-                pbp_event = pbp_by_event_num[shot.event_num]
-                
-                # Update PBP event with shot coordinates
-                try:
-                    await conn.execute("""
-                        UPDATE pbp_events 
-                        SET shot_x = $1, shot_y = $2, shot_distance_ft = $3
-                        WHERE game_id = $4 AND event_idx = $5
-                    """, shot.loc_x, shot.loc_y, 
-                    self._calculate_shot_distance(shot.loc_x, shot.loc_y),
-                    game_id, shot.event_num)
-                    
-                    mappings += 1
-                except Exception as e:
-                    logger.warning("Failed to map shot to PBP", 
-                                 game_id=game_id, event_num=shot.event_num, error=str(e))
+        try:
+            await self._write_shot_coordinates(conn, [game_id] * len(matches), matches)
+        except Exception as e:
+            logger.warning("Failed to map shots to PBP", game_id=game_id, error=str(e))
+            return 0
         
-        return mappings
+        return len(matches)
     
-    def _calculate_shot_distance(self, loc_x: int, loc_y: int) -> float:
-        """Calculate shot distance from coordinates."""
-        # NBA court coordinates: basket is at (0, 0)
-        import math
-        return math.sqrt(loc_x**2 + loc_y**2) / 10.0  # Convert to feet
+    async def _write_shot_coordinates(self, conn, game_ids: List[str], matches: List) -> None:
+        """Write matched shot coordinates in one statement (one or many games).
+
+        Args:
+            conn: Database connection
+            game_ids: Game ID per match, parallel to ``matches``
+            matches: (shot, event_num) pairs from match_shots_to_pbp
+        """
+        loc_x = [shot.loc_x for shot, _ in matches]
+        loc_y = [shot.loc_y for shot, _ in matches]
+        distances = shot_distances_ft(loc_x, loc_y)
+        
+        await conn.execute(
+            _MAP_SHOTS_SQL,
+            game_ids,
+            [event_num for _, event_num in matches],
+            [float(x) for x in loc_x],
+            [float(y) for y in loc_y],
+            distances.tolist(),
+        )
     
     async def run_multiple_games(self, game_ids: List[str], *, concurrency: int = 3) -> List[Dict[str, Any]]:
         """Process multiple games with controlled concurrency."""
@@ -3,12 +3,18 @@
 import asyncio
 from datetime import datetime, date, UTC
 from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .game_pipeline import GamePipeline, GamePipelineResult
-from ..models import GameStatus
 from ..nba_logging import get_logger
 from ..rate_limit import RateLimiter
+from ..state.processing_plan import (
+    GameProcessingPlan,
+    build_processing_plan,
+    plan_report,
+    processing_plan_query,
+    season_game_ids,
+)
 
 logger = get_logger(__name__)
 
@@ -23,6 +29,8 @@ class SeasonPipelineResult:
     total_records_updated: Dict[str, int]
     duration_seconds: Optional[float] = None
     error: Optional[str] = None
+    # Partitions set aside by a rebuild that did not complete: table -> backup table
+    detached_partitions: Dict[str, str] = field(default_factory=dict)
 
 
 class SeasonPipeline:
@@ -39,13 +47,16 @@ class SeasonPipeline:
         self.rate_limiter = rate_limiter
         self.batch_size = batch_size
         self.max_concurrent = max_concurrent
+        # Resolved on first use: the schema does not change under a running pipeline
+        self._plan_query: Optional[str] = None
     
     async def process_season(
         self,
         season: str,
         sources: Optional[List[str]] = None,
         force_refresh: bool = False,
-        date_range: Optional[tuple[date, date]] = None
+        date_range: Optional[tuple[date, date]] = None,
+        rebuild: bool = False
     ) -> SeasonPipelineResult:
         """Process an entire NBA season with intelligent batching.
         
@@ -54,6 +65,10 @@ class SeasonPipeline:
             sources: List of sources to process per game
             force_refresh: Whether to force re-extraction of existing games
             date_range: Optional tuple of (start_date, end_date) to limit processing
+            rebuild: Detach the season's event partitions and reload every game
+                into fresh ones. The old partitions are dropped if every game
+                succeeds, otherwise kept and reported in ``detached_partitions``
+                for ``loaders.partitions.restore_season``.
             
         Returns:
             SeasonPipelineResult with processing summary
@@ -68,6 +83,9 @@ class SeasonPipeline:
             total_records_updated={}
         )
         
+        if rebuild and date_range:
+            raise ValueError("rebuild replaces the whole season and cannot take a date_range")
+        
         try:
             logger.info("Starting season pipeline", season=season, sources=sources)
             
@@ -79,6 +97,10 @@ class SeasonPipeline:
             
             logger.info("Found games for season", season=season, count=len(game_ids))
             
+            if rebuild:
+                result.detached_partitions = await self._detach_season_partitions(season)
+                force_refresh = True
+            
             # Filter games that need processing
             if not force_refresh:
                 game_ids = await self._filter_games_needing_processing(game_ids)
@@ -130,6 +152,9 @@ class SeasonPipeline:
                     result.games_failed += 1
             
             result.success = result.games_processed > 0
+            if result.detached_partitions and result.success and result.games_failed == 0:
+                await self._drop_season_backups(result.detached_partitions)
+                result.detached_partitions = {}
             result.duration_seconds = (datetime.now(UTC) - start_time).total_seconds()
             
             logger.info("Season pipeline completed",
@@ -143,8 +168,28 @@ class SeasonPipeline:
             result.duration_seconds = (datetime.now(UTC) - start_time).total_seconds()
             logger.error("Season pipeline failed", season=season, error=str(e))
         
+        if result.detached_partitions:
+            logger.warning("Season rebuild incomplete, previous partitions kept",
+                           season=season, backups=result.detached_partitions)
+        
         return result
     
+    async def _detach_season_partitions(self, season: str) -> Dict[str, str]:
+        """Set the season's event partitions aside before a rebuild."""
+        from ..db import pooled_connection
+        from ..loaders.partitions import detach_season
+
+        async with pooled_connection() as conn:
+            return await detach_season(conn, season)
+    
+    async def _drop_season_backups(self, backups: Dict[str, str]) -> None:
+        """Drop the partitions a successful rebuild replaced."""
+        from ..db import pooled_connection
+        from ..loaders.partitions import drop_detached
+
+        async with pooled_connection() as conn:
+            await drop_detached(conn, backups)
+    
     async def _process_game_with_semaphore(
         self,
         semaphore: asyncio.Semaphore,
@@ -163,90 +208,114 @@ class SeasonPipeline:
     ) -> List[str]:
         """Get list of game IDs for a season."""
         try:
-            from ..db import get_connection
+            from ..db import pooled_connection
             
-            conn = await get_connection()
-            
-            # Base query
-            query = "SELECT DISTINCT game_id FROM games WHERE season = $1"
-            params = [season]
-            
-            # Add date filtering if specified
-            if date_range:
-                query += " AND game_date >= $2 AND game_date <= $3"
-                params.extend([date_range[0], date_range[1]])
-            
-            query += " ORDER BY game_id"
-            
-            rows = await conn.fetch(query, *params)
-            return [row['game_id'] for row in rows]
+            async with pooled_connection() as conn:
+                return await season_game_ids(conn, season, date_range)
             
         except Exception as e:
             logger.error("Failed to get season games", season=season, error=str(e))
             return []
     
+    async def build_processing_plan(self, game_ids: List[str]) -> List[GameProcessingPlan]:
+        """Decide which games need work, and why, with a single query.
+
+        Args:
+            game_ids: Games to check, in the order plans are returned
+
+        Returns:
+            One GameProcessingPlan per requested game
+        """
+        if not game_ids:
+            return []
+
+        from ..db import pooled_connection
+
+        async with pooled_connection() as conn:
+            if self._plan_query is None:
+                self._plan_query = await processing_plan_query(conn)
+            return await build_processing_plan(conn, game_ids, self._plan_query)
+
     async def _filter_games_needing_processing(self, game_ids: List[str]) -> List[str]:
         """Filter to games that need processing (not final or missing data)."""
-        filtered_games = []
-        
-        for game_id in game_ids:
-            should_process = await self.game_pipeline.should_process_game(game_id)
-            if should_process:
-                filtered_games.append(game_id)
-        
-        return filtered_games
+        try:
+            plans = await self.build_processing_plan(game_ids)
+        except Exception as e:
+            # Fall back to per-game status checks if the plan query is unavailable
+            logger.warning("Processing plan query failed, checking games individually", error=str(e))
+            filtered_games = []
+            for game_id in game_ids:
+                should_process = await self.game_pipeline.should_process_game(game_id)
+                if should_process:
+                    filtered_games.append(game_id)
+            return filtered_games
+
+        return [plan.game_id for plan in plans if plan.needs_processing]
+
+    async def plan_season(
+        self,
+        season: str,
+        date_range: Optional[tuple[date, date]] = None
+    ) -> Dict[str, Any]:
+        """Dry-run report: which games process_season would touch, and why.
+
+        Nothing is fetched or written.
+        """
+        game_ids = await self._get_season_games(season, date_range)
+        plans = await self.build_processing_plan(game_ids)
+        return plan_report(season, plans)
     
     async def get_season_processing_stats(self, season: str) -> Dict[str, Any]:
         """Get processing statistics for a season."""
         try:
-            from ..db import get_connection
-            
-            conn = await get_connection()
-            
-            # Get game status distribution
-            status_query = """
-            SELECT status, COUNT(*) as count
-            FROM games 
-            WHERE season = $1 
-            GROUP BY status
-            ORDER BY status
-            """
-            
-            status_rows = await conn.fetch(status_query, season)
-            status_distribution = {row['status']: row['count'] for row in status_rows}
-            
-            # Get data completeness stats
-            completeness_query = """
-            SELECT 
-                COUNT(*) as total_games,
-                COUNT(CASE WHEN EXISTS(
-                    SELECT 1 FROM ref_assignments WHERE ref_assignments.game_id = games.game_id
-                )) as games_with_refs,
-                COUNT(CASE WHEN EXISTS(
-                    SELECT 1 FROM starting_lineups WHERE starting_lineups.game_id = games.game_id
-                )) as games_with_lineups,
-                COUNT(CASE WHEN EXISTS(
-                    SELECT 1 FROM pbp_events WHERE pbp_events.game_id = games.game_id
-                )) as games_with_pbp
-            FROM games 
-            WHERE season = $1
-            """
-            
-            completeness_row = await conn.fetchrow(completeness_query, season)
-            
-            return {
-                'season': season,
-                'status_distribution': status_distribution,
-                'total_games': completeness_row['total_games'],
-                'games_with_refs': completeness_row['games_with_refs'],
-                'games_with_lineups': completeness_row['games_with_lineups'],
-                'games_with_pbp': completeness_row['games_with_pbp'],
-                'completeness_pct': {
-                    'refs': (completeness_row['games_with_refs'] / completeness_row['total_games'] * 100) if completeness_row['total_games'] > 0 else 0,
-                    'lineups': (completeness_row['games_with_lineups'] / completeness_row['total_games'] * 100) if completeness_row['total_games'] > 0 else 0,
-                    'pbp': (completeness_row['games_with_pbp'] / completeness_row['total_games'] * 100) if completeness_row['total_games'] > 0 else 0,
+            from ..db import pooled_connection
+            
+            async with pooled_connection() as conn:
+            
+                # Get game status distribution
+                status_query = """
+                SELECT status, COUNT(*) as count
+                FROM games 
+                WHERE season = $1 
+                GROUP BY status
+                ORDER BY status
+                """
+            
+                status_rows = await conn.fetch(status_query, season)
+                status_distribution = {row['status']: row['count'] for row in status_rows}
+            
+                # Get data completeness stats
+                completeness_query = """
+                SELECT 
+                    COUNT(*) as total_games,
+                    COUNT(CASE WHEN EXISTS(
+                        SELECT 1 FROM ref_assignments WHERE ref_assignments.game_id = games.game_id
+                    )) as games_with_refs,
+                    COUNT(CASE WHEN EXISTS(
+                        SELECT 1 FROM starting_lineups WHERE starting_lineups.game_id = games.game_id
+                    )) as games_with_lineups,
+                    COUNT(CASE WHEN EXISTS(
+                        SELECT 1 FROM pbp_events WHERE pbp_events.game_id = games.game_id
+                    )) as games_with_pbp
+                FROM games 
+                WHERE season = $1
+                """
+            
+                completeness_row = await conn.fetchrow(completeness_query, season)
+            
+                return {
+                    'season': season,
+                    'status_distribution': status_distribution,
+                    'total_games': completeness_row['total_games'],
+                    'games_with_refs': completeness_row['games_with_refs'],
+                    'games_with_lineups': completeness_row['games_with_lineups'],
+                    'games_with_pbp': completeness_row['games_with_pbp'],
+                    'completeness_pct': {
+                        'refs': (completeness_row['games_with_refs'] / completeness_row['total_games'] * 100) if completeness_row['total_games'] > 0 else 0,
+                        'lineups': (completeness_row['games_with_lineups'] / completeness_row['total_games'] * 100) if completeness_row['total_games'] > 0 else 0,
+                        'pbp': (completeness_row['games_with_pbp'] / completeness_row['total_games'] * 100) if completeness_row['total_games'] > 0 else 0,
+                    }
                 }
-            }
             
         except Exception as e:
             logger.error("Failed to get season stats", season=season, error=str(e))
@@ -259,19 +328,19 @@ class SeasonPipeline:
     ) -> SeasonPipelineResult:
         """Process recent games (useful for daily updates)."""
         try:
-            from ..db import get_connection
+            from ..db import pooled_connection
             
-            conn = await get_connection()
+            async with pooled_connection() as conn:
             
-            # Get recent games
-            query = """
-            SELECT DISTINCT game_id, season
-            FROM games 
-            WHERE game_date >= CURRENT_DATE - INTERVAL '%s days'
-            ORDER BY game_date DESC, game_id
-            """ % days_back
+                # Get recent games
+                query = """
+                SELECT DISTINCT game_id, season
+                FROM games 
+                WHERE game_date >= CURRENT_DATE - INTERVAL '%s days'
+                ORDER BY game_date DESC, game_id
+                """ % days_back
             
-            rows = await conn.fetch(query)
+                rows = await conn.fetch(query)
             game_ids = [row['game_id'] for row in rows]
             
             if not game_ids:
@@ -1,5 +1,5 @@
 """Scheduler for daily and backfill jobs."""
 
-from .jobs import run_daily, run_backfill
+from .jobs import run_daily, run_backfill, run_daily_async, run_backfill_async
 
-__all__ = ["run_daily", "run_backfill"]
+__all__ = ["run_daily", "run_backfill", "run_daily_async", "run_backfill_async"]
@@ -1,19 +1,63 @@
-"""Scheduler jobs for daily and backfill operations."""
+"""Scheduler jobs for daily and backfill operations.
+
+``run_daily``/``run_backfill`` use a synchronous SQLAlchemy engine built per
+run. ``run_daily_async``/``run_backfill_async`` run on the shared asyncpg pool
+(``db.get_performance_pool``): the state tables are checked once per process,
+backfill date chunks run concurrently under one limit, and game state and
+watermarks are committed every few chunks instead of after each one.
+"""
 from __future__ import annotations
+import asyncio
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
-from typing import Iterable, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
 from sqlalchemy import create_engine
 
 from nba_scraper.config import get_settings
-from nba_scraper.state.watermarks import get_watermark, set_watermark, ensure_tables
+from nba_scraper.db import get_performance_pool
+from nba_scraper.state.watermarks import (
+    ensure_tables,
+    ensure_tables_async,
+    fetch_watermark,
+    get_watermark,
+    save_watermarks,
+    set_watermark,
+)
+from nba_scraper.state.game_state import (
+    STAGE_VERSIONS,
+    STATUS_FAILED,
+    STATUS_OK,
+    GameStageState,
+    ensure_game_state_table,
+    ensure_game_state_table_async,
+    fetch_stage_states,
+    get_stage_states,
+    record_stage_states,
+    save_stage_states,
+    stage_needs_work,
+)
+from nba_scraper.utils.db import maybe_transaction
 from nba_scraper.schedule.discovery import discover_game_ids_for_date, discover_game_ids_for_date_range
 
 logger = logging.getLogger(__name__)
 
 ET = ZoneInfo("America/New_York")
 
+# Backfill date chunks in flight at once (discovery + pipeline)
+DEFAULT_CHUNK_CONCURRENCY = 4
+# Finished chunks whose game state and watermark are committed together
+DEFAULT_COMMIT_EVERY = 4
+
+_STATE_TABLES_PRESENT_SQL = (
+    "SELECT to_regclass('ingest_watermarks') IS NOT NULL "
+    "AND to_regclass('game_ingest_state') IS NOT NULL"
+)
+
+# Set once the state tables are known to exist in this process
+_state_tables_ready = False
+
 
 def _get_sync_engine():
     """Get synchronous SQLAlchemy engine for scheduler."""
@@ -76,11 +120,26 @@ def run_daily() -> int:
     return failures
 
 
+def _backfill_selects(game_id: str, state: GameStageState | None, resume_from: str | None, version: str) -> bool:
+    """Whether a discovered game belongs in this backfill run.
+
+    Games with recorded state run when their last attempt failed or the backfill
+    version moved. Games without state (never attempted, or processed before state
+    was tracked) fall back to the watermark.
+    """
+    if state is not None:
+        return stage_needs_work(state, version=version)
+    return not resume_from or game_id > resume_from
+
+
 def run_backfill(season: str, since_game_id: str | None = None, chunk_days: int = 7) -> int:
     """
     Walk the season from Oct 1 → Sep 30 ET in chunks. Resume from watermark if present.
     
-    Watermark key = season (e.g., '2024-25'), value = last processed game_id (lexicographic).
+    Watermark key = season (e.g., '2024-25'), value = highest processed game_id.
+    Per-game state (stage 'backfill') takes precedence over the watermark: games
+    whose last attempt failed, or that ran under an older backfill version, are
+    retried even if they sort below the watermark.
     
     Args:
         season: Season string (e.g., '2024-25')
@@ -94,12 +153,15 @@ def run_backfill(season: str, since_game_id: str | None = None, chunk_days: int
     
     start, end = season_bounds(season)
     engine = _get_sync_engine()
+    version = STAGE_VERSIONS["backfill"]
     
     with engine.begin() as conn:
         ensure_tables(conn)
+        ensure_game_state_table(conn)
         last = get_watermark(conn, stage="backfill", key=season)
     
     resume_from = since_game_id or last
+    high_water = last
     total_failures = 0
     
     logger.info("job.start", extra={
@@ -111,10 +173,12 @@ def run_backfill(season: str, since_game_id: str | None = None, chunk_days: int
     for chunk_start, chunk_end in _dates_in_chunks(start, end, chunk_days):
         # Discover games in [chunk_start, chunk_end]
         games = discover_game_ids_for_date_range(chunk_start, chunk_end)
+        if not games:
+            continue
         
-        if resume_from:
-            # Lexicographic filter; game_ids are fixed-length so safe
-            games = [g for g in games if g > resume_from]
+        with engine.begin() as conn:
+            states = get_stage_states(conn, stage="backfill", game_ids=games)
+        games = [g for g in games if _backfill_selects(g, states.get(g), resume_from, version)]
         
         if not games:
             continue
@@ -123,10 +187,15 @@ def run_backfill(season: str, since_game_id: str | None = None, chunk_days: int
             from nba_scraper.cli_pipeline import run_pipeline_for_games
             run_pipeline_for_games(games)
             
-            # Update watermark to the max game_id processed in this chunk
+            # Record per-game success and advance the watermark (never backwards)
+            high_water = max([*games, high_water] if high_water else games)
             with engine.begin() as conn:
-                set_watermark(conn, stage="backfill", key=season, value=max(games))
-        except Exception:
+                record_stage_states(conn, [
+                    GameStageState(game_id=g, stage="backfill", status=STATUS_OK, version=version)
+                    for g in games
+                ])
+                set_watermark(conn, stage="backfill", key=season, value=high_water)
+        except Exception as e:
             logger.exception("job.chunk_error", extra={
                 "job": "backfill",
                 "season": season,
@@ -134,7 +203,211 @@ def run_backfill(season: str, since_game_id: str | None = None, chunk_days: int
                 "chunk_end": chunk_end.isoformat()
             })
             total_failures += 1
-            # Continue; watermark remains at last successful batch
+            # Mark the chunk's games failed so a later run retries them; if the
+            # database is what failed, the chunk still counts once and the run goes on
+            try:
+                with engine.begin() as conn:
+                    record_stage_states(conn, [
+                        GameStageState(
+                            game_id=g, stage="backfill", status=STATUS_FAILED,
+                            version=version, last_error=str(e)[:2000],
+                        )
+                        for g in games
+                    ])
+            except Exception:
+                logger.exception("job.state_error", extra={
+                    "job": "backfill",
+                    "season": season,
+                    "games": len(games)
+                })
+    
+    logger.info("job.end", extra={
+        "job": "backfill",
+        "season": season,
+        "failures": total_failures
+    })
+    return total_failures
+
+
+# ---------------------------------------------------------------------------
+# Async jobs (shared asyncpg pool)
+# ---------------------------------------------------------------------------
+
+
+async def _ensure_state_tables_async(conn) -> None:
+    """Create the scheduler state tables if missing; a no-op after the first call."""
+    global _state_tables_ready
+    if _state_tables_ready:
+        return
+    if not await conn.fetchval(_STATE_TABLES_PRESENT_SQL):
+        await ensure_tables_async(conn)
+        await ensure_game_state_table_async(conn)
+    _state_tables_ready = True
+
+
+async def _run_pipeline_async(game_ids: List[str]) -> None:
+    # The pipeline runner is synchronous; a worker thread keeps other chunks moving
+    from nba_scraper.cli_pipeline import run_pipeline_for_games
+    await asyncio.to_thread(run_pipeline_for_games, game_ids)
+
+
+async def run_daily_async() -> int:
+    """
+    Async ``run_daily`` on the shared connection pool.
+    
+    Returns:
+        Non-zero count of failures encountered
+    """
+    pool = await get_performance_pool()
+    async with pool.acquire() as conn:
+        await _ensure_state_tables_async(conn)
+    
+    target = _yesterday_et()
+    logger.info("job.start", extra={"job": "daily", "target_date": target.isoformat()})
+    
+    game_ids = await asyncio.to_thread(discover_game_ids_for_date, target)
+    failures = 0
+    
+    if not game_ids:
+        logger.info("job.no_games", extra={"date": target.isoformat()})
+    else:
+        try:
+            await _run_pipeline_async(game_ids)
+        except Exception:
+            logger.exception("job.batch_error", extra={"job": "daily", "date": target.isoformat()})
+            failures += 1
+    
+    async with pool.acquire() as conn:
+        await save_watermarks(conn, [("schedule", "daily", target.isoformat())])
+    
+    logger.info("job.end", extra={"job": "daily", "failures": failures, "games": len(game_ids)})
+    return failures
+
+
+@dataclass
+class _ChunkOutcome:
+    """Games a backfill chunk ran, and the error if the pipeline failed."""
+    index: int
+    games: List[str]
+    error: Optional[str] = None
+
+    def states(self, version: str) -> List[GameStageState]:
+        status = STATUS_OK if self.error is None else STATUS_FAILED
+        return [
+            GameStageState(game_id=g, stage="backfill", status=status, version=version, last_error=self.error)
+            for g in self.games
+        ]
+
+
+async def run_backfill_async(
+    season: str,
+    since_game_id: str | None = None,
+    chunk_days: int = 7,
+    max_concurrent: int = DEFAULT_CHUNK_CONCURRENCY,
+    commit_every: int = DEFAULT_COMMIT_EVERY,
+) -> int:
+    """
+    Async ``run_backfill``: same selection rules, chunks run concurrently.
+    
+    Per-game state is recorded for every finished chunk. The watermark only
+    advances through the leading run of finished chunks, so a crash never
+    leaves it past a chunk that had not completed.
+    
+    Args:
+        season: Season string (e.g., '2024-25')
+        since_game_id: Optional explicit game ID to resume from (overrides watermark)
+        chunk_days: Number of days per chunk
+        max_concurrent: Chunks in flight at once
+        commit_every: Finished chunks per state/watermark commit
+        
+    Returns:
+        Non-zero count of failures encountered
+    """
+    from nba_scraper.utils.season_utils import season_bounds
+    
+    start, end = season_bounds(season)
+    version = STAGE_VERSIONS["backfill"]
+    pool = await get_performance_pool()
+    
+    async with pool.acquire() as conn:
+        await _ensure_state_tables_async(conn)
+        last = await fetch_watermark(conn, stage="backfill", key=season)
+    
+    resume_from = since_game_id or last
+    logger.info("job.start", extra={
+        "job": "backfill",
+        "season": season,
+        "resume_from": resume_from,
+        "max_concurrent": max_concurrent,
+    })
+    
+    semaphore = asyncio.Semaphore(max_concurrent)
+    
+    async def run_chunk(index: int, chunk_start: date, chunk_end: date) -> _ChunkOutcome:
+        async with semaphore:
+            games = await asyncio.to_thread(discover_game_ids_for_date_range, chunk_start, chunk_end)
+            if games:
+                async with pool.acquire() as conn:
+                    states = await fetch_stage_states(conn, stage="backfill", game_ids=games)
+                games = [g for g in games if _backfill_selects(g, states.get(g), resume_from, version)]
+            if not games:
+                return _ChunkOutcome(index, [])
+            try:
+                await _run_pipeline_async(games)
+            except Exception as e:
+                logger.exception("job.chunk_error", extra={
+                    "job": "backfill",
+                    "season": season,
+                    "chunk_start": chunk_start.isoformat(),
+                    "chunk_end": chunk_end.isoformat()
+                })
+                return _ChunkOutcome(index, games, error=str(e)[:2000])
+            return _ChunkOutcome(index, games)
+    
+    high_water, committed_high_water = last, last
+    finished: Dict[int, _ChunkOutcome] = {}
+    next_index = 0
+    pending: List[GameStageState] = []
+    pending_chunks = 0
+    total_failures = 0
+    
+    async def commit() -> None:
+        nonlocal pending, pending_chunks, committed_high_water
+        if not pending and high_water == committed_high_water:
+            return
+        async with pool.acquire() as conn:
+            async with maybe_transaction(conn):
+                await save_stage_states(conn, pending)
+                if high_water != committed_high_water:
+                    await save_watermarks(conn, [("backfill", season, high_water)])
+        pending, pending_chunks, committed_high_water = [], 0, high_water
+    
+    tasks = [
+        asyncio.create_task(run_chunk(i, chunk_start, chunk_end))
+        for i, (chunk_start, chunk_end) in enumerate(_dates_in_chunks(start, end, chunk_days))
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            outcome = await next_done
+            if outcome.error is not None:
+                total_failures += 1
+            pending.extend(outcome.states(version))
+            pending_chunks += 1
+            
+            # Advance the watermark (never backwards) through the finished prefix
+            finished[outcome.index] = outcome
+            while next_index in finished:
+                done = finished.pop(next_index)
+                if done.error is None and done.games:
+                    high_water = max([*done.games, high_water] if high_water else done.games)
+                next_index += 1
+            
+            if pending_chunks >= commit_every:
+                await commit()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await commit()
     
     logger.info("job.end", extra={
         "job": "backfill",
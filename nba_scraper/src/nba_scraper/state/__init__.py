@@ -1,5 +1,37 @@
-"""State management for scheduler watermarks."""
+"""State management for scheduler watermarks, per-game ingestion state and processing plans."""
 
 from .watermarks import ensure_tables, get_watermark, set_watermark
+from .game_state import (
+    STAGE_VERSIONS,
+    STATUS_FAILED,
+    STATUS_OK,
+    GameStageState,
+    ensure_game_state_table,
+    fingerprint,
+    games_needing_work,
+    get_stage_states,
+    payload_fingerprint,
+    record_stage_states,
+    stage_needs_work,
+)
+from .processing_plan import GameProcessingPlan, build_processing_plan, plan_season
 
-__all__ = ["ensure_tables", "get_watermark", "set_watermark"]
+__all__ = [
+    "ensure_tables",
+    "get_watermark",
+    "set_watermark",
+    "STAGE_VERSIONS",
+    "STATUS_FAILED",
+    "STATUS_OK",
+    "GameStageState",
+    "ensure_game_state_table",
+    "fingerprint",
+    "games_needing_work",
+    "get_stage_states",
+    "payload_fingerprint",
+    "record_stage_states",
+    "stage_needs_work",
+    "GameProcessingPlan",
+    "build_processing_plan",
+    "plan_season",
+]
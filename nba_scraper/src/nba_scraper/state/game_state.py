@@ -0,0 +1,254 @@
+"""Per-game, per-stage ingestion state for fine-grained incremental reprocessing.
+
+Each (game_id, stage) row records what a stage last consumed and produced:
+
+- ``input_sha1``: fingerprint of the stage's inputs (the raw payload sha1 for
+  ``bronze``, the upstream fingerprint for ``silver`` and ``derived:*`` stages)
+- ``version``: code version of the stage (bump it when a transformer fix changes
+  output for the same input)
+- ``status`` / ``last_error``: outcome of the last attempt
+
+A stage needs work for a game when it has never succeeded, its last attempt
+failed, or its input fingerprint or version moved. Writes are single batched
+upserts; the same table is reachable from the synchronous scheduler (SQLAlchemy)
+and the asyncpg pipelines.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from sqlalchemy import Column, DateTime, MetaData, PrimaryKeyConstraint, String, Table, Text, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+
+# Stage code versions. Bump a value to make every game re-run that stage once.
+STAGE_VERSIONS: Dict[str, str] = {
+    "bronze": "1",
+    "silver": "1",
+    "backfill": "1",
+}
+
+# Keep IN (...) lists well under SQLite's bind-parameter limit.
+_SELECT_CHUNK = 500
+
+metadata = MetaData()
+game_ingest_state = Table(
+    "game_ingest_state", metadata,
+    Column("game_id", String, nullable=False),
+    Column("stage", String, nullable=False),  # 'bronze', 'silver', 'derived:q1_window', ...
+    Column("input_sha1", String, nullable=True),
+    Column("version", String, nullable=True),
+    Column("status", String, nullable=False),
+    Column("last_error", Text, nullable=True),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    PrimaryKeyConstraint("game_id", "stage", name="pk_game_ingest_state"),
+)
+
+
+@dataclass
+class GameStageState:
+    """State of one stage for one game."""
+    game_id: str
+    stage: str
+    status: str = STATUS_OK
+    input_sha1: Optional[str] = None
+    version: Optional[str] = None
+    last_error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+    def as_row(self) -> Dict[str, Any]:
+        return {
+            "game_id": self.game_id,
+            "stage": self.stage,
+            "input_sha1": self.input_sha1,
+            "version": self.version,
+            "status": self.status,
+            "last_error": self.last_error,
+            "updated_at": self.updated_at or datetime.now(timezone.utc),
+        }
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable sha1 over upstream fingerprints/versions (``None`` parts included)."""
+    joined = "\x1f".join("" if part is None else str(part) for part in parts)
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+def payload_fingerprint(*payloads: Any) -> str:
+    """sha1 of raw API payloads in canonical JSON form (key order ignored)."""
+    digest = hashlib.sha1()
+    for payload in payloads:
+        digest.update(json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def stage_needs_work(
+    state: Optional[GameStageState],
+    *,
+    input_sha1: Optional[str] = None,
+    version: Optional[str] = None,
+) -> bool:
+    """Whether a stage must (re)run given its recorded state and current inputs.
+
+    ``input_sha1``/``version`` of ``None`` mean "unknown" and never force a re-run.
+    """
+    if state is None or not state.ok:
+        return True
+    if input_sha1 is not None and state.input_sha1 != input_sha1:
+        return True
+    if version is not None and state.version != version:
+        return True
+    return False
+
+
+def _state_from_row(row: Mapping[str, Any]) -> GameStageState:
+    return GameStageState(
+        game_id=row["game_id"],
+        stage=row["stage"],
+        status=row["status"],
+        input_sha1=row["input_sha1"],
+        version=row["version"],
+        last_error=row["last_error"],
+        updated_at=row["updated_at"],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Synchronous API (scheduler / SQLAlchemy)
+# ---------------------------------------------------------------------------
+
+
+def ensure_game_state_table(conn: Connection) -> None:
+    """Create the game state table if it doesn't exist (idempotent)."""
+    metadata.create_all(conn.engine, tables=[game_ingest_state])
+
+
+def get_stage_states(
+    conn: Connection, *, stage: str, game_ids: Iterable[str]
+) -> Dict[str, GameStageState]:
+    """Fetch recorded state for ``stage`` for many games."""
+    ids = list(dict.fromkeys(game_ids))
+    states: Dict[str, GameStageState] = {}
+    for start in range(0, len(ids), _SELECT_CHUNK):
+        rows = conn.execute(
+            select(game_ingest_state).where(
+                game_ingest_state.c.stage == stage,
+                game_ingest_state.c.game_id.in_(ids[start:start + _SELECT_CHUNK]),
+            )
+        ).mappings()
+        for row in rows:
+            states[row["game_id"]] = _state_from_row(row)
+    return states
+
+
+def record_stage_states(conn: Connection, states: Sequence[GameStageState]) -> None:
+    """Upsert many stage states in one statement."""
+    if not states:
+        return
+
+    rows = list({(s.game_id, s.stage): s.as_row() for s in states}.values())
+    dialect_insert = postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(game_ingest_state)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[game_ingest_state.c.game_id, game_ingest_state.c.stage],
+        set_={
+            name: stmt.excluded[name]
+            for name in ("input_sha1", "version", "status", "last_error", "updated_at")
+        },
+    )
+    conn.execute(stmt, rows)
+    logger.debug("game_state.recorded", extra={"rows": len(rows)})
+
+
+def games_needing_work(
+    conn: Connection,
+    *,
+    stage: str,
+    game_ids: Sequence[str],
+    version: Optional[str] = None,
+    input_sha1s: Optional[Mapping[str, str]] = None,
+) -> List[str]:
+    """Filter ``game_ids`` (order kept) to those whose ``stage`` must run."""
+    states = get_stage_states(conn, stage=stage, game_ids=game_ids)
+    input_sha1s = input_sha1s or {}
+    return [
+        game_id for game_id in game_ids
+        if stage_needs_work(states.get(game_id), input_sha1=input_sha1s.get(game_id), version=version)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Async API (asyncpg pipelines)
+# ---------------------------------------------------------------------------
+
+_CREATE_TABLE_SQL = str(
+    CreateTable(game_ingest_state, if_not_exists=True).compile(dialect=postgresql.dialect())
+)
+
+_SELECT_STATES_SQL = """
+SELECT game_id, stage, input_sha1, version, status, last_error, updated_at
+FROM game_ingest_state
+WHERE stage = $1 AND game_id = ANY($2::text[])
+"""
+
+
+@lru_cache(maxsize=1)
+def _state_spec():
+    # Imported lazily: the scheduler imports this module without the loaders package.
+    from ..loaders.upsert import TableSpec
+
+    return TableSpec.from_columns(
+        "game_ingest_state",
+        [
+            ("game_id", "text"),
+            ("stage", "text"),
+            ("input_sha1", "text"),
+            ("version", "text"),
+            ("status", "text"),
+            ("last_error", "text"),
+            ("updated_at", "timestamptz"),
+        ],
+        ("game_id", "stage"),
+        compare_exclude=("updated_at",),
+    )
+
+
+async def ensure_game_state_table_async(conn: Any) -> None:
+    """Create the game state table from an asyncpg connection (idempotent)."""
+    await conn.execute(_CREATE_TABLE_SQL)
+
+
+async def fetch_stage_states(
+    conn: Any, *, stage: str, game_ids: Sequence[str]
+) -> Dict[str, GameStageState]:
+    """Fetch recorded state for ``stage`` for many games in one query."""
+    if not game_ids:
+        return {}
+    rows = await conn.fetch(_SELECT_STATES_SQL, stage, list(game_ids))
+    return {row["game_id"]: _state_from_row(row) for row in rows}
+
+
+async def save_stage_states(conn: Any, states: Sequence[GameStageState]) -> None:
+    """Upsert many stage states with one set-based statement."""
+    if not states:
+        return
+    from ..loaders.upsert import upsert_rows
+
+    await upsert_rows(conn, _state_spec(), [state.as_row() for state in states])
@@ -0,0 +1,202 @@
+"""Season processing plan: which games need (re)processing, and why.
+
+One round-trip answers the question for a whole season: per requested game,
+its status and a pbp_events aggregate. ``SeasonPipeline`` filters its work
+with it, and ``plan_season`` reports it as a dry run without touching the
+game pipeline or any upstream source.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..models import GameStatus
+
+# Reasons a game needs (re)processing, in reporting order.
+REASON_NOT_INGESTED = "not_ingested"
+REASON_NOT_FINAL = "not_final"
+REASON_MISSING_PBP = "missing_pbp"
+REASON_MISSING_SHOTS = "missing_shots"
+REASON_STALE_SOURCE = "stale_source"
+
+# PBP captured less than this long after tip-off may predate the final buzzer.
+STALE_AFTER_TIPOFF = timedelta(hours=4)
+
+# One round-trip for the whole season: per requested game, its status and a
+# pbp_events aggregate (served by idx_pbp_processing_plan).
+PROCESSING_PLAN_QUERY = """
+SELECT
+    r.game_id,
+    g.game_id IS NOT NULL AS ingested,
+    g.status,
+    g.game_date_utc,
+    COALESCE(p.event_count, 0) AS event_count,
+    COALESCE(p.shot_count, 0) AS shot_count,
+    COALESCE(p.located_shot_count, 0) AS located_shot_count,
+    p.pbp_ingested_at
+FROM unnest($1::text[]) WITH ORDINALITY AS r(game_id, ord)
+LEFT JOIN games g ON g.game_id = r.game_id
+LEFT JOIN LATERAL (
+    SELECT
+        COUNT(*) AS event_count,
+        COUNT(*) FILTER (WHERE e.event_type IN ('SHOT_MADE', 'SHOT_MISSED')) AS shot_count,
+        COUNT(*) FILTER (
+            WHERE e.event_type IN ('SHOT_MADE', 'SHOT_MISSED') AND e.shot_x IS NOT NULL
+        ) AS located_shot_count,
+        MAX(e.ingested_at_utc) AS pbp_ingested_at
+    FROM pbp_events e
+    WHERE e.game_id = r.game_id
+) p ON TRUE
+ORDER BY r.ord
+"""
+
+# The same plan over the foundation schema (db_migrations_foundations.sql):
+# no event_type or tip-off time, shots live in shot_events and are located once
+# their coordinates are mapped onto pbp_events. Stale-source checks are skipped.
+FOUNDATION_PROCESSING_PLAN_QUERY = """
+SELECT
+    r.game_id,
+    g.game_id IS NOT NULL AS ingested,
+    g.status,
+    NULL::timestamptz AS game_date_utc,
+    COALESCE(p.event_count, 0) AS event_count,
+    COALESCE(s.shot_count, 0) AS shot_count,
+    COALESCE(p.located_shot_count, 0) AS located_shot_count,
+    p.pbp_ingested_at
+FROM unnest($1::text[]) WITH ORDINALITY AS r(game_id, ord)
+LEFT JOIN games g ON g.game_id = r.game_id
+LEFT JOIN LATERAL (
+    SELECT
+        COUNT(*) AS event_count,
+        COUNT(*) FILTER (WHERE e.shot_x IS NOT NULL) AS located_shot_count,
+        MAX(e.created_at) AS pbp_ingested_at
+    FROM pbp_events e
+    WHERE e.game_id = r.game_id
+) p ON TRUE
+LEFT JOIN LATERAL (
+    SELECT COUNT(*) AS shot_count FROM shot_events se WHERE se.game_id = r.game_id
+) s ON TRUE
+ORDER BY r.ord
+"""
+
+PBP_COLUMNS_QUERY = """
+SELECT column_name FROM information_schema.columns
+WHERE table_schema = current_schema() AND table_name = 'pbp_events'
+"""
+
+
+@dataclass
+class GameProcessingPlan:
+    """Whether a game needs work, and why."""
+    game_id: str
+    status: Optional[str] = None
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def needs_processing(self) -> bool:
+        return bool(self.reasons)
+
+    @classmethod
+    def from_row(cls, row: Any) -> "GameProcessingPlan":
+        """Derive reasons from one PROCESSING_PLAN_QUERY row."""
+        plan = cls(game_id=row['game_id'], status=row['status'])
+
+        if not row['ingested']:
+            plan.reasons.append(REASON_NOT_INGESTED)
+            return plan
+
+        if (row['status'] or '').upper() != GameStatus.FINAL.value:
+            plan.reasons.append(REASON_NOT_FINAL)
+        if row['event_count'] == 0:
+            plan.reasons.append(REASON_MISSING_PBP)
+        elif row['shot_count'] > 0 and row['located_shot_count'] == 0:
+            plan.reasons.append(REASON_MISSING_SHOTS)
+
+        pbp_ingested_at = row['pbp_ingested_at']
+        tipoff = row['game_date_utc']
+        if (
+            REASON_NOT_FINAL not in plan.reasons
+            and pbp_ingested_at is not None
+            and tipoff is not None
+            and pbp_ingested_at < tipoff + STALE_AFTER_TIPOFF
+        ):
+            plan.reasons.append(REASON_STALE_SOURCE)
+
+        return plan
+
+
+async def processing_plan_query(conn: Any) -> str:
+    """The plan query matching the pbp_events layout the database actually has."""
+    columns = {row['column_name'] for row in await conn.fetch(PBP_COLUMNS_QUERY)}
+    return PROCESSING_PLAN_QUERY if 'event_type' in columns else FOUNDATION_PROCESSING_PLAN_QUERY
+
+
+async def build_processing_plan(
+    conn: Any,
+    game_ids: Sequence[str],
+    query: Optional[str] = None,
+) -> List[GameProcessingPlan]:
+    """One GameProcessingPlan per requested game, in request order, from a single query.
+
+    ``query`` skips the schema lookup when the caller already resolved it
+    with :func:`processing_plan_query`.
+    """
+    if not game_ids:
+        return []
+    query = query or await processing_plan_query(conn)
+    rows = await conn.fetch(query, list(game_ids))
+    return [GameProcessingPlan.from_row(row) for row in rows]
+
+
+async def season_game_ids(
+    conn: Any,
+    season: str,
+    date_range: Optional[Tuple[date, date]] = None,
+) -> List[str]:
+    """Game IDs stored for ``season``, optionally limited to a date range."""
+    query = "SELECT DISTINCT game_id FROM games WHERE season = $1"
+    params: List[Any] = [season]
+    if date_range:
+        query += " AND game_date >= $2 AND game_date <= $3"
+        params.extend([date_range[0], date_range[1]])
+    query += " ORDER BY game_id"
+    rows = await conn.fetch(query, *params)
+    return [row['game_id'] for row in rows]
+
+
+def plan_report(season: str, plans: Sequence[GameProcessingPlan]) -> Dict[str, Any]:
+    """Summarise plans as the dry-run report: counts per reason and the games needing work."""
+    reason_counts: Dict[str, int] = {}
+    for plan in plans:
+        for reason in plan.reasons:
+            reason_counts[reason] = reason_counts.get(reason, 0) + 1
+
+    pending = [plan for plan in plans if plan.needs_processing]
+    return {
+        'season': season,
+        'total_games': len(plans),
+        'games_needing_processing': len(pending),
+        'games_up_to_date': len(plans) - len(pending),
+        'reasons': reason_counts,
+        'games': [
+            {'game_id': plan.game_id, 'status': plan.status, 'reasons': plan.reasons}
+            for plan in pending
+        ],
+    }
+
+
+async def plan_season(
+    season: str,
+    date_range: Optional[Tuple[date, date]] = None,
+) -> Dict[str, Any]:
+    """Dry-run report: which games process_season would touch, and why.
+
+    Nothing is fetched or written.
+    """
+    from ..db import pooled_connection
+
+    async with pooled_connection() as conn:
+        game_ids = await season_game_ids(conn, season, date_range)
+        plans = await build_processing_plan(conn, game_ids)
+    return plan_report(season, plans)
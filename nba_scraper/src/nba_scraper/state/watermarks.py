@@ -1,9 +1,16 @@
-"""Watermark tracking for resumable scheduler operations."""
+"""Watermark tracking for resumable scheduler operations.
+
+The synchronous API serves SQLAlchemy connections; the async API at the bottom
+serves asyncpg connections from the shared pool and writes many watermarks in
+one statement.
+"""
 from __future__ import annotations
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Optional, Sequence, Tuple
 from sqlalchemy import Table, Column, String, DateTime, MetaData, insert, select, update, UniqueConstraint
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable
 import logging
 
 logger = logging.getLogger(__name__)
@@ -55,3 +62,42 @@ def set_watermark(conn: Connection, *, stage: str, key: str, value: str) -> None
             .values(value=value, updated_at=now)
         )
     logger.debug("watermark.updated", extra={"stage": stage, "key": key, "value": value})
+
+
+# ---------------------------------------------------------------------------
+# Async API (asyncpg pool)
+# ---------------------------------------------------------------------------
+
+_CREATE_TABLE_SQL = str(
+    CreateTable(ingest_watermarks, if_not_exists=True).compile(dialect=postgresql.dialect())
+)
+
+_SELECT_WATERMARK_SQL = "SELECT value FROM ingest_watermarks WHERE stage = $1 AND key = $2"
+
+_UPSERT_WATERMARKS_SQL = """
+INSERT INTO ingest_watermarks (stage, key, value, updated_at)
+SELECT w.stage, w.key, w.value, now() AT TIME ZONE 'utc'
+FROM unnest($1::text[], $2::text[], $3::text[]) AS w(stage, key, value)
+ON CONFLICT (stage, key) DO UPDATE
+SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
+"""
+
+
+async def ensure_tables_async(conn: Any) -> None:
+    """Create the watermarks table from an asyncpg connection (idempotent)."""
+    await conn.execute(_CREATE_TABLE_SQL)
+
+
+async def fetch_watermark(conn: Any, *, stage: str, key: str) -> Optional[str]:
+    """Get watermark value for a given stage and key."""
+    return await conn.fetchval(_SELECT_WATERMARK_SQL, stage, key)
+
+
+async def save_watermarks(conn: Any, watermarks: Sequence[Tuple[str, str, str]]) -> None:
+    """Upsert many ``(stage, key, value)`` watermarks in one statement (last value per key wins)."""
+    if not watermarks:
+        return
+    latest = {(stage, key): value for stage, key, value in watermarks}
+    stages, keys = zip(*latest)
+    await conn.execute(_UPSERT_WATERMARKS_SQL, list(stages), list(keys), list(latest.values()))
+    logger.debug("watermark.updated", extra={"watermarks": len(latest)})
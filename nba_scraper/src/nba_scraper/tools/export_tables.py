@@ -0,0 +1,459 @@
+"""Bulk export of tables and queries to columnar files.
+
+Rows are streamed through a server-side cursor in fixed-size chunks and
+each chunk is written out as one row group before the next is fetched, so
+memory stays flat however large the table is. Three formats are supported:
+
+- ``parquet``: one row group per chunk, with Parquet's own column statistics
+- ``arrow``: an Arrow IPC file with one record batch per chunk
+- ``npz``: a NumPy zip archive with one ``.npy`` member per column and
+  chunk. It needs no extra dependency; nulls are kept in ``__null`` masks.
+
+Parquet and Arrow need ``pyarrow`` (``pip install nba-scraper[export]``).
+``auto`` picks Parquet when it is installed and ``.npz`` otherwise.
+
+Tables with a ``game_id`` column can be filtered by season, date range and
+team through ``games``, and are exported one file per season under
+``<out>/<table>/season=<season>/``. An unfiltered export puts rows whose
+game is missing from ``games`` (or has no season) under ``season=unknown``
+rather than dropping them. Seasons run concurrently, each on its own pooled
+connection. Every export writes ``_manifest.json`` next to its files,
+listing rows and per-row-group min/max/null counts for each file.
+"""
+
+import abc
+import asyncio
+import io
+import json
+import os
+import tempfile
+import time
+import zipfile
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..db import get_performance_pool
+from ..loaders.partitions import UNKNOWN_SEASON
+from ..nba_logging import get_logger
+
+logger = get_logger(__name__)
+
+FORMATS = ("auto", "parquet", "arrow", "npz")
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "npz": ".npz"}
+DEFAULT_CHUNK_ROWS = 50_000
+DEFAULT_WORKERS = 4
+
+TABLE_COLUMNS_QUERY = """
+SELECT column_name FROM information_schema.columns
+WHERE table_schema = current_schema() AND table_name = $1
+ORDER BY ordinal_position
+"""
+
+# PostgreSQL type name -> (NumPy dtype, null fill); anything else is exported as text
+_NUMPY_TYPES: Dict[str, Tuple[str, Any]] = {
+    "bool": ("bool", False),
+    "int2": ("int64", 0),
+    "int4": ("int64", 0),
+    "int8": ("int64", 0),
+    "float4": ("float64", np.nan),
+    "float8": ("float64", np.nan),
+    "numeric": ("float64", np.nan),
+    "date": ("datetime64[D]", date(1970, 1, 1)),
+    "timestamp": ("datetime64[us]", datetime(1970, 1, 1)),
+    "timestamptz": ("datetime64[us]", datetime(1970, 1, 1, tzinfo=UTC)),
+}
+_TEXT = ("str", "")
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class ExportError(Exception):
+    """An export that cannot run as requested."""
+
+
+@dataclass(frozen=True)
+class ExportFilter:
+    """Game-level filters applied through ``games``; all optional."""
+    seasons: Tuple[str, ...] = ()
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    team: Optional[str] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.seasons or self.start_date or self.end_date or self.team)
+
+    def games_where(self, season: Optional[str] = None) -> Tuple[str, List[Any]]:
+        """WHERE clause over ``games g`` and its arguments; ``season`` narrows to one partition."""
+        conditions: List[str] = []
+        args: List[Any] = []
+
+        def bind(value: Any) -> str:
+            args.append(value)
+            return f"${len(args)}"
+
+        if season is not None:
+            conditions.append(f"g.season = {bind(season)}")
+        elif self.seasons:
+            conditions.append(f"g.season = ANY({bind(list(self.seasons))}::text[])")
+        if self.start_date:
+            conditions.append(f"g.game_date_local >= {bind(self.start_date)}")
+        if self.end_date:
+            conditions.append(f"g.game_date_local <= {bind(self.end_date)}")
+        if self.team:
+            team = bind(self.team.upper())
+            conditions.append(f"(g.home_team_tricode = {team} OR g.away_team_tricode = {team})")
+        return (" AND ".join(conditions) or "TRUE"), args
+
+
+@dataclass
+class ExportedFile:
+    """One written file: its rows and per-row-group column statistics."""
+    path: str
+    season: Optional[str]
+    rows: int = 0
+    row_groups: List[Dict[str, Dict[str, Any]]] = field(default_factory=list)
+
+
+@dataclass
+class ExportResult:
+    """Outcome of exporting one table or query."""
+    name: str
+    format: str
+    files: List[ExportedFile] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return sum(f.rows for f in self.files)
+
+
+def resolve_format(fmt: str) -> str:
+    """``fmt`` checked against the installed libraries; ``auto`` becomes parquet or npz."""
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown export format '{fmt}' (choose from {', '.join(FORMATS)})")
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        if fmt == "auto":
+            return "npz"
+        if fmt != "npz":
+            raise ExportError(f"{fmt} export needs pyarrow: pip install nba-scraper[export]")
+        return fmt
+    return "parquet" if fmt == "auto" else fmt
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+# -- sinks ------------------------------------------------------------------
+
+class _Sink(abc.ABC):
+    """Writes chunks of records to a temporary file renamed into place on close."""
+
+    def __init__(self, path: Path, attributes: Sequence[Any]):
+        self.path = path
+        self.names = [attribute.name for attribute in attributes]
+        self.types = [attribute.type.name for attribute in attributes]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        os.close(fd)
+        self.tmp = Path(tmp)
+        self.row_groups: List[Dict[str, Dict[str, Any]]] = []
+
+    def write(self, records: Sequence[Any]) -> None:
+        columns = list(zip(*records))
+        self.row_groups.append(self._write(columns))
+
+    def close(self) -> None:
+        self._close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self) -> None:
+        try:
+            self._close()
+        finally:
+            self.tmp.unlink(missing_ok=True)
+
+    @abc.abstractmethod
+    def _write(self, columns: List[Sequence[Any]]) -> Dict[str, Dict[str, Any]]:
+        """Write one chunk (column-major) and return its per-column statistics."""
+
+    @abc.abstractmethod
+    def _close(self) -> None:
+        """Finish the temporary file."""
+
+
+class _NpzSink(_Sink):
+    """``<column>/<chunk>.npy`` members (plus ``<column>/<chunk>.__null`` masks) in one zip."""
+
+    def __init__(self, path: Path, attributes: Sequence[Any]):
+        super().__init__(path, attributes)
+        self.archive = zipfile.ZipFile(self.tmp, "w", compression=zipfile.ZIP_STORED, allowZip64=True)
+
+    def _member(self, name: str, array: np.ndarray) -> None:
+        buffer = io.BytesIO()
+        np.lib.format.write_array(buffer, array, allow_pickle=False)
+        self.archive.writestr(f"{name}.npy", buffer.getvalue())
+
+    def _write(self, columns: List[Sequence[Any]]) -> Dict[str, Dict[str, Any]]:
+        chunk = len(self.row_groups)
+        stats = {}
+        for name, pg_type, values in zip(self.names, self.types, columns):
+            array, nulls = _to_numpy(values, pg_type)
+            self._member(f"{name}/{chunk:05d}", array)
+            if nulls.any():
+                self._member(f"{name}/{chunk:05d}.__null", nulls)
+            present = array[~nulls]
+            if not len(present):
+                low = high = None
+            elif array.dtype.kind == "U":
+                low, high = np.sort(present)[[0, -1]]  # NumPy has no min/max loop for strings
+            else:
+                low, high = present.min(), present.max()
+            stats[name] = {
+                "min": _json_value(low),
+                "max": _json_value(high),
+                "null_count": int(nulls.sum()),
+            }
+        return stats
+
+    def _close(self) -> None:
+        self.archive.writestr("_schema.json", json.dumps(
+            {"columns": [{"name": n, "type": t} for n, t in zip(self.names, self.types)],
+             "chunks": len(self.row_groups)}
+        ))
+        self.archive.close()
+
+
+def _to_numpy(values: Sequence[Any], pg_type: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(values, null mask) for one column chunk; nulls are filled so the dtype stays native."""
+    column = np.fromiter(values, dtype=object, count=len(values))
+    nulls = np.equal(column, None)
+    dtype, fill = _NUMPY_TYPES.get(pg_type, _TEXT)
+    if nulls.any():
+        column[nulls] = fill
+    if pg_type == "date":
+        days = np.fromiter((d.toordinal() for d in column), dtype=np.int64, count=len(column))
+        return (days - _EPOCH_ORDINAL).astype(dtype), nulls
+    if pg_type in ("timestamp", "timestamptz"):
+        # Microseconds since the epoch; timestamptz is stored as UTC since NumPy has no zones
+        micros = np.fromiter(((t - fill) // _MICROSECOND for t in column), dtype=np.int64, count=len(column))
+        return micros.astype(dtype), nulls
+    return column.astype(dtype), nulls
+
+
+class _ArrowSink(_Sink):
+    """Record batches through pyarrow, to Parquet or an Arrow IPC file."""
+
+    def __init__(self, path: Path, attributes: Sequence[Any], fmt: str):
+        super().__init__(path, attributes)
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        self.pa, self.pc = pa, pc
+        self.schema = pa.schema([(n, _arrow_type(pa, t)) for n, t in zip(self.names, self.types)])
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self.writer = pq.ParquetWriter(self.tmp, self.schema, compression="zstd", write_statistics=True)
+        else:
+            self.writer = pa.ipc.new_file(str(self.tmp), self.schema)
+
+    def _write(self, columns: List[Sequence[Any]]) -> Dict[str, Dict[str, Any]]:
+        arrays = [
+            self.pa.array(_arrow_values(values, pg_type), type=column.type)
+            for values, pg_type, column in zip(columns, self.types, self.schema)
+        ]
+        # One batch per chunk: a row group in Parquet, a record batch in Arrow IPC
+        self.writer.write_batch(self.pa.record_batch(arrays, schema=self.schema))
+        stats = {}
+        for name, array in zip(self.names, arrays):
+            bounds = self.pc.min_max(array).as_py()
+            stats[name] = {
+                "min": _json_value(bounds["min"]),
+                "max": _json_value(bounds["max"]),
+                "null_count": array.null_count,
+            }
+        return stats
+
+    def _close(self) -> None:
+        self.writer.close()
+
+
+def _arrow_type(pa: Any, pg_type: str) -> Any:
+    return {
+        "bool": pa.bool_(), "int2": pa.int16(), "int4": pa.int32(), "int8": pa.int64(),
+        "float4": pa.float32(), "float8": pa.float64(), "numeric": pa.float64(),
+        "date": pa.date32(), "timestamp": pa.timestamp("us"), "timestamptz": pa.timestamp("us", tz="UTC"),
+    }.get(pg_type, pa.string())
+
+
+def _arrow_values(values: Sequence[Any], pg_type: str) -> Sequence[Any]:
+    if pg_type == "numeric":
+        return [None if v is None else float(v) for v in values]
+    if pg_type not in _NUMPY_TYPES:
+        return [v if v is None or isinstance(v, str) else str(v) for v in values]
+    return values
+
+
+def _sink(fmt: str, path: Path, attributes: Sequence[Any]) -> _Sink:
+    return _NpzSink(path, attributes) if fmt == "npz" else _ArrowSink(path, attributes, fmt)
+
+
+# -- exporter ---------------------------------------------------------------
+
+class TableExporter:
+    """Stream tables or queries out of the database into columnar files.
+
+    Args:
+        out_dir: Directory exports are written under
+        fmt: One of ``FORMATS``
+        chunk_rows: Rows fetched per cursor round trip (one row group each)
+        workers: Season partitions exported concurrently
+    """
+
+    def __init__(self, out_dir: Path, fmt: str = "auto", chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 workers: int = DEFAULT_WORKERS):
+        self.out_dir = Path(out_dir)
+        self.format = resolve_format(fmt)
+        self.chunk_rows = chunk_rows
+        self.workers = max(1, workers)
+
+    async def export_table(self, table: str, filters: ExportFilter = ExportFilter()) -> ExportResult:
+        """Export ``table``, one file per season when it has a ``game_id`` column."""
+        started = time.perf_counter()
+        pool = await get_performance_pool()
+        async with pool.acquire() as conn:
+            columns = [r["column_name"] for r in await conn.fetch(TABLE_COLUMNS_QUERY, table)]
+            if not columns:
+                raise ExportError(f"Table '{table}' does not exist")
+            if "game_id" not in columns:
+                if filters:
+                    raise ExportError(f"Table '{table}' has no game_id column to filter on")
+                partitions: List[Optional[str]] = [None]
+            else:
+                where, args = filters.games_where()
+                partitions = [r["season"] for r in await conn.fetch(
+                    f"SELECT DISTINCT g.season FROM games g WHERE {where} ORDER BY g.season", *args)
+                    if r["season"] is not None]
+                if not filters:
+                    partitions = [s for s in partitions if s != UNKNOWN_SEASON]
+                    if await conn.fetchval(f"SELECT EXISTS ({self._unseasoned(table)})"):
+                        partitions.append(UNKNOWN_SEASON)
+
+        def query(season: Optional[str]) -> Tuple[str, List[Any]]:
+            if season is None:
+                return f"SELECT * FROM {_quote(table)}", []
+            if season == UNKNOWN_SEASON and not filters:
+                return f"{self._unseasoned(table)} ORDER BY t.game_id", []
+            where, args = filters.games_where(season)
+            order = " ORDER BY t.game_id" if "game_id" in columns else ""
+            # games_where binds the season first; naming it on t lets the planner prune partitions
+            prune = "t.season = $1 AND " if "season" in columns else ""
+            return (f"SELECT t.* FROM {_quote(table)} t WHERE {prune}"
+                    f"t.game_id IN (SELECT g.game_id FROM games g WHERE {where}){order}", args)
+
+        result = ExportResult(name=table, format=self.format)
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def export_partition(season: Optional[str]) -> ExportedFile:
+            async with semaphore, pool.acquire() as conn:
+                sql, args = query(season)
+                return await self._stream(conn, table, season, sql, args)
+
+        result.files = list(await asyncio.gather(*(export_partition(s) for s in partitions)))
+        return self._finish(result, started)
+
+    async def export_query(self, name: str, sql: str, *args: Any) -> ExportResult:
+        """Export the rows of an arbitrary query as ``<out>/<name>/<name>.<ext>``."""
+        started = time.perf_counter()
+        pool = await get_performance_pool()
+        async with pool.acquire() as conn:
+            exported = await self._stream(conn, name, None, sql, list(args))
+        return self._finish(ExportResult(name=name, format=self.format, files=[exported]), started)
+
+    @staticmethod
+    def _unseasoned(table: str) -> str:
+        """Rows of ``table`` that no season file would pick up through ``games``."""
+        return (f"SELECT t.* FROM {_quote(table)} t WHERE NOT EXISTS (SELECT 1 FROM games g "
+                f"WHERE g.game_id = t.game_id AND g.season IS NOT NULL AND g.season <> '{UNKNOWN_SEASON}')")
+
+    def _path(self, name: str, season: Optional[str]) -> Path:
+        directory = self.out_dir / name
+        if season is not None:
+            directory = directory / f"season={season}"
+        return directory / f"{name}{EXTENSIONS[self.format]}"
+
+    async def _stream(self, conn: Any, name: str, season: Optional[str], sql: str,
+                      args: List[Any]) -> ExportedFile:
+        """Copy one query's rows to one file, a chunk at a time."""
+        path = self._path(name, season)
+        exported = ExportedFile(path=str(path), season=season)
+        # Server-side cursors need a transaction; a read-only snapshot keeps the file consistent
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            statement = await conn.prepare(sql)
+            sink = _sink(self.format, path, statement.get_attributes())
+            try:
+                cursor = await statement.cursor(*args)
+                while True:
+                    records = await cursor.fetch(self.chunk_rows)
+                    if not records:
+                        break
+                    await asyncio.to_thread(sink.write, records)
+                    exported.rows += len(records)
+            except BaseException:
+                sink.abort()
+                raise
+            await asyncio.to_thread(sink.close)
+        exported.row_groups = sink.row_groups
+        logger.info("Export partition written", name=name, season=season, rows=exported.rows,
+                    row_groups=len(exported.row_groups), path=str(path))
+        return exported
+
+    def _finish(self, result: ExportResult, started: float) -> ExportResult:
+        result.duration_seconds = time.perf_counter() - started
+        manifest = self.out_dir / result.name / "_manifest.json"
+        manifest.parent.mkdir(parents=True, exist_ok=True)
+        manifest.write_text(json.dumps({
+            "name": result.name,
+            "format": result.format,
+            "rows": result.rows,
+            "written_at": datetime.now(UTC).isoformat(),
+            "files": [asdict(f) for f in result.files],
+        }, indent=2))
+        logger.info("Export completed", name=result.name, format=result.format, rows=result.rows,
+                    files=len(result.files), duration_seconds=round(result.duration_seconds, 2))
+        return result
+
+
+def read_npz_export(path: Path) -> Dict[str, np.ma.MaskedArray]:
+    """Columns of an ``.npz`` export, chunks concatenated, nulls masked."""
+    with zipfile.ZipFile(path) as archive:
+        schema = json.loads(archive.read("_schema.json"))
+        members = set(archive.namelist())
+        columns = {}
+        for column in schema["columns"]:
+            parts = []
+            for chunk in range(schema["chunks"]):
+                stem = f"{column['name']}/{chunk:05d}"
+                values = np.lib.format.read_array(io.BytesIO(archive.read(f"{stem}.npy")))
+                mask = (np.lib.format.read_array(io.BytesIO(archive.read(f"{stem}.__null.npy")))
+                        if f"{stem}.__null.npy" in members else np.zeros(len(values), dtype=bool))
+                parts.append(np.ma.MaskedArray(values, mask=mask))
+            columns[column["name"]] = np.ma.concatenate(parts) if parts else np.ma.MaskedArray([])
+    return columns
@@ -3,17 +3,58 @@
 
 import argparse
 import asyncio
+import json
+import shutil
 import sys
 from datetime import datetime, UTC
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-from ..db import get_connection
+from ..db import get_performance_pool
+from ..loaders.partitions import detach_season, truncate_season
+from ..loaders.summaries import SummaryKeys, recompute_summary_keys, summary_keys
 from ..nba_logging import get_logger
-from ..pipelines.foundation import _maybe_transaction
+from ..utils.db import maybe_transaction
 
 logger = get_logger(__name__)
 
+# Tables cleared by a game rollback, children before games: (table, season-partitioned).
+# Derived and analytics rows go with their games, and so does the ingest state that
+# would otherwise mark a re-ingested game as already loaded.
+ROLLBACK_TABLES = (
+    ('pbp_events', True),
+    ('shot_events', True),
+    ('lineup_stints', False),
+    ('adv_metrics', False),
+    ('q1_window_12_8', False),
+    ('early_shocks', False),
+    ('schedule_travel', False),
+    ('outcomes', False),
+    ('team_game_stats', False),
+    ('player_game_impact', False),
+    ('game_results', False),
+    ('player_game_box', False),
+    ('game_ingest_state', False),
+    ('games', False),
+)
+
+# Raw payloads stay on disk, so their bronze state stays valid
+_EXTRA_FILTERS = {
+    'game_ingest_state': "stage <> 'bronze'",
+}
+
+# Per-season running sums; a missing season is rebuilt by the next analytics run
+SEASON_AGGREGATES_TABLE = 'team_season_aggregates'
+
+# Checked up front: a failing DELETE on a missing table would abort the whole transaction
+EXISTING_TABLES_QUERY = """
+SELECT t AS table_name FROM unnest($1::text[]) AS t WHERE to_regclass(t) IS NOT NULL
+"""
+
+GAME_SEASONS_QUERY = "SELECT DISTINCT season FROM games WHERE game_id = ANY($1::text[])"
+
+ARCHIVE_MANIFEST = "manifest.json"
+
 
 class GameRollbackTool:
     """Tool for safely rolling back games and their child records."""
@@ -44,9 +85,10 @@ class GameRollbackTool:
         }
         
         try:
-            async with get_connection() as conn:
+            pool = await get_performance_pool()
+            async with pool.acquire() as conn:
                 # Check what exists before deletion
-                counts_before = await self._get_record_counts(conn, game_id)
+                counts_before = await self._delete_games(conn, [game_id], dry_run=True, archive_dir=None)
                 result['records_before'] = counts_before
                 
                 if not any(counts_before.values()):
@@ -60,44 +102,7 @@ class GameRollbackTool:
                     result['records_deleted'] = counts_before
                     return result
                 
-                # Perform actual deletion in transaction
-                async with _maybe_transaction(conn):
-                    # Delete children first to avoid FK violations
-                    deleted_counts = {}
-                    
-                    # PBP events
-                    deleted_pbp = await conn.execute(
-                        "DELETE FROM pbp_events WHERE game_id = $1", game_id
-                    )
-                    deleted_counts['pbp_events'] = self._extract_delete_count(deleted_pbp)
-                    
-                    # Lineup stints
-                    deleted_lineups = await conn.execute(
-                        "DELETE FROM lineup_stints WHERE game_id = $1", game_id
-                    )
-                    deleted_counts['lineup_stints'] = self._extract_delete_count(deleted_lineups)
-                    
-                    # Shots
-                    deleted_shots = await conn.execute(
-                        "DELETE FROM shots WHERE game_id = $1", game_id
-                    )
-                    deleted_counts['shots'] = self._extract_delete_count(deleted_shots)
-                    
-                    # Advanced metrics (if table exists)
-                    try:
-                        deleted_adv = await conn.execute(
-                            "DELETE FROM adv_metrics WHERE game_id = $1", game_id
-                        )
-                        deleted_counts['adv_metrics'] = self._extract_delete_count(deleted_adv)
-                    except Exception:
-                        # Table might not exist
-                        deleted_counts['adv_metrics'] = 0
-                    
-                    # Finally delete parent game
-                    deleted_game = await conn.execute(
-                        "DELETE FROM games WHERE game_id = $1", game_id
-                    )
-                    deleted_counts['games'] = self._extract_delete_count(deleted_game)
+                deleted_counts = await self._delete_games(conn, [game_id], dry_run=False, archive_dir=None)
                 
                 result['records_deleted'] = deleted_counts
                 result['success'] = True
@@ -115,10 +120,30 @@ class GameRollbackTool:
         
         return result
     
-    async def rollback_multiple_games(self, game_ids: List[str], dry_run: bool = False) -> Dict[str, Any]:
-        """Rollback multiple games with batch logging."""
+    async def rollback_multiple_games(self, game_ids: List[str], dry_run: bool = False,
+                                      batch_size: Optional[int] = None,
+                                      archive: bool = False) -> Dict[str, Any]:
+        """Rollback many games with set-based deletes, one transaction per batch.
+
+        Each table in ROLLBACK_TABLES is cleared with one
+        ``DELETE ... WHERE game_id = ANY($1)`` per batch, children before
+        games, and counted from the rows the statement returns. A failed
+        batch rolls back as a whole and its games are reported as failed.
+
+        Args:
+            game_ids: Games to rollback
+            dry_run: If True, only count what would be deleted
+            batch_size: Games per transaction (default: all in one)
+            archive: Save the deleted rows under the ops dir so
+                :meth:`restore_archive` can put them back; a batch's archive
+                directory only appears once its transaction has committed
+
+        Returns:
+            Dictionary with batch rollback results
+        """
         logger.info(f"{'DRY RUN: ' if dry_run else ''}Rolling back {len(game_ids)} games")
         
+        game_ids = list(dict.fromkeys(game_ids))
         results = {
             'total_games': len(game_ids),
             'successful_rollbacks': 0,
@@ -126,73 +151,280 @@ class GameRollbackTool:
             'dry_run': dry_run,
             'timestamp': datetime.now(UTC).isoformat(),
             'total_records_deleted': {},
-            'failed_games': []
+            'failed_games': [],
+            'archives': []
         }
         
-        for game_id in game_ids:
+        batch_size = batch_size or max(len(game_ids), 1)
+        pool = await get_performance_pool()
+        for start in range(0, len(game_ids), batch_size):
+            batch = game_ids[start:start + batch_size]
+            archive_dir = staging_dir = None
+            if archive and not dry_run:
+                archive_dir = self.ops_dir / "rollback_archive" / (
+                    f"{datetime.now(UTC).strftime('%Y%m%dT%H%M%S%f')}_{len(results['archives']):03d}"
+                )
+                staging_dir = _staging_dir(archive_dir)
             try:
-                game_result = await self.rollback_game(game_id, dry_run)
-                
-                if game_result['success']:
-                    results['successful_rollbacks'] += 1
-                    # Accumulate deleted record counts
-                    for table, count in game_result.get('records_deleted', {}).items():
-                        results['total_records_deleted'][table] = (
-                            results['total_records_deleted'].get(table, 0) + count
-                        )
-                else:
-                    results['failed_rollbacks'] += 1
-                    results['failed_games'].append({
-                        'game_id': game_id,
-                        'error': game_result.get('error', 'Unknown error')
-                    })
-                
+                async with pool.acquire() as conn:
+                    deleted_counts = await self._delete_games(conn, batch, dry_run, staging_dir)
+                if staging_dir is not None:
+                    # Committed: publish the archive under its final name
+                    self._write_archive_manifest(staging_dir, batch, deleted_counts)
+                    staging_dir.rename(archive_dir)
             except Exception as e:
-                logger.error(f"Exception rolling back game {game_id}: {e}")
-                results['failed_rollbacks'] += 1
-                results['failed_games'].append({
-                    'game_id': game_id,
-                    'error': str(e)
-                })
+                logger.error(f"❌ Batch rollback failed for {len(batch)} games: {e}")
+                if staging_dir is not None:
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                results['failed_rollbacks'] += len(batch)
+                results['failed_games'].extend({'game_id': game_id, 'error': str(e)} for game_id in batch)
+                continue
+            
+            results['successful_rollbacks'] += len(batch)
+            for table, count in deleted_counts.items():
+                results['total_records_deleted'][table] = (
+                    results['total_records_deleted'].get(table, 0) + count
+                )
+            if archive_dir is not None:
+                results['archives'].append(str(archive_dir))
         
         # Write batch rollback log
         await self._write_batch_rollback_log(results)
         
         return results
     
-    async def _get_record_counts(self, conn, game_id: str) -> Dict[str, int]:
-        """Get current record counts for a game across all tables."""
-        counts = {}
-        
-        # Count games
-        counts['games'] = await conn.fetchval(
-            "SELECT COUNT(*) FROM games WHERE game_id = $1", game_id
+    async def _delete_games(self, conn, game_ids: List[str], dry_run: bool,
+                            archive_dir: Optional[Path]) -> Dict[str, int]:
+        """Delete (or count) every row of ``game_ids`` in one transaction; returns counts per table.
+
+        Season summaries the games fed are recomputed without them, and their
+        ``team_season_aggregates`` rows are dropped for the analytics pipeline
+        to rebuild; neither is archived, :meth:`restore_archive` redoes both.
+        """
+        tables = await conn.fetch(
+            EXISTING_TABLES_QUERY, [table for table, _ in ROLLBACK_TABLES] + [SEASON_AGGREGATES_TABLE]
         )
+        present = {row['table_name'] for row in tables}
         
-        # Count PBP events
-        counts['pbp_events'] = await conn.fetchval(
-            "SELECT COUNT(*) FROM pbp_events WHERE game_id = $1", game_id
+        counts = {}
+        async with maybe_transaction(conn):
+            # Read before the per-game rows go
+            seasons = await self._stored_seasons(conn, game_ids, present)
+            keys = await self._summary_keys(conn, game_ids, present)
+            aggregate_seasons = (
+                [row['season'] for row in await conn.fetch(GAME_SEASONS_QUERY, game_ids)]
+                if 'games' in present else []
+            )
+            
+            for table, partitioned in ROLLBACK_TABLES:
+                if table not in present:
+                    counts[table] = 0
+                    continue
+                where, args = "game_id = ANY($1::text[])", [game_ids]
+                if table in _EXTRA_FILTERS:
+                    where += f" AND {_EXTRA_FILTERS[table]}"
+                if partitioned and seasons:
+                    # Prunes to the seasons the rows are actually stored under
+                    where, args = where + " AND season = ANY($2::text[])", args + [seasons]
+                
+                if dry_run:
+                    counts[table] = await conn.fetchval(f"SELECT COUNT(*) FROM {table} WHERE {where}", *args)
+                elif archive_dir is None:
+                    counts[table] = await conn.fetchval(
+                        f"WITH deleted AS (DELETE FROM {table} WHERE {where} RETURNING 1) "
+                        f"SELECT COUNT(*) FROM deleted", *args
+                    )
+                else:
+                    counts[table] = await self._delete_and_archive(conn, table, where, args, archive_dir)
+            
+            if not dry_run:
+                await recompute_summary_keys(conn, keys)
+            if SEASON_AGGREGATES_TABLE in present:
+                counts[SEASON_AGGREGATES_TABLE] = await self._invalidate_season_aggregates(
+                    conn, aggregate_seasons, dry_run)
+        return counts
+    
+    async def _stored_seasons(self, conn, game_ids: List[str], present) -> List[str]:
+        """Seasons the games' event rows are stored under, as the loaders resolved them."""
+        sources = [table for table, partitioned in ROLLBACK_TABLES if partitioned and table in present]
+        if not sources:
+            return []
+        query = " UNION ".join(
+            f"SELECT season FROM {table} WHERE game_id = ANY($1::text[])" for table in sources
         )
-        
-        # Count lineup stints
-        counts['lineup_stints'] = await conn.fetchval(
-            "SELECT COUNT(*) FROM lineup_stints WHERE game_id = $1", game_id
+        return sorted(row['season'] for row in await conn.fetch(query, game_ids))
+    
+    async def _summary_keys(self, conn, game_ids: List[str], present) -> SummaryKeys:
+        if not {'game_results', 'player_game_box'} <= present:
+            return SummaryKeys()
+        return await summary_keys(conn, game_ids)
+    
+    async def _invalidate_season_aggregates(self, conn, seasons: List[str], dry_run: bool) -> int:
+        """Drop (or count) the running sums of ``seasons`` so they get rebuilt from what is left."""
+        if not seasons:
+            return 0
+        where = "season = ANY($1::text[])"
+        if dry_run:
+            return await conn.fetchval(f"SELECT COUNT(*) FROM {SEASON_AGGREGATES_TABLE} WHERE {where}", seasons)
+        return await conn.fetchval(
+            f"WITH deleted AS (DELETE FROM {SEASON_AGGREGATES_TABLE} WHERE {where} RETURNING 1) "
+            f"SELECT COUNT(*) FROM deleted", seasons
         )
-        
-        # Count shots
-        counts['shots'] = await conn.fetchval(
-            "SELECT COUNT(*) FROM shots WHERE game_id = $1", game_id
+    
+    async def _delete_and_archive(self, conn, table: str, where: str, args: List[Any],
+                                  archive_dir: Path) -> int:
+        """Delete into a temp table and dump it as binary COPY, so archive and delete see the same rows."""
+        stage = f"_rollback_{table}"
+        await conn.execute(f"CREATE TEMP TABLE {stage} (LIKE {table}) ON COMMIT DROP")
+        moved = await conn.execute(
+            f"WITH deleted AS (DELETE FROM {table} WHERE {where} RETURNING *) "
+            f"INSERT INTO {stage} SELECT * FROM deleted", *args
         )
-        
-        # Count advanced metrics (if table exists)
-        try:
-            counts['adv_metrics'] = await conn.fetchval(
-                "SELECT COUNT(*) FROM adv_metrics WHERE game_id = $1", game_id
+        count = self._extract_insert_count(moved)
+        if count:
+            archive_dir.mkdir(parents=True, exist_ok=True)
+            await conn.copy_from_table(stage, output=str(archive_dir / f"{table}.copy"), format='binary')
+        return count
+    
+    def _write_archive_manifest(self, archive_dir: Path, game_ids: List[str],
+                                counts: Dict[str, int]) -> None:
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            'created_at': datetime.now(UTC).isoformat(),
+            'game_ids': game_ids,
+            # Restore order: parents first
+            'tables': [{'table': table, 'rows': counts[table]}
+                       for table, _ in reversed(ROLLBACK_TABLES) if counts.get(table)],
+        }
+        (archive_dir / ARCHIVE_MANIFEST).write_text(json.dumps(manifest, indent=2))
+    
+    async def restore_archive(self, archive_dir: str) -> Dict[str, int]:
+        """Reinsert rows saved by ``rollback_multiple_games(archive=True)``, in one transaction.
+
+        The season summaries the games feed are recomputed with them and
+        their ``team_season_aggregates`` rows dropped for a rebuild.
+
+        Returns:
+            Rows restored per table
+        """
+        archive_path = Path(archive_dir)
+        manifest = json.loads((archive_path / ARCHIVE_MANIFEST).read_text())
+        game_ids = manifest['game_ids']
+        restored = {}
+        pool = await get_performance_pool()
+        async with pool.acquire() as conn:
+            tables = await conn.fetch(
+                EXISTING_TABLES_QUERY, ['game_results', 'player_game_box', SEASON_AGGREGATES_TABLE]
             )
-        except Exception:
-            counts['adv_metrics'] = 0
-        
-        return counts
+            present = {row['table_name'] for row in tables}
+            async with maybe_transaction(conn):
+                for entry in manifest['tables']:
+                    table = entry['table']
+                    status = await conn.copy_to_table(
+                        table, source=str(archive_path / f"{table}.copy"), format='binary'
+                    )
+                    restored[table] = self._extract_copy_count(status)
+                
+                await recompute_summary_keys(conn, await self._summary_keys(conn, game_ids, present))
+                if SEASON_AGGREGATES_TABLE in present:
+                    seasons = [row['season'] for row in await conn.fetch(GAME_SEASONS_QUERY, game_ids)]
+                    await self._invalidate_season_aggregates(conn, seasons, dry_run=False)
+        logger.info(f"✅ Restored {sum(restored.values())} records from {archive_path}", tables=restored)
+        return restored
+    
+    async def rollback_season(self, season: str, dry_run: bool = False,
+                              keep_backup: bool = False) -> Dict[str, Any]:
+        """Rollback a whole season by emptying its event partitions.
+
+        pbp_events and shot_events lose the season's partitions in one
+        statement each (truncated, or detached into backup tables with
+        ``keep_backup`` so :func:`loaders.partitions.restore_season` can
+        bring them back); the remaining child tables and games are deleted
+        by season.
+
+        Args:
+            season: Season to rollback (e.g. '2023-24')
+            dry_run: If True, only count the season's games
+            keep_backup: Detach the partitions instead of truncating them
+
+        Returns:
+            Dictionary with rollback results
+        """
+        logger.info(f"{'DRY RUN: ' if dry_run else ''}Rolling back season {season}")
+
+        result = {
+            'game_id': f"season {season}",
+            'season': season,
+            'dry_run': dry_run,
+            'timestamp': datetime.now(UTC).isoformat(),
+            'records_deleted': {},
+            'partitions': [],
+            'backups': {},
+            'success': False,
+            'error': None
+        }
+
+        try:
+            pool = await get_performance_pool()
+            async with pool.acquire() as conn:
+                if dry_run:
+                    games = await conn.fetchval("SELECT COUNT(*) FROM games WHERE season = $1", season)
+                    result['records_deleted'] = {'games': games}
+                    result['success'] = True
+                    return result
+
+                async with maybe_transaction(conn):
+                    deleted_counts = {}
+                    if keep_backup:
+                        result['backups'] = await detach_season(conn, season)
+                    else:
+                        result['partitions'] = await truncate_season(conn, season)
+
+                    for table in ('lineup_stints', 'adv_metrics'):
+                        try:
+                            deleted = await conn.execute(
+                                f"DELETE FROM {table} WHERE game_id IN "
+                                f"(SELECT game_id FROM games WHERE season = $1)", season
+                            )
+                            deleted_counts[table] = self._extract_delete_count(deleted)
+                        except Exception:
+                            # Table might not exist
+                            deleted_counts[table] = 0
+
+                    deleted_games = await conn.execute("DELETE FROM games WHERE season = $1", season)
+                    deleted_counts['games'] = self._extract_delete_count(deleted_games)
+
+                result['records_deleted'] = deleted_counts
+                result['success'] = True
+                logger.info(f"✅ Rolled back season {season}",
+                            partitions=result['partitions'], backups=result['backups'])
+
+        except Exception as e:
+            logger.error(f"❌ Rollback failed for season {season}: {e}")
+            result['error'] = str(e)
+            result['success'] = False
+
+        await self._write_rollback_log(result)
+
+        return result
+
+    def _extract_insert_count(self, insert_result: str) -> int:
+        """Extract number of inserted rows from an INSERT result ("INSERT 0 n")."""
+        if isinstance(insert_result, str) and insert_result.startswith('INSERT '):
+            try:
+                return int(insert_result.split(' ')[2])
+            except (IndexError, ValueError):
+                return 0
+        return 0
+    
+    def _extract_copy_count(self, copy_result: str) -> int:
+        """Extract number of copied rows from a COPY result ("COPY n")."""
+        if isinstance(copy_result, str) and copy_result.startswith('COPY '):
+            try:
+                return int(copy_result.split(' ')[1])
+            except (IndexError, ValueError):
+                return 0
+        return 0
     
     def _extract_delete_count(self, delete_result: str) -> int:
         """Extract number of deleted rows from DELETE result."""
@@ -249,17 +481,34 @@ Failed games:
         for failed_game in results.get('failed_games', []):
             log_content += f"- {failed_game['game_id']}: {failed_game['error']}\n"
         
+        for archive_dir in results.get('archives', []):
+            log_content += f"Archived: {archive_dir}\n"
+        
         log_content += "\n"
         
         with open(log_file, 'a') as f:
             f.write(log_content)
 
 
+def _staging_dir(archive_dir: Path) -> Path:
+    """Hidden sibling an archive is written to until its rollback commits."""
+    return archive_dir.with_name(f".{archive_dir.name}.tmp")
+
+
 async def main():
     """CLI entry point for game rollback tool."""
     parser = argparse.ArgumentParser(description="Rollback NBA games and their child records")
     parser.add_argument("--game-id", help="Single game ID to rollback")
     parser.add_argument("--game-ids-file", help="File with game IDs (one per line)")
+    parser.add_argument("--season", help="Whole season to rollback (e.g. 2023-24)")
+    parser.add_argument("--keep-backup", action="store_true",
+                       help="With --season, detach partitions into backup tables instead of truncating")
+    parser.add_argument("--batch-size", type=int,
+                       help="With --game-ids-file, games per transaction (default: all in one)")
+    parser.add_argument("--archive", action="store_true",
+                       help="With --game-ids-file, save deleted rows under the ops dir for --restore")
+    parser.add_argument("--restore", metavar="ARCHIVE_DIR",
+                       help="Reinsert the rows saved in an archive directory")
     parser.add_argument("--dry-run", action="store_true", 
                        help="Show what would be deleted without actually deleting")
     parser.add_argument("--ops-dir", default="./ops",
@@ -267,14 +516,20 @@ async def main():
     
     args = parser.parse_args()
     
-    if not args.game_id and not args.game_ids_file:
-        parser.error("Must specify either --game-id or --game-ids-file")
+    if not (args.game_id or args.game_ids_file or args.season or args.restore):
+        parser.error("Must specify one of --game-id, --game-ids-file, --season or --restore")
     
     # Create rollback tool
     tool = GameRollbackTool(ops_dir=args.ops_dir)
     
     try:
-        if args.game_id:
+        if args.restore:
+            restored = await tool.restore_archive(args.restore)
+            print(f"✅ Restored {sum(restored.values())} records from {args.restore}")
+            for table, count in restored.items():
+                print(f"   {table}: {count}")
+        
+        elif args.game_id:
             # Single game rollback
             result = await tool.rollback_game(args.game_id, dry_run=args.dry_run)
             
@@ -289,6 +544,20 @@ async def main():
                 print(f"❌ Rollback failed for game {args.game_id}: {result.get('error', 'Unknown error')}")
                 sys.exit(1)
         
+        elif args.season:
+            result = await tool.rollback_season(args.season, dry_run=args.dry_run,
+                                                keep_backup=args.keep_backup)
+
+            if not result['success']:
+                print(f"❌ Rollback failed for season {args.season}: {result.get('error', 'Unknown error')}")
+                sys.exit(1)
+            print(f"✅ {'DRY RUN: Would roll back' if args.dry_run else 'Rolled back'} season {args.season}")
+            for table, count in result['records_deleted'].items():
+                if count > 0:
+                    print(f"   {table}: {count}")
+            for table, backup in result['backups'].items():
+                print(f"   {table} kept as {backup}")
+
         elif args.game_ids_file:
             # Multi-game rollback
             game_ids_file = Path(args.game_ids_file)
@@ -303,7 +572,8 @@ async def main():
                 print(f"❌ No game IDs found in file: {game_ids_file}")
                 sys.exit(1)
             
-            result = await tool.rollback_multiple_games(game_ids, dry_run=args.dry_run)
+            result = await tool.rollback_multiple_games(game_ids, dry_run=args.dry_run,
+                                                        batch_size=args.batch_size, archive=args.archive)
             
             successful = result['successful_rollbacks']
             failed = result['failed_rollbacks']
@@ -312,6 +582,8 @@ async def main():
             print(f"✅ Batch rollback complete: {successful} successful, {failed} failed")
             if total_deleted > 0:
                 print(f"   {'Would delete' if args.dry_run else 'Deleted'} {total_deleted} total records")
+            for archive_dir in result['archives']:
+                print(f"   Archived to {archive_dir} (restore with --restore {archive_dir})")
             
             if failed > 0:
                 print(f"⚠️  {failed} games failed - check ops logs")
@@ -1,13 +1,25 @@
 """Early shocks transformer for detecting Q1 disruption events."""
 
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from collections import defaultdict, Counter
 from dataclasses import dataclass
 
+import numpy as np
+
+from ..models.pbp_frame import (
+    DESC_FLAGRANT,
+    DESC_FLAGRANT_1,
+    DESC_FLAGRANT_2,
+    DESC_INJURY,
+    DESC_TECHNICAL,
+    DESC_UNSPORTSMANLIKE,
+    PbpFrame,
+)
 from ..models.pbp_rows import PbpEventRow
 from ..models.derived_rows import EarlyShockRow
 from ..models.enums import EarlyShockType, EventType
 from ..nba_logging import get_logger
+from .possessions import ensure_possessions, possession_starts
 
 logger = get_logger(__name__)
 
@@ -21,13 +33,71 @@ class PlayerFoulTracker:
 
 
 @dataclass
-class InjuryTracker:
-    """Track potential injury events."""
-    event_idx: int
-    seconds_elapsed: float
-    team_tricode: str
-    player_slug: str
-    last_seen_event_idx: Optional[int] = None
+class Q1EventIndex:
+    """Per-game lookups over a chronologically sorted Q1 PbpFrame.
+    
+    Built with array operations so every detector query is O(1) or O(log n)
+    instead of a rescan of the events. Possessions come from the frame's
+    possession annotations.
+    """
+    position: Dict[int, int]  # event_idx -> first position in the sorted events
+    possession_prefix: np.ndarray  # possession_prefix[i] = possessions started in events[:i]
+    possession_positions: np.ndarray  # positions of events that start a possession
+    last_seen: np.ndarray  # player code -> largest event_idx naming the player (-1 if never)
+    substitutions: Dict[int, np.ndarray]  # player code -> positions where the player is subbed out
+    
+    @classmethod
+    def build(cls, q1: PbpFrame) -> "Q1EventIndex":
+        unique_idx, first_pos = np.unique(q1.event_idx, return_index=True)
+        position = dict(zip(unique_idx.tolist(), first_pos.tolist()))
+        
+        is_change = possession_starts(ensure_possessions(q1))
+        possession_prefix = np.concatenate(([0], np.cumsum(is_change)))
+        
+        last_seen = np.full(len(q1.players), -1, dtype=np.int64)
+        for slot in (q1.player1, q1.player2, q1.player3):
+            named = slot >= 0
+            np.maximum.at(last_seen, slot[named], q1.event_idx[named])
+        
+        subs = np.flatnonzero(q1.type_mask(EventType.SUBSTITUTION) & (q1.player1 >= 0))
+        substitutions: Dict[int, List[int]] = defaultdict(list)
+        for pos, player in zip(subs.tolist(), q1.player1[subs].tolist()):
+            substitutions[player].append(pos)
+        
+        return cls(
+            position=position,
+            possession_prefix=possession_prefix,
+            possession_positions=np.flatnonzero(is_change),
+            last_seen=last_seen,
+            substitutions={player: np.array(positions) for player, positions in substitutions.items()},
+        )
+    
+    def possessions_since(self, event_idx: int) -> int:
+        """Possessions started after the given event (0 if the event is unknown)."""
+        pos = self.position.get(event_idx)
+        if pos is None:
+            return 0
+        return int(self.possession_prefix[-1] - self.possession_prefix[pos + 1])
+    
+    def subbed_out_within_possession(self, event_idx: int, player: int) -> bool:
+        """Whether the player is subbed out before the second possession after the event starts."""
+        pos = self.position.get(event_idx)
+        subs = self.substitutions.get(player)
+        if pos is None or subs is None:
+            return False
+        
+        # The window ends where the second possession after the event starts
+        changes = self.possession_positions
+        nxt = int(np.searchsorted(changes, pos, side="right"))
+        end = changes[nxt + 1] if nxt + 1 < len(changes) else len(self.possession_prefix) - 1
+        
+        first_sub = int(np.searchsorted(subs, pos, side="right"))
+        return first_sub < len(subs) and bool(subs[first_sub] < end)
+    
+    def last_appearance_after(self, event_idx: int, player: int) -> Optional[int]:
+        """event_idx of the player's last appearance if it comes after the given event."""
+        last = int(self.last_seen[player]) if 0 <= player < len(self.last_seen) else -1
+        return last if last > event_idx else None
 
 
 class EarlyShocksTransformer:
@@ -43,38 +113,37 @@ class EarlyShocksTransformer:
         self.source = source
         self.early_foul_threshold_sec = early_foul_threshold_sec
     
-    def transform(self, pbp_events: List[PbpEventRow], source_url: str) -> List[EarlyShockRow]:
+    def transform(
+        self, pbp_events: Union[List[PbpEventRow], PbpFrame], source_url: str
+    ) -> List[EarlyShockRow]:
         """Transform PBP events into early shock rows.
         
+        Builds the per-game Q1 index once, then runs all detectors in a single
+        pass over the candidate events; cost is linear in the number of Q1 events.
+        
         Args:
-            pbp_events: List of play-by-play events
+            pbp_events: Play-by-play events for one game, as rows or a PbpFrame
             source_url: Source URL for provenance
             
         Returns:
             List of early shock events
         """
-        if not pbp_events:
+        frame = pbp_events if isinstance(pbp_events, PbpFrame) else PbpFrame.from_rows(pbp_events or [])
+        if not len(frame):
             return []
         
-        game_id = pbp_events[0].game_id
-        logger.debug("Processing early shocks", game_id=game_id, total_events=len(pbp_events))
+        game_id = frame.game_id_at(0)
+        logger.debug("Processing early shocks", game_id=game_id, total_events=len(frame))
         
-        # Filter to Q1 events only
-        q1_events = [e for e in pbp_events if e.period == 1]
-        if not q1_events:
+        # Q1 events only, in chronological (event index) order
+        frame = ensure_possessions(frame)
+        q1 = np.flatnonzero(frame.period == 1)
+        if not len(q1):
             logger.debug("No Q1 events found", game_id=game_id)
             return []
+        q1 = frame.take(q1[np.argsort(frame.event_idx[q1], kind="stable")])
         
-        # Sort by event index to ensure chronological order
-        q1_events.sort(key=lambda x: x.event_idx)
-        
-        early_shocks = []
-        
-        # Track various shock types
-        early_shocks.extend(self._detect_early_foul_trouble(q1_events, source_url))
-        early_shocks.extend(self._detect_technical_fouls(q1_events, source_url))
-        early_shocks.extend(self._detect_flagrant_fouls(q1_events, source_url))
-        early_shocks.extend(self._detect_injury_leaves(q1_events, source_url))
+        early_shocks = self._scan(q1, Q1EventIndex.build(q1), game_id, source_url)
         
         logger.debug("Early shocks detected", 
                     game_id=game_id, 
@@ -83,355 +152,157 @@ class EarlyShocksTransformer:
         
         return early_shocks
     
-    def _detect_early_foul_trouble(self, q1_events: List[PbpEventRow], source_url: str) -> List[EarlyShockRow]:
-        """Detect players with two personal fouls early in Q1."""
-        foul_trackers = defaultdict(lambda: PlayerFoulTracker([], "", ""))
-        early_shocks = []
-        
-        for event in q1_events:
-            # Convert seconds_elapsed to float for comparison
-            try:
-                if event.seconds_elapsed is None:
-                    continue
-                    
-                if isinstance(event.seconds_elapsed, str):
-                    seconds_elapsed = float(event.seconds_elapsed)
-                else:
-                    seconds_elapsed = event.seconds_elapsed
-            except (ValueError, TypeError):
-                # Skip events with invalid time data
-                logger.warning(f"Invalid seconds_elapsed value: {event.seconds_elapsed} (type: {type(event.seconds_elapsed)}) for game {event.game_id}")
-                continue
-                
-            if seconds_elapsed > self.early_foul_threshold_sec:
-                continue
-                
-            # Track personal fouls (not technical/flagrant)
-            if (event.event_type == EventType.FOUL and 
-                event.player1_name_slug and 
-                event.team_tricode and
-                not self._is_technical_or_flagrant_foul(event)):
-                
-                player_key = (event.team_tricode, event.player1_name_slug)
-                tracker = foul_trackers[player_key]
-                tracker.team_tricode = event.team_tricode
-                tracker.player_slug = event.player1_name_slug
-                tracker.fouls.append((seconds_elapsed, event.event_idx))
-                
-                # Check if this is the second foul in the early window
-                if len(tracker.fouls) == 2:
-                    # Verify both fouls are within threshold
-                    if all(foul_time <= self.early_foul_threshold_sec for foul_time, _ in tracker.fouls):
-                        # Check for immediate substitution
-                        immediate_sub = self._check_immediate_substitution(
-                            q1_events, event.event_idx, event.player1_name_slug
-                        )
-                        
-                        early_shock = EarlyShockRow(
-                            game_id=event.game_id,
-                            team_tricode=event.team_tricode,
-                            player_slug=event.player1_name_slug,
-                            shock_type=EarlyShockType.TWO_PF_EARLY,
-                            shock_seq=1,  # Only one TWO_PF_EARLY per player
-                            period=1,
-                            clock_hhmmss=self._format_clock(seconds_elapsed),
-                            event_idx_start=tracker.fouls[0][1],
-                            event_idx_end=tracker.fouls[1][1],
-                            immediate_sub=immediate_sub,
-                            poss_since_event=self._count_possessions_since(q1_events, event.event_idx),
-                            notes=f"2 PF in {seconds_elapsed:.1f}s",
-                            source=self.source,
-                            source_url=source_url
-                        )
-                        early_shocks.append(early_shock)
+    def transform_batch(self, frame: PbpFrame, source_url: str) -> List[EarlyShockRow]:
+        """Early shock rows for every game in a multi-game frame.
         
+        Possessions are annotated once for the whole batch; each game is then
+        scanned on its own.
+        """
+        frame = ensure_possessions(frame)
+        early_shocks: List[EarlyShockRow] = []
+        for _, game in frame.split_games():
+            early_shocks.extend(self.transform(game, source_url))
         return early_shocks
     
-    def _detect_technical_fouls(self, q1_events: List[PbpEventRow], source_url: str) -> List[EarlyShockRow]:
-        """Detect technical fouls in Q1."""
-        early_shocks = []
-        tech_sequences = defaultdict(int)
+    def _scan(self, q1: PbpFrame, index: Q1EventIndex, game_id: str,
+              source_url: str, min_absent_possessions: int = 6) -> List[EarlyShockRow]:
+        """Run every detector in one pass over the candidate Q1 events.
         
-        for event in q1_events:
-            # FIXED: Check for EventType.TECHNICAL_FOUL first, then description
-            is_technical = (event.event_type == EventType.TECHNICAL_FOUL or
-                           self._is_technical_foul(event))
+        Output order matches running the detectors one after another: foul
+        trouble, technicals, flagrants, then injury leaves.
+        """
+        named = (q1.player1 >= 0) & (q1.team >= 0)
+        seconds = q1.seconds_elapsed
+        
+        is_personal_foul_early = (
+            q1.type_mask(EventType.FOUL) & named
+            & ~np.isnan(seconds) & (seconds <= self.early_foul_threshold_sec)
+            & ~q1.type_mask(EventType.TECHNICAL_FOUL, EventType.FLAGRANT_FOUL)
+            & ~q1.flag_mask(DESC_TECHNICAL | DESC_FLAGRANT | DESC_UNSPORTSMANLIKE)
+        )
+        is_technical = q1.type_mask(EventType.TECHNICAL_FOUL) | q1.flag_mask(DESC_TECHNICAL)
+        is_flagrant = (q1.type_mask(EventType.FLAGRANT_FOUL) | q1.flag_mask(DESC_FLAGRANT)) & named
+        is_injury = q1.flag_mask(DESC_INJURY) & named
+        candidates = np.flatnonzero(is_personal_foul_early | is_technical | is_flagrant | is_injury)
+        
+        foul_trackers: Dict[Tuple[int, int], PlayerFoulTracker] = {}
+        tech_sequences: Dict[Tuple[str, str], int] = defaultdict(int)
+        flagrant_sequences: Dict[Tuple[str, str], int] = defaultdict(int)
+        foul_trouble: List[EarlyShockRow] = []
+        technicals: List[EarlyShockRow] = []
+        flagrants: List[EarlyShockRow] = []
+        injuries: List[EarlyShockRow] = []
+        
+        for pos in candidates.tolist():
+            event_idx = int(q1.event_idx[pos])
+            player = int(q1.player1[pos])
+            player_slug = q1.players[player]
+            team_tricode = q1.team_at(pos)
+            seconds_elapsed = q1.seconds_at(pos)
+            elapsed_or_zero = 0.0 if seconds_elapsed is None else seconds_elapsed
             
-            if is_technical:
-                player_slug = event.player1_name_slug or "TEAM"
-                team_tricode = event.team_tricode or "UNK"
+            # Two personal fouls (not technical/flagrant) inside the early window
+            if is_personal_foul_early[pos]:
+                player_key = (int(q1.team[pos]), player)
+                tracker = foul_trackers.get(player_key)
+                if tracker is None:
+                    tracker = foul_trackers[player_key] = PlayerFoulTracker([], team_tricode, player_slug)
+                tracker.fouls.append((seconds_elapsed, event_idx))
                 
-                # Convert seconds_elapsed to float for consistency
-                try:
-                    if event.seconds_elapsed is None:
-                        seconds_elapsed = 0.0
-                    elif isinstance(event.seconds_elapsed, str):
-                        seconds_elapsed = float(event.seconds_elapsed)
-                    else:
-                        seconds_elapsed = event.seconds_elapsed
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid seconds_elapsed value: {event.seconds_elapsed} for game {event.game_id}")
-                    seconds_elapsed = 0.0
-                
-                # Increment sequence for this player/team
-                shock_key = (team_tricode, player_slug)
+                # Only the second foul triggers (one TWO_PF_EARLY per player)
+                if len(tracker.fouls) == 2:
+                    foul_trouble.append(EarlyShockRow(
+                        game_id=game_id,
+                        team_tricode=team_tricode,
+                        player_slug=player_slug,
+                        shock_type=EarlyShockType.TWO_PF_EARLY,
+                        shock_seq=1,
+                        period=1,
+                        clock_hhmmss=self._format_clock(seconds_elapsed),
+                        event_idx_start=tracker.fouls[0][1],
+                        event_idx_end=tracker.fouls[1][1],
+                        immediate_sub=index.subbed_out_within_possession(event_idx, player),
+                        poss_since_event=index.possessions_since(event_idx),
+                        notes=f"2 PF in {seconds_elapsed:.1f}s",
+                        source=self.source,
+                        source_url=source_url
+                    ))
+            
+            if is_technical[pos]:
+                shock_key = (team_tricode or "UNK", player_slug or "TEAM")
                 tech_sequences[shock_key] += 1
                 
-                immediate_sub = False
-                if player_slug != "TEAM" and event.player1_name_slug:
-                    immediate_sub = self._check_immediate_substitution(
-                        q1_events, event.event_idx, event.player1_name_slug
-                    )
-                
-                early_shock = EarlyShockRow(
-                    game_id=event.game_id,
-                    team_tricode=team_tricode,
-                    player_slug=player_slug,
+                technicals.append(EarlyShockRow(
+                    game_id=game_id,
+                    team_tricode=shock_key[0],
+                    player_slug=shock_key[1],
                     shock_type=EarlyShockType.TECH,
                     shock_seq=tech_sequences[shock_key],
                     period=1,
-                    clock_hhmmss=self._format_clock(seconds_elapsed),
-                    event_idx_start=event.event_idx,
-                    immediate_sub=immediate_sub,
-                    poss_since_event=self._count_possessions_since(q1_events, event.event_idx),
+                    clock_hhmmss=self._format_clock(elapsed_or_zero),
+                    event_idx_start=event_idx,
+                    immediate_sub=player_slug is not None and index.subbed_out_within_possession(event_idx, player),
+                    poss_since_event=index.possessions_since(event_idx),
                     notes="Technical foul",
                     source=self.source,
                     source_url=source_url
-                )
-                early_shocks.append(early_shock)
-        
-        return early_shocks
-    
-    def _detect_flagrant_fouls(self, q1_events: List[PbpEventRow], source_url: str) -> List[EarlyShockRow]:
-        """Detect flagrant fouls in Q1."""
-        early_shocks = []
-        flagrant_sequences = defaultdict(int)
-        
-        for event in q1_events:
-            # FIXED: Check for EventType.FLAGRANT_FOUL first, then description
-            is_flagrant = (event.event_type == EventType.FLAGRANT_FOUL or
-                          self._is_flagrant_foul(event))
+                ))
             
-            if is_flagrant:
-                if not event.player1_name_slug or not event.team_tricode:
-                    continue
-                
-                # Convert seconds_elapsed to float for consistency
-                try:
-                    if event.seconds_elapsed is None:
-                        seconds_elapsed = 0.0
-                    elif isinstance(event.seconds_elapsed, str):
-                        seconds_elapsed = float(event.seconds_elapsed)
-                    else:
-                        seconds_elapsed = event.seconds_elapsed
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid seconds_elapsed value: {event.seconds_elapsed} for game {event.game_id}")
-                    seconds_elapsed = 0.0
-                
-                shock_key = (event.team_tricode, event.player1_name_slug)
+            if is_flagrant[pos]:
+                shock_key = (team_tricode, player_slug)
                 flagrant_sequences[shock_key] += 1
                 
-                immediate_sub = self._check_immediate_substitution(
-                    q1_events, event.event_idx, event.player1_name_slug
-                )
-                
-                early_shock = EarlyShockRow(
-                    game_id=event.game_id,
-                    team_tricode=event.team_tricode,
-                    player_slug=event.player1_name_slug,
+                flagrants.append(EarlyShockRow(
+                    game_id=game_id,
+                    team_tricode=team_tricode,
+                    player_slug=player_slug,
                     shock_type=EarlyShockType.FLAGRANT,
                     shock_seq=flagrant_sequences[shock_key],
                     period=1,
-                    clock_hhmmss=self._format_clock(seconds_elapsed),
-                    event_idx_start=event.event_idx,
-                    immediate_sub=immediate_sub,
-                    poss_since_event=self._count_possessions_since(q1_events, event.event_idx),
-                    notes=self._extract_flagrant_type(event),
+                    clock_hhmmss=self._format_clock(elapsed_or_zero),
+                    event_idx_start=event_idx,
+                    immediate_sub=index.subbed_out_within_possession(event_idx, player),
+                    poss_since_event=index.possessions_since(event_idx),
+                    notes=self._extract_flagrant_type(int(q1.desc_flags[pos])),
                     source=self.source,
                     source_url=source_url
-                )
-                early_shocks.append(early_shock)
-        
-        return early_shocks
-    
-    def _detect_injury_leaves(self, q1_events: List[PbpEventRow], source_url: str, 
-                            min_absent_possessions: int = 6) -> List[EarlyShockRow]:
-        """Detect players who leave due to injury and don't return for several possessions."""
-        early_shocks = []
-        
-        # Find potential injury events (look for injury-related keywords in descriptions)
-        injury_events = []
-        for event in q1_events:
-            if (event.description and 
-                any(keyword in event.description.lower() for keyword in 
-                    ['injury', 'hurt', 'twisted', 'sprain', 'strain', 'collision'])):
-                
-                if event.player1_name_slug and event.team_tricode:
-                    # Convert seconds_elapsed to float for consistency
-                    try:
-                        if event.seconds_elapsed is None:
-                            seconds_elapsed = 0.0
-                        elif isinstance(event.seconds_elapsed, str):
-                            seconds_elapsed = float(event.seconds_elapsed)
-                        else:
-                            seconds_elapsed = event.seconds_elapsed
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid seconds_elapsed value: {event.seconds_elapsed} for game {event.game_id}")
-                        seconds_elapsed = 0.0
-                    
-                    injury_events.append(InjuryTracker(
-                        event_idx=event.event_idx,
-                        seconds_elapsed=seconds_elapsed,
-                        team_tricode=event.team_tricode,
-                        player_slug=event.player1_name_slug
-                    ))
-        
-        # Track when players are last seen after injury events
-        for injury in injury_events:
-            last_seen = self._find_last_appearance(q1_events, injury.event_idx, injury.player_slug)
-            possessions_absent = self._count_possessions_since(q1_events, last_seen or injury.event_idx)
+                ))
             
-            if possessions_absent >= min_absent_possessions:
-                immediate_sub = self._check_immediate_substitution(
-                    q1_events, injury.event_idx, injury.player_slug
-                )
+            # Injury leave: player does not reappear for several possessions
+            if is_injury[pos]:
+                last_seen = index.last_appearance_after(event_idx, player)
+                possessions_absent = index.possessions_since(last_seen or event_idx)
                 
-                early_shock = EarlyShockRow(
-                    game_id=q1_events[0].game_id,
-                    team_tricode=injury.team_tricode,
-                    player_slug=injury.player_slug,
-                    shock_type=EarlyShockType.INJURY_LEAVE,
-                    shock_seq=1,
-                    period=1,
-                    clock_hhmmss=self._format_clock(injury.seconds_elapsed),
-                    event_idx_start=injury.event_idx,
-                    event_idx_end=last_seen,
-                    immediate_sub=immediate_sub,
-                    poss_since_event=possessions_absent,
-                    notes=f"Absent {possessions_absent} possessions",
-                    source=self.source,
-                    source_url=source_url
-                )
-                early_shocks.append(early_shock)
-        
-        return early_shocks
-    
-    def _is_technical_or_flagrant_foul(self, event: PbpEventRow) -> bool:
-        """Check if foul is technical or flagrant (not personal)."""
-        if event.event_type in [EventType.TECHNICAL_FOUL, EventType.FLAGRANT_FOUL]:
-            return True
-        
-        if event.description:
-            desc = event.description.lower()
-            return any(keyword in desc for keyword in 
-                      ['technical', 'flagrant', 'unsportsmanlike'])
+                if possessions_absent >= min_absent_possessions:
+                    injuries.append(EarlyShockRow(
+                        game_id=game_id,
+                        team_tricode=team_tricode,
+                        player_slug=player_slug,
+                        shock_type=EarlyShockType.INJURY_LEAVE,
+                        shock_seq=1,
+                        period=1,
+                        clock_hhmmss=self._format_clock(elapsed_or_zero),
+                        event_idx_start=event_idx,
+                        event_idx_end=last_seen,
+                        immediate_sub=index.subbed_out_within_possession(event_idx, player),
+                        poss_since_event=possessions_absent,
+                        notes=f"Absent {possessions_absent} possessions",
+                        source=self.source,
+                        source_url=source_url
+                    ))
         
-        return False
-    
-    def _is_technical_foul(self, event: PbpEventRow) -> bool:
-        """Check if event is a technical foul."""
-        if event.description:
-            return 'technical' in event.description.lower()
-        return False
+        return foul_trouble + technicals + flagrants + injuries
     
-    def _is_flagrant_foul(self, event: PbpEventRow) -> bool:
-        """Check if event is a flagrant foul."""
-        if event.description:
-            return 'flagrant' in event.description.lower()
-        return False
-    
-    def _extract_flagrant_type(self, event: PbpEventRow) -> str:
-        """Extract flagrant foul type from description."""
-        if event.description:
-            desc = event.description.lower()
-            if 'flagrant 2' in desc:
-                return "Flagrant 2"
-            elif 'flagrant 1' in desc:
-                return "Flagrant 1"
-            elif 'flagrant' in desc:
-                return "Flagrant"
+    def _extract_flagrant_type(self, desc_flags: int) -> str:
+        """Flagrant foul type from the event's description flags."""
+        if desc_flags & DESC_FLAGRANT_2:
+            return "Flagrant 2"
+        if desc_flags & DESC_FLAGRANT_1:
+            return "Flagrant 1"
+        if desc_flags & DESC_FLAGRANT:
+            return "Flagrant"
         return "Flagrant foul"
     
-    def _check_immediate_substitution(self, events: List[PbpEventRow], 
-                                    event_idx: int, player_slug: str) -> bool:
-        """Check if player was substituted within next possession."""
-        # Find next few events to look for substitution
-        current_event_pos = next((i for i, e in enumerate(events) if e.event_idx == event_idx), -1)
-        if current_event_pos == -1:
-            return False
-        
-        # Look ahead for substitution in next few events (within same possession)
-        possessions_seen = 0
-        for i in range(current_event_pos + 1, len(events)):
-            event = events[i]
-            
-            # Count possession changes
-            if self._is_possession_change(event):
-                possessions_seen += 1
-                if possessions_seen > 1:  # More than one possession has passed
-                    break
-            
-            # Check for substitution removing this player
-            if (event.event_type == EventType.SUBSTITUTION and
-                event.player1_name_slug == player_slug):  # player being subbed out
-                return True
-        
-        return False
-    
-    def _find_last_appearance(self, events: List[PbpEventRow], 
-                            after_event_idx: int, player_slug: str) -> Optional[int]:
-        """Find the last event where player appears after given event."""
-        last_appearance = None
-        
-        for event in events:
-            if (event.event_idx > after_event_idx and
-                (event.player1_name_slug == player_slug or 
-                 event.player2_name_slug == player_slug or
-                 event.player3_name_slug == player_slug)):
-                last_appearance = event.event_idx
-        
-        return last_appearance
-    
-    def _count_possessions_since(self, events: List[PbpEventRow], event_idx: int) -> int:
-        """Count possessions that have occurred since given event."""
-        possessions = 0
-        current_event_pos = next((i for i, e in enumerate(events) if e.event_idx == event_idx), -1)
-        
-        if current_event_pos == -1:
-            return 0
-        
-        for i in range(current_event_pos + 1, len(events)):
-            if self._is_possession_change(events[i]):
-                possessions += 1
-        
-        return possessions
-    
-    def _is_possession_change(self, event: PbpEventRow) -> bool:
-        """Determine if event represents a possession change."""
-        # Possession changes on:
-        # - Made shots (except and-1 situations)
-        # - Defensive rebounds
-        # - Live ball turnovers
-        # - Start of period
-        
-        if event.event_type in [EventType.PERIOD_BEGIN, EventType.JUMP_BALL]:
-            return True
-        
-        if event.event_type == EventType.SHOT_MADE:
-            # Check if it's an and-1 (free throw follows)
-            # For simplicity, assume most made shots change possession
-            return True
-        
-        if event.event_type == EventType.REBOUND:
-            # Defensive rebounds change possession, offensive don't
-            # Simple heuristic: if rebounder's team differs from shooter's team
-            return True  # Simplified - would need more context in production
-        
-        if event.event_type == EventType.TURNOVER:
-            return True
-        
-        return False
-    
     def _format_clock(self, seconds_elapsed: Optional[float]) -> str:
         """Format seconds elapsed into HH:MM:SS clock format."""
         if seconds_elapsed is None:
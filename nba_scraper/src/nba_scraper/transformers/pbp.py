@@ -4,11 +4,11 @@ from typing import Any, Dict, Iterable, List
 
 from ..models.pbp import PbpEvent
 from ..utils.coerce import to_int_or_none
+from ..utils.column_coercion import PLAY_BY_PLAY_COLUMNS, coerce_record
 from ..utils.preprocess import (
     normalize_clock_time,
     normalize_player_id,
     normalize_team_id,
-    preprocess_nba_stats_data,
 )
 
 
@@ -25,8 +25,8 @@ def transform_pbp(events: Iterable[Dict[str, Any]], game_id: str) -> List[PbpEve
     rows: List[PbpEvent] = []
 
     for e in events:
-        # Apply preprocessing to handle mixed data types safely
-        e = preprocess_nba_stats_data(e)
+        # Coerce with the PlayByPlay column schema (clock strings stay strings)
+        e = coerce_record(e, PLAY_BY_PLAY_COLUMNS)
 
         # Extract required fields with safe defaults using robust coercion
         event_num = to_int_or_none(e.get("EVENTNUM")) or 0
@@ -1,14 +1,17 @@
 """PBP window builders with clock-safe and possession-aware logic."""
 
 from collections import defaultdict
-from dataclasses import dataclass
 from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+import numpy as np
+
 from ..models.enums import EventType
+from ..models.pbp_frame import PbpFrame, description_flags
 from ..models.pbp_rows import PbpEventRow
 from ..nba_logging import get_logger
 from ..utils.clock import period_length_ms
 from ..utils.coerce import to_int_or_none
+from .possessions import PossessionMark, PossessionTracker
 
 logger = get_logger(__name__)
 
@@ -73,14 +76,21 @@ def period_bounds_ms(period: int) -> Tuple[int, int]:
     return (0, start)
 
 
-@dataclass
-class PossessionState:
-    """Track possession state for window analysis."""
+# Possession state for window analysis is the shared streaming tracker
+PossessionState = PossessionTracker
+
 
-    current_team: Optional[str] = None
-    last_event_type: Optional[EventType] = None
-    possession_changes: int = 0
-    unknown_possessions: int = 0
+def track_event(tracker: PossessionTracker, event: PbpEventRow) -> PossessionMark:
+    """Feed one silver row to a possession tracker."""
+    clock_ms = to_int_or_none(getattr(event, "clock_ms_remaining", None))
+    description = getattr(event, "description", None)
+    return tracker.step(
+        to_int_or_none(getattr(event, "period", None)),
+        -1 if clock_ms is None else clock_ms,
+        event.event_type,
+        event.team_tricode or None,
+        description_flags(description) if isinstance(description, str) else 0,
+    )
 
 
 class WindowEventProcessor:
@@ -122,6 +132,26 @@ class WindowEventProcessor:
 
         return deduplicated
 
+    def first_occurrence_mask(self, frame: PbpFrame, mask: np.ndarray) -> np.ndarray:
+        """Frame counterpart of ``deduplicate_events`` restricted to ``mask``.
+
+        Keeps the first event per (period, clock_ms_remaining, event_type, team).
+        """
+        candidates = np.flatnonzero(mask)
+        keep = np.zeros(len(frame), dtype=bool)
+        if not len(candidates):
+            return keep
+
+        keys = np.column_stack((
+            frame.period[candidates],
+            frame.clock_ms[candidates],
+            frame.event_type[candidates],
+            frame.team[candidates],
+        ))
+        _, first = np.unique(keys, axis=0, return_index=True)
+        keep[candidates[first]] = True
+        return keep
+
     def is_valid_period_event(self, event: PbpEventRow) -> bool:
         """Check if event has valid period and clock bounds.
 
@@ -144,61 +174,27 @@ class WindowEventProcessor:
         period_end_ms, period_start_ms = period_bounds_ms(event.period)
         return period_end_ms <= clock_ms <= period_start_ms
 
-    def update_possession(self, event: PbpEventRow) -> None:
-        """Update possession tracking based on event.
+    def update_possession(self, event: PbpEventRow) -> PossessionMark:
+        """Advance the possession tracker over one event (events in game order).
 
         Args:
             event: Event to process for possession logic
+
+        Returns:
+            The event's possession annotation
         """
-        team = event.team_tricode
-        if not team:
-            self.possession_state.unknown_possessions += 1
-            return
-
-        # Track possession changes based on event type
-        if event.event_type in [EventType.SHOT_MADE, EventType.FREE_THROW_MADE]:
-            # Made shots generally flip possession after the inbound
-            if self.possession_state.current_team and self.possession_state.current_team != team:
-                self.possession_state.possession_changes += 1
-            self.possession_state.current_team = self._get_opponent_team(team)
-
-        elif event.event_type == EventType.REBOUND:
-            # Defensive rebounds flip possession
-            if "defensive" in (event.description or "").lower():
-                if self.possession_state.current_team != team:
-                    self.possession_state.possession_changes += 1
-                self.possession_state.current_team = team
-            # Offensive rebounds maintain possession
-
-        elif event.event_type in [EventType.TURNOVER, EventType.PERSONAL_FOUL]:
-            # Turnovers and offensive fouls flip possession
-            opponent = self._get_opponent_team(team)
-            if opponent and self.possession_state.current_team != opponent:
-                self.possession_state.possession_changes += 1
-            self.possession_state.current_team = opponent
-
-        elif event.event_type == EventType.JUMP_BALL:
-            # Jump ball - try to determine who gains control
-            # This is a simplified heuristic
-            if self.possession_state.current_team != team:
-                self.possession_state.possession_changes += 1
-            self.possession_state.current_team = team
-
-        self.possession_state.last_event_type = event.event_type
-
-    def _get_opponent_team(self, team: str) -> Optional[str]:
-        """Get opponent team code (simplified heuristic)."""
-        # This would ideally use game metadata, but for now use a simple approach
-        # In practice, this should be enhanced with actual team mappings
-        all_teams = set(e.team_tricode for e in self.processed_events if e.team_tricode)
-        all_teams.add(team)
-        opponents = all_teams - {team}
-        return opponents.pop() if opponents else None
+        state = self.possession_state
+        if len(state.teams) < 2:
+            for processed in self.processed_events:
+                state.add_team(processed.team_tricode or None)
+
+        return track_event(state, event)
 
     def estimate_possessions(self, events: List[PbpEventRow]) -> int:
         """Estimate possessions using box score formula.
 
-        Possessions ≈ FGA + 0.44*FTA - OREB + TOV
+        Possessions ≈ FGA + 0.44*FTA - OREB + TOV. For unordered event
+        collections; ordered events get exact counts from ``update_possession``.
 
         Args:
             events: Events to analyze
@@ -271,6 +267,16 @@ class Q1WindowBuilder(WindowEventProcessor):
         self.processed_events = window_events
         return window_events
 
+    def window_mask(self, frame: PbpFrame) -> np.ndarray:
+        """Boolean mask of the events ``build_q1_window_12_8`` would return.
+
+        Selection only: possession state is not updated.
+        """
+        q1 = self.first_occurrence_mask(frame, frame.period == 1)
+        return q1 & frame.valid_clock_mask() & frame.clock_window_mask(
+            self.window_start_ms, self.window_end_ms
+        )
+
 
 class EarlyShocksBuilder(WindowEventProcessor):
     """Builder for early shocks analysis (first 4:00 of each period)."""
@@ -308,6 +314,9 @@ class EarlyShocksBuilder(WindowEventProcessor):
 
         # Process each period separately
         for period, period_events in events_by_period.items():
+            # Possessions come from the whole period, not just the window
+            marks = {id(event): self.update_possession(event) for event in period_events}
+
             # Get period length and calculate window end (first 4:00)
             period_start_ms = period_length_ms(period)
             window_end_ms = period_start_ms - (4 * 60 * 1000)  # 4 minutes = 240000ms
@@ -330,14 +339,35 @@ class EarlyShocksBuilder(WindowEventProcessor):
             window_events = self.deduplicate_events(window_events)
 
             # Process events for team stats
-            self._process_early_period_events(period, window_events, period_stats)
+            self._process_early_period_events(period, window_events, period_stats, marks)
 
         return dict(period_stats)
 
+    def window_mask(self, frame: PbpFrame) -> np.ndarray:
+        """Boolean mask of the events in the first 4:00 of each period (deduplicated)."""
+        period_start_ms = np.where(frame.period <= 4, 12 * 60 * 1000, 5 * 60 * 1000)
+        in_window = frame.valid_clock_mask() & frame.clock_window_mask(
+            period_start_ms, period_start_ms - (4 * 60 * 1000)
+        )
+        return self.first_occurrence_mask(frame, in_window)
+
     def _process_early_period_events(
-        self, period: int, events: List[PbpEventRow], period_stats: Dict
+        self,
+        period: int,
+        events: List[PbpEventRow],
+        period_stats: Dict,
+        marks: Optional[Dict[int, PossessionMark]] = None,
     ) -> None:
-        """Process events for a single period's early window."""
+        """Process events for a single period's early window.
+
+        ``marks`` maps ``id(event)`` to its possession annotation; without it the
+        window events are tracked on their own.
+        """
+        if marks is None:
+            tracker = PossessionTracker()
+            marks = {id(event): track_event(tracker, event) for event in events}
+        team_possessions: Dict[str, Set[int]] = defaultdict(set)
+
         team_scores = defaultdict(int)
         last_leader = None
 
@@ -369,6 +399,9 @@ class EarlyShocksBuilder(WindowEventProcessor):
 
             stats = period_stats[period][team]
             stats["events"].append(event)
+            mark = marks[id(event)]
+            if mark.offense is not None:
+                team_possessions[mark.offense].add(mark.possession_id)
 
             # Track scoring events
             points = 0
@@ -409,9 +442,8 @@ class EarlyShocksBuilder(WindowEventProcessor):
         for team in all_teams:
             stats = period_stats[period][team]
 
-            # Estimate possessions: FGA + 0.44*FTA - OREB + TOV
-            possessions = stats["fga"] + int(0.44 * stats["fta"]) - stats["oreb"] + stats["tov"]
-            possessions = max(1, possessions)  # At least 1 possession
+            # Tracked possessions with the team on offense inside the window
+            possessions = max(1, len(team_possessions[team]))  # At least 1 possession
             stats["possessions"] = possessions
 
             # Calculate net rating per 100 possessions
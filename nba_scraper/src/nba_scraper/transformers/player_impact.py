@@ -0,0 +1,435 @@
+"""On-court attribution of team points, possessions and usage to players.
+
+A player's time on court is a set of intervals over the game's sorted events.
+An interval opens at the period start (starters) or just after the
+substitution bringing the player in (``player2`` of a SUBSTITUTION), and it
+closes at the substitution taking them out (``player1``) or at the period end.
+Team totals are prefix-summed once per batch, so each interval's points
+for/against, possessions and usage load cost two lookups
+(``cum[end] - cum[start]``). This is one sorted sweep, linear in events plus
+intervals, with no player-by-event join.
+
+Period starters come from ``lineup_stints`` when available (the period's
+players minus those whose first appearance is entering by substitution).
+Otherwise they are the players who appear in the period before any
+substitution brings them in.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..models.enums import EventType
+from ..models.pbp_frame import PbpFrame
+from ..utils.clock import period_lengths_ms
+from .possessions import ensure_possessions, possession_starts
+
+# Per-(game, team, player) sums, in player_game_impact column order
+IMPACT_COUNT_COLUMNS = (
+    'seconds_on',
+    'possessions_on', 'opp_possessions_on',
+    'points_for_on', 'points_against_on',
+    'team_usage_on',
+    'team_possessions', 'opp_possessions',
+    'team_points', 'opp_points',
+    'points', 'field_goals_attempted', 'free_throws_attempted', 'turnovers',
+)
+
+IMPACT_METRIC_COLUMNS = (
+    'usage_pct', 'true_shooting_pct',
+    'offensive_rating_on', 'defensive_rating_on', 'net_rating_on', 'net_rating_off', 'on_off_net_rating',
+    'plus_minus_on', 'plus_minus_off',
+)
+
+# Players on court per team
+LINEUP_SIZE = 5
+
+# Weight of a free throw attempt in possessions used
+FTA_WEIGHT = 0.44
+
+# Starters keyed by (game code, period), then team code
+Starters = Dict[Tuple[int, int], Dict[int, List[int]]]
+
+# lineup_stints players keyed by (game_id, period, team_tricode)
+StintPlayers = Mapping[Tuple[str, int, str], Iterable[int]]
+
+_COLUMN = {name: i for i, name in enumerate(IMPACT_COUNT_COLUMNS)}
+
+
+class OnCourtIntervals(NamedTuple):
+    """Half-open ``[start, end)`` event ranges a player spent on court."""
+    game: np.ndarray
+    team: np.ndarray
+    player_id: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    seconds: np.ndarray
+
+
+class PlayerGameCounts(NamedTuple):
+    """Summed counts per (game, team, player) of one frame."""
+    game: np.ndarray
+    team: np.ndarray
+    player_id: np.ndarray
+    counts: np.ndarray  # (players, len(IMPACT_COUNT_COLUMNS))
+
+
+def period_elapsed_seconds(frame: PbpFrame) -> np.ndarray:
+    """Seconds into each event's period (clock first, then ``seconds_elapsed``, carried forward).
+
+    Events without either keep the last known time of their period, or 0.
+    """
+    n = len(frame)
+    period_s = period_lengths_ms(frame.period) / 1000.0
+    elapsed = np.where(frame.clock_ms >= 0, period_s - frame.clock_ms / 1000.0, frame.seconds_elapsed)
+    known = ~np.isnan(elapsed)
+    last = np.maximum.accumulate(np.where(known, np.arange(n), -1)) if n else np.zeros(0, dtype=np.int64)
+    segment = _segment_ids(frame)
+    carried = (last >= 0) & (segment[np.maximum(last, 0)] == segment)
+    return np.where(carried, elapsed[np.maximum(last, 0)], 0.0)
+
+
+def _segment_ids(frame: PbpFrame) -> np.ndarray:
+    """Running id of each (game, period) run of a sorted frame."""
+    change = np.ones(len(frame), dtype=bool)
+    if len(frame) > 1:
+        change[1:] = (frame.game[1:] != frame.game[:-1]) | (frame.period[1:] != frame.period[:-1])
+    return np.cumsum(change) - 1
+
+
+def period_starters(frame: PbpFrame, stint_players: Optional[StintPlayers] = None) -> Starters:
+    """Players on court at the start of each period, per team.
+
+    ``frame`` must be sorted. A player counts as a starter unless their first
+    appearance in the period is entering by substitution. With
+    ``stint_players``, listed players come first (in order of appearance, then
+    unseen), and at most ``LINEUP_SIZE`` are kept per team.
+    """
+    substitution = frame.type_mask(EventType.SUBSTITUTION)
+    active = np.flatnonzero((frame.player1_id >= 0) & (frame.team >= 0))
+    entering = np.flatnonzero(substitution & (frame.player2_id >= 0) & (frame.team >= 0))
+    position = np.concatenate((active, entering))
+    player = np.concatenate((frame.player1_id[active], frame.player2_id[entering]))
+    is_in = np.concatenate((np.zeros(len(active), dtype=bool), np.ones(len(entering), dtype=bool)))
+
+    game, period, team = frame.game[position], frame.period[position], frame.team[position]
+    order = np.lexsort((position, player, team, period, game))
+    game, period, team, player = game[order], period[order], team[order], player[order]
+    position, is_in = position[order], is_in[order]
+    first = np.ones(len(order), dtype=bool)
+    if len(order) > 1:
+        first[1:] = ((game[1:] != game[:-1]) | (period[1:] != period[:-1]) |
+                     (team[1:] != team[:-1]) | (player[1:] != player[:-1]))
+    # First appearances in order of appearance
+    by_position = np.flatnonzero(first)[np.argsort(position[first], kind='stable')]
+
+    seen: Dict[Tuple[int, int, int], Dict[int, bool]] = {}
+    for i in by_position.tolist():
+        key = (int(game[i]), int(period[i]), int(team[i]))
+        seen.setdefault(key, {})[int(player[i])] = not bool(is_in[i])
+
+    listed: Dict[Tuple[int, int, int], List[int]] = {}
+    for (game_id, period_number, tricode), players in (stint_players or {}).items():
+        codes = (frame.games.lookup(game_id), frame.teams.lookup(tricode))
+        if min(codes) >= 0:
+            listed[(codes[0], int(period_number), codes[1])] = [int(p) for p in players]
+
+    starters: Starters = {}
+    for key in set(seen) | set(listed):
+        appeared = seen.get(key, {})
+        stint = set(listed.get(key, ()))
+        candidates = (
+            [p for p, started in appeared.items() if started and p in stint]
+            + [p for p in listed.get(key, ()) if p not in appeared]
+            + [p for p, started in appeared.items() if started and p not in stint]
+        )
+        lineup = list(dict.fromkeys(candidates))[:LINEUP_SIZE]
+        if lineup:
+            starters.setdefault(key[:2], {})[key[2]] = lineup
+    return starters
+
+
+def on_court_intervals(frame: PbpFrame, starters: Starters) -> OnCourtIntervals:
+    """Each player's on-court event ranges in a sorted frame.
+
+    A player subbed out without having been seen entering is taken to have
+    played since the period start, provided their team had fewer than
+    ``LINEUP_SIZE`` players on court.
+    """
+    elapsed = period_elapsed_seconds(frame)
+    segment = _segment_ids(frame)
+    bounds = np.flatnonzero(np.diff(segment, prepend=-1)).tolist() + [len(frame)]
+    subs = np.flatnonzero(frame.type_mask(EventType.SUBSTITUTION)).tolist()
+
+    games: List[int] = []
+    teams: List[int] = []
+    players: List[int] = []
+    starts: List[int] = []
+    ends: List[int] = []
+    seconds: List[float] = []
+
+    def emit(game: int, team: int, player: int, start: int, end: int, duration: float) -> None:
+        games.append(game)
+        teams.append(team)
+        players.append(player)
+        starts.append(start)
+        ends.append(end)
+        seconds.append(max(0.0, duration))
+
+    next_sub = 0
+    for first, stop in zip(bounds[:-1], bounds[1:]):
+        game, period = int(frame.game[first]), int(frame.period[first])
+        on_court = {
+            team: {player: (first, 0.0) for player in lineup}
+            for team, lineup in starters.get((game, period), {}).items()
+        }
+        while next_sub < len(subs) and subs[next_sub] < stop:
+            position = subs[next_sub]
+            next_sub += 1
+            team = int(frame.team[position])
+            if team < 0:
+                continue
+            court = on_court.setdefault(team, {})
+            now = float(elapsed[position])
+            leaving, entering = int(frame.player1_id[position]), int(frame.player2_id[position])
+            if leaving >= 0:
+                opened = court.pop(leaving, None)
+                if opened is None and len(court) < LINEUP_SIZE:
+                    opened = (first, 0.0)
+                if opened is not None:
+                    emit(game, team, leaving, opened[0], position, now - opened[1])
+            if entering >= 0 and entering not in court:
+                court[entering] = (position + 1, now)
+
+        period_end = float(period_lengths_ms(period)) / 1000.0
+        for team, court in on_court.items():
+            for player, (start, since) in court.items():
+                emit(game, team, player, start, stop, period_end - since)
+
+    return OnCourtIntervals(
+        game=np.array(games, dtype=np.int32),
+        team=np.array(teams, dtype=np.int16),
+        player_id=np.array(players, dtype=np.int64),
+        start=np.array(starts, dtype=np.int64),
+        end=np.array(ends, dtype=np.int64),
+        seconds=np.array(seconds, dtype=np.float64),
+    )
+
+
+def _game_sides(frame: PbpFrame) -> np.ndarray:
+    """Team codes of each game's two sides, ``(games, 2)`` (-1 if unknown)."""
+    sides = np.full((max(len(frame.games), 1), 2), -1, dtype=np.int64)
+    known = frame.team >= 0
+    width = len(frame.teams) + 1
+    pairs = np.unique(frame.game[known].astype(np.int64) * width + frame.team[known])
+    if len(pairs):
+        game, team = pairs // width, pairs % width
+        first = np.ones(len(pairs), dtype=bool)
+        first[1:] = game[1:] != game[:-1]
+        sides[game[first], 0] = team[first]
+        second = np.flatnonzero(~first)
+        second = second[~np.isin(second - 1, second)]  # a third team stays unmatched
+        sides[game[second], 1] = team[second]
+    return sides
+
+
+def _side_of(sides: np.ndarray, game: np.ndarray, team: np.ndarray) -> np.ndarray:
+    pair = sides[game]
+    return np.where((team >= 0) & (pair[:, 0] == team), 0, np.where((team >= 0) & (pair[:, 1] == team), 1, -1))
+
+
+def player_game_counts(
+    frame: PbpFrame, starters: Optional[Starters] = None, presorted: bool = False
+) -> PlayerGameCounts:
+    """On-court and individual counts for every player of a frame.
+
+    The frame is sorted and possession-annotated first unless ``presorted``.
+    """
+    if not presorted:
+        frame = ensure_possessions(frame.sorted())
+    if starters is None:
+        starters = period_starters(frame)
+    n = len(frame)
+    sides = _game_sides(frame)
+    side = _side_of(sides, frame.game, frame.team)
+
+    shot = frame.type_mask(EventType.SHOT_MADE, EventType.SHOT_MISSED)
+    made = frame.type_mask(EventType.SHOT_MADE)
+    ft_made = frame.type_mask(EventType.FREE_THROW_MADE)
+    free_throw = frame.type_mask(EventType.FREE_THROW_MADE, EventType.FREE_THROW_MISSED)
+    turnover = frame.type_mask(EventType.TURNOVER)
+    value = frame.shot_value.astype(np.int64)
+    points = np.where(made & (value >= 1) & (value <= 3), value, 0) + ft_made
+    fga = shot & ((value == 2) | (value == 3))
+    usage = fga + FTA_WEIGHT * free_throw + turnover
+
+    starts = possession_starts(frame)
+    if n:
+        starts[0] = True
+    offense_side = _side_of(sides, frame.game, frame.offense)
+    possession = starts & (frame.offense >= 0)
+
+    # cum[s, q, i]: side s's total of quantity q (points, possessions, usage) over events [0, i)
+    per_event = np.zeros((2, 3, n), dtype=np.float64)
+    for s in (0, 1):
+        per_event[s, 0] = np.where(side == s, points, 0)
+        per_event[s, 1] = possession & (offense_side == s)
+        per_event[s, 2] = np.where(side == s, usage, 0.0)
+    cum = np.zeros((2, 3, n + 1), dtype=np.float64)
+    np.cumsum(per_event, axis=2, out=cum[:, :, 1:])
+
+    intervals = on_court_intervals(frame, starters)
+    interval_side = _side_of(sides, intervals.game, intervals.team)
+    keep = interval_side >= 0
+    k = np.flatnonzero(keep)
+    mine, theirs = interval_side[keep], 1 - interval_side[keep]
+    window = cum[:, :, intervals.end[keep]] - cum[:, :, intervals.start[keep]]  # (2, 3, k)
+    slot = np.arange(len(k))
+    ours, opponents = window[mine, :, slot], window[theirs, :, slot]  # (k, 3)
+
+    individual = np.flatnonzero((frame.player1_id >= 0) & (side >= 0))
+
+    # Group intervals and individual events by (game, team, player)
+    # Group intervals and individual events by (game, team, player), packed into one int64
+    width = len(frame.teams) + 1
+    key_side = np.concatenate((intervals.game[keep].astype(np.int64) * width + intervals.team[keep],
+                               frame.game[individual].astype(np.int64) * width + frame.team[individual]))
+    key_player = np.concatenate((intervals.player_id[keep], frame.player1_id[individual]))
+    packed, inverse = np.unique((key_side << 32) | key_player, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    on_rows, own_rows = inverse[:len(k)], inverse[len(k):]
+    key_game, key_team = (packed >> 32) // width, (packed >> 32) % width
+    key_player = packed & 0xFFFFFFFF
+
+    counts = np.zeros((len(packed), len(IMPACT_COUNT_COLUMNS)), dtype=np.float64)
+
+    def add(column: str, rows: np.ndarray, values: np.ndarray) -> None:
+        counts[:, _COLUMN[column]] += np.bincount(rows, weights=values, minlength=len(packed))
+
+    add('seconds_on', on_rows, intervals.seconds[keep])
+    add('possessions_on', on_rows, ours[:, 1])
+    add('opp_possessions_on', on_rows, opponents[:, 1])
+    add('points_for_on', on_rows, ours[:, 0])
+    add('points_against_on', on_rows, opponents[:, 0])
+    add('team_usage_on', on_rows, ours[:, 2])
+    add('points', own_rows, points[individual])
+    add('field_goals_attempted', own_rows, fga[individual])
+    add('free_throws_attempted', own_rows, free_throw[individual])
+    add('turnovers', own_rows, turnover[individual])
+
+    # Whole-game team totals, indexed by 2 * game + side
+    pair = 2 * frame.game.astype(np.int64) + np.maximum(side, 0)
+    n_pairs = 2 * sides.shape[0]
+    team_points = np.bincount(pair, weights=points * (side >= 0), minlength=n_pairs)
+    offense_pair = 2 * frame.game.astype(np.int64) + np.maximum(offense_side, 0)
+    team_possessions = np.bincount(offense_pair, weights=possession & (offense_side >= 0), minlength=n_pairs)
+    side_of_key = _side_of(sides, key_game, key_team)
+    own_pair, opp_pair = 2 * key_game + side_of_key, 2 * key_game + 1 - side_of_key
+    counts[:, _COLUMN['team_possessions']] = team_possessions[own_pair]
+    counts[:, _COLUMN['opp_possessions']] = team_possessions[opp_pair]
+    counts[:, _COLUMN['team_points']] = team_points[own_pair]
+    counts[:, _COLUMN['opp_points']] = team_points[opp_pair]
+
+    return PlayerGameCounts(game=key_game, team=key_team, player_id=key_player, counts=counts)
+
+
+def impact_metrics(counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """Usage, true shooting, on/off ratings and plus/minus from summed counts (NaN if undefined).
+
+    Usage and true shooting are fractions; ratings are points per 100 possessions.
+    """
+    c = {name: counts[:, i] for name, i in _COLUMN.items()}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        used = c['field_goals_attempted'] + FTA_WEIGHT * c['free_throws_attempted'] + c['turnovers']
+        shooting = c['field_goals_attempted'] + FTA_WEIGHT * c['free_throws_attempted']
+        points_for_off = c['team_points'] - c['points_for_on']
+        points_against_off = c['opp_points'] - c['points_against_on']
+        offensive_on = _per_100(c['points_for_on'], c['possessions_on'])
+        defensive_on = _per_100(c['points_against_on'], c['opp_possessions_on'])
+        net_on = offensive_on - defensive_on
+        net_off = (_per_100(points_for_off, c['team_possessions'] - c['possessions_on'])
+                   - _per_100(points_against_off, c['opp_possessions'] - c['opp_possessions_on']))
+        return {
+            'usage_pct': np.where(c['team_usage_on'] > 0, used / c['team_usage_on'], np.nan),
+            'true_shooting_pct': np.where(shooting > 0, c['points'] / (2 * shooting), np.nan),
+            'offensive_rating_on': offensive_on,
+            'defensive_rating_on': defensive_on,
+            'net_rating_on': net_on,
+            'net_rating_off': net_off,
+            'on_off_net_rating': net_on - net_off,
+            'plus_minus_on': c['points_for_on'] - c['points_against_on'],
+            'plus_minus_off': points_for_off - points_against_off,
+        }
+
+
+def _per_100(points: np.ndarray, possessions: np.ndarray) -> np.ndarray:
+    return np.where(possessions > 0, points * 100.0 / possessions, np.nan)
+
+
+def _value_columns(counts: np.ndarray, rows: np.ndarray) -> List[Tuple[str, List[Any]]]:
+    """Count and metric columns of ``rows`` as lists (undefined metrics as None)."""
+    counts = counts[rows]
+    metrics = impact_metrics(counts)
+    columns = [(name, counts[:, i].tolist()) for i, name in enumerate(IMPACT_COUNT_COLUMNS)]
+    for name in IMPACT_METRIC_COLUMNS:
+        values = metrics[name]
+        columns.append((name, np.where(np.isnan(values), None, values).tolist()))
+    return columns
+
+
+def _rows(keys: Dict[str, List[Any]], columns: List[Tuple[str, List[Any]]]) -> List[Dict[str, Any]]:
+    names = list(keys) + [name for name, _ in columns]
+    return [dict(zip(names, values)) for values in zip(*keys.values(), *(values for _, values in columns))]
+
+
+class PlayerImpactAccumulator:
+    """Per-game player impact rows, batch by batch, plus running season totals.
+
+    Memory is bounded by the batch being processed and one row of sums per
+    (player, team) seen so far.
+    """
+
+    def __init__(self, player_ids: Optional[Iterable[int]] = None):
+        self.player_ids = None if player_ids is None else {int(p) for p in player_ids}
+        self.index: Dict[Tuple[int, str], int] = {}
+        self.keys: List[Tuple[int, str]] = []
+        self.totals = np.zeros((0, len(IMPACT_COUNT_COLUMNS)), dtype=np.float64)
+        self.games = np.zeros(0, dtype=np.int64)
+
+    def add_frame(self, frame: PbpFrame, stint_players: Optional[StintPlayers] = None) -> List[Dict[str, Any]]:
+        """Add a batch of whole games and return their per-game player rows."""
+        frame = ensure_possessions(frame.sorted())
+        result = player_game_counts(frame, period_starters(frame, stint_players), presorted=True)
+        keep = np.ones(len(result.player_id), dtype=bool)
+        if self.player_ids is not None:
+            keep = np.isin(result.player_id, list(self.player_ids))
+        rows_at = np.flatnonzero(keep)
+
+        keys = [(int(result.player_id[i]), frame.teams[int(result.team[i])]) for i in rows_at.tolist()]
+        for key in keys:
+            if key not in self.index:
+                self.index[key] = len(self.keys)
+                self.keys.append(key)
+        grow = len(self.keys) - len(self.totals)
+        if grow:
+            self.totals = np.vstack((self.totals, np.zeros((grow, self.totals.shape[1]))))
+            self.games = np.concatenate((self.games, np.zeros(grow, dtype=np.int64)))
+        target = np.array([self.index[key] for key in keys], dtype=np.int64)
+        np.add.at(self.totals, target, result.counts[rows_at])
+        np.add.at(self.games, target, 1)
+
+        return _rows(
+            {'game_id': [frame.games[game] for game in result.game[rows_at].tolist()],
+             'player_id': [str(player_id) for player_id, _ in keys],
+             'team_tricode': [team for _, team in keys]},
+            _value_columns(result.counts, rows_at),
+        )
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Season rows per (player, team) from the summed counts."""
+        return _rows(
+            {'player_id': [str(player_id) for player_id, _ in self.keys],
+             'team_tricode': [team for _, team in self.keys],
+             'games': self.games.tolist()},
+            _value_columns(self.totals, np.arange(len(self.keys))),
+        )
@@ -0,0 +1,271 @@
+"""Streaming possession engine shared by the window, shock and pace analytics.
+
+``PossessionTracker`` is an incremental state machine: feed it a game's events
+in order and it returns, for each one, the possession it belongs to (a per-game
+id), the offensive team and the clock at which that possession started.
+``annotate_possessions`` runs it once over a PbpFrame (O(n)) and stores the
+result in the frame's ``possession`` / ``offense`` / ``possession_start_ms``
+columns, so transformers read possessions instead of re-deriving them.
+
+Rules:
+
+- A made field goal, a turnover and a foul by the team with the ball end the
+  possession; so does a made free throw unless the same team shoots again at
+  the same clock (the rest of the trip).
+- And-1s: after a made basket, the defense's foul and the shooter's free
+  throws at the same clock stay in the scoring possession.
+- Offensive rebounds keep the possession; defensive rebounds start one.
+- Every period starts a new possession whose offense is unknown until an event
+  shows it (usually the jump ball).
+- Dead-ball events (substitutions, timeouts, reviews, technicals) and
+  box-score companions (assists, steals, blocks) never change possession.
+- A shot, rebound or turnover by the team without the ball resynchronizes the
+  tracker to that team, so gaps in the feed don't cascade.
+"""
+
+from dataclasses import replace
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..models.enums import EventType
+from ..models.pbp_frame import DESC_TECHNICAL, EVENT_TYPES, PbpFrame
+from ..utils.clock import period_length_ms, period_lengths_ms
+
+_FIELD_GOALS = frozenset({EventType.SHOT_MADE, EventType.SHOT_MISSED})
+_FREE_THROWS = frozenset({EventType.FREE_THROW_MADE, EventType.FREE_THROW_MISSED})
+_FOULS = frozenset({EventType.FOUL, EventType.PERSONAL_FOUL})
+
+# Events that can move the ball; anything else leaves possession untouched
+_LIVE_EVENTS = _FIELD_GOALS | _FREE_THROWS | _FOULS | {
+    EventType.REBOUND,
+    EventType.TURNOVER,
+    EventType.JUMP_BALL,
+}
+
+# Why the current possession is about to end
+_AFTER_FIELD_GOAL = "field_goal"
+_AFTER_FREE_THROW = "free_throw"
+_AFTER_TURNOVER = "turnover"
+
+
+class PossessionMark(NamedTuple):
+    """Possession annotation of one event."""
+
+    possession_id: int
+    offense: Optional[Hashable]
+    start_ms: int
+
+
+class _PendingChange(NamedTuple):
+    team: Optional[Hashable]  # team that gets the ball
+    clock_ms: int  # clock of the ending play
+    kind: str
+    ending_team: Optional[Hashable]  # offense of the possession that ends
+
+
+class PossessionTracker:
+    """Incremental possession state machine for one game.
+
+    Teams may be any hashable (tricodes for rows, string-table codes for
+    frames); pass both up front when known, otherwise they are learned from
+    the events. ``clock_ms`` of ``-1`` means the clock is unknown.
+    """
+
+    def __init__(self, teams: Iterable[Hashable] = ()):
+        self.teams: List[Hashable] = []
+        for team in teams:
+            self.add_team(team)
+        self.period: Optional[int] = None
+        self.possession_id = 0
+        self.offense: Optional[Hashable] = None
+        self.start_ms = -1
+        self.last_event_type: Optional[EventType] = None
+        self.possession_changes = 0
+        self.unknown_possessions = 0
+        self._pending: Optional[_PendingChange] = None
+
+    @property
+    def current_team(self) -> Optional[Hashable]:
+        """Team with the ball after the last event (a pending change included)."""
+        return self._pending.team if self._pending is not None else self.offense
+
+    @current_team.setter
+    def current_team(self, team: Optional[Hashable]) -> None:
+        self._pending = None
+        self.offense = team
+        self.add_team(team)
+
+    def add_team(self, team: Optional[Hashable]) -> None:
+        """Record one of the game's two teams."""
+        if team is not None and team not in self.teams and len(self.teams) < 2:
+            self.teams.append(team)
+
+    def opponent(self, team: Optional[Hashable]) -> Optional[Hashable]:
+        if team is None:
+            return None
+        for other in self.teams:
+            if other != team:
+                return other
+        return None
+
+    def mark(self) -> PossessionMark:
+        return PossessionMark(self.possession_id, self.offense, self.start_ms)
+
+    def step(
+        self,
+        period: Optional[int],
+        clock_ms: int,
+        event_type: EventType,
+        team: Optional[Hashable] = None,
+        desc_flags: int = 0,
+    ) -> PossessionMark:
+        """Advance over one event and return its possession annotation."""
+        if period != self.period:
+            if self.period is not None:
+                self._start(None, -1)
+            self.period = period
+            self._pending = None
+            if period is not None:
+                self.start_ms = period_length_ms(period)
+
+        self.last_event_type = event_type
+        live = event_type in _LIVE_EVENTS and not desc_flags & DESC_TECHNICAL
+        if team is not None:
+            self.add_team(team)
+        elif live:
+            self.unknown_possessions += 1
+
+        pending = self._pending
+        if pending is not None:
+            if not live:
+                return self.mark()
+            if clock_ms >= 0 and clock_ms == pending.clock_ms and team == pending.ending_team:
+                if event_type in _FREE_THROWS and pending.kind != _AFTER_TURNOVER:
+                    # And-1 or the rest of a free throw trip: the possession goes on
+                    self._pending = None
+                    self.possession_changes -= 1
+                elif event_type in _FOULS or event_type == EventType.TURNOVER:
+                    return self.mark()  # logged alongside the ending play
+                else:
+                    self._settle()
+            elif (clock_ms >= 0 and clock_ms == pending.clock_ms and team == pending.team
+                  and pending.kind == _AFTER_FIELD_GOAL and event_type in _FOULS):
+                return self.mark()  # the defense's and-1 foul
+            else:
+                self._settle()
+
+        if not live or team is None:
+            return self.mark()
+
+        if event_type in _FOULS:
+            if team == self.offense:
+                self._hand_over(clock_ms, _AFTER_TURNOVER)
+            return self.mark()
+
+        # Shots, free throws, rebounds, turnovers and jump balls show who has the ball
+        self._claim(team, clock_ms)
+        mark = self.mark()
+        if event_type == EventType.SHOT_MADE:
+            self._hand_over(clock_ms, _AFTER_FIELD_GOAL)
+        elif event_type == EventType.FREE_THROW_MADE:
+            self._hand_over(clock_ms, _AFTER_FREE_THROW)
+        elif event_type == EventType.TURNOVER:
+            self._hand_over(clock_ms, _AFTER_TURNOVER)
+        return mark
+
+    def _start(self, team: Optional[Hashable], start_ms: int) -> None:
+        self.possession_id += 1
+        self.offense = team
+        self.start_ms = start_ms
+
+    def _claim(self, team: Hashable, clock_ms: int) -> None:
+        if self.offense is None:
+            self.offense = team
+        elif self.offense != team:
+            self._start(team, clock_ms)
+            self.possession_changes += 1
+
+    def _hand_over(self, clock_ms: int, kind: str) -> None:
+        self._pending = _PendingChange(self.opponent(self.offense), clock_ms, kind, self.offense)
+        self.possession_changes += 1
+
+    def _settle(self) -> None:
+        pending, self._pending = self._pending, None
+        self._start(pending.team, pending.clock_ms)
+
+
+def _event_clock_ms(frame: PbpFrame) -> np.ndarray:
+    """Clock per event, falling back to seconds_elapsed when the clock is missing."""
+    from_seconds = np.round(period_lengths_ms(frame.period) - frame.seconds_elapsed * 1000.0)
+    from_seconds = np.where(np.isnan(from_seconds) | (from_seconds < 0), -1, from_seconds)
+    return np.where(frame.clock_ms >= 0, frame.clock_ms, from_seconds).astype(np.int64)
+
+
+def annotate_possessions(frame: PbpFrame) -> PbpFrame:
+    """Copy of ``frame`` with its possession columns filled in (one pass per game).
+
+    Events are walked in (game, period, event_idx) order; the frame's own row
+    order is kept.
+    """
+    n = len(frame)
+    possession = np.full(n, -1, dtype=np.int32)
+    offense = np.full(n, -1, dtype=np.int16)
+    start_ms = np.full(n, -1, dtype=np.int32)
+    if n:
+        teams_by_game: Dict[int, List[int]] = {}
+        known = frame.team >= 0
+        for game, team in np.unique(np.column_stack((frame.game[known], frame.team[known])), axis=0).tolist():
+            teams_by_game.setdefault(game, []).append(team)
+
+        order = np.lexsort((frame.event_idx, frame.period, frame.game))
+        columns = zip(
+            order.tolist(),
+            frame.game[order].tolist(),
+            frame.period[order].tolist(),
+            _event_clock_ms(frame)[order].tolist(),
+            frame.event_type[order].tolist(),
+            frame.team[order].tolist(),
+            frame.desc_flags[order].tolist(),
+        )
+        current_game, tracker = None, None
+        for pos, game, period, clock_ms, event_type, team, flags in columns:
+            if game != current_game:
+                current_game = game
+                game_teams = teams_by_game.get(game, [])
+                tracker = PossessionTracker(game_teams if len(game_teams) == 2 else ())
+            mark = tracker.step(period, clock_ms, EVENT_TYPES[event_type], team if team >= 0 else None, flags)
+            possession[pos] = mark.possession_id
+            offense[pos] = -1 if mark.offense is None else mark.offense
+            start_ms[pos] = mark.start_ms
+
+    return replace(frame, possession=possession, offense=offense, possession_start_ms=start_ms)
+
+
+def ensure_possessions(frame: PbpFrame) -> PbpFrame:
+    """``frame`` itself if already annotated, otherwise an annotated copy."""
+    return frame if frame.has_possessions else annotate_possessions(frame)
+
+
+def possession_starts(frame: PbpFrame) -> np.ndarray:
+    """Boolean mask of events that open a new possession (frame in game order)."""
+    starts = np.zeros(len(frame), dtype=bool)
+    if len(frame) > 1:
+        starts[1:] = (frame.possession[1:] != frame.possession[:-1]) | (frame.game[1:] != frame.game[:-1])
+    return starts
+
+
+def possessions_by_team(frame: PbpFrame) -> Dict[Tuple[str, str], int]:
+    """Distinct possessions per (game_id, offensive team) among the frame's events."""
+    frame = ensure_possessions(frame)
+    known = frame.offense >= 0
+    if not known.any():
+        return {}
+    keys = np.unique(
+        np.column_stack((frame.game[known], frame.offense[known], frame.possession[known])), axis=0
+    )
+    pairs, counts = np.unique(keys[:, :2], axis=0, return_counts=True)
+    return {
+        (frame.games[game], frame.teams[team]): count
+        for (game, team), count in zip(pairs.tolist(), counts.tolist())
+    }
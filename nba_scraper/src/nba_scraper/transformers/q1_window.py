@@ -1,14 +1,17 @@
 """Q1 window (12:00 to 8:00) analytics transformer."""
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
 
 from ..models.derived_rows import Q1WindowRow
 from ..models.enums import EventType
+from ..models.pbp_frame import DESC_OFFENSIVE, PbpFrame
 from ..models.pbp_rows import PbpEventRow
 from ..nba_logging import get_logger
-from ..utils.coerce import to_float_or_none
-from .pbp_windows import is_in_clock_window, period_bounds_ms
+from .pbp_windows import period_bounds_ms
+from .possessions import ensure_possessions, possessions_by_team
 
 logger = get_logger(__name__)
 
@@ -98,253 +101,219 @@ class Q1WindowTransformer:
         self.window_end_sec = window_end_sec
         self.expected_pace = expected_pace
 
-    def transform(self, pbp_events: List[PbpEventRow], source_url: str) -> Optional[Q1WindowRow]:
+    def transform(
+        self, pbp_events: Union[List[PbpEventRow], PbpFrame], source_url: str
+    ) -> Optional[Q1WindowRow]:
         """Transform PBP events into Q1 window analytics.
 
         Args:
-            pbp_events: List of play-by-play events
+            pbp_events: Play-by-play events for one game, as rows or a PbpFrame
             source_url: Source URL for provenance
 
         Returns:
             Q1WindowRow instance or None if insufficient data
         """
-        if not pbp_events:
+        frame = pbp_events if isinstance(pbp_events, PbpFrame) else PbpFrame.from_rows(pbp_events or [])
+        if not len(frame):
             return None
 
-        game_id = pbp_events[0].game_id
-        logger.debug(
-            "Processing Q1 window analytics", game_id=game_id, total_events=len(pbp_events)
-        )
-
-        # Filter to Q1 events within our window using clock-safe logic
-        window_events = []
-        for e in pbp_events:
-            # Ignore events outside Q1 or invalid periods
-            if e.period != 1 or e.period < 1 or e.period > 10:
-                continue
-
-            if e.clock_ms_remaining is not None:
-                # Use clock-safe window checking
-                end_ms, start_ms = period_bounds_ms(1)
-                window_start_ms = start_ms - (self.window_start_sec * 1000)  # 12:00 -> 720000ms
-                window_end_ms = start_ms - (self.window_end_sec * 1000)  # 08:00 -> 480000ms
-
-                if is_in_clock_window(e.clock_ms_remaining, window_start_ms, window_end_ms):
-                    window_events.append(e)
-            elif e.seconds_elapsed is not None:
-                # Fallback to seconds_elapsed for backwards compatibility
-                seconds_elapsed = to_float_or_none(e.seconds_elapsed)
-                if seconds_elapsed is None:
-                    logger.warning(
-                        f"Invalid seconds_elapsed value: {e.seconds_elapsed} for game {game_id}"
-                    )
-                    continue
-
-                if self.window_start_sec <= seconds_elapsed <= self.window_end_sec:
-                    window_events.append(e)
-
-        if not window_events:
-            logger.debug("No Q1 window events found", game_id=game_id)
-            return None
+        logger.debug("Processing Q1 window analytics", game_id=frame.game_id_at(0), total_events=len(frame))
+        rows = self.transform_batch(frame, source_url)
+        return rows[0] if rows else None
 
-        # Deduplicate consecutive events with identical (period, clock_ms_remaining, event_type, team_id)
-        window_events = self._deduplicate_events(window_events)
-
-        # Sort by event index to ensure chronological order
-        window_events.sort(key=lambda x: x.event_idx)
-
-        # Identify teams
-        teams = set()
-        for event in window_events:
-            if event.team_tricode:
-                teams.add(event.team_tricode)
-
-        if len(teams) != 2:
-            logger.warning("Expected 2 teams, found", game_id=game_id, teams=list(teams))
-            return None
+    def transform_batch(self, frame: PbpFrame, source_url: str) -> List[Q1WindowRow]:
+        """Q1 window analytics for every game in ``frame``, one row per game.
 
-        home_team, away_team = self._identify_home_away_teams(window_events)
-
-        # Track statistics for both teams
-        team_stats = {home_team: TeamStats(home_team), away_team: TeamStats(away_team)}
-
-        # Process all events to build statistics
-        possessions_elapsed = self._process_window_events(window_events, team_stats)
+        Team counts for all games are computed together by grouping window
+        events on (game, team). Games without window events or without exactly
+        two teams in the window are skipped.
+        """
+        if not len(frame):
+            return []
+
+        frame = ensure_possessions(frame)
+        window = frame.take(self._window_positions(frame))
+        for game in np.setdiff1d(np.unique(frame.game), window.game).tolist():
+            logger.debug("No Q1 window events found", game_id=frame.games[game])
+        if not len(window):
+            return []
+
+        # One group per (game, team) seen in the window
+        known = window.team >= 0
+        pair_keys = window.game[known].astype(np.int64) * len(window.teams) + window.team[known]
+        pairs, pair_of = np.unique(pair_keys, return_inverse=True)
+        pair_game, pair_team = np.divmod(pairs, len(window.teams))
+        stats = self._grouped_team_stats(window, known, pair_of, len(pairs))
+
+        # Tracked possessions with at least one event inside the window
+        team_possessions = possessions_by_team(window)
+        game_possessions: Dict[str, int] = {}
+        for (game_id, _), count in team_possessions.items():
+            game_possessions[game_id] = game_possessions.get(game_id, 0) + count
+
+        # Transition and early clock rates are shares of all window events
+        n_games = len(window.games)
+        events_per_game = np.bincount(window.game, minlength=n_games)
+        transition_rate = np.bincount(window.game, weights=window.is_transition, minlength=n_games)
+        early_clock_rate = np.bincount(window.game, weights=window.is_early_clock, minlength=n_games)
 
-        # Calculate pace metrics
         window_duration_min = (self.window_end_sec - self.window_start_sec) / 60.0
-        pace48_actual = (
-            (possessions_elapsed / window_duration_min) * 48.0 if window_duration_min > 0 else None
-        )
-
-        # Calculate rebound percentages (requires both teams' data)
-        home_stats = team_stats[home_team]
-        away_stats = team_stats[away_team]
-
-        home_orb_pct = self._calculate_orb_pct(
-            home_stats.offensive_rebounds, away_stats.defensive_rebounds
-        )
-        home_drb_pct = self._calculate_drb_pct(
-            home_stats.defensive_rebounds, away_stats.offensive_rebounds
-        )
-        away_orb_pct = self._calculate_orb_pct(
-            away_stats.offensive_rebounds, home_stats.defensive_rebounds
-        )
-        away_drb_pct = self._calculate_drb_pct(
-            away_stats.defensive_rebounds, home_stats.offensive_rebounds
-        )
-
-        # Calculate bonus time
-        bonus_time_home = self._calculate_bonus_time(home_stats, self.window_end_sec)
-        bonus_time_away = self._calculate_bonus_time(away_stats, self.window_end_sec)
-
-        # Calculate transition and early clock rates
-        transition_rate = self._calculate_transition_rate(window_events)
-        early_clock_rate = self._calculate_early_clock_rate(window_events)
-
-        return Q1WindowRow(
-            game_id=game_id,
-            home_team_tricode=home_team,
-            away_team_tricode=away_team,
-            possessions_elapsed=possessions_elapsed,
-            pace48_actual=pace48_actual,
-            pace48_expected=self.expected_pace,
-            home_efg_actual=home_stats.effective_fg_pct,
-            home_efg_expected=0.52,  # League average benchmark
-            away_efg_actual=away_stats.effective_fg_pct,
-            away_efg_expected=0.52,
-            home_to_rate=home_stats.turnover_rate,
-            away_to_rate=away_stats.turnover_rate,
-            home_ft_rate=home_stats.free_throw_rate,
-            away_ft_rate=away_stats.free_throw_rate,
-            home_orb_pct=home_orb_pct,
-            home_drb_pct=home_drb_pct,
-            away_orb_pct=away_orb_pct,
-            away_drb_pct=away_drb_pct,
-            bonus_time_home_sec=bonus_time_home,
-            bonus_time_away_sec=bonus_time_away,
-            transition_rate=transition_rate,
-            early_clock_rate=early_clock_rate,
-            source=self.source,
-            source_url=source_url,
-        )
-
-    def _deduplicate_events(self, events: List[PbpEventRow]) -> List[PbpEventRow]:
-        """Deduplicate consecutive events with identical (period, clock_ms_remaining, event_type, team_id)."""
-        if not events:
-            return events
-
-        deduplicated = [events[0]]  # Keep first event
-
-        for event in events[1:]:
-            prev_event = deduplicated[-1]
-
-            # Check if this event is identical to the previous one
-            if (
-                event.period == prev_event.period
-                and event.clock_ms_remaining == prev_event.clock_ms_remaining
-                and event.event_type == prev_event.event_type
-                and event.team_tricode == prev_event.team_tricode
-            ):
-                # Skip duplicate, keep the first occurrence
-                logger.debug(
-                    f"Skipping duplicate event: {event.event_idx} (keeping {prev_event.event_idx})"
+        games, first_pair, team_count = np.unique(pair_game, return_index=True, return_counts=True)
+        rows = []
+        for game, first, count in zip(games.tolist(), first_pair.tolist(), team_count.tolist()):
+            game_id = window.games[game]
+            if count != 2:
+                logger.warning(
+                    "Expected 2 teams, found",
+                    game_id=game_id,
+                    teams=[window.teams[int(code)] for code in pair_team[first:first + count]],
                 )
                 continue
 
-            deduplicated.append(event)
-
-        return deduplicated
-
-    def _identify_home_away_teams(self, events: List[PbpEventRow]) -> Tuple[str, str]:
-        """Identify home and away teams from events.
-
-        Heuristic: Look for score updates or use alphabetical ordering as fallback.
+            # Heuristic: alphabetical assignment (in production this would use game metadata)
+            home_stats, away_stats = sorted(
+                (stats(first + k, window.teams[int(pair_team[first + k])]) for k in range(2)),
+                key=lambda team_stats: team_stats.team_tricode,
+            )
+            for team_stats in (home_stats, away_stats):
+                team_stats.possessions = max(1, team_possessions.get((game_id, team_stats.team_tricode), 0))
+            possessions_elapsed = game_possessions.get(game_id, 0)
+
+            rows.append(Q1WindowRow(
+                game_id=game_id,
+                home_team_tricode=home_stats.team_tricode,
+                away_team_tricode=away_stats.team_tricode,
+                possessions_elapsed=possessions_elapsed,
+                pace48_actual=(
+                    (possessions_elapsed / window_duration_min) * 48.0 if window_duration_min > 0 else None
+                ),
+                pace48_expected=self.expected_pace,
+                home_efg_actual=home_stats.effective_fg_pct,
+                home_efg_expected=0.52,  # League average benchmark
+                away_efg_actual=away_stats.effective_fg_pct,
+                away_efg_expected=0.52,
+                home_to_rate=home_stats.turnover_rate,
+                away_to_rate=away_stats.turnover_rate,
+                home_ft_rate=home_stats.free_throw_rate,
+                away_ft_rate=away_stats.free_throw_rate,
+                home_orb_pct=self._calculate_orb_pct(
+                    home_stats.offensive_rebounds, away_stats.defensive_rebounds
+                ),
+                home_drb_pct=self._calculate_drb_pct(
+                    home_stats.defensive_rebounds, away_stats.offensive_rebounds
+                ),
+                away_orb_pct=self._calculate_orb_pct(
+                    away_stats.offensive_rebounds, home_stats.defensive_rebounds
+                ),
+                away_drb_pct=self._calculate_drb_pct(
+                    away_stats.defensive_rebounds, home_stats.offensive_rebounds
+                ),
+                bonus_time_home_sec=self._calculate_bonus_time(home_stats, self.window_end_sec),
+                bonus_time_away_sec=self._calculate_bonus_time(away_stats, self.window_end_sec),
+                transition_rate=float(transition_rate[game] / events_per_game[game]),
+                early_clock_rate=float(early_clock_rate[game] / events_per_game[game]),
+                source=self.source,
+                source_url=source_url,
+            ))
+        return rows
+
+    def _window_positions(self, frame: PbpFrame) -> np.ndarray:
+        """Positions of Q1 window events: deduplicated, then ordered by (game, event_idx).
+
+        Events with a clock use clock-safe window checking; events without one
+        fall back to seconds_elapsed for backwards compatibility.
         """
-        teams = set(e.team_tricode for e in events if e.team_tricode)
-        teams_list = sorted(list(teams))
-
-        if len(teams_list) == 2:
-            # Simple alphabetical assignment as fallback
-            # In production, this would use game metadata
-            return teams_list[0], teams_list[1]  # home, away
+        _, period_start_ms = period_bounds_ms(1)
+        window_start_ms = period_start_ms - (self.window_start_sec * 1000)  # 12:00 -> 720000ms
+        window_end_ms = period_start_ms - (self.window_end_sec * 1000)  # 08:00 -> 480000ms
+
+        seconds = frame.seconds_elapsed
+        by_seconds = (
+            ~np.isnan(seconds)
+            & (seconds >= self.window_start_sec)
+            & (seconds <= self.window_end_sec)
+        )
+        in_window = (frame.period == 1) & np.where(
+            frame.clock_ms >= 0, frame.clock_window_mask(window_start_ms, window_end_ms), by_seconds
+        )
+        positions = np.flatnonzero(in_window)
+
+        # Drop consecutive events with identical (game, period, clock_ms_remaining, event_type, team)
+        keep = np.ones(len(positions), dtype=bool)
+        if len(positions) > 1:
+            current, previous = positions[1:], positions[:-1]
+            keep[1:] = (
+                (frame.game[current] != frame.game[previous])
+                | (frame.period[current] != frame.period[previous])
+                | (frame.clock_ms[current] != frame.clock_ms[previous])
+                | (frame.event_type[current] != frame.event_type[previous])
+                | (frame.team[current] != frame.team[previous])
+            )
+        positions = positions[keep]
 
-        # Fallback if we can't determine
-        return "HOME", "AWAY"
+        # Sort by event index to ensure chronological order
+        return positions[np.lexsort((frame.event_idx[positions], frame.game[positions]))]
 
-    def _process_window_events(
-        self, events: List[PbpEventRow], team_stats: Dict[str, TeamStats]
-    ) -> int:
-        """Process events to build team statistics and count possessions."""
-        possessions = 0
+    def _grouped_team_stats(
+        self, window: PbpFrame, known: np.ndarray, pair_of: np.ndarray, n_pairs: int
+    ) -> Callable[[int, str], TeamStats]:
+        """Box-score counts for every (game, team) group of the window events.
 
-        for event in events:
-            if not event.team_tricode or event.team_tricode not in team_stats:
-                continue
-
-            stats = team_stats[event.team_tricode]
-
-            # Track shooting statistics
-            if event.event_type in [EventType.SHOT_MADE, EventType.SHOT_MISSED]:
-                stats.field_goals_attempted += 1
-                if event.shot_made:
-                    stats.field_goals_made += 1
-                    stats.points += event.shot_value or 2
-
-                if event.shot_value == 3:
-                    stats.three_pointers_attempted += 1
-                    if event.shot_made:
-                        stats.three_pointers_made += 1
-
-            # Track free throws - fix the logic to properly assign to the fouled team
-            elif event.event_type in [EventType.FREE_THROW_MADE, EventType.FREE_THROW_MISSED]:
-                stats.free_throws_attempted += 1
-                if event.shot_made:
-                    stats.free_throws_made += 1
-                    stats.points += 1
-
-            # Track rebounds
-            elif event.event_type == EventType.REBOUND:
-                # Determine if it's offensive or defensive based on context
-                # If the rebounding team is different from the shooting team, it's defensive
-                if "offensive" in (event.description or "").lower():
-                    stats.offensive_rebounds += 1
-                else:
-                    stats.defensive_rebounds += 1
-
-            # Track turnovers and assists
-            elif event.event_type == EventType.TURNOVER:
-                stats.turnovers += 1
-            elif event.event_type == EventType.ASSIST:
-                stats.assists += 1
-
-            # Track fouls and bonus situations - assign to the fouling team
-            elif event.event_type in [EventType.FOUL, EventType.PERSONAL_FOUL]:
-                stats.personal_fouls += 1
-                stats.team_fouls_in_quarter += 1
-
-                # Check for bonus threshold (4 team fouls = bonus for opponent)
-                if stats.team_fouls_in_quarter >= 4 and stats.bonus_start_time is None:
-                    # Use robust coercion for bonus time calculation
-                    stats.bonus_start_time = to_float_or_none(event.seconds_elapsed)
-
-            # Count possessions on certain events
-            if self._is_possession_ending_event(event):
-                possessions += 1
-
-        # Update possession counts for rate calculations
-        for stats in team_stats.values():
-            stats.possessions = max(1, possessions // 2)  # Rough estimate per team
-
-        return possessions
-
-    def _is_possession_ending_event(self, event: PbpEventRow) -> bool:
-        """Determine if event ends a possession."""
-        return event.event_type in [
-            EventType.SHOT_MADE,
-            EventType.TURNOVER,
-            EventType.REBOUND,  # Defensive rebound ends possession
-        ]
+        ``pair_of`` gives the group of each event with a known team. Returns a
+        factory building the ``TeamStats`` of one group.
+        """
+        made = window.shot_made == 1
+
+        def count(mask: np.ndarray) -> np.ndarray:
+            return np.bincount(pair_of, weights=mask[known], minlength=n_pairs).astype(np.int64)
+
+        # Field goals; made shots without a value count as twos
+        shots = window.type_mask(EventType.SHOT_MADE, EventType.SHOT_MISSED)
+        threes = shots & (window.shot_value == 3)
+        shot_points = np.where(shots & made, np.where(window.shot_value > 0, window.shot_value, 2), 0)
+        free_throws = window.type_mask(EventType.FREE_THROW_MADE, EventType.FREE_THROW_MISSED)
+
+        # Rebounds are offensive only when the description says so
+        rebounds = window.type_mask(EventType.REBOUND)
+        offensive = window.flag_mask(DESC_OFFENSIVE)
+
+        # Fouls are assigned to the fouling team; the 4th team foul puts the opponent in the bonus
+        fouls = window.type_mask(EventType.FOUL, EventType.PERSONAL_FOUL)[known]
+        foul_pair = pair_of[fouls]
+        foul_seconds = window.seconds_elapsed[known][fouls]
+        foul_order = np.argsort(foul_pair, kind="stable")
+        sorted_pairs = foul_pair[foul_order]
+        group_start = np.searchsorted(sorted_pairs, sorted_pairs)
+        foul_rank = np.empty(len(foul_order), dtype=np.int64)
+        foul_rank[foul_order] = np.arange(len(foul_order)) - group_start
+        bonus = (foul_rank >= 3) & ~np.isnan(foul_seconds)
+        bonus_pairs, first_bonus = np.unique(foul_pair[bonus], return_index=True)
+        bonus_start = dict(zip(bonus_pairs.tolist(), foul_seconds[bonus][first_bonus].tolist()))
+
+        columns = {
+            "field_goals_attempted": count(shots),
+            "field_goals_made": count(shots & made),
+            "three_pointers_attempted": count(threes),
+            "three_pointers_made": count(threes & made),
+            "free_throws_attempted": count(free_throws),
+            "free_throws_made": count(free_throws & made),
+            "offensive_rebounds": count(rebounds & offensive),
+            "defensive_rebounds": count(rebounds & ~offensive),
+            "turnovers": count(window.type_mask(EventType.TURNOVER)),
+            "assists": count(window.type_mask(EventType.ASSIST)),
+            "personal_fouls": np.bincount(foul_pair, minlength=n_pairs),
+        }
+        points = np.bincount(pair_of, weights=shot_points[known], minlength=n_pairs).astype(np.int64)
+        columns["points"] = points + columns["free_throws_made"]
+        columns = {name: values.tolist() for name, values in columns.items()}
+
+        def team_stats(pair: int, team_tricode: str) -> TeamStats:
+            stats = TeamStats(team_tricode, **{name: values[pair] for name, values in columns.items()})
+            stats.team_fouls_in_quarter = stats.personal_fouls
+            stats.bonus_start_time = bonus_start.get(pair)
+            return stats
+
+        return team_stats
 
     def _calculate_orb_pct(self, team_orb: int, opponent_drb: int) -> Optional[float]:
         """Calculate offensive rebound percentage."""
@@ -368,23 +337,3 @@ class Q1WindowTransformer:
         # Time in bonus = window_end - bonus_start_time
         bonus_seconds = window_end_sec - stats.bonus_start_time
         return max(0.0, bonus_seconds)
-
-    def _calculate_transition_rate(self, events: List[PbpEventRow]) -> Optional[float]:
-        """Calculate rate of transition possessions (events within 6 seconds of possession change)."""
-        if not events:
-            return None
-
-        transition_events = sum(1 for e in events if e.is_transition)
-        total_events = len(events)
-
-        return transition_events / total_events if total_events > 0 else None
-
-    def _calculate_early_clock_rate(self, events: List[PbpEventRow]) -> Optional[float]:
-        """Calculate rate of early shot clock events (within first 8 seconds)."""
-        if not events:
-            return None
-
-        early_clock_events = sum(1 for e in events if e.is_early_clock)
-        total_events = len(events)
-
-        return early_clock_events / total_events if total_events > 0 else None
@@ -1,11 +1,25 @@
-"""Schedule travel analytics transformer with circadian and altitude metrics."""
+"""Schedule travel analytics transformer with circadian and altitude metrics.
+
+Travel is derived for a whole schedule at once. Venue-to-venue distance,
+altitude change and timezone shift are precomputed once into square matrices
+(``VenueMatrix``, 30x30 for the league). The schedule becomes one sorted array
+of (team, game) appearances (``ScheduleArrays``). Rest days, back-to-backs and
+the 3-in-4 / 5-in-7 density windows are then computed with array shifts over
+every team together (``derive_travel``).
+
+What-if analysis works on the arrays directly. To move a game, relocate a
+venue or change a date, ``_replace`` the field and call ``derive_travel``
+again. No rows are rebuilt until ``rows`` is called.
+"""
 
 import csv
 import math
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
 
 from ..models.derived_rows import ScheduleTravelRow
 from ..models.game_rows import GameRow
@@ -14,6 +28,21 @@ from ..utils.coerce import to_float_or_none
 
 logger = get_logger(__name__)
 
+EARTH_RADIUS_KM = 6371.0
+
+# Simplified timezone mapping (hours from UTC, standard time)
+TZ_UTC_OFFSETS: Dict[str, int] = {
+    "America/Los_Angeles": -8,  # PST
+    "America/Denver": -7,  # MST
+    "America/Phoenix": -7,  # MST (no DST)
+    "America/Chicago": -6,  # CST
+    "America/Detroit": -5,  # EST
+    "America/New_York": -5,  # EST
+    "America/Toronto": -5,  # EST
+}
+
+_EPOCH = datetime(1970, 1, 1)
+
 
 @dataclass
 class VenueData:
@@ -48,6 +77,204 @@ class TravelLeg:
         return self.timezone_shift_hours < 0
 
 
+def haversine_km(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km (broadcasting over the inputs)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(a))
+
+
+@dataclass(frozen=True)
+class VenueMatrix:
+    """Pairwise travel metrics between venues, indexed ``[from, to]``.
+
+    Timezone shifts are positive for eastward travel.
+    """
+
+    venues: Tuple[VenueData, ...]
+    index: Dict[str, int]
+    distance_km: np.ndarray
+    altitude_change_m: np.ndarray
+    timezone_shift_hours: np.ndarray
+
+    @classmethod
+    def from_venues(cls, venues: Mapping[str, VenueData]) -> "VenueMatrix":
+        ordered = tuple(venues.values())
+        lat = np.array([v.lat for v in ordered], dtype=np.float64)
+        lon = np.array([v.lon for v in ordered], dtype=np.float64)
+        altitude = np.array([v.altitude_m for v in ordered], dtype=np.float64)
+        offset = np.array([TZ_UTC_OFFSETS.get(v.arena_tz, 0) for v in ordered], dtype=np.float64)
+        return cls(
+            venues=ordered,
+            index={code: i for i, code in enumerate(venues)},
+            distance_km=haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :]),
+            altitude_change_m=altitude[None, :] - altitude[:, None],
+            timezone_shift_hours=offset[None, :] - offset[:, None],
+        )
+
+    def __len__(self) -> int:
+        return len(self.venues)
+
+
+class ScheduleArrays(NamedTuple):
+    """A schedule as (team, game) appearances, two per game (home, then away).
+
+    ``venue`` is the venue-matrix index of the home arena (``-1`` when
+    unknown). ``day`` is the proleptic ordinal of the game date, ``hour`` the
+    game hour and ``when`` the tip-off in epoch seconds, which is used to order
+    each team's games.
+    """
+
+    game_ids: Tuple[str, ...]
+    teams: Tuple[str, ...]
+    game: np.ndarray  # int32, index into game_ids
+    team: np.ndarray  # int32, index into teams
+    venue: np.ndarray  # int32
+    day: np.ndarray  # int64
+    hour: np.ndarray  # int8
+    when: np.ndarray  # float64
+
+    @classmethod
+    def from_games(cls, games: List[GameRow], venue_index: Mapping[str, int]) -> "ScheduleArrays":
+        team_codes: Dict[str, int] = {}
+        team = np.fromiter(
+            (team_codes.setdefault(code, len(team_codes))
+             for g in games for code in (g.home_team_tricode, g.away_team_tricode)),
+            dtype=np.int32,
+            count=2 * len(games),
+        )
+        venue = np.array([venue_index.get(g.home_team_tricode, -1) for g in games], dtype=np.int32)
+        day = np.array([g.game_date_utc.date().toordinal() for g in games], dtype=np.int64)
+        hour = np.array([g.game_date_utc.hour for g in games], dtype=np.int8)
+        when = np.array([_epoch_seconds(g.game_date_utc) for g in games], dtype=np.float64)
+        return cls(
+            game_ids=tuple(g.game_id for g in games),
+            teams=tuple(team_codes),
+            game=np.repeat(np.arange(len(games), dtype=np.int32), 2),
+            team=team,
+            venue=np.repeat(venue, 2),
+            day=np.repeat(day, 2),
+            hour=np.repeat(hour, 2),
+            when=np.repeat(when, 2),
+        )
+
+
+class TravelArrays(NamedTuple):
+    """Travel metrics per appearance, in (team, tip-off) order.
+
+    ``order`` maps back to ``ScheduleArrays`` positions and ``prev`` is the
+    team's previous appearance in the same numbering (``-1`` for a first
+    game). ``valid`` marks the rows that get a ``ScheduleTravelRow``: a
+    previous game exists and both venues are known.
+    """
+
+    order: np.ndarray
+    prev: np.ndarray
+    valid: np.ndarray
+    days_rest: np.ndarray
+    is_back_to_back: np.ndarray
+    is_3_in_4: np.ndarray
+    is_5_in_7: np.ndarray
+    distance_km: np.ndarray
+    timezone_shift_hours: np.ndarray
+    altitude_change_m: np.ndarray
+    circadian_index: np.ndarray
+
+
+def _epoch_seconds(when: datetime) -> float:
+    if when.tzinfo is None:
+        return (when - _EPOCH).total_seconds()
+    return (when.astimezone(timezone.utc).replace(tzinfo=None) - _EPOCH).total_seconds()
+
+
+def _density(day: np.ndarray, position: np.ndarray, games: int, days: int) -> np.ndarray:
+    """True where a team's last ``games`` games (this one included) fit in ``days`` days."""
+    flags = np.zeros(len(day), dtype=bool)
+    if len(day) >= games:
+        windows = np.lib.stride_tricks.sliding_window_view(day, games)
+        span = windows.max(axis=1) - windows.min(axis=1) + 1
+        flags[games - 1:] = span <= days
+    return flags & (position >= games - 1)
+
+
+def circadian_index(
+    timezone_shift_hours: np.ndarray,
+    distance_km: np.ndarray,
+    altitude_change_m: np.ndarray,
+    days_rest: np.ndarray,
+    game_hour: np.ndarray,
+) -> np.ndarray:
+    """Composite circadian disruption index (0.0 = no impact, 1.0 = maximum impact)."""
+    eastward = timezone_shift_hours > 0
+
+    # Timezone shift impact (3+ hour shifts = maximum), eastward travel 1.5x worse
+    disruption = np.minimum(np.abs(timezone_shift_hours) / 3.0, 1.0)
+    disruption = np.where(eastward, disruption * 1.5, disruption)
+
+    # Distance fatigue on long-haul flights (max 0.3)
+    disruption = disruption + np.where(distance_km > 1000, np.minimum(distance_km / 5000.0, 0.3), 0.0)
+
+    # Recovery time: back-to-backs amplify fatigue, good rest reduces it
+    rest_multiplier = np.select(
+        [days_rest == 0, days_rest == 1, days_rest >= 3], [1.5, 1.0, 0.5], default=0.8
+    )
+    disruption = disruption * rest_multiplier
+
+    # Late games (10 PM or later) after eastward travel are worse
+    disruption = np.where(eastward & (game_hour >= 22), disruption * 1.2, disruption)
+
+    # Going to high altitude is disruptive (max 0.2)
+    disruption = disruption + np.where(
+        altitude_change_m > 1000, np.minimum(altitude_change_m / 2000.0, 0.2), 0.0
+    )
+
+    return np.clip(disruption, 0.0, 1.0)
+
+
+def derive_travel(schedule: ScheduleArrays, venues: VenueMatrix) -> TravelArrays:
+    """Rest, density and travel metrics for every appearance in ``schedule``."""
+    order = np.lexsort((schedule.when, schedule.team))
+    n = len(order)
+    team = schedule.team[order]
+    day = schedule.day[order]
+    venue = schedule.venue[order]
+
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = team[1:] != team[:-1]
+    positions = np.arange(n)
+    position = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+    has_prev = position >= 1
+
+    prev_day = np.roll(day, 1)
+    prev_venue = np.roll(venue, 1)
+    days_rest = np.where(has_prev, day - prev_day - 1, 0)
+    valid = has_prev & (venue >= 0) & (prev_venue >= 0)
+
+    # Pairwise lookups; invalid rows read venue 0 and are masked out
+    src = np.where(valid, prev_venue, 0)
+    dst = np.where(valid, venue, 0)
+    if len(venues):
+        distance = np.where(valid, venues.distance_km[src, dst], 0.0)
+        tz_shift = np.where(valid, venues.timezone_shift_hours[src, dst], 0.0)
+        altitude = np.where(valid, venues.altitude_change_m[src, dst], 0.0)
+    else:
+        distance = tz_shift = altitude = np.zeros(n)
+
+    return TravelArrays(
+        order=order,
+        prev=np.where(has_prev, np.roll(order, 1), -1),
+        valid=valid,
+        days_rest=days_rest,
+        is_back_to_back=has_prev & (days_rest == 0),
+        is_3_in_4=_density(day, position, 3, 4),
+        is_5_in_7=_density(day, position, 5, 7),
+        distance_km=distance,
+        timezone_shift_hours=tz_shift,
+        altitude_change_m=altitude,
+        circadian_index=circadian_index(tz_shift, distance, altitude, days_rest, schedule.hour[order]),
+    )
+
+
 class ScheduleTravelTransformer:
     """Transformer for schedule difficulty and travel impact analytics."""
 
@@ -65,36 +292,24 @@ class ScheduleTravelTransformer:
             venues_csv_path = Path(__file__).parent.parent.parent.parent / "venues.csv"
 
         self.venues = self._load_venues_data(venues_csv_path)
+        self.venue_matrix = VenueMatrix.from_venues(self.venues)
         logger.info("Loaded venue data", venue_count=len(self.venues))
 
     def transform(self, games: List[GameRow], source_url: str) -> List[ScheduleTravelRow]:
         """Transform game schedule into travel analytics.
 
         Args:
-            games: List of games sorted by date for each team
+            games: Games of one or more seasons, in any order
             source_url: Source URL for provenance
 
         Returns:
-            List of ScheduleTravelRow instances
+            List of ScheduleTravelRow instances (per team, chronologically)
         """
         if not games:
             return []
 
-        # Group games by team for schedule analysis
-        team_schedules = self._group_games_by_team(games)
-
-        travel_rows = []
-
-        for team_tricode, team_games in team_schedules.items():
-            # Sort games chronologically for each team
-            team_games.sort(key=lambda g: g.game_date_utc)
-
-            for i, game in enumerate(team_games):
-                travel_row = self._analyze_game_travel(
-                    game, team_games[:i], team_tricode, source_url
-                )
-                if travel_row:
-                    travel_rows.append(travel_row)
+        schedule = self.schedule_arrays(games)
+        travel_rows = self.rows(schedule, derive_travel(schedule, self.venue_matrix), source_url)
 
         logger.info(
             "Generated travel analytics", total_games=len(games), travel_analytics=len(travel_rows)
@@ -102,6 +317,64 @@ class ScheduleTravelTransformer:
 
         return travel_rows
 
+    def schedule_arrays(self, games: List[GameRow]) -> ScheduleArrays:
+        """Columnar schedule keyed to this transformer's venue matrix."""
+        return ScheduleArrays.from_games(games, self.venue_matrix.index)
+
+    def rows(
+        self, schedule: ScheduleArrays, travel: TravelArrays, source_url: str
+    ) -> List[ScheduleTravelRow]:
+        """Build ScheduleTravelRow models for the valid appearances of ``travel``."""
+        missing = np.flatnonzero((travel.prev >= 0) & ~travel.valid)
+        for pos in travel.order[missing].tolist():
+            logger.warning(
+                "Missing venue data",
+                game_id=schedule.game_ids[schedule.game[pos]],
+                team=schedule.teams[schedule.team[pos]],
+            )
+
+        keep = np.flatnonzero(travel.valid)
+        current = travel.order[keep]
+        prev = travel.prev[keep]
+        venues = self.venue_matrix.venues
+        columns = zip(
+            schedule.game[current].tolist(),
+            schedule.team[current].tolist(),
+            travel.is_back_to_back[keep].tolist(),
+            travel.is_3_in_4[keep].tolist(),
+            travel.is_5_in_7[keep].tolist(),
+            travel.days_rest[keep].tolist(),
+            travel.timezone_shift_hours[keep].tolist(),
+            travel.circadian_index[keep].tolist(),
+            travel.altitude_change_m[keep].tolist(),
+            travel.distance_km[keep].tolist(),
+            schedule.day[prev].tolist(),
+            schedule.venue[prev].tolist(),
+        )
+        return [
+            ScheduleTravelRow(
+                game_id=schedule.game_ids[game],
+                team_tricode=schedule.teams[team],
+                is_back_to_back=b2b,
+                is_3_in_4=three_in_four,
+                is_5_in_7=five_in_seven,
+                days_rest=days_rest,
+                timezone_shift_hours=tz_shift,
+                circadian_index=circadian,
+                altitude_change_m=altitude,
+                travel_distance_km=distance,
+                prev_game_date=date.fromordinal(prev_day),
+                prev_arena_tz=venues[prev_venue].arena_tz,
+                prev_lat=venues[prev_venue].lat,
+                prev_lon=venues[prev_venue].lon,
+                prev_altitude_m=venues[prev_venue].altitude_m,
+                source=self.source,
+                source_url=source_url,
+            )
+            for (game, team, b2b, three_in_four, five_in_seven, days_rest, tz_shift,
+                 circadian, altitude, distance, prev_day, prev_venue) in columns
+        ]
+
     def _load_venues_data(self, venues_csv_path: Path) -> Dict[str, VenueData]:
         """Load venue data from CSV file."""
         venues = {}
@@ -137,91 +410,6 @@ class ScheduleTravelTransformer:
 
         return venues
 
-    def _group_games_by_team(self, games: List[GameRow]) -> Dict[str, List[GameRow]]:
-        """Group games by team (both home and away)."""
-        team_schedules = {}
-
-        for game in games:
-            # Add game to home team's schedule
-            if game.home_team_tricode not in team_schedules:
-                team_schedules[game.home_team_tricode] = []
-            team_schedules[game.home_team_tricode].append(game)
-
-            # Add game to away team's schedule
-            if game.away_team_tricode not in team_schedules:
-                team_schedules[game.away_team_tricode] = []
-            team_schedules[game.away_team_tricode].append(game)
-
-        return team_schedules
-
-    def _analyze_game_travel(
-        self,
-        current_game: GameRow,
-        previous_games: List[GameRow],
-        team_tricode: str,
-        source_url: str,
-    ) -> Optional[ScheduleTravelRow]:
-        """Analyze travel impact for a specific game."""
-
-        if not previous_games:
-            # First game of the season - no travel analysis
-            return None
-
-        # Find the most recent previous game
-        prev_game = previous_games[-1]
-
-        # Calculate days rest
-        days_rest = (current_game.game_date_utc.date() - prev_game.game_date_utc.date()).days - 1
-
-        # Determine current and previous venues
-        current_venue = self._get_team_venue(current_game, team_tricode)
-        prev_venue = self._get_team_venue(prev_game, team_tricode)
-
-        if not current_venue or not prev_venue:
-            logger.warning("Missing venue data", game_id=current_game.game_id, team=team_tricode)
-            return None
-
-        # Calculate travel metrics
-        travel_leg = self._calculate_travel_leg(prev_venue, current_venue)
-
-        # Analyze schedule difficulty
-        schedule_patterns = self._analyze_schedule_patterns(
-            current_game, previous_games, team_tricode
-        )
-
-        # Calculate circadian impact
-        circadian_index = self._calculate_circadian_index(
-            travel_leg, days_rest, current_game.game_date_utc
-        )
-
-        return ScheduleTravelRow(
-            game_id=current_game.game_id,
-            team_tricode=team_tricode,
-            is_back_to_back=schedule_patterns["is_back_to_back"],
-            is_3_in_4=schedule_patterns["is_3_in_4"],
-            is_5_in_7=schedule_patterns["is_5_in_7"],
-            days_rest=days_rest,
-            timezone_shift_hours=travel_leg.timezone_shift_hours,
-            circadian_index=circadian_index,
-            altitude_change_m=travel_leg.altitude_change_m,
-            travel_distance_km=travel_leg.distance_km,
-            prev_game_date=prev_game.game_date_utc.date(),
-            prev_arena_tz=prev_venue.arena_tz,
-            prev_lat=prev_venue.lat,
-            prev_lon=prev_venue.lon,
-            prev_altitude_m=prev_venue.altitude_m,
-            source=self.source,
-            source_url=source_url,
-        )
-
-    def _get_team_venue(self, game: GameRow, team_tricode: str) -> Optional[VenueData]:
-        """Get the venue for a team's game (home venue if home, away venue if away)."""
-        if team_tricode == game.home_team_tricode:
-            return self.venues.get(game.home_team_tricode)
-        elif team_tricode == game.away_team_tricode:
-            return self.venues.get(game.home_team_tricode)  # Away team plays at home team's venue
-        return None
-
     def _calculate_travel_leg(self, from_venue: VenueData, to_venue: VenueData) -> TravelLeg:
         """Calculate travel metrics between two venues."""
 
@@ -266,106 +454,30 @@ class ScheduleTravelTransformer:
         )
         c = 2 * math.asin(math.sqrt(a))
 
-        # Earth radius in kilometers
-        earth_radius_km = 6371.0
-
-        return earth_radius_km * c
+        return EARTH_RADIUS_KM * c
 
     def _calculate_timezone_shift(self, from_tz: str, to_tz: str) -> float:
         """Calculate timezone shift in hours (positive = eastward)."""
+        return TZ_UTC_OFFSETS.get(to_tz, 0) - TZ_UTC_OFFSETS.get(from_tz, 0)
 
-        # Simplified timezone mapping (hours from UTC)
-        tz_offsets = {
-            "America/Los_Angeles": -8,  # PST
-            "America/Denver": -7,  # MST
-            "America/Phoenix": -7,  # MST (no DST)
-            "America/Chicago": -6,  # CST
-            "America/Detroit": -5,  # EST
-            "America/New_York": -5,  # EST
-            "America/Toronto": -5,  # EST
-        }
-
-        from_offset = tz_offsets.get(from_tz, 0)
-        to_offset = tz_offsets.get(to_tz, 0)
-
-        # Positive = eastward travel (harder on body clock)
-        return to_offset - from_offset
-
-    def _analyze_schedule_patterns(
-        self, current_game: GameRow, previous_games: List[GameRow], team_tricode: str
-    ) -> Dict[str, bool]:
-        """Analyze back-to-back and compressed schedule patterns."""
-
-        current_date = current_game.game_date_utc.date()
-
-        # Check for back-to-back (game yesterday)
-        is_back_to_back = False
-        if previous_games:
-            prev_date = previous_games[-1].game_date_utc.date()
-            is_back_to_back = (current_date - prev_date).days == 1
-
-        # Check for 3-in-4 (3 games in 4 days)
-        is_3_in_4 = False
-        if len(previous_games) >= 2:
-            game_dates = [g.game_date_utc.date() for g in previous_games[-2:]] + [current_date]
-            date_span = (max(game_dates) - min(game_dates)).days + 1
-            is_3_in_4 = date_span <= 4
-
-        # Check for 5-in-7 (5 games in 7 days)
-        is_5_in_7 = False
-        if len(previous_games) >= 4:
-            game_dates = [g.game_date_utc.date() for g in previous_games[-4:]] + [current_date]
-            date_span = (max(game_dates) - min(game_dates)).days + 1
-            is_5_in_7 = date_span <= 7
-
-        return {"is_back_to_back": is_back_to_back, "is_3_in_4": is_3_in_4, "is_5_in_7": is_5_in_7}
+    def _group_games_by_team(self, games: List[GameRow]) -> Dict[str, List[GameRow]]:
+        """Group games by team (both home and away)."""
+        team_schedules: Dict[str, List[GameRow]] = {}
+        for game in games:
+            team_schedules.setdefault(game.home_team_tricode, []).append(game)
+            team_schedules.setdefault(game.away_team_tricode, []).append(game)
+        return team_schedules
 
     def _calculate_circadian_index(
         self, travel_leg: TravelLeg, days_rest: int, game_datetime: datetime
     ) -> float:
-        """Calculate composite circadian disruption index (0.0 = no impact, 1.0 = maximum impact)."""
-
-        base_disruption = 0.0
-
-        # Timezone shift impact (eastward travel is worse)
-        tz_shift_abs = abs(travel_leg.timezone_shift_hours)
-        if tz_shift_abs > 0:
-            tz_impact = min(tz_shift_abs / 3.0, 1.0)  # 3+ hour shifts = maximum impact
-
-            # Eastward travel is 1.5x worse than westward
-            if travel_leg.is_eastward:
-                tz_impact *= 1.5
-
-            base_disruption += tz_impact
-
-        # Distance fatigue (long flights)
-        if travel_leg.distance_km > 1000:  # Long-haul threshold
-            distance_impact = min(travel_leg.distance_km / 5000.0, 0.3)  # Max 0.3 from distance
-            base_disruption += distance_impact
-
-        # Recovery time adjustment (more rest = less impact)
-        if days_rest == 0:
-            rest_multiplier = 1.5  # Back-to-back amplifies fatigue
-        elif days_rest == 1:
-            rest_multiplier = 1.0  # Normal impact
-        elif days_rest >= 3:
-            rest_multiplier = 0.5  # Good rest reduces impact
-        else:
-            rest_multiplier = 0.8  # Some rest helps
-
-        base_disruption *= rest_multiplier
-
-        # Game time adjustment (late games after eastward travel are worse)
-        game_hour = game_datetime.hour
-        if travel_leg.is_eastward and game_hour >= 22:  # 10 PM or later
-            base_disruption *= 1.2
-
-        # Altitude adjustment (going to high altitude is disruptive)
-        if travel_leg.altitude_change_m > 1000:  # Significant altitude gain
-            altitude_impact = min(
-                travel_leg.altitude_change_m / 2000.0, 0.2
-            )  # Max 0.2 from altitude
-            base_disruption += altitude_impact
-
-        # Cap at 1.0 and ensure non-negative
-        return max(0.0, min(base_disruption, 1.0))
+        """Circadian disruption index of a single travel leg."""
+        return float(
+            circadian_index(
+                np.float64(travel_leg.timezone_shift_hours),
+                np.float64(travel_leg.distance_km),
+                np.float64(travel_leg.altitude_change_m),
+                np.int64(days_rest),
+                np.int64(game_datetime.hour),
+            )
+        )
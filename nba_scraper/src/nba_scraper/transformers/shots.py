@@ -1,10 +1,16 @@
 """Shot transformation functions - pure, synchronous."""
 
-from typing import Any, Dict, List
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence, Tuple
 
+import numpy as np
+
+from ..models.pbp import PbpEvent
 from ..models.shots import ShotEvent
 from ..utils.coerce import to_int_or_none
-from ..utils.preprocess import normalize_player_id, normalize_team_id, preprocess_nba_stats_data
+from ..utils.column_coercion import SHOT_CHART_DETAIL_COLUMNS, coerce_record
+from ..utils.preprocess import normalize_player_id, normalize_team_id
 
 
 def transform_shots(raw: List[Dict[str, Any]], game_id: str) -> List[ShotEvent]:
@@ -20,8 +26,8 @@ def transform_shots(raw: List[Dict[str, Any]], game_id: str) -> List[ShotEvent]:
     out = []
 
     for s in raw:
-        # Apply preprocessing to handle mixed data types
-        s = preprocess_nba_stats_data(s)
+        # Coerce with the Shot_Chart_Detail column schema
+        s = coerce_record(s, SHOT_CHART_DETAIL_COLUMNS)
 
         try:
             # Extract required fields
@@ -42,6 +48,15 @@ def transform_shots(raw: List[Dict[str, Any]], game_id: str) -> List[ShotEvent]:
             # Optional event number for linking to PBP using robust coercion
             event_num = to_int_or_none(s.get("EVENT_NUM"))
 
+            # Shot clock position for time-based linking when event_num is missing
+            minutes = to_int_or_none(s.get("MINUTES_REMAINING"))
+            seconds = to_int_or_none(s.get("SECONDS_REMAINING"))
+            clock_ms_remaining = (
+                (minutes * 60 + seconds) * 1000
+                if minutes is not None and seconds is not None
+                else None
+            )
+
             shot_event = ShotEvent(
                 game_id=game_id,
                 player_id=player_id,
@@ -51,6 +66,7 @@ def transform_shots(raw: List[Dict[str, Any]], game_id: str) -> List[ShotEvent]:
                 loc_x=loc_x,
                 loc_y=loc_y,
                 event_num=event_num,
+                clock_ms_remaining=clock_ms_remaining,
             )
             out.append(shot_event)
 
@@ -59,3 +75,93 @@ def transform_shots(raw: List[Dict[str, Any]], game_id: str) -> List[ShotEvent]:
             continue
 
     return out
+
+
+# Shot chart clocks have whole-second resolution; PBP clocks may carry tenths.
+SHOT_MATCH_TOLERANCE_MS = 1000
+
+# NBA Stats EVENTMSGTYPE for field goals, keyed by shot_made_flag.
+_SHOT_ACTION_TYPES = {1: 1, 0: 2}
+
+
+def shot_distances_ft(loc_x: Sequence[int], loc_y: Sequence[int]) -> np.ndarray:
+    """Vectorized shot distance in feet (court coordinates are tenths of a foot)."""
+    return np.hypot(np.asarray(loc_x, dtype=np.float64), np.asarray(loc_y, dtype=np.float64)) / 10.0
+
+
+def match_shots_to_pbp(
+    shot_rows: Sequence[ShotEvent],
+    pbp_rows: Sequence[PbpEvent],
+    tolerance_ms: int = SHOT_MATCH_TOLERANCE_MS,
+) -> List[Tuple[ShotEvent, int]]:
+    """Pair shots with the PBP event they describe.
+
+    Shots carrying an ``event_num`` present in ``pbp_rows`` match directly. The rest
+    fall back to a time-based match: per period, field-goal events are sorted by
+    ``clock_ms_remaining`` once, and each shot binary-searches the window within
+    ``tolerance_ms`` of its own clock. Inside the window the shooter must agree
+    (when PBP has one), made/missed must agree (when PBP has an action type), and
+    the closest clock wins. Each PBP event is claimed at most once.
+
+    Returns:
+        List of (shot, event_num) pairs
+    """
+    if not shot_rows or not pbp_rows:
+        return []
+
+    event_nums = {pbp.event_num for pbp in pbp_rows}
+    matches: List[Tuple[ShotEvent, int]] = []
+    claimed = set()
+    unmatched: List[ShotEvent] = []
+
+    for shot in shot_rows:
+        if shot.event_num and shot.event_num in event_nums and shot.event_num not in claimed:
+            matches.append((shot, shot.event_num))
+            claimed.add(shot.event_num)
+        elif shot.clock_ms_remaining is not None:
+            unmatched.append(shot)
+
+    if not unmatched:
+        return matches
+
+    # Sorted clock index per period over field-goal candidates
+    by_period: Dict[int, List[PbpEvent]] = defaultdict(list)
+    for pbp in pbp_rows:
+        if pbp.clock_ms_remaining is None or pbp.event_num in claimed:
+            continue
+        if pbp.action_type is not None and pbp.action_type not in _SHOT_ACTION_TYPES.values():
+            continue
+        by_period[pbp.period].append(pbp)
+    for events in by_period.values():
+        events.sort(key=lambda pbp: pbp.clock_ms_remaining)
+    clocks = {
+        period: [pbp.clock_ms_remaining for pbp in events] for period, events in by_period.items()
+    }
+
+    for shot in unmatched:
+        events = by_period.get(shot.period)
+        if not events:
+            continue
+        period_clocks = clocks[shot.period]
+        lo = bisect_left(period_clocks, shot.clock_ms_remaining - tolerance_ms)
+        hi = bisect_right(period_clocks, shot.clock_ms_remaining + tolerance_ms)
+
+        best = None
+        best_gap = None
+        expected_type = _SHOT_ACTION_TYPES.get(shot.shot_made_flag)
+        for pbp in events[lo:hi]:
+            if pbp.event_num in claimed:
+                continue
+            if pbp.player1_id is not None and pbp.player1_id != shot.player_id:
+                continue
+            if pbp.action_type is not None and pbp.action_type != expected_type:
+                continue
+            gap = abs(pbp.clock_ms_remaining - shot.clock_ms_remaining)
+            if best_gap is None or gap < best_gap:
+                best, best_gap = pbp, gap
+
+        if best is not None:
+            matches.append((shot, best.event_num))
+            claimed.add(best.event_num)
+
+    return matches
@@ -0,0 +1,298 @@
+"""Lineup stints rebuilt from play-by-play substitutions.
+
+``StintBuilder`` walks one game's events in order and keeps each team's
+on-court set. A stint ends whenever a team's five changes or a period ends.
+It is credited with the seconds elapsed and the points scored for and
+against while it lasted. Substitutions follow the NBA Stats convention
+(``player1`` leaves, ``player2`` enters).
+
+First-period starters can be supplied from the boxscore StartingLineup or
+Basketball Reference. In later periods, or when starters are not supplied, a
+player who acts before being subbed in is taken to have started the period.
+That player is added to the stints already open in the period. A player who
+acts while their team already has five on court replaces the teammate seen
+least recently, which covers substitutions missing from the feed. Only one
+period of stints is held at a time.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from ..models.enums import EventType
+from ..models.lineups import LineupStint
+from ..models.ref_rows import normalize_name_slug
+from ..nba_logging import get_logger
+from ..utils.clock import period_length_ms
+from ..utils.coerce import to_int_or_none
+
+logger = get_logger(__name__)
+
+LINEUP_SIZE = 5
+
+# Events whose player1 may be off the court (bench technicals, ejections, timeouts)
+_OFF_COURT_EVENTS = frozenset(e.value for e in (
+    EventType.SUBSTITUTION, EventType.TIMEOUT, EventType.TECHNICAL_FOUL, EventType.DOUBLE_TECHNICAL,
+    EventType.EJECTION, EventType.PERIOD_BEGIN, EventType.PERIOD_END, EventType.GAME_END,
+    EventType.REPLAY_REVIEW, EventType.INSTANT_REPLAY,
+))
+
+_SUBSTITUTION = EventType.SUBSTITUTION.value
+_SHOT_MADE = EventType.SHOT_MADE.value
+_FREE_THROW_MADE = EventType.FREE_THROW_MADE.value
+
+
+def _getter(event: Any):
+    if type(event) is dict or isinstance(event, Mapping) or hasattr(event, "keys"):
+        return event.get
+    return lambda name: getattr(event, name, None)
+
+
+def _event_type(value: Any) -> Optional[str]:
+    if type(value) is str or value is None:
+        return value
+    return value.value if isinstance(value, EventType) else str(value)
+
+
+def _int(value: Any) -> Optional[int]:
+    """Fast path of ``to_int_or_none`` for the ints and digit strings ids usually are."""
+    if type(value) is int:
+        return value
+    if type(value) is str and value.isdigit():
+        return int(value)
+    return to_int_or_none(value)
+
+
+@dataclass
+class _Stint:
+    players: Set[int]
+    start: float
+    end: Optional[float] = None
+    points_for: int = 0
+    points_against: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return self.end == self.start and not (self.points_for or self.points_against)
+
+
+@dataclass
+class _Team:
+    on_court: Dict[int, int] = field(default_factory=dict)  # player -> ordinal of last event seen
+    stints: List[_Stint] = field(default_factory=list)  # current period, last one open
+
+    @property
+    def open(self) -> _Stint:
+        return self.stints[-1]
+
+
+class StintBuilder:
+    """Single-pass lineup stint builder for one game.
+
+    Args:
+        game_id: Game identifier for the emitted rows
+        team_ids: Team tricode -> NBA team id for both teams
+        starters: Optional first-period starters by team tricode
+    """
+
+    def __init__(
+        self,
+        game_id: str,
+        team_ids: Mapping[str, int],
+        starters: Optional[Mapping[str, Iterable[int]]] = None
+    ):
+        self.game_id = game_id
+        self.team_ids = dict(team_ids)
+        self.starters = {team: [int(p) for p in players] for team, players in (starters or {}).items()}
+        self.period: Optional[int] = None
+        self.teams: Dict[str, _Team] = {}
+        self.now = 0.0
+        self.ordinal = 0
+        self.inferred_subs = 0
+        self.incomplete_seconds = 0.0
+        self._totals: Dict[Tuple[int, int, Tuple[int, ...]], List[float]] = {}
+
+    def add(self, event: Any) -> None:
+        """Feed the next event in game order (``PbpEventRow`` or ``pbp_events`` mapping)."""
+        get = _getter(event)
+        period = _int(get("period"))
+        if period is None:
+            return
+        if period != self.period:
+            self._start_period(period)
+        self.ordinal += 1
+        self.now = self._elapsed(get, period)
+
+        tricode = get("team_tricode")
+        if tricode not in self.teams:
+            return
+        event_type = _event_type(get("event_type"))
+        player1 = _int(get("player1_id"))
+
+        if event_type == _SUBSTITUTION:
+            self._substitute(tricode, player1, _int(get("player2_id")))
+        elif player1 is not None and event_type not in _OFF_COURT_EVENTS and not self._technical(get):
+            self._seen(tricode, player1)
+
+        points = 0
+        if event_type == _SHOT_MADE:
+            points = _int(get("shot_value")) or 0
+            points = points if 1 <= points <= 3 else 0
+        elif event_type == _FREE_THROW_MADE:
+            points = 1
+        if points:
+            for team, state in self.teams.items():
+                if team == tricode:
+                    state.open.points_for += points
+                else:
+                    state.open.points_against += points
+
+    def finish(self) -> List[LineupStint]:
+        """Close the last period and return stints summed per (team, period, lineup)."""
+        if self.period is not None:
+            self._end_period()
+            self.period = None
+        if self.inferred_subs or self.incomplete_seconds:
+            logger.debug("Lineup stints inferred", game_id=self.game_id, inferred_subs=self.inferred_subs,
+                         incomplete_seconds=round(self.incomplete_seconds, 1))
+        return [
+            LineupStint(
+                game_id=self.game_id, team_id=team_id, period=period, lineup=list(lineup),
+                seconds_played=int(round(seconds)), plus_minus=int(plus_minus),
+            )
+            for (team_id, period, lineup), (seconds, plus_minus) in self._totals.items()
+        ]
+
+    def _elapsed(self, get, period: int) -> float:
+        clock_ms = _int(get("clock_ms_remaining"))
+        if clock_ms is not None and clock_ms >= 0:
+            return max(self.now, (period_length_ms(period) - clock_ms) / 1000.0)
+        seconds = get("seconds_elapsed")
+        return max(self.now, float(seconds)) if seconds is not None else self.now
+
+    @staticmethod
+    def _technical(get) -> bool:
+        description = get("description")
+        return bool(description) and "technical" in description.lower()
+
+    def _start_period(self, period: int) -> None:
+        if self.period is not None:
+            self._end_period()
+        self.period, self.now = period, 0.0
+        starters = self.starters if period == 1 else {}
+        self.teams = {}
+        for tricode in self.team_ids:
+            lineup = starters.get(tricode, [])[:LINEUP_SIZE]
+            self.teams[tricode] = _Team(
+                on_court={player: 0 for player in lineup},
+                stints=[_Stint(players=set(lineup), start=0.0)],
+            )
+
+    def _end_period(self) -> None:
+        end = period_length_ms(self.period) / 1000.0
+        for tricode, state in self.teams.items():
+            state.open.end = end
+            for stint in state.stints:
+                seconds = max(0.0, stint.end - stint.start)
+                if len(stint.players) != LINEUP_SIZE:
+                    self.incomplete_seconds += seconds
+                    continue
+                key = (self.team_ids[tricode], self.period, tuple(sorted(stint.players)))
+                totals = self._totals.setdefault(key, [0.0, 0])
+                totals[0] += seconds
+                totals[1] += stint.points_for - stint.points_against
+
+    def _change(self, state: _Team) -> None:
+        """Start a new stint for the team's current five at the current time."""
+        current = state.open
+        current.end = self.now
+        if current.empty:
+            current.players = set(state.on_court)
+            current.end = None
+        else:
+            state.stints.append(_Stint(players=set(state.on_court), start=self.now))
+
+    def _seen(self, tricode: str, player: int) -> None:
+        state = self.teams[tricode]
+        if player in state.on_court:
+            state.on_court[player] = self.ordinal
+            return
+        if len(state.on_court) < LINEUP_SIZE:
+            # Never subbed in this period: on since the period started
+            state.on_court[player] = self.ordinal
+            for stint in state.stints:
+                if len(stint.players) < LINEUP_SIZE:
+                    stint.players.add(player)
+            return
+        # Substitution missing from the feed: replace the teammate seen least recently
+        stale = min(state.on_court, key=state.on_court.get)
+        del state.on_court[stale]
+        state.on_court[player] = self.ordinal
+        self.inferred_subs += 1
+        self._change(state)
+
+    def _substitute(self, tricode: str, leaving: Optional[int], entering: Optional[int]) -> None:
+        state = self.teams[tricode]
+        if leaving is not None:
+            if leaving not in state.on_court and len(state.on_court) < LINEUP_SIZE:
+                self._seen(tricode, leaving)
+            if leaving in state.on_court:
+                del state.on_court[leaving]
+            elif state.on_court:
+                del state.on_court[min(state.on_court, key=state.on_court.get)]
+                self.inferred_subs += 1
+        if entering is not None and entering not in state.on_court:
+            state.on_court[entering] = self.ordinal
+        self._change(state)
+
+
+def build_lineup_stints(
+    events: Iterable[Any],
+    game_id: str,
+    team_ids: Mapping[str, int],
+    starters: Optional[Mapping[str, Iterable[int]]] = None
+) -> List[LineupStint]:
+    """LineupStint rows for one game from its events in order."""
+    builder = StintBuilder(game_id, team_ids, starters)
+    for event in events:
+        builder.add(event)
+    return builder.finish()
+
+
+def starters_from_boxscore(records: Iterable[Mapping[str, Any]]) -> Dict[str, List[int]]:
+    """Starters by team tricode from ``silver.transform_starters`` records."""
+    starters: Dict[str, List[int]] = {}
+    for record in records:
+        player_id = to_int_or_none(record.get("player_id"))
+        tricode = record.get("team_abbreviation") or record.get("team_tricode")
+        if player_id is not None and tricode:
+            starters.setdefault(str(tricode).upper(), []).append(player_id)
+    return starters
+
+
+def player_ids_by_slug(events: Iterable[Any]) -> Dict[str, int]:
+    """Player name slug -> id pairs seen in a game's events."""
+    ids: Dict[str, int] = {}
+    for event in events:
+        get = _getter(event)
+        for slot in (1, 2, 3):
+            player_id = to_int_or_none(get(f"player{slot}_id"))
+            slug = get(f"player{slot}_name_slug")
+            if player_id is not None and slug:
+                ids.setdefault(slug, player_id)
+    return ids
+
+
+def starters_from_bref(
+    lineups: Mapping[str, Iterable[Mapping[str, Any]]],
+    home_tricode: str,
+    away_tricode: str,
+    slug_ids: Mapping[str, int]
+) -> Dict[str, List[int]]:
+    """Starters by tricode from ``BRefClient.parse_starting_lineups`` (names matched by slug)."""
+    starters: Dict[str, List[int]] = {}
+    for side, tricode in (("home", home_tricode), ("away", away_tricode)):
+        for entry in lineups.get(side, []):
+            player_id = slug_ids.get(normalize_name_slug(entry.get("player") or ""))
+            if player_id is not None:
+                starters.setdefault(tricode, []).append(player_id)
+    return starters
@@ -0,0 +1,160 @@
+"""Grouped NumPy aggregation of play-by-play events into team game stats.
+
+Mirrors ``AnalyticsPipeline._compute_team_game_stats_sql`` row for row: an
+event belongs to the home team when its ``team_tricode`` equals the game's
+``home_team_tricode`` and to the away team otherwise (including events without
+a team), and a game without events still yields an all-zero away row. Rows are
+keyed like ``team_game_stats``, by ``(game_id, team_tricode)``. Each box
+stat is one ``np.bincount`` over the (game, side) pair of every event, so
+events can be fed in chunks straight from a database cursor.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.enums import EventType
+
+# Box-score counts, in team_game_stats column order
+COUNT_COLUMNS = (
+    'points',
+    'fgm', 'fga',
+    'fg3m', 'fg3a',
+    'ftm', 'fta',
+    'oreb', 'dreb', 'reb',
+    'ast', 'stl', 'blk', 'tov', 'pf',
+)
+
+DERIVED_COLUMNS = ('possessions_estimated', 'pace', 'offensive_rating', 'defensive_rating')
+
+# Event types the stats read; anything else only marks its team as present
+_EVENT_CODES: Dict[str, int] = {
+    event_type.value: code
+    for code, event_type in enumerate([
+        EventType.SHOT_MADE, EventType.SHOT_MISSED,
+        EventType.FREE_THROW_MADE, EventType.FREE_THROW_MISSED,
+        EventType.REBOUND, EventType.ASSIST, EventType.TURNOVER,
+        EventType.STEAL, EventType.BLOCK, EventType.FOUL,
+    ])
+}
+_SHOT_MADE, _SHOT_MISSED, _FT_MADE, _FT_MISSED, _REBOUND, _ASSIST, _TURNOVER, _STEAL, _BLOCK, _FOUL = range(10)
+_OTHER = -1
+
+_REBOUND_CODES = {'OFFENSIVE': 1, 'DEFENSIVE': 2}
+
+_HOME, _AWAY = 0, 1
+
+
+class TeamGameStatsAccumulator:
+    """Per-(game, team) box-score sums fed one chunk of events at a time.
+
+    ``games`` are mappings with ``game_id``, ``home_team_tricode``,
+    ``away_team_tricode``, ``home_team_id``, ``away_team_id`` and
+    ``duration_minutes``. Pair ``2 * game + side`` holds the home (side 0)
+    or away (side 1) team of a game.
+    """
+
+    def __init__(self, games: Sequence[Mapping[str, Any]]):
+        self.game_ids: List[str] = [game['game_id'] for game in games]
+        self.index: Dict[str, int] = {game_id: i for i, game_id in enumerate(self.game_ids)}
+        self.teams: List[Tuple[Optional[str], Optional[Any]]] = [
+            (game[f'{side}_team_tricode'], game[f'{side}_team_id'])
+            for game in games for side in ('home', 'away')
+        ]
+        self.duration = np.array(
+            [float(game['duration_minutes'] or 0) for game in games], dtype=np.float64
+        )
+        n_pairs = 2 * len(self.game_ids)
+        self.totals = np.zeros((n_pairs, len(COUNT_COLUMNS)), dtype=np.int64)
+        self.events = np.zeros(n_pairs, dtype=np.int64)
+
+    def add_records(self, records: Sequence[Mapping[str, Any]]) -> None:
+        """Add events with ``game_id``, ``is_home``, ``event_type``, ``shot_value`` and ``rebound_type``."""
+        n = len(records)
+        if not n:
+            return
+        game = np.fromiter((self.index[r['game_id']] for r in records), dtype=np.int64, count=n)
+        home = np.fromiter((bool(r['is_home']) for r in records), dtype=bool, count=n)
+        event = np.fromiter(
+            (_EVENT_CODES.get(r['event_type'], _OTHER) for r in records), dtype=np.int8, count=n
+        )
+        shot_value = np.fromiter((r['shot_value'] or 0 for r in records), dtype=np.int8, count=n)
+        rebound = np.fromiter(
+            (_REBOUND_CODES.get(r['rebound_type'], 0) for r in records), dtype=np.int8, count=n
+        )
+        self.add(game, home, event, shot_value, rebound)
+
+    def add(
+        self,
+        game: np.ndarray,
+        home: np.ndarray,
+        event: np.ndarray,
+        shot_value: np.ndarray,
+        rebound: np.ndarray
+    ) -> None:
+        """Add events given as arrays of game index, home flag and codes."""
+        pair = 2 * game + np.where(home, _HOME, _AWAY)
+        n_pairs = len(self.events)
+
+        made = event == _SHOT_MADE
+        shot = made | (event == _SHOT_MISSED)
+        field_goal = (shot_value == 2) | (shot_value == 3)
+        three = shot_value == 3
+        ft_made = event == _FT_MADE
+        is_rebound = event == _REBOUND
+
+        points = np.where(made & (shot_value >= 1) & (shot_value <= 3), shot_value, 0) + ft_made
+        offensive = is_rebound & (rebound == 1)
+        defensive = is_rebound & (rebound == 2)
+        stats = (
+            points,
+            made & field_goal, shot & field_goal,
+            made & three, shot & three,
+            ft_made, ft_made | (event == _FT_MISSED),
+            offensive, defensive, offensive | defensive,
+            event == _ASSIST, event == _STEAL, event == _BLOCK, event == _TURNOVER, event == _FOUL,
+        )
+        for column, values in enumerate(stats):
+            self.totals[:, column] += np.bincount(pair, weights=values, minlength=n_pairs).astype(np.int64)
+        self.events += np.bincount(pair, minlength=n_pairs)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """team_game_stats rows of every team with events (away rows for event-less games)."""
+        present = self.events > 0
+        empty_games = ~(present[0::2] | present[1::2])
+        present[1::2] |= empty_games
+
+        fga = self.totals[:, COUNT_COLUMNS.index('fga')]
+        turnovers = self.totals[:, COUNT_COLUMNS.index('tov')]
+        points = self.totals[:, COUNT_COLUMNS.index('points')]
+        possessions = np.maximum(1, fga + turnovers)
+        duration = np.repeat(self.duration, 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pace = np.where(duration > 0, possessions * 48.0 / duration, 0.0)
+        offensive_rating = points * 100.0 / possessions
+
+        rows = []
+        for pair in np.flatnonzero(present).tolist():
+            team_tricode, team_id = self.teams[pair]
+            if team_tricode is None:
+                continue
+            row: Dict[str, Any] = {
+                'game_id': self.game_ids[pair // 2], 'team_tricode': team_tricode, 'team_id': team_id,
+            }
+            row.update(zip(COUNT_COLUMNS, self.totals[pair].tolist()))
+            row['possessions_estimated'] = int(possessions[pair])
+            row['pace'] = float(pace[pair])
+            row['offensive_rating'] = float(offensive_rating[pair])
+            row['defensive_rating'] = 0.0
+            rows.append(row)
+        return rows
+
+
+def aggregate_team_game_stats(
+    games: Sequence[Mapping[str, Any]], chunks: Iterable[Sequence[Mapping[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """team_game_stats rows for ``games`` from event record chunks."""
+    accumulator = TeamGameStatsAccumulator(games)
+    for chunk in chunks:
+        accumulator.add_records(chunk)
+    return accumulator.rows()
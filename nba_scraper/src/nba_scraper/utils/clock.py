@@ -1,18 +1,20 @@
-"""Clock parsing utilities for NBA time formats."""
+"""Clock parsing utilities for NBA time formats.
+
+Single home for clock handling (``utils.clock_parsing`` re-exports from here).
+Scalar parsers are memoized, since a season repeats the same few thousand clock
+strings; ``parse_clocks`` handles whole periods or games at once and reports
+malformed values through a validity mask instead of raising.
+"""
 
 from __future__ import annotations
 
 import re
-from typing import Optional, Tuple, Union
-
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional, Sequence, Tuple, Union
 
-# Fix import path
-def safe_str_strip(x):
-    return str(x).strip() if x is not None else ""
+import numpy as np
 
-
-def safe_float_parse(x):
-    return float(x) if x is not None else None
+from .preprocessing import safe_float_parse, safe_str_strip
 
 
 # Period lengths in seconds
@@ -40,43 +42,107 @@ def period_length_ms(period_number: int) -> int:
     return (12 if 1 <= period_number <= 4 else 5) * 60 * 1000
 
 
-def parse_clock_to_ms(clock: str, period_number: int) -> int:
-    """Return milliseconds remaining in the period (int)."""
-    if not clock:
-        raise ValueError("empty clock")
-
+@lru_cache(maxsize=8192)
+def _clock_total_ms(clock: str) -> int:
+    """Milliseconds on a clock string, ignoring period bounds (-1 if malformed)."""
     m = _RE_STD.match(clock)
     if m:
-        mm = int(m["m"])
         ss = int(m["s"])
-        ms = int((m["ms"] or "0").ljust(3, "0"))
-
         # Validate seconds range
         if ss >= 60:
-            raise ValueError(f"unsupported clock format: {clock}")
+            return -1
+        return (int(m["m"]) * 60 + ss) * 1000 + int((m["ms"] or "0").ljust(3, "0"))
 
-        total = (mm * 60 + ss) * 1000 + ms
-    else:
-        m2 = _RE_ISO.match(clock)
-        if not m2:
-            raise ValueError(f"unsupported clock format: {clock}")
-        mm = int(m2["m"] or 0)
-        ss = float(m2["s"] or 0.0)
+    m2 = _RE_ISO.match(clock)
+    if not m2:
+        return -1
+    ss = float(m2["s"] or 0.0)
+    # Validate seconds range for ISO format too
+    if ss >= 60:
+        return -1
+    return int(round((int(m2["m"] or 0) * 60 + ss) * 1000))
 
-        # Validate seconds range for ISO format too
-        if ss >= 60:
-            raise ValueError(f"unsupported clock format: {clock}")
 
-        total = int(round((mm * 60 + ss) * 1000))
+def parse_clock_to_ms(clock: str, period_number: int) -> int:
+    """Return milliseconds remaining in the period (int)."""
+    if not clock:
+        raise ValueError("empty clock")
+
+    total = _clock_total_ms(clock)
+    if total < 0:
+        raise ValueError(f"unsupported clock format: {clock}")
 
     # Validate against period bounds
     max_ms = period_length_ms(period_number)
-    if total < 0 or total > max_ms:
+    if total > max_ms:
         raise ValueError(f"clock {clock} exceeds period bounds for period {period_number}")
 
     return total
 
 
+class ClockArrays(NamedTuple):
+    """Batch clock parse result (one entry per input)."""
+
+    clock_ms_remaining: np.ndarray  # int64, -1 where invalid
+    seconds_elapsed: np.ndarray  # float64 seconds elapsed in the period, NaN where invalid
+    valid: np.ndarray  # bool
+
+
+def period_lengths_ms(periods: Any) -> np.ndarray:
+    """Vectorized ``period_length_ms``."""
+    periods = np.asarray(periods)
+    return np.where((periods >= 1) & (periods <= 4), 12 * 60 * 1000, 5 * 60 * 1000)
+
+
+def parse_clocks(clocks: Sequence[Optional[str]], periods: Any) -> ClockArrays:
+    """Parse many clocks (MM:SS, MM:SS.f, PT##M##.##S) with their period numbers.
+
+    Same rules as ``parse_clock_to_ms``. Each distinct string is parsed once;
+    bounds and elapsed time are computed as arrays. Empty, malformed or
+    out-of-bounds clocks are marked invalid rather than raising.
+
+    Args:
+        clocks: Clock strings (None/empty allowed)
+        periods: Period number per clock (sequence/array, or a scalar for all)
+
+    Returns:
+        ClockArrays with clock_ms_remaining, seconds_elapsed and valid
+    """
+    n = len(clocks)
+    distinct: dict = {}
+    try:
+        codes = [distinct.setdefault(clock, len(distinct)) for clock in clocks]
+    except TypeError:  # unhashable values are invalid anyway
+        distinct.clear()
+        codes = [distinct.setdefault(clock if isinstance(clock, str) else None, len(distinct))
+                 for clock in clocks]
+    codes = np.array(codes, dtype=np.int64)
+
+    totals = np.fromiter(
+        (_clock_total_ms(clock) if isinstance(clock, str) and clock else -1 for clock in distinct),
+        dtype=np.int64,
+        count=len(distinct),
+    )
+    clock_ms = totals[codes] if n else np.empty(0, dtype=np.int64)
+
+    lengths = np.broadcast_to(period_lengths_ms(periods), (n,))
+    valid = (clock_ms >= 0) & (clock_ms <= lengths)
+    clock_ms = np.where(valid, clock_ms, -1)
+    seconds = np.where(valid, (lengths - clock_ms) / 1000.0, np.nan)
+    return ClockArrays(clock_ms, seconds, valid)
+
+
+def game_seconds_elapsed(periods: Any, clock_ms_remaining: Any) -> np.ndarray:
+    """Vectorized ``calculate_seconds_elapsed`` from period and ms remaining (NaN if invalid)."""
+    periods = np.asarray(periods, dtype=np.int64)
+    remaining = np.asarray(clock_ms_remaining, dtype=np.float64) / 1000.0
+    regulation = np.minimum(periods - 1, 4) * REG_PERIOD_SEC
+    overtime = np.maximum(periods - 5, 0) * OT_PERIOD_SEC
+    lengths = np.where(periods <= 4, REG_PERIOD_SEC, OT_PERIOD_SEC)
+    elapsed = regulation + overtime + lengths - remaining
+    return np.where((periods >= 1) & (remaining >= 0), elapsed, np.nan)
+
+
 def parse_game_clock(clock_str: Union[str, None]) -> Optional[float]:
     """Parse NBA game clock string to total seconds remaining.
 
@@ -98,7 +164,11 @@ def parse_game_clock(clock_str: Union[str, None]) -> Optional[float]:
     cleaned = safe_str_strip(clock_str)
     if not cleaned:
         return None
+    return _parse_cleaned_game_clock(cleaned)
+
 
+@lru_cache(maxsize=8192)
+def _parse_cleaned_game_clock(cleaned: str) -> Optional[float]:
     # Handle PT format (e.g., "PT12M00.00S")
     pt_match = re.match(r"PT(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?", cleaned)
     if pt_match:
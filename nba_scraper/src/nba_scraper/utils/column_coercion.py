@@ -0,0 +1,278 @@
+"""Schema-directed coercion of NBA Stats resultSets.
+
+Each endpoint's resultSets declare a type per column (``GAME_ID`` stays a
+string, ``PCTIMESTRING`` is a clock, ``SCOREMARGIN`` is an int, ...). A
+resultSet is coerced in one pass over its rows with one coercer per column
+picked from the headers, so no value goes through regex type sniffing.
+Columns a schema doesn't know fall back to the heuristic ``_coerce_scalar``
+from ``utils.preprocess``.
+"""
+
+from math import isfinite
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from .preprocess import _coerce_scalar, preprocess_nba_stats_data
+
+Coercer = Callable[[Any], Any]
+
+
+def _to_int(value: Any) -> Any:
+    """int, or None for blanks/unparseable strings; non-integral numbers are kept."""
+    if value is None or type(value) is int:
+        return value
+    if isinstance(value, str):
+        s = value.strip()
+        if not s:
+            return None
+        try:
+            return int(s)
+        except ValueError:
+            try:
+                f = float(s)
+            except ValueError:
+                return None
+            if not isfinite(f):
+                return None
+            return int(f) if f.is_integer() else f
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    return value
+
+
+def _to_float(value: Any) -> Any:
+    """float, or None for blanks/unparseable strings."""
+    if value is None or type(value) is float:
+        return value
+    if isinstance(value, str):
+        try:
+            f = float(value)
+        except ValueError:
+            return None
+        return f if isfinite(f) else None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def _to_id(value: Any) -> Any:
+    """Identifier kept as a string (leading zeros preserved)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip()
+    return str(value)
+
+
+def _to_text(value: Any) -> Any:
+    """Free text, never numeric-coerced."""
+    return value.strip() if isinstance(value, str) else value
+
+
+def _to_margin(value: Any) -> Any:
+    """Score margin: "TIE" is 0."""
+    if isinstance(value, str) and value.strip().upper() == "TIE":
+        return 0
+    return _to_int(value)
+
+
+COERCERS: Dict[str, Coercer] = {
+    "int": _to_int,
+    "float": _to_float,
+    "id": _to_id,
+    "text": _to_text,
+    "clock": _to_text,
+    "margin": _to_margin,
+}
+
+# ---------------------------------------------------------------------------
+# Column schemas
+# ---------------------------------------------------------------------------
+
+PLAY_BY_PLAY_COLUMNS: Dict[str, str] = {
+    "GAME_ID": "id",
+    "EVENTNUM": "int",
+    "EVENTMSGTYPE": "int",
+    "EVENTMSGACTIONTYPE": "int",
+    "PERIOD": "int",
+    "WCTIMESTRING": "text",
+    "PCTIMESTRING": "clock",
+    "HOMEDESCRIPTION": "text",
+    "NEUTRALDESCRIPTION": "text",
+    "VISITORDESCRIPTION": "text",
+    "SCORE": "text",
+    "SCOREMARGIN": "margin",
+    "VIDEO_AVAILABLE_FLAG": "int",
+    **{
+        f"{prefix}{n}{suffix}": kind
+        for n in (1, 2, 3)
+        for prefix, suffix, kind in (
+            ("PERSON", "TYPE", "int"),
+            ("PLAYER", "_ID", "int"),
+            ("PLAYER", "_NAME", "text"),
+            ("PLAYER", "_TEAM_ID", "int"),
+            ("PLAYER", "_TEAM_CITY", "text"),
+            ("PLAYER", "_TEAM_NICKNAME", "text"),
+            ("PLAYER", "_TEAM_ABBREVIATION", "text"),
+        )
+    },
+}
+
+SHOT_CHART_DETAIL_COLUMNS: Dict[str, str] = {
+    "GRID_TYPE": "text",
+    "GAME_ID": "id",
+    "GAME_EVENT_ID": "int",
+    "EVENT_NUM": "int",
+    "PLAYER_ID": "int",
+    "PLAYER_NAME": "text",
+    "TEAM_ID": "int",
+    "TEAM_NAME": "text",
+    "PERIOD": "int",
+    "MINUTES_REMAINING": "int",
+    "SECONDS_REMAINING": "int",
+    "EVENT_TYPE": "text",
+    "ACTION_TYPE": "text",
+    "SHOT_TYPE": "text",
+    "SHOT_ZONE_BASIC": "text",
+    "SHOT_ZONE_AREA": "text",
+    "SHOT_ZONE_RANGE": "text",
+    "SHOT_DISTANCE": "int",
+    "LOC_X": "int",
+    "LOC_Y": "int",
+    "SHOT_ATTEMPTED_FLAG": "int",
+    "SHOT_MADE_FLAG": "int",
+    "GAME_DATE": "text",
+    "HTM": "text",
+    "VTM": "text",
+}
+
+LEAGUE_AVERAGES_COLUMNS: Dict[str, str] = {
+    "GRID_TYPE": "text",
+    "SHOT_ZONE_BASIC": "text",
+    "SHOT_ZONE_AREA": "text",
+    "SHOT_ZONE_RANGE": "text",
+    "FGA": "int",
+    "FGM": "int",
+    "FG_PCT": "float",
+}
+
+GAME_HEADER_COLUMNS: Dict[str, str] = {
+    "GAME_ID": "id",
+    "GAME_SEQUENCE": "int",
+    "GAME_STATUS_ID": "int",
+    "HOME_TEAM_ID": "int",
+    "VISITOR_TEAM_ID": "int",
+    "LIVE_PERIOD": "int",
+    "LIVE_PC_TIME": "clock",
+    "GAMECODE": "text",
+    "ARENA_NAME": "text",
+}
+
+# Box score style resultSets share their identifier columns
+_BOX_SCORE_IDS: Dict[str, str] = {
+    "GAME_ID": "id",
+    "TEAM_ID": "int",
+    "PLAYER_ID": "int",
+    "TEAM_ABBREVIATION": "text",
+    "MIN": "clock",
+}
+
+# endpoint -> resultSet name -> column -> kind
+ENDPOINT_SCHEMAS: Dict[str, Dict[str, Dict[str, str]]] = {
+    "playbyplayv2": {"PlayByPlay": PLAY_BY_PLAY_COLUMNS},
+    "shotchartdetail": {
+        "Shot_Chart_Detail": SHOT_CHART_DETAIL_COLUMNS,
+        "LeagueAverages": LEAGUE_AVERAGES_COLUMNS,
+    },
+    "scoreboardv2": {"GameHeader": GAME_HEADER_COLUMNS, "LineScore": _BOX_SCORE_IDS},
+    "boxscoretraditionalv2": {"PlayerStats": _BOX_SCORE_IDS, "TeamStats": _BOX_SCORE_IDS},
+    "boxscoreadvancedv2": {"PlayerStats": _BOX_SCORE_IDS, "TeamStats": _BOX_SCORE_IDS},
+}
+
+# resultSet name -> columns, for payloads whose endpoint isn't known
+RESULT_SET_SCHEMAS: Dict[str, Dict[str, str]] = {
+    name: columns
+    for schemas in ENDPOINT_SCHEMAS.values()
+    for name, columns in schemas.items()
+}
+
+
+def schema_for(endpoint: Optional[str], result_set_name: Optional[str]) -> Optional[Dict[str, str]]:
+    """Column schema for a resultSet (by endpoint, then by resultSet name alone)."""
+    if endpoint and endpoint.lower() in ENDPOINT_SCHEMAS:
+        columns = ENDPOINT_SCHEMAS[endpoint.lower()].get(result_set_name or "")
+        if columns is not None:
+            return columns
+    return RESULT_SET_SCHEMAS.get(result_set_name or "")
+
+
+# ---------------------------------------------------------------------------
+# Coercion
+# ---------------------------------------------------------------------------
+
+
+def _coercers(columns: Optional[Mapping[str, str]], headers: List[str]) -> List[Coercer]:
+    columns = columns or {}
+    return [COERCERS[columns[h]] if h in columns else _coerce_scalar for h in headers]
+
+
+def coerce_rows(headers: List[str], rows: List[Any], columns: Optional[Mapping[str, str]]) -> List[Any]:
+    """Coerce a rowSet in one pass using per-column coercers."""
+    coercers = _coercers(columns, [str(h).upper() for h in headers])
+    width = len(coercers)
+    out = []
+    for row in rows:
+        if not isinstance(row, list):
+            out.append(preprocess_nba_stats_data(row))
+            continue
+        coerced = [coerce(value) for coerce, value in zip(coercers, row)]
+        if len(row) > width:
+            # Values past the headers: heuristic
+            coerced.extend(_coerce_scalar(value) for value in row[width:])
+        out.append(coerced)
+    return out
+
+
+def coerce_result_set(
+    result_set: Mapping[str, Any], columns: Optional[Mapping[str, str]] = None
+) -> Dict[str, Any]:
+    """Coerce one resultSet (``name``/``headers``/``rowSet``); other keys are kept."""
+    coerced = dict(result_set)
+    if columns is None:
+        columns = schema_for(None, result_set.get("name"))
+    headers = result_set.get("headers")
+    rows = result_set.get("rowSet")
+    if isinstance(headers, list) and isinstance(rows, list):
+        coerced["rowSet"] = coerce_rows(headers, rows, columns)
+    return coerced
+
+
+def coerce_record(record: Mapping[str, Any], columns: Optional[Mapping[str, str]]) -> Dict[str, Any]:
+    """Coerce one row already zipped into a dict (e.g. from the shape-only extractors)."""
+    columns = columns or {}
+    out = {}
+    for key, value in record.items():
+        kind = columns.get(key)
+        if kind is not None:
+            out[key] = COERCERS[kind](value)
+        elif isinstance(value, (dict, list)):
+            out[key] = preprocess_nba_stats_data(value)
+        else:
+            out[key] = _coerce_scalar(value)
+    return out
+
+
+def coerce_response(payload: Mapping[str, Any], endpoint: Optional[str] = None) -> Dict[str, Any]:
+    """Coerce an NBA Stats response: resultSets by schema, everything else heuristically."""
+    coerced: Dict[str, Any] = {}
+    for key, value in payload.items():
+        if key in ("resultSets", "resultSet"):
+            sets = value if isinstance(value, list) else [value]
+            out = [
+                coerce_result_set(rs, schema_for(endpoint, rs.get("name"))) if isinstance(rs, Mapping)
+                else preprocess_nba_stats_data(rs)
+                for rs in sets
+            ]
+            coerced[key] = out if isinstance(value, list) else out[0]
+        else:
+            coerced[key] = preprocess_nba_stats_data(value)
+    return coerced
@@ -0,0 +1,59 @@
+"""Benchmark: batch clock parsing vs the per-event scalar parser.
+
+Run with ``make bench`` (or ``pytest tests/perf -m slow -s``) to print timings.
+"""
+
+import random
+import time
+
+import pytest
+
+from nba_scraper.utils.clock import parse_clock_to_ms, parse_clocks
+
+pytestmark = pytest.mark.slow
+
+GAMES = 50
+EVENTS_PER_GAME = 450
+
+
+def _clocks(rng: random.Random):
+    clocks, periods = [], []
+    for _ in range(GAMES * EVENTS_PER_GAME):
+        period = rng.randint(1, 5)
+        limit = 12 if period <= 4 else 5
+        clocks.append(f"{rng.randrange(limit)}:{rng.randrange(60):02d}")
+        periods.append(period)
+    return clocks, periods
+
+
+def _scalar(clocks, periods):
+    out = []
+    for clock, period in zip(clocks, periods):
+        try:
+            out.append(parse_clock_to_ms(clock, period))
+        except ValueError:
+            out.append(-1)
+    return out
+
+
+def _best_of(fn, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_batch_is_faster_than_scalar():
+    clocks, periods = _clocks(random.Random(11))
+    assert parse_clocks(clocks, periods).clock_ms_remaining.tolist() == _scalar(clocks, periods)
+
+    scalar = _best_of(lambda: _scalar(clocks, periods))
+    batch = _best_of(lambda: parse_clocks(clocks, periods))
+
+    n = len(clocks)
+    print(f"\n{n} clocks: scalar {scalar / n * 1e9:.0f}ns/clock, "
+          f"batch {batch / n * 1e9:.0f}ns/clock ({scalar / batch:.1f}x)")
+    # ~1.9x when idle; only a batch path slower than the scalar one is a regression
+    assert scalar / batch >= 1.0
@@ -0,0 +1,74 @@
+"""Ingest microbenchmark: schema-directed coercion vs recursive heuristic preprocessing.
+
+Payloads follow the playbyplayv2 and shotchartdetail column layouts. Run with
+``make bench`` (or ``pytest tests/perf -m slow -s``) to print timings.
+"""
+
+import random
+import time
+
+import pytest
+
+from nba_scraper.utils.column_coercion import (
+    PLAY_BY_PLAY_COLUMNS,
+    SHOT_CHART_DETAIL_COLUMNS,
+    coerce_response,
+)
+from nba_scraper.utils.preprocess import preprocess_nba_stats_data
+
+pytestmark = pytest.mark.slow
+
+PBP_HEADERS = list(PLAY_BY_PLAY_COLUMNS)
+SHOT_HEADERS = list(SHOT_CHART_DETAIL_COLUMNS)
+
+
+def _filler(rng: random.Random, kind: str):
+    if kind == "int":
+        return rng.choice([None, 0, 4, 1628369, 1610612738])
+    if kind == "id":
+        return "0022300001"
+    return rng.choice([None, "Jayson Tatum", "BOS", "Above the Break 3"])
+
+
+def _pbp_payload(rng: random.Random, n: int = 450) -> dict:
+    rows = []
+    for idx in range(n):
+        values = {
+            "GAME_ID": "0022300001", "EVENTNUM": idx, "EVENTMSGTYPE": rng.randint(1, 13),
+            "EVENTMSGACTIONTYPE": rng.randint(0, 80), "PERIOD": 1 + idx * 4 // n,
+            "WCTIMESTRING": "7:45 PM", "PCTIMESTRING": f"{rng.randrange(12)}:{rng.randrange(60):02d}",
+            "HOMEDESCRIPTION": rng.choice([None, "James 25' 3PT Jump Shot (3 PTS)"]),
+            "VISITORDESCRIPTION": rng.choice([None, "Tatum Personal Foul (P1.T1)"]),
+            "SCORE": rng.choice([None, f"{idx} - {idx + 2}"]), "SCOREMARGIN": rng.choice([None, "TIE", "-2", "5"]),
+        }
+        rows.append([values[h] if h in values else _filler(rng, PLAY_BY_PLAY_COLUMNS[h]) for h in PBP_HEADERS])
+    return {"resource": "playbyplay", "parameters": {"GameID": "0022300001"},
+            "resultSets": [{"name": "PlayByPlay", "headers": PBP_HEADERS, "rowSet": rows}]}
+
+
+def _shot_payload(rng: random.Random, n: int = 180) -> dict:
+    rows = [[_filler(rng, SHOT_CHART_DETAIL_COLUMNS[h]) for h in SHOT_HEADERS] for _ in range(n)]
+    return {"resource": "shotchartdetail", "parameters": {"GameID": "0022300001"},
+            "resultSets": [{"name": "Shot_Chart_Detail", "headers": SHOT_HEADERS, "rowSet": rows}]}
+
+
+def _best_of(fn, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.mark.parametrize("endpoint,build", [("playbyplayv2", _pbp_payload), ("shotchartdetail", _shot_payload)])
+def test_schema_coercion_beats_heuristic(endpoint, build):
+    payload = build(random.Random(3))
+
+    heuristic = _best_of(lambda: preprocess_nba_stats_data(payload))
+    schema = _best_of(lambda: coerce_response(payload, endpoint))
+
+    rows = len(payload["resultSets"][0]["rowSet"])
+    print(f"\n{endpoint} ({rows} rows): heuristic {heuristic * 1e3:.2f}ms, "
+          f"schema {schema * 1e3:.2f}ms ({heuristic / schema:.1f}x)")
+    assert heuristic / schema >= 2
@@ -0,0 +1,82 @@
+"""Scaling benchmark for EarlyShocksTransformer.
+
+Run with ``make bench`` (or ``pytest tests/perf -m slow -s``) to print timings.
+"""
+
+import random
+import time
+
+import pytest
+
+from nba_scraper.models.enums import EventType
+from nba_scraper.models.pbp_rows import PbpEventRow
+from nba_scraper.transformers.early_shocks import EarlyShocksTransformer
+
+pytestmark = pytest.mark.slow
+
+GAMES_PER_SEASON = 1230
+Q1_EVENTS_PER_GAME = 120
+
+_EVENT_MIX = (
+    [EventType.FOUL] * 3
+    + [EventType.SUBSTITUTION] * 3
+    + [EventType.SHOT_MADE, EventType.SHOT_MISSED, EventType.REBOUND, EventType.TURNOVER]
+)
+_DESCRIPTIONS = [None, "Personal foul", "Shooting foul", "technical foul", "Flagrant 1", "injury timeout"]
+
+
+def _q1_game(game_id: str, n_events: int, rng: random.Random) -> list:
+    players = [f"player-{i}" for i in range(10)]
+    return [
+        PbpEventRow(
+            game_id=game_id,
+            period=1,
+            event_idx=idx,
+            time_remaining="00:00",
+            seconds_elapsed=720.0 * idx / n_events,
+            event_type=rng.choice(_EVENT_MIX),
+            description=rng.choice(_DESCRIPTIONS),
+            team_tricode=rng.choice(["LAL", "BOS"]),
+            player1_name_slug=rng.choice(players),
+            player2_name_slug=rng.choice(players),
+            source="bench",
+            source_url="bench://q1",
+        )
+        for idx in range(n_events)
+    ]
+
+
+def _best_of(fn, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_full_season_throughput():
+    """A season of Q1 events transforms in well under a minute."""
+    rng = random.Random(2024)
+    season = [_q1_game(f"00223{i:05d}", Q1_EVENTS_PER_GAME, rng) for i in range(GAMES_PER_SEASON)]
+    transformer = EarlyShocksTransformer()
+
+    elapsed = _best_of(lambda: [transformer.transform(game, "bench://q1") for game in season], repeats=1)
+
+    events = GAMES_PER_SEASON * Q1_EVENTS_PER_GAME
+    print(f"\nearly_shocks season: {events} events in {elapsed:.2f}s ({events / elapsed:,.0f} events/s)")
+    assert elapsed < 60
+
+
+def test_scaling_is_linear_in_game_length():
+    """8x the events per game costs roughly 8x, not 64x."""
+    rng = random.Random(7)
+    transformer = EarlyShocksTransformer()
+    small = _q1_game("0022300001", 1_000, rng)
+    large = _q1_game("0022300002", 8_000, rng)
+
+    t_small = _best_of(lambda: transformer.transform(small, "bench://q1"))
+    t_large = _best_of(lambda: transformer.transform(large, "bench://q1"))
+
+    print(f"\nearly_shocks scaling: 1k={t_small * 1e3:.1f}ms 8k={t_large * 1e3:.1f}ms ratio={t_large / t_small:.1f}")
+    assert t_large / t_small < 20
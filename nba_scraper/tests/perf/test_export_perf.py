@@ -0,0 +1,101 @@
+"""Benchmark: streaming a large pbp_events export to .npz in constant memory.
+
+Run with ``make bench`` (or ``pytest tests/perf -m slow -s``) to print timings.
+"""
+
+import asyncio
+import time
+import tracemalloc
+from datetime import UTC, date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from nba_scraper.tools.export_tables import TableExporter, read_npz_export
+
+pytestmark = pytest.mark.slow
+
+CHUNK_ROWS = 50_000
+
+COLUMNS = [
+    ("game_id", "text"), ("period", "int4"), ("event_idx", "int4"), ("event_type", "text"),
+    ("seconds_elapsed", "float8"), ("team_tricode", "text"), ("player1_id", "text"),
+    ("shot_made", "bool"), ("shot_value", "int4"), ("shot_distance_ft", "numeric"),
+    ("game_date", "date"), ("ingested_at_utc", "timestamptz"),
+]
+ATTRIBUTES = [SimpleNamespace(name=n, type=SimpleNamespace(name=t)) for n, t in COLUMNS]
+EVENT_TYPES = ("SHOT_MADE", "SHOT_MISSED", "REBOUND", "FOUL", "TURNOVER", "SUBSTITUTION")
+
+
+class GeneratedEvents:
+    """A prepared statement whose cursor generates ``rows`` events chunk by chunk."""
+
+    def __init__(self, rows: int):
+        self.rows = rows
+
+    def get_attributes(self):
+        return ATTRIBUTES
+
+    async def cursor(self):
+        produced = 0
+        start = datetime(2023, 10, 25, tzinfo=UTC)
+
+        async def fetch(n):
+            nonlocal produced
+            chunk = [
+                (f"00223{i // 450:05d}", 1 + i % 450 // 113, i % 450, EVENT_TYPES[i % 6], float(i % 2880),
+                 "BOS" if i % 2 else "LAL", str(1_628_000 + i % 300), i % 3 == 0, 2 + i % 2,
+                 None if i % 4 else i % 30, date(2023, 10, 24), start + timedelta(seconds=i))
+                for i in range(produced, min(produced + n, self.rows))
+            ]
+            produced += len(chunk)
+            return chunk
+
+        return SimpleNamespace(fetch=fetch)
+
+
+class Connection:
+    def __init__(self, rows: int):
+        self.statement = GeneratedEvents(rows)
+
+    def transaction(self, **kwargs):
+        return _NullContext()
+
+    async def prepare(self, sql):
+        return self.statement
+
+
+class _NullContext:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _export(tmp_path, rows: int, traced: bool = False):
+    """(exported file, seconds, peak traced bytes) for an npz export of ``rows`` events."""
+    exporter = TableExporter(tmp_path, fmt="npz", chunk_rows=CHUNK_ROWS)
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    exported = asyncio.run(exporter._stream(Connection(rows), "pbp_events", None, "SELECT", []))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if traced else 0
+    tracemalloc.stop()
+    return exported, elapsed, peak
+
+
+def test_export_throughput_and_flat_memory(tmp_path):
+    large, large_s, _ = _export(tmp_path / "timed", 20 * CHUNK_ROWS)
+    small, _, small_peak = _export(tmp_path / "small", 3 * CHUNK_ROWS, traced=True)
+    medium, _, medium_peak = _export(tmp_path / "medium", 12 * CHUNK_ROWS, traced=True)
+
+    assert large.rows == 20 * CHUNK_ROWS and len(large.row_groups) == 20
+    assert read_npz_export(small.path)["event_idx"][:3].tolist() == [0, 1, 2]
+
+    print(f"\nnpz export of {large.rows} pbp rows: {large_s:.1f}s ({large.rows / large_s:,.0f} rows/s incl. "
+          f"row generation); peak traced memory {small_peak / 1e6:.0f} MB at {small.rows} rows, "
+          f"{medium_peak / 1e6:.0f} MB at {medium.rows} rows")
+    # Four times the rows, about the same memory: one chunk is resident at a time
+    assert medium_peak < 1.5 * small_peak
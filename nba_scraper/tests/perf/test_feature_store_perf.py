@@ -0,0 +1,72 @@
+"""Benchmark: loading a multi-season training set from the feature store.
+
+Run with ``make bench`` (or ``pytest tests/perf -m slow -s``) to print timings.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from nba_scraper.features import FEATURE_COLUMNS, FeatureMatrix, FeatureStore
+from nba_scraper.features.store import KEY_DTYPES
+
+pytestmark = pytest.mark.slow
+
+SEASONS = 20
+GAMES_PER_SEASON = 1230
+
+
+def _matrix(rng: np.random.Generator) -> FeatureMatrix:
+    rows = SEASONS * GAMES_PER_SEASON * 2
+    game = np.arange(rows) // 2
+    season = 2004 + game // GAMES_PER_SEASON
+    keys = {
+        "game_id": np.char.add(b"002", np.char.zfill(game.astype("S"), 7)).astype(KEY_DTYPES["game_id"]),
+        "season": np.char.add(np.char.add(season.astype("S4"), b"-"),
+                              np.char.zfill(((season + 1) % 100).astype("S"), 2)),
+        "game_date": (np.datetime64("2004-11-01") + (season - 2004) * 365
+                      + (game % GAMES_PER_SEASON) // 8).astype("datetime64[D]"),
+        "team_tricode": np.where(np.arange(rows) % 2, b"BOS", b"LAL").astype("S4"),
+        "opponent_tricode": np.where(np.arange(rows) % 2, b"LAL", b"BOS").astype("S4"),
+        "is_home": np.arange(rows) % 2 == 0,
+    }
+    values = rng.normal(size=(rows, len(FEATURE_COLUMNS))).astype(np.float32)
+    return FeatureMatrix(
+        keys=keys, values=values, columns=tuple(c.name for c in FEATURE_COLUMNS),
+        kinds=tuple(c.kind for c in FEATURE_COLUMNS), roles=tuple(c.role for c in FEATURE_COLUMNS),
+    )
+
+
+def _best_of(fn, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_multi_season_load(tmp_path):
+    store = FeatureStore(tmp_path / "features.nbaf")
+    matrix = _matrix(np.random.default_rng(7))
+    store.update(matrix)
+    seasons = sorted({s.decode() for s in matrix.keys["season"]})[-10:]
+
+    def load():
+        training = store.load(seasons)
+        return float(training.features.sum(dtype=np.float64)), len(training)
+
+    total, rows = load()
+    assert rows == 10 * GAMES_PER_SEASON * 2
+    assert total == pytest.approx(float(matrix.values[-rows:, :matrix.features.shape[1]].sum(dtype=np.float64)),
+                                  rel=1e-4)
+    load_s = _best_of(load)
+
+    day = matrix.take(slice(-16, None))
+    update_s = _best_of(lambda: store.update(day), repeats=3)
+
+    size_mb = store.path.stat().st_size / 1e6
+    print(f"\nfeature store, {len(matrix)} rows x {len(FEATURE_COLUMNS)} columns ({size_mb:.1f} MB): "
+          f"10-season load + scan {load_s * 1e3:.1f}ms, 8-game update {update_s * 1e3:.1f}ms")
+    assert load_s < 1.0
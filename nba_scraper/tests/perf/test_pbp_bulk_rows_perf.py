@@ -0,0 +1,54 @@
+"""Benchmark: bulk PbpEventRow construction vs per-row validation.
+
+Run with ``make bench`` (or ``pytest tests/perf -m slow -s``) to print timings.
+"""
+
+import random
+import time
+
+import pytest
+
+from nba_scraper.models.pbp_rows import PbpEventRow
+
+pytestmark = pytest.mark.slow
+
+EVENTS_PER_GAME = 450
+
+HEADERS = [
+    "GAME_ID", "EVENTNUM", "EVENTMSGTYPE", "EVENTMSGACTIONTYPE", "PERIOD", "PCTIMESTRING",
+    "HOMEDESCRIPTION", "VISITORDESCRIPTION", "SCORE", "PLAYER1_ID", "PLAYER1_NAME",
+    "PLAYER2_ID", "PLAYER2_NAME",
+]
+
+
+def _result_set(rng: random.Random) -> dict:
+    players = [(str(1000 + i), f"Player {i}") for i in range(20)]
+    rows = []
+    for idx in range(EVENTS_PER_GAME):
+        player_id, name = rng.choice(players)
+        rows.append([
+            "0022300001", str(idx), str(rng.choice([1, 2, 3, 4, 5, 6, 8])), "1",
+            str(1 + idx * 4 // EVENTS_PER_GAME), f"{rng.randrange(12)}:{rng.randrange(60):02d}",
+            rng.choice(["Jump Shot", "3PT Jump Shot", None]), "Foul", "10 - 8", player_id, name, "0", None,
+        ])
+    return {"name": "PlayByPlay", "headers": HEADERS, "rowSet": rows}
+
+
+def _best_of(fn, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_bulk_is_much_faster_than_strict():
+    result_set = _result_set(random.Random(5))
+
+    bulk = _best_of(lambda: PbpEventRow.bulk_from_nba_stats("0022300001", result_set, "url"))
+    strict = _best_of(lambda: PbpEventRow.bulk_from_nba_stats("0022300001", result_set, "url", strict=True))
+
+    print(f"\n{EVENTS_PER_GAME} rows: strict {strict / EVENTS_PER_GAME * 1e6:.1f}us/row, "
+          f"bulk {bulk / EVENTS_PER_GAME * 1e6:.1f}us/row ({strict / bulk:.0f}x)")
+    assert strict / bulk >= 4
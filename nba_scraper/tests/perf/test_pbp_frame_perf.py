@@ -0,0 +1,61 @@
+"""Memory benchmark: PbpFrame vs a list of PbpEventRow for a season of events.
+
+Run with ``make bench`` (or ``pytest tests/perf -m slow -s``) to print sizes.
+"""
+
+import random
+import tracemalloc
+
+import pytest
+
+from nba_scraper.models.enums import EventType
+from nba_scraper.models.pbp_frame import PbpFrame
+from nba_scraper.models.pbp_rows import PbpEventRow
+
+pytestmark = pytest.mark.slow
+
+GAMES = 100
+EVENTS_PER_GAME = 450
+SEASON_GAMES = 1230
+
+_DESCRIPTIONS = [None, "Personal foul", "Jump Shot", "Defensive rebound", "Bad pass turnover"]
+
+
+def _rows(rng: random.Random) -> list:
+    teams = ["LAL", "BOS", "GSW", "MIA"]
+    players = [f"Player {i}" for i in range(60)]
+    return [
+        PbpEventRow(
+            game_id=f"00223{game:05d}",
+            period=1 + idx * 4 // EVENTS_PER_GAME,
+            event_idx=idx,
+            time_remaining=f"{rng.randrange(12)}:{rng.randrange(60):02d}",
+            event_type=rng.choice(list(EventType)),
+            description=rng.choice(_DESCRIPTIONS),
+            team_tricode=rng.choice(teams),
+            player1_name_slug=rng.choice(players),
+            player2_name_slug=rng.choice(players + [None]),
+            source="bench",
+            source_url="https://bench",
+        )
+        for game in range(GAMES)
+        for idx in range(EVENTS_PER_GAME)
+    ]
+
+
+def test_frame_is_an_order_of_magnitude_smaller():
+    rng = random.Random(11)
+
+    tracemalloc.start()
+    rows = _rows(rng)
+    rows_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    frame = PbpFrame.from_rows(rows)
+    ratio = rows_bytes / frame.nbytes
+
+    scale = SEASON_GAMES / GAMES
+    print(f"\n{len(rows)} events: rows {rows_bytes / 1e6:.1f} MB, frame {frame.nbytes / 1e6:.2f} MB "
+          f"({ratio:.0f}x); season estimate rows {rows_bytes * scale / 1e9:.2f} GB, "
+          f"frame {frame.nbytes * scale / 1e6:.0f} MB")
+    assert ratio >= 10
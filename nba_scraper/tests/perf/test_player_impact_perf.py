@@ -0,0 +1,95 @@
+"""Benchmark: player impact sweep over a season of events.
+
+Run with ``make bench`` (or ``pytest tests/perf -m slow -s``) to print timings.
+"""
+
+import random
+import time
+
+import numpy as np
+import pytest
+
+from nba_scraper.models.enums import EventType
+from nba_scraper.models.pbp_frame import PbpFrame
+from nba_scraper.transformers.player_impact import PlayerImpactAccumulator
+from nba_scraper.transformers.possessions import ensure_possessions
+
+pytestmark = pytest.mark.slow
+
+GAMES_PER_SEASON = 1230
+PERIODS = 4
+EVENTS_PER_PERIOD = 110
+BATCH_GAMES = 50
+
+_PLAYS = [
+    (EventType.SHOT_MADE, 2), (EventType.SHOT_MADE, 3), (EventType.SHOT_MISSED, 2),
+    (EventType.SHOT_MISSED, 3), (EventType.FREE_THROW_MADE, 1), (EventType.REBOUND, 0),
+    (EventType.REBOUND, 0), (EventType.TURNOVER, 0), (EventType.FOUL, 0),
+]
+
+
+def _game(rng: random.Random, game_id: str, home: int, away: int):
+    rosters = {f"T{home:02d}": [100 * home + i for i in range(13)], f"T{away:02d}": [100 * away + i for i in range(13)]}
+    rows, listed, idx = [], {}, 0
+    for period in range(1, PERIODS + 1):
+        court = {team: roster[:5] for team, roster in rosters.items()}
+        seen = {team: set(players) for team, players in court.items()}
+        for i in range(EVENTS_PER_PERIOD):
+            team = rng.choice(list(rosters))
+            clock = 720_000 - (i + 1) * 6_000
+            row = {"game_id": game_id, "period": period, "event_idx": idx, "clock_ms_remaining": clock,
+                   "team_tricode": team}
+            if rng.random() < 0.1:
+                leaving = rng.choice(court[team])
+                entering = rng.choice([p for p in rosters[team] if p not in court[team]])
+                court[team] = [entering if p == leaving else p for p in court[team]]
+                seen[team].add(entering)
+                row.update(event_type="SUBSTITUTION", player1_id=leaving, player2_id=entering)
+            else:
+                event_type, value = rng.choice(_PLAYS)
+                row.update(event_type=event_type.value, player1_id=rng.choice(court[team]), shot_value=value)
+            rows.append(row)
+            idx += 1
+        listed.update({(game_id, period, team): sorted(players) for team, players in seen.items()})
+    return rows, listed
+
+
+def _season(rng: random.Random):
+    batches = []
+    for start in range(0, GAMES_PER_SEASON, BATCH_GAMES):
+        rows, listed = [], {}
+        for i in range(start, min(start + BATCH_GAMES, GAMES_PER_SEASON)):
+            game_rows, game_listed = _game(rng, f"00223{i:05d}", i % 30, (i + 7) % 30)
+            rows += game_rows
+            listed.update(game_listed)
+        # Possessions are annotated on load by the pipeline's possession engine
+        batches.append((ensure_possessions(PbpFrame.from_rows(rows)), listed))
+    return batches
+
+
+def _best_of(fn, repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_season_impact_throughput():
+    batches = _season(random.Random(42))
+    n = sum(len(frame) for frame, _ in batches)
+
+    def season():
+        accumulator = PlayerImpactAccumulator()
+        game_rows = sum(len(accumulator.add_frame(frame, listed)) for frame, listed in batches)
+        return game_rows, accumulator.rows()
+
+    game_rows, season_rows = season()
+    assert len(season_rows) <= 30 * 13
+    assert np.isfinite([row["seconds_on"] for row in season_rows]).all()
+    elapsed = _best_of(season)
+
+    print(f"\nplayer impact sweep, {n} events in {len(batches)} batches: {elapsed:.2f}s "
+          f"({n / elapsed / 1e6:.2f}M events/s), {game_rows} game rows, {len(season_rows)} season rows")
+    assert elapsed < 30
@@ -0,0 +1,66 @@
+"""Benchmark: batch Q1 window derivation vs one transform per game.
+
+Run with ``make bench`` (or ``pytest tests/perf -m slow -s``) to print timings.
+"""
+
+import random
+import time
+
+import pytest
+
+from nba_scraper.models.enums import EventType
+from nba_scraper.models.pbp_frame import PbpFrame
+from nba_scraper.transformers.q1_window import Q1WindowTransformer
+
+pytestmark = pytest.mark.slow
+
+GAMES_PER_SEASON = 1230
+EVENTS_PER_GAME = 130  # Q1 events up to the end of the 12:00-8:00 window
+
+_EVENT_MIX = [
+    EventType.SHOT_MADE, EventType.SHOT_MISSED, EventType.SHOT_MISSED, EventType.REBOUND,
+    EventType.REBOUND, EventType.FREE_THROW_MADE, EventType.FREE_THROW_MISSED, EventType.TURNOVER,
+    EventType.FOUL, EventType.ASSIST, EventType.SUBSTITUTION, EventType.TIMEOUT,
+]
+
+
+def _season_rows(rng: random.Random) -> list:
+    rows = []
+    for game in range(GAMES_PER_SEASON):
+        for idx in range(EVENTS_PER_GAME):
+            event_type = rng.choice(_EVENT_MIX)
+            rows.append({
+                "game_id": f"00223{game:05d}",
+                "period": 1,
+                "event_idx": idx,
+                "seconds_elapsed": 240.0 * idx / EVENTS_PER_GAME,
+                "event_type": event_type,
+                "team_tricode": rng.choice(["LAL", "BOS"]),
+                "shot_made": event_type in (EventType.SHOT_MADE, EventType.FREE_THROW_MADE),
+                "shot_value": rng.choice([2, 2, 3]),
+                "description": rng.choice([None, "Offensive rebound", "Defensive rebound"]),
+                "is_transition": rng.random() < 0.15,
+                "is_early_clock": rng.random() < 0.25,
+            })
+    return rows
+
+
+def test_season_batch_is_faster_than_per_game():
+    rows = _season_rows(random.Random(38))
+    transformer = Q1WindowTransformer()
+    frame = PbpFrame.from_rows(rows)
+    games = [frame.take(frame.game == code) for code in range(len(frame.games))]
+
+    start = time.perf_counter()
+    per_game = [transformer.transform(game, "bench://q1") for game in games]
+    t_per_game = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = transformer.transform_batch(frame, "bench://q1")
+    t_batch = time.perf_counter() - start
+
+    assert batch == per_game
+    print(f"\nq1_window season ({GAMES_PER_SEASON} games): per-game {t_per_game:.2f}s, "
+          f"batch {t_batch:.2f}s ({t_per_game / t_batch:.1f}x)")
+    assert t_batch < 10
+    assert t_per_game / t_batch >= 1.5
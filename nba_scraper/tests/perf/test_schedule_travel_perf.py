@@ -0,0 +1,76 @@
+"""Benchmark: season-wide travel derivation from precomputed venue matrices.
+
+Run with ``make bench`` (or ``pytest tests/perf -m slow -s``) to print timings.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import mock_open, patch
+
+import pytest
+
+from nba_scraper.models.game_rows import GameRow
+from nba_scraper.transformers.schedule_travel import ScheduleTravelTransformer, derive_travel
+
+pytestmark = pytest.mark.slow
+
+SEASONS = 5
+GAMES_PER_SEASON = 1230
+TEAMS = [f"T{i:02d}" for i in range(30)]
+_TIMEZONES = ["America/Los_Angeles", "America/Denver", "America/Chicago", "America/New_York"]
+
+
+def _transformer(rng: random.Random) -> ScheduleTravelTransformer:
+    csv = "team_id,arena_name,arena_tz,lat,lon,altitude_m\n" + "".join(
+        f"{team},Arena {team},{rng.choice(_TIMEZONES)},"
+        f"{rng.uniform(25, 48):.4f},{rng.uniform(-123, -70):.4f},{rng.randint(0, 1700)}\n"
+        for team in TEAMS
+    )
+    with patch("builtins.open", mock_open(read_data=csv)):
+        return ScheduleTravelTransformer(venues_csv_path=Path("venues.csv"))
+
+
+def _games(rng: random.Random) -> list:
+    games = []
+    for season in range(SEASONS):
+        opening = datetime(2019 + season, 10, 20)
+        for i in range(GAMES_PER_SEASON):
+            home, away = rng.sample(TEAMS, 2)
+            tip_off = opening + timedelta(days=rng.randrange(170), hours=rng.choice([19, 20, 22]))
+            games.append(GameRow(
+                game_id=f"002{season}{i:05d}",
+                season=f"{2019 + season}-{(20 + season) % 100:02d}",
+                game_date_utc=tip_off,
+                game_date_local=tip_off.date(),
+                arena_tz="America/New_York",
+                home_team_tricode=home,
+                away_team_tricode=away,
+                source="bench",
+                source_url="https://bench",
+            ))
+    return games
+
+
+def _best_of(fn, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_multi_season_derivation_runs_in_milliseconds():
+    rng = random.Random(5)
+    transformer = _transformer(rng)
+    games = _games(rng)
+    schedule = transformer.schedule_arrays(games)
+
+    derive = _best_of(lambda: derive_travel(schedule, transformer.venue_matrix))
+    full = _best_of(lambda: transformer.transform(games, "https://bench"), repeats=3)
+
+    print(f"\n{len(games)} games: derive_travel {derive * 1e3:.1f}ms, "
+          f"transform with rows {full * 1e3:.0f}ms")
+    assert derive < 0.05
@@ -0,0 +1,73 @@
+"""Benchmark: lineup stints rebuilt from a season of play-by-play.
+
+Run with ``make bench`` (or ``pytest tests/perf -m slow -s``) to print timings.
+"""
+
+import random
+import time
+
+import pytest
+
+from nba_scraper.models.enums import EventType
+from nba_scraper.transformers.stints import build_lineup_stints
+
+pytestmark = pytest.mark.slow
+
+GAMES_PER_SEASON = 1230
+EVENTS_PER_PERIOD = 110
+
+_PLAYS = [
+    (EventType.SHOT_MADE.value, 2), (EventType.SHOT_MADE.value, 3), (EventType.SHOT_MISSED.value, 2),
+    (EventType.FREE_THROW_MADE.value, None), (EventType.REBOUND.value, None), (EventType.TURNOVER.value, None),
+    (EventType.FOUL.value, None),
+]
+
+
+def _game(rng: random.Random, home: int, away: int):
+    rosters = {f"T{home:02d}": [100 * home + i for i in range(13)], f"T{away:02d}": [100 * away + i for i in range(13)]}
+    events, starters = [], {team: roster[:5] for team, roster in rosters.items()}
+    for period in range(1, 5):
+        court = {team: roster[:5] for team, roster in rosters.items()}
+        for i in range(EVENTS_PER_PERIOD):
+            team = rng.choice(list(rosters))
+            event = {"period": period, "clock_ms_remaining": 720_000 - (i + 1) * 6_000, "team_tricode": team}
+            if rng.random() < 0.1:
+                leaving = rng.choice(court[team])
+                entering = rng.choice([p for p in rosters[team] if p not in court[team]])
+                court[team] = [entering if p == leaving else p for p in court[team]]
+                event.update(event_type=EventType.SUBSTITUTION.value, player1_id=str(leaving), player2_id=str(entering))
+            else:
+                event_type, value = rng.choice(_PLAYS)
+                event.update(event_type=event_type, player1_id=str(rng.choice(court[team])), shot_value=value)
+            events.append(event)
+    team_ids = {team: 1610612700 + int(team[1:]) for team in rosters}
+    return events, team_ids, starters
+
+
+def _best_of(fn, repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_season_stint_rebuild_throughput():
+    rng = random.Random(42)
+    season = [_game(rng, i % 30, (i + 7) % 30) for i in range(GAMES_PER_SEASON)]
+    n = sum(len(events) for events, _, _ in season)
+
+    def rebuild():
+        return sum(
+            len(build_lineup_stints(events, f"00223{i:05d}", team_ids, starters))
+            for i, (events, team_ids, starters) in enumerate(season)
+        )
+
+    stints = rebuild()
+    assert stints > 2 * 4 * GAMES_PER_SEASON
+    elapsed = _best_of(rebuild)
+
+    print(f"\nlineup stint rebuild, {n} events over {GAMES_PER_SEASON} games: {elapsed:.2f}s "
+          f"({n / elapsed / 1e6:.2f}M events/s, {GAMES_PER_SEASON / elapsed:.0f} games/s), {stints} stints")
+    assert elapsed < 60
@@ -0,0 +1,83 @@
+"""Benchmark: NumPy team_game_stats engine over a season of events.
+
+Run with ``make bench`` (or ``pytest tests/perf -m slow -s``) to print timings.
+The SQL engine needs a database; compare both on a real workload with
+``AnalyticsPipeline.compare_team_stats_engines``.
+"""
+
+import random
+import time
+
+import numpy as np
+import pytest
+
+from nba_scraper.models.enums import EventType
+from nba_scraper.pipelines.analytics_pipeline import TEAM_STATS_STREAM_ROWS
+from nba_scraper.transformers.team_game_stats import TeamGameStatsAccumulator
+
+pytestmark = pytest.mark.slow
+
+GAMES_PER_SEASON = 1230
+EVENTS_PER_GAME = 450
+
+_EVENT_MIX = [e.value for e in (
+    EventType.SHOT_MADE, EventType.SHOT_MISSED, EventType.SHOT_MISSED, EventType.FREE_THROW_MADE,
+    EventType.FREE_THROW_MISSED, EventType.REBOUND, EventType.REBOUND, EventType.ASSIST,
+    EventType.TURNOVER, EventType.STEAL, EventType.BLOCK, EventType.FOUL, EventType.SUBSTITUTION,
+)]
+
+
+def _season(rng: random.Random):
+    games = [
+        {"game_id": f"00223{i:05d}", "home_team_tricode": f"H{i % 30}", "away_team_tricode": f"A{i % 29}",
+         "home_team_id": f"16{i % 30}", "away_team_id": f"26{i % 29}", "duration_minutes": 48}
+        for i in range(GAMES_PER_SEASON)
+    ]
+    records = [
+        {"game_id": game["game_id"], "is_home": rng.random() < 0.5, "event_type": rng.choice(_EVENT_MIX),
+         "shot_value": rng.choice([2, 2, 3]), "rebound_type": rng.choice(["OFFENSIVE", "DEFENSIVE"])}
+        for game in games
+        for _ in range(EVENTS_PER_GAME)
+    ]
+    return games, records
+
+
+def _best_of(fn, repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_season_aggregation_throughput():
+    games, records = _season(random.Random(42))
+    chunks = [records[i:i + TEAM_STATS_STREAM_ROWS] for i in range(0, len(records), TEAM_STATS_STREAM_ROWS)]
+
+    def from_records():
+        accumulator = TeamGameStatsAccumulator(games)
+        for chunk in chunks:
+            accumulator.add_records(chunk)
+        return accumulator.rows()
+
+    rng = np.random.default_rng(42)
+    n = len(records)
+    arrays = (
+        np.repeat(np.arange(GAMES_PER_SEASON), EVENTS_PER_GAME), rng.random(n) < 0.5,
+        rng.integers(-1, 10, n).astype(np.int8), rng.integers(1, 4, n).astype(np.int8),
+        rng.integers(0, 3, n).astype(np.int8),
+    )
+
+    def from_arrays():
+        accumulator = TeamGameStatsAccumulator(games)
+        accumulator.add(*arrays)
+        return accumulator.rows()
+
+    assert len(from_records()) == 2 * GAMES_PER_SEASON
+    t_records = _best_of(from_records)
+    t_arrays = _best_of(from_arrays)
+
+    print(f"\nteam_game_stats numpy engine, {n} events: records {t_records:.2f}s "
+          f"({n / t_records / 1e6:.1f}M events/s), reductions only {t_arrays * 1e3:.0f}ms")
+    assert t_records < 10
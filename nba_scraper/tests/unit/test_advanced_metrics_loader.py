@@ -0,0 +1,132 @@
+"""Tests for the batched, diff-aware AdvancedMetricsLoader upserts."""
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from nba_scraper.loaders import advanced_metrics
+from nba_scraper.loaders.advanced_metrics import AdvancedMetricsLoader
+
+
+def _mock_conn(inserted: int = 0, updated: int = 0) -> MagicMock:
+    conn = MagicMock()
+    conn.statement = MagicMock()
+    conn.statement.fetchrow = AsyncMock(return_value={"inserted": inserted, "updated": updated})
+    conn.prepare = AsyncMock(return_value=conn.statement)
+    conn.transaction = MagicMock(side_effect=TypeError)  # maybe_transaction falls back to no-op
+    return conn
+
+
+def _pooled(conn, released=None):
+    """Patch advanced_metrics.pooled_connection to hand out ``conn``, counting releases."""
+    @asynccontextmanager
+    async def pooled_connection():
+        try:
+            yield conn
+        finally:
+            if released is not None:
+                released.append(conn)
+
+    return patch.object(advanced_metrics, "pooled_connection", pooled_connection)
+
+
+def _player(player_id, **overrides):
+    row = {
+        "game_id": "0022300001",
+        "player_id": player_id,
+        "player_name": f"Player {player_id}",
+        "team_id": 1610612747,
+        "team_abbreviation": "LAL",
+        "offensive_rating": "112.5",
+        "source_url": "https://stats.nba.com/test",
+    }
+    row.update(overrides)
+    return row
+
+
+class TestAdvancedMetricsLoader:
+    """Test cases for set-based advanced metrics upserts."""
+
+    @pytest.mark.asyncio
+    async def test_one_statement_per_batch(self):
+        conn = _mock_conn(inserted=3)
+        loader = AdvancedMetricsLoader(batch_size=2)
+        released = []
+
+        with _pooled(conn, released):
+            changed = await loader.upsert_advanced_player_stats([_player(i) for i in range(3)])
+
+        # 3 rows at batch_size=2 -> two round-trips, not three
+        assert conn.statement.fetchrow.await_count == 2
+        assert changed == 6  # mocked counts are summed per batch
+        assert released == [conn]
+
+    @pytest.mark.asyncio
+    async def test_connection_is_released_on_failure(self):
+        conn = _mock_conn()
+        conn.statement.fetchrow.side_effect = RuntimeError("connection reset")
+        released = []
+
+        with _pooled(conn, released), pytest.raises(RuntimeError):
+            await AdvancedMetricsLoader().upsert_advanced_player_stats([_player(1)])
+
+        assert released == [conn]
+
+    @pytest.mark.asyncio
+    async def test_columns_are_bound_as_coerced_arrays(self):
+        conn = _mock_conn(inserted=2)
+        loader = AdvancedMetricsLoader()
+
+        with _pooled(conn):
+            await loader.upsert_advanced_player_stats(
+                [_player(201939), _player(2544, offensive_rating=None)]
+            )
+
+        query = conn.prepare.await_args.args[0]
+        arrays = conn.statement.fetchrow.await_args.args
+        assert "unnest($1::text[]" in query
+        assert "IS DISTINCT FROM" in query
+        assert "RETURNING (xmax = 0) AS inserted" in query
+
+        columns = advanced_metrics.ADVANCED_PLAYER_SPEC.column_names
+        by_name = dict(zip(columns, arrays))
+        assert by_name["player_id"] == ["201939", "2544"]
+        assert by_name["team_id"] == ["1610612747", "1610612747"]
+        assert by_name["offensive_rating"] == [112.5, None]
+        assert by_name["source"] == ["nba_stats", "nba_stats"]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_keys_collapse_to_last_row(self):
+        conn = _mock_conn(inserted=1)
+        loader = AdvancedMetricsLoader(batch_size=1)
+
+        with _pooled(conn):
+            await loader.upsert_misc_player_stats(
+                [_player(1, plus_minus=3), _player("1", plus_minus=-4)]
+            )
+
+        assert conn.statement.fetchrow.await_count == 1
+        columns = advanced_metrics.MISC_PLAYER_SPEC.column_names
+        by_name = dict(zip(columns, conn.statement.fetchrow.await_args.args))
+        assert by_name["plus_minus"] == -4.0
+
+    @pytest.mark.asyncio
+    async def test_returns_only_changed_rows(self):
+        conn = _mock_conn(inserted=0, updated=1)
+        loader = AdvancedMetricsLoader()
+
+        with _pooled(conn):
+            changed = await loader.upsert_advanced_team_stats(
+                [{"game_id": "0022300001", "team_id": tid, "team_abbreviation": "LAL"}
+                 for tid in (1, 2)]
+            )
+
+        assert changed == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_input_skips_database(self):
+        pooled = MagicMock()
+        with patch.object(advanced_metrics, "pooled_connection", pooled):
+            assert await AdvancedMetricsLoader().upsert_usage_player_stats([]) == 0
+        pooled.assert_not_called()
@@ -0,0 +1,157 @@
+"""Tests for the analytics DAG executor."""
+
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from nba_scraper.pipelines.analytics_dag import NODE_FAILED, NODE_OK, NODE_SKIPPED, AnalyticsDag
+from nba_scraper.pipelines.derive import AnalyticsRegistry, DerivePipeline
+
+# base_a ─┬─> team ─> season
+# base_b ─┘
+#          other
+GRAPH = {
+    'base_a': [],
+    'base_b': [],
+    'team': ['base_a', 'base_b'],
+    'season': ['team'],
+    'other': [],
+}
+
+
+def _runner(log, delays=None, fail=()):
+    running = set()
+
+    async def run(unit):
+        for node in unit:
+            log.append(('start', node, frozenset(running)))
+        running.update(unit)
+        await asyncio.sleep((delays or {}).get(unit[0], 0.01))
+        running.difference_update(unit)
+        for node in unit:
+            log.append(('end', node, None))
+        if set(unit) & set(fail):
+            raise RuntimeError('boom')
+
+    return run
+
+
+class TestAnalyticsDag:
+    """Graph validation, scheduling and reporting."""
+
+    def test_rejects_cycles_and_unknown_dependencies(self):
+        with pytest.raises(ValueError, match='cycle'):
+            AnalyticsDag({'a': ['b'], 'b': ['a']})
+        with pytest.raises(ValueError, match='unknown'):
+            AnalyticsDag({'a': ['missing']})
+
+    def test_downstream_follows_transitive_dependents(self):
+        dag = AnalyticsDag(GRAPH)
+        assert dag.downstream(['base_b']) == {'base_b', 'team', 'season'}
+        assert dag.downstream(['other']) == {'other'}
+
+    @pytest.mark.asyncio
+    async def test_dependents_start_after_inputs_and_independents_overlap(self):
+        log = []
+        report = await AnalyticsDag(GRAPH).run(_runner(log), max_workers=4)
+
+        order = [(event, node) for event, node, _ in log]
+        assert order.index(('start', 'team')) > max(order.index(('end', 'base_a')), order.index(('end', 'base_b')))
+        assert order.index(('start', 'season')) > order.index(('end', 'team'))
+        roots = {node for event, node, _ in log[:3] if event == 'start'}
+        assert roots == {'base_a', 'base_b', 'other'}
+        assert set(report.with_status(NODE_OK)) == set(GRAPH)
+
+    @pytest.mark.asyncio
+    async def test_worker_pool_is_bounded(self):
+        log = []
+        await AnalyticsDag(GRAPH).run(_runner(log), max_workers=1)
+        assert all(not running for event, _, running in log if event == 'start')
+
+    @pytest.mark.asyncio
+    async def test_failure_skips_only_dependents(self):
+        log = []
+        report = await AnalyticsDag(GRAPH).run(_runner(log, fail=['base_a']))
+
+        assert report.with_status(NODE_FAILED) == ['base_a']
+        assert set(report.with_status(NODE_SKIPPED)) == {'team', 'season'}
+        assert report.nodes['other'].status == NODE_OK
+        assert ('start', 'team') not in [(event, node) for event, node, _ in log]
+
+    @pytest.mark.asyncio
+    async def test_subset_treats_outside_dependencies_as_satisfied(self):
+        dag = AnalyticsDag(GRAPH)
+        log = []
+        report = await dag.run(_runner(log), nodes=dag.downstream(['team']))
+        assert set(report.nodes) == {'team', 'season'}
+
+    @pytest.mark.asyncio
+    async def test_groups_run_as_one_unit(self):
+        units = []
+
+        async def run(unit):
+            units.append(unit)
+            return ['base_b'] if 'base_b' in unit else None
+
+        report = await AnalyticsDag(GRAPH).run(run, groups=[['base_a', 'base_b', 'other']])
+
+        assert set(units[0]) == {'base_a', 'base_b', 'other'}
+        assert report.nodes['base_b'].status == NODE_FAILED
+        assert set(report.with_status(NODE_SKIPPED)) == {'team', 'season'}
+
+        with pytest.raises(ValueError, match='depend on each other'):
+            await AnalyticsDag(GRAPH).run(run, groups=[['base_a', 'season']])
+
+    @pytest.mark.asyncio
+    async def test_critical_path_is_longest_dependent_chain(self):
+        delays = {'base_a': 0.01, 'base_b': 0.08, 'team': 0.02, 'season': 0.02, 'other': 0.05}
+        report = await AnalyticsDag(GRAPH).run(_runner([], delays))
+
+        assert report.critical_path == ['base_b', 'team', 'season']
+        assert report.critical_path_seconds == pytest.approx(0.12, abs=0.04)
+        assert report.critical_path_seconds <= report.wall_seconds + 1e-6
+        assert report.summary()['critical_path'] == ['base_b', 'team', 'season']
+
+
+class TestDeriveAllDag:
+    """DerivePipeline runs the registry as a DAG."""
+
+    def test_changed_source_selects_downstream_analytics(self):
+        assert AnalyticsRegistry.get_downstream_analytics({'pbp_events'}) == {'q1_window', 'early_shocks'}
+        assert 'outcomes' in AnalyticsRegistry.get_downstream_analytics({'bref'})
+
+    @pytest.mark.asyncio
+    async def test_fused_analytics_run_as_one_unit_next_to_outcomes(self):
+        with patch('nba_scraper.pipelines.derive.ScheduleTravelTransformer'):
+            pipeline = DerivePipeline(max_workers=2)
+        pipeline._derive_fused = AsyncMock()
+        pipeline._derive_outcomes = AsyncMock(return_value=3)
+
+        result = await pipeline.derive_all(
+            date(2024, 1, 1), date(2024, 1, 31),
+            available_sources={'nba_stats', 'bref'}, changed_sources={'pbp_events', 'bref'},
+        )
+
+        assert pipeline._derive_fused.await_count == 1
+        assert sorted(pipeline._derive_fused.await_args.args[0]) == ['early_shocks', 'q1_window', 'schedule_travel']
+        assert result.records_updated['outcomes'] == 3
+        assert set(result.dag_report.nodes) == {'q1_window', 'early_shocks', 'schedule_travel', 'outcomes'}
+        assert result.dag_report.critical_path
+
+    @pytest.mark.asyncio
+    async def test_changed_source_limits_the_run(self):
+        with patch('nba_scraper.pipelines.derive.ScheduleTravelTransformer'):
+            pipeline = DerivePipeline()
+        pipeline._derive_fused = AsyncMock()
+        pipeline._derive_outcomes = AsyncMock(return_value=0)
+
+        result = await pipeline.derive_all(
+            date(2024, 1, 1), date(2024, 1, 31),
+            available_sources={'nba_stats', 'bref'}, changed_sources={'pbp_events'},
+        )
+
+        pipeline._derive_outcomes.assert_not_awaited()
+        assert sorted(pipeline._derive_fused.await_args.args[0]) == ['early_shocks', 'q1_window']
+        assert set(result.dag_report.nodes) == {'q1_window', 'early_shocks'}
@@ -0,0 +1,151 @@
+"""Tests for incremental team analytics in AnalyticsPipeline."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from nba_scraper.pipelines import analytics_pipeline
+from nba_scraper.pipelines.analytics_pipeline import (
+    SEASON_AGGREGATES_ADD,
+    SEASON_AGGREGATES_REBUILD,
+    SEASON_AGGREGATES_SEASONS_QUERY,
+    SEASON_CONTRIBUTIONS_QUERY,
+    TEAM_ANALYTICS_STAGE,
+    TEAM_ANALYTICS_VERSION,
+    AnalyticsPipeline,
+)
+from nba_scraper.state.game_state import GameStageState, fingerprint
+
+GAMES = ["0022300001", "0022300002", "0022300003"]
+SEASON = "2023-24"
+
+
+def _sums(team_games, off, def_, pace):
+    return {
+        "season": SEASON, "team_games": team_games,
+        "off_rating_sum": off, "off_rating_sumsq": off * off / 2,
+        "def_rating_sum": def_, "def_rating_sumsq": def_ * def_ / 2,
+        "pace_sum": pace, "pace_sumsq": pace * pace / 2,
+    }
+
+
+def _connection(contributions, aggregated_seasons=(SEASON,)):
+    """asyncpg-like connection: games in scope, season sums before then after the recompute."""
+    contributions = list(contributions)
+
+    async def fetch(query, *args):
+        if query == SEASON_CONTRIBUTIONS_QUERY:
+            return [contributions.pop(0)]
+        if query == SEASON_AGGREGATES_SEASONS_QUERY:
+            return [{"season": season} for season in aggregated_seasons]
+        if query.startswith("SELECT g.game_id FROM games g"):
+            return [{"game_id": game_id} for game_id in GAMES]
+        return []  # tracked possession events
+
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=fetch)
+    conn.execute = AsyncMock(return_value="UPDATE 0")
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    return conn
+
+
+def _states(stage, game_ids):
+    if stage == "silver":
+        return {g: GameStageState(g, "silver", input_sha1=f"sha-{g}", version="1") for g in GAMES}
+    # The first game changed since its last team analytics run
+    return {
+        g: GameStageState(
+            g, TEAM_ANALYTICS_STAGE, version=TEAM_ANALYTICS_VERSION,
+            input_sha1=fingerprint("stale" if g == GAMES[0] else f"sha-{g}", "1"),
+        )
+        for g in GAMES
+    }
+
+
+def _executed(conn, query):
+    return [call.args for call in conn.execute.await_args_list if call.args[0] == query]
+
+
+class TestIncrementalTeamAnalytics:
+    """Change-log driven recompute with additive season aggregates."""
+
+    @pytest.mark.asyncio
+    async def test_only_changed_games_recomputed_and_aggregates_rolled_forward(self):
+        conn = _connection([_sums(2, 200.0, 210.0, 196.0), _sums(2, 230.0, 200.0, 200.0)])
+        save = AsyncMock()
+
+        with patch.object(analytics_pipeline, "get_connection", AsyncMock(return_value=conn)), \
+             patch.object(analytics_pipeline, "fetch_stage_states",
+                          AsyncMock(side_effect=lambda c, stage, game_ids: _states(stage, game_ids))), \
+             patch.object(analytics_pipeline, "save_stage_states", save):
+            result = await AnalyticsPipeline().compute_team_analytics(season=SEASON)
+
+        assert result.success, result.error
+        assert result.games_analyzed == 1
+        assert result.games_skipped == 2
+
+        # Every heavy statement is narrowed to the changed game
+        heavy = [args for args in (call.args for call in conn.execute.await_args_list)
+                 if "team_game_stats" in args[0] and "ANY($2::text[])" in args[0]]
+        assert heavy and all(args[-1] == [GAMES[0]] for args in heavy)
+
+        (add,) = _executed(conn, SEASON_AGGREGATES_ADD)
+        assert add[1] == [SEASON]
+        assert add[2] == [0]                      # team_games unchanged
+        assert add[3] == [pytest.approx(30.0)]    # off_rating_sum delta
+        assert add[5] == [pytest.approx(-10.0)]   # def_rating_sum delta
+        assert add[7] == [pytest.approx(4.0)]     # pace_sum delta
+        assert not _executed(conn, SEASON_AGGREGATES_REBUILD)
+
+        (states,) = save.await_args.args[1:]
+        assert [s.game_id for s in states] == [GAMES[0]]
+        assert states[0].input_sha1 == fingerprint(f"sha-{GAMES[0]}", "1")
+
+    @pytest.mark.asyncio
+    async def test_nothing_changed_does_no_work(self):
+        conn = _connection([])
+        current = lambda c, stage, game_ids: {
+            g: GameStageState(g, stage, input_sha1=fingerprint(f"sha-{g}", "1"), version=TEAM_ANALYTICS_VERSION)
+            for g in GAMES
+        } if stage == TEAM_ANALYTICS_STAGE else _states(stage, game_ids)
+
+        with patch.object(analytics_pipeline, "get_connection", AsyncMock(return_value=conn)), \
+             patch.object(analytics_pipeline, "fetch_stage_states", AsyncMock(side_effect=current)):
+            result = await AnalyticsPipeline().compute_team_analytics(season=SEASON)
+
+        assert result.success
+        assert (result.games_analyzed, result.games_skipped) == (0, 3)
+        conn.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_new_season_is_rebuilt_instead_of_rolled(self):
+        conn = _connection([_sums(0, 0.0, 0.0, 0.0), _sums(2, 230.0, 200.0, 200.0)], aggregated_seasons=())
+
+        with patch.object(analytics_pipeline, "get_connection", AsyncMock(return_value=conn)), \
+             patch.object(analytics_pipeline, "fetch_stage_states",
+                          AsyncMock(side_effect=lambda c, stage, game_ids: _states(stage, game_ids))), \
+             patch.object(analytics_pipeline, "save_stage_states", AsyncMock()):
+            result = await AnalyticsPipeline().compute_team_analytics(season=SEASON)
+
+        assert result.success, result.error
+        assert _executed(conn, SEASON_AGGREGATES_REBUILD) == [(SEASON_AGGREGATES_REBUILD, [SEASON])]
+        assert not _executed(conn, SEASON_AGGREGATES_ADD)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("full_rebuild", [True, False])
+    async def test_full_rebuild_on_demand_or_without_game_state(self, full_rebuild):
+        conn = _connection([_sums(6, 600.0, 600.0, 590.0)])
+        fetch_states = AsyncMock(side_effect=RuntimeError("no state table"))
+        save = AsyncMock()
+
+        with patch.object(analytics_pipeline, "get_connection", AsyncMock(return_value=conn)), \
+             patch.object(analytics_pipeline, "fetch_stage_states", fetch_states), \
+             patch.object(analytics_pipeline, "save_stage_states", save):
+            result = await AnalyticsPipeline().compute_team_analytics(season=SEASON, full_rebuild=full_rebuild)
+
+        assert result.success, result.error
+        assert result.games_analyzed == 3
+        assert fetch_states.await_count == (0 if full_rebuild else 1)
+        assert _executed(conn, SEASON_AGGREGATES_REBUILD) == [(SEASON_AGGREGATES_REBUILD, [SEASON])]
+        assert not any("ANY($2::text[])" in call.args[0] for call in conn.execute.await_args_list)
+        save.assert_not_awaited()
@@ -1,7 +1,14 @@
 """Tests for clock parsing utility."""
 
+import numpy as np
 import pytest
-from nba_scraper.utils.clock import parse_clock_to_ms, period_length_ms
+from nba_scraper.utils.clock import (
+    calculate_seconds_elapsed,
+    game_seconds_elapsed,
+    parse_clock_to_ms,
+    parse_clocks,
+    period_length_ms,
+)
 
 
 class TestClockParsing:
@@ -87,3 +94,51 @@ class TestClockParsing:
         # Overtime periods (5+): 5 minutes
         for period in range(5, 10):
             assert period_length_ms(period) == 300000
+
+
+class TestBatchClockParsing:
+    """Test the vectorized clock parser against the scalar one."""
+
+    CLOCKS = ["12:00", "0:00.5", "PT11M58.50S", "5:00", "5:01", "", None, "abc", "1:60", 90]
+    PERIODS = [1, 2, 3, 5, 5, 1, 1, 1, 1, 1]
+
+    def test_matches_scalar_parser(self):
+        """Valid entries equal parse_clock_to_ms; the rest are flagged, not raised."""
+        result = parse_clocks(self.CLOCKS, self.PERIODS)
+
+        for i, (clock, period) in enumerate(zip(self.CLOCKS, self.PERIODS)):
+            try:
+                expected = parse_clock_to_ms(clock, period)
+            except (TypeError, ValueError):
+                assert not result.valid[i]
+                assert result.clock_ms_remaining[i] == -1
+                assert np.isnan(result.seconds_elapsed[i])
+            else:
+                assert result.valid[i]
+                assert result.clock_ms_remaining[i] == expected
+                assert result.seconds_elapsed[i] == (period_length_ms(period) - expected) / 1000.0
+
+        assert result.valid.tolist() == [True, True, True, True, False, False, False, False, False, False]
+
+    def test_scalar_period_broadcasts(self):
+        result = parse_clocks(["12:00", "4:59"], 5)
+        assert result.valid.tolist() == [False, True]
+        assert result.seconds_elapsed[1] == 1.0
+
+    def test_empty_input(self):
+        result = parse_clocks([], [])
+        assert len(result.clock_ms_remaining) == 0
+        assert result.valid.dtype == bool
+
+    def test_game_seconds_elapsed_matches_scalar(self):
+        periods = [1, 2, 4, 5, 7, 0, 3]
+        remaining_ms = [720000, 60500, 0, 300000, 12000, 1000, -1]
+
+        elapsed = game_seconds_elapsed(periods, remaining_ms)
+
+        for i, (period, ms) in enumerate(zip(periods, remaining_ms)):
+            expected = calculate_seconds_elapsed(period, ms / 1000.0)
+            if expected is None:
+                assert np.isnan(elapsed[i])
+            else:
+                assert elapsed[i] == pytest.approx(expected)
@@ -0,0 +1,85 @@
+"""Tests for schema-directed resultSet coercion."""
+
+import pytest
+
+from nba_scraper.utils.column_coercion import (
+    PLAY_BY_PLAY_COLUMNS,
+    SHOT_CHART_DETAIL_COLUMNS,
+    coerce_record,
+    coerce_response,
+    coerce_result_set,
+    schema_for,
+)
+
+PBP_HEADERS = ["GAME_ID", "EVENTNUM", "EVENTMSGTYPE", "PERIOD", "PCTIMESTRING",
+               "HOMEDESCRIPTION", "SCORE", "SCOREMARGIN", "PLAYER1_ID", "PLAYER1_NAME", "UNKNOWN_COL"]
+
+
+def _pbp_response(rows):
+    return {
+        "resource": "playbyplay",
+        "parameters": {"GameID": "0022300001", "StartPeriod": "0"},
+        "resultSets": [{"name": "PlayByPlay", "headers": PBP_HEADERS, "rowSet": rows}],
+    }
+
+
+class TestSchemaCoercion:
+    """Declared columns get their declared types."""
+
+    def test_play_by_play_columns(self):
+        rows = [["0022300001", "2", "1", "1", "11:40", "James 3PT Jump Shot", "3 - 0", "TIE", "2544", "LeBron James", "12.5"]]
+
+        (row,) = coerce_response(_pbp_response(rows), "playbyplayv2")["resultSets"][0]["rowSet"]
+
+        assert row == ["0022300001", 2, 1, 1, "11:40", "James 3PT Jump Shot", "3 - 0", 0, 2544, "LeBron James", 12.5]
+
+    def test_game_id_keeps_leading_zeros(self):
+        rows = [["0022300001", 1, 12, 1, "12:00", None, None, None, None, None, None]]
+        coerced = coerce_response(_pbp_response(rows), "playbyplayv2")
+        assert coerced["resultSets"][0]["rowSet"][0][0] == "0022300001"
+
+    @pytest.mark.parametrize("raw,expected", [(None, None), ("", None), ("-3", -3), (" 7 ", 7), ("TIE", 0)])
+    def test_score_margin(self, raw, expected):
+        rows = [["0022300001", 1, 1, 1, "12:00", None, None, raw, None, None, None]]
+        coerced = coerce_response(_pbp_response(rows), "playbyplayv2")
+        assert coerced["resultSets"][0]["rowSet"][0][7] == expected
+
+    def test_clock_and_text_are_never_numeric(self):
+        rows = [["0022300001", 1, 1, 1, "0:45.2", "76", None, None, None, "123", None]]
+        row = coerce_response(_pbp_response(rows), "playbyplayv2")["resultSets"][0]["rowSet"][0]
+        assert (row[4], row[5], row[9]) == ("0:45.2", "76", "123")
+
+    def test_unknown_columns_use_heuristic(self):
+        rows = [["0022300001", 1, 1, 1, "12:00", None, None, None, None, None, "4:30"]]
+        row = coerce_response(_pbp_response(rows), "playbyplayv2")["resultSets"][0]["rowSet"][0]
+        assert row[10] == "4:30"
+
+    def test_non_result_set_parts_are_preprocessed(self):
+        coerced = coerce_response(_pbp_response([]), "playbyplayv2")
+        assert coerced["parameters"] == {"GameID": "0022300001", "StartPeriod": 0}
+
+    def test_ragged_rows_fall_back(self):
+        result_set = {"name": "PlayByPlay", "headers": PBP_HEADERS, "rowSet": [["0022300001", "2"]]}
+        assert coerce_result_set(result_set)["rowSet"] == [["0022300001", 2]]
+
+
+class TestSchemaLookup:
+    """Endpoint and resultSet name resolution."""
+
+    def test_endpoint_then_name(self):
+        assert schema_for("playbyplayv2", "PlayByPlay") is PLAY_BY_PLAY_COLUMNS
+        assert schema_for(None, "Shot_Chart_Detail") is SHOT_CHART_DETAIL_COLUMNS
+        assert schema_for("unknown", "Nothing") is None
+
+
+class TestCoerceRecord:
+    """Dict rows from the shape-only extractors."""
+
+    def test_shot_record(self):
+        record = {"GAME_ID": "0022300001", "LOC_X": "-220", "LOC_Y": "15", "SHOT_MADE_FLAG": "1",
+                  "PLAYER_NAME": "Stephen Curry", "EXTRA": "3.5"}
+
+        coerced = coerce_record(record, SHOT_CHART_DETAIL_COLUMNS)
+
+        assert coerced == {"GAME_ID": "0022300001", "LOC_X": -220, "LOC_Y": 15, "SHOT_MADE_FLAG": 1,
+                           "PLAYER_NAME": "Stephen Curry", "EXTRA": 3.5}
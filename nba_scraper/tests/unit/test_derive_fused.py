@@ -0,0 +1,189 @@
+"""Tests for the fused multi-analytic derive pass."""
+
+from contextlib import asynccontextmanager
+from datetime import date, datetime, UTC
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, mock_open, patch
+
+import pytest
+
+from nba_scraper.models.enums import EventType
+from nba_scraper.pipelines import derive
+from nba_scraper.pipelines.derive import DerivePipeline, DerivePipelineResult
+from nba_scraper.transformers.schedule_travel import ScheduleTravelTransformer
+
+VENUES_CSV = """team_id,arena_name,arena_tz,lat,lon,altitude_m
+LAL,Crypto.com Arena,America/Los_Angeles,34.0430,-118.2675,89
+BOS,TD Garden,America/New_York,42.3662,-71.0621,5
+"""
+
+GAMES = ["0022300001", "0022300002"]
+
+
+def _pbp(game_id):
+    events = [
+        (1, EventType.JUMP_BALL, 0.0, "LAL"),
+        (2, EventType.SHOT_MADE, 20.0, "LAL"),
+        (3, EventType.SHOT_MISSED, 40.0, "BOS"),
+        (4, EventType.REBOUND, 42.0, "LAL"),
+        (5, EventType.FOUL, 60.0, "BOS"),
+        (6, EventType.FOUL, 80.0, "BOS"),
+        (7, EventType.TURNOVER, 100.0, "LAL"),
+    ]
+    return [
+        {
+            "game_id": game_id, "period": 1, "event_idx": idx, "seconds_elapsed": seconds,
+            "event_type": event_type.value, "team_tricode": team, "shot_made": event_type == EventType.SHOT_MADE,
+            "shot_value": 2, "player1_name_slug": f"{team.lower()}-1",
+        }
+        for idx, event_type, seconds, team in events
+    ]
+
+
+def _schedule():
+    return [
+        {
+            "game_id": game_id, "season": "2023-24", "game_date_utc": datetime(2024, 1, 10 + n, 3, 0, tzinfo=UTC),
+            "game_date_local": date(2024, 1, 10 + n), "arena_tz": "America/New_York",
+            "home_team_tricode": home, "away_team_tricode": away, "source": "test", "source_url": "u",
+        }
+        for n, (game_id, home, away) in enumerate([(GAMES[0], "LAL", "BOS"), (GAMES[1], "BOS", "LAL")])
+    ]
+
+
+def _connection():
+    async def fetch(query, *args):
+        if query is derive.SCHEDULE_QUERY:
+            return _schedule()
+        return [row for game_id in args[0] for row in _pbp(game_id)]
+
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=fetch)
+    return conn
+
+
+def _pooled(conn, released=None):
+    """Patch derive.pooled_connection to hand out ``conn``, counting releases."""
+    @asynccontextmanager
+    async def pooled_connection():
+        try:
+            yield conn
+        finally:
+            if released is not None:
+                released.append(conn)
+
+    return patch.object(derive, "pooled_connection", pooled_connection)
+
+
+def _pipeline():
+    with patch("builtins.open", mock_open(read_data=VENUES_CSV)):
+        travel = ScheduleTravelTransformer(venues_csv_path=Path("venues.csv"))
+    with patch.object(derive, "ScheduleTravelTransformer", return_value=travel):
+        pipeline = DerivePipeline()
+
+    pipeline.derived_loader = MagicMock()
+    for method in ("upsert_q1_windows", "upsert_early_shocks", "upsert_schedule_travel"):
+        setattr(pipeline.derived_loader, method, AsyncMock(side_effect=lambda rows: len(rows)))
+    pipeline._get_games_in_range = AsyncMock(return_value=[{"game_id": game_id} for game_id in GAMES])
+    pipeline._plan_derived_games = AsyncMock(side_effect=lambda analytic, games, force: (games, {}))
+    pipeline._record_derived_states = AsyncMock()
+    return pipeline
+
+
+def _result():
+    return DerivePipelineResult(date(2024, 1, 1), date(2024, 1, 31), [], [], {})
+
+
+class TestFusedDerive:
+    """Single-load, multi-analytic derive pass."""
+
+    @pytest.mark.asyncio
+    async def test_inputs_loaded_once_and_one_upsert_per_table(self):
+        pipeline, conn, result = _pipeline(), _connection(), _result()
+
+        with _pooled(conn):
+            await pipeline._derive_fused(
+                ["q1_window", "early_shocks", "schedule_travel"],
+                date(2024, 1, 1), date(2024, 1, 31), False, False, result,
+            )
+
+        # One schedule query and one PBP query for the whole batch
+        queries = [call.args[0] for call in conn.fetch.await_args_list]
+        assert queries == [derive.SCHEDULE_QUERY, derive.Q1_EVENTS_QUERY]
+        assert conn.fetch.await_args_list[1].args[1] == GAMES
+
+        loader = pipeline.derived_loader
+        loader.upsert_q1_windows.assert_awaited_once()
+        loader.upsert_early_shocks.assert_awaited_once()
+        loader.upsert_schedule_travel.assert_awaited_once()
+        assert [row.game_id for row in loader.upsert_q1_windows.await_args.args[0]] == GAMES
+
+        assert result.tables_processed == ["q1_window", "early_shocks", "schedule_travel"]
+        assert result.records_updated["q1_window_12_8"] == 2
+        assert result.records_updated["schedule_travel"] == 2  # both teams travel into the second game
+        assert set(result.cpu_seconds) == {"inputs", "q1_window", "early_shocks", "schedule_travel"}
+        assert pipeline._record_derived_states.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_window_only_query_when_early_shocks_not_requested(self):
+        pipeline, conn, result = _pipeline(), _connection(), _result()
+
+        with _pooled(conn):
+            await pipeline._derive_fused(["q1_window"], date(2024, 1, 1), date(2024, 1, 31), False, False, result)
+
+        assert [call.args[0] for call in conn.fetch.await_args_list] == [derive.Q1_WINDOW_EVENTS_QUERY]
+
+    @pytest.mark.asyncio
+    async def test_failing_analytic_does_not_block_the_others(self):
+        pipeline, conn, result = _pipeline(), _connection(), _result()
+        pipeline.early_shocks_transformer.transform_batch = MagicMock(side_effect=RuntimeError("boom"))
+
+        with _pooled(conn):
+            await pipeline._derive_fused(
+                ["q1_window", "early_shocks"], date(2024, 1, 1), date(2024, 1, 31), False, False, result,
+            )
+
+        pipeline.derived_loader.upsert_q1_windows.assert_awaited_once()
+        pipeline.derived_loader.upsert_early_shocks.assert_not_awaited()
+        states = {call.args[0]: call.args[2] for call in pipeline._record_derived_states.await_args_list}
+        assert states["q1_window"] == {}
+        assert states["early_shocks"] == {game_id: "boom" for game_id in GAMES}
+
+    @pytest.mark.asyncio
+    async def test_feature_store_refreshed_with_derived_games(self):
+        pipeline, conn = _pipeline(), _connection()
+        pipeline.feature_store = MagicMock()
+        pipeline._refresh_features = AsyncMock(return_value=4)
+        pipeline.early_shocks_transformer.transform_batch = MagicMock(side_effect=RuntimeError("boom"))
+
+        with _pooled(conn):
+            result = await pipeline.derive_all(
+                date(2024, 1, 1), date(2024, 1, 31), tables=["q1_window", "early_shocks"],
+                available_sources={"nba_stats"},
+            )
+
+        # Every game still got its Q1 window rows, so each is refreshed once
+        assert result.games_derived == set(GAMES)
+        pipeline._refresh_features.assert_awaited_once_with(GAMES)
+        assert result.records_updated["features"] == 4
+
+
+class TestDerivedState:
+    """Per-game derived state reads and writes give their connection back."""
+
+    @pytest.mark.asyncio
+    async def test_plan_and_record_release_connections(self):
+        pipeline, conn, released = _pipeline(), MagicMock(), []
+        # _pipeline() stubs these out; exercise the real ones
+        del pipeline._plan_derived_games, pipeline._record_derived_states
+        games = [{"game_id": game_id} for game_id in GAMES]
+
+        with _pooled(conn, released), \
+             patch.object(derive, "fetch_stage_states", AsyncMock(return_value={})), \
+             patch.object(derive, "save_stage_states", AsyncMock()) as save:
+            pending, _ = await pipeline._plan_derived_games("q1_window", games, force=False)
+            await pipeline._record_derived_states("q1_window", pending, {}, {})
+
+        assert pending == games
+        save.assert_awaited_once()
+        assert released == [conn, conn]
@@ -7,7 +7,8 @@ from unittest.mock import patch
 from nba_scraper.models.pbp_rows import PbpEventRow
 from nba_scraper.models.derived_rows import EarlyShockRow
 from nba_scraper.models.enums import EarlyShockType, EventType, FoulType
-from nba_scraper.transformers.early_shocks import EarlyShocksTransformer
+from nba_scraper.models.pbp_frame import PbpFrame
+from nba_scraper.transformers.early_shocks import EarlyShocksTransformer, Q1EventIndex
 
 
 class TestEarlyShocksTransformer:
@@ -530,4 +531,69 @@ class TestEarlyShocksTransformer:
         )
         
         result = transformer.transform([event], "http://test.com")
-        assert result == []
\ No newline at end of file
+        assert result == []
+
+
+class TestQ1EventIndex:
+    """Test the per-game Q1 lookup index."""
+
+    def _event(self, event_idx, event_type, player1=None, player2=None, team=None):
+        return PbpEventRow(
+            game_id="test_game",
+            event_idx=event_idx,
+            period=1,
+            seconds_elapsed=float(event_idx),
+            event_type=event_type,
+            team_tricode=team,
+            player1_name_slug=player1,
+            player2_name_slug=player2,
+            source="test",
+            source_url="https://test.com"
+        )
+
+    def _index(self, events):
+        frame = PbpFrame.from_rows(events)
+        return Q1EventIndex.build(frame), frame.players.lookup
+
+    def test_possessions_since_uses_prefix_counts(self):
+        events = [
+            self._event(1, EventType.FOUL, "A", team="LAL"),
+            self._event(2, EventType.SHOT_MADE, "B", team="LAL"),
+            self._event(3, EventType.TURNOVER, "C", team="BOS"),
+            self._event(4, EventType.FOUL, "A", team="LAL"),  # offensive foul
+            self._event(5, EventType.REBOUND, "D", team="BOS"),
+        ]
+        index, player = self._index(events)
+
+        assert index.possessions_since(1) == 3
+        assert index.possessions_since(4) == 1
+        assert index.possessions_since(5) == 0
+        assert index.possessions_since(99) == 0
+
+    def test_substitution_window_ends_at_second_possession_change(self):
+        events = [
+            self._event(1, EventType.FOUL, "A", team="LAL"),
+            self._event(2, EventType.SHOT_MADE, "B", team="LAL"),
+            self._event(3, EventType.SUBSTITUTION, "A", "E", team="LAL"),
+            self._event(4, EventType.TURNOVER, "C", team="BOS"),
+            self._event(5, EventType.SHOT_MISSED, "D", team="LAL"),
+            self._event(6, EventType.SUBSTITUTION, "B", "F", team="LAL"),
+        ]
+        index, player = self._index(events)
+
+        assert index.subbed_out_within_possession(1, player("A")) is True
+        assert index.subbed_out_within_possession(1, player("B")) is False  # after the second change
+        assert index.subbed_out_within_possession(4, player("B")) is True
+        assert index.subbed_out_within_possession(3, player("A")) is False  # only later subs count
+
+    def test_last_appearance_after(self):
+        events = [
+            self._event(1, EventType.FOUL, "A"),
+            self._event(2, EventType.SHOT_MADE, "B", "A"),
+            self._event(3, EventType.TURNOVER, "C"),
+        ]
+        index, player = self._index(events)
+
+        assert index.last_appearance_after(1, player("A")) == 2
+        assert index.last_appearance_after(2, player("A")) is None
+        assert index.last_appearance_after(1, player("Z")) is None
@@ -0,0 +1,191 @@
+"""Tests for the bulk table export tool."""
+
+import json
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from nba_scraper.tools import export_tables
+from nba_scraper.tools.export_tables import (
+    TABLE_COLUMNS_QUERY,
+    ExportError,
+    ExportFilter,
+    TableExporter,
+    read_npz_export,
+    resolve_format,
+)
+
+ATTRIBUTES = [
+    SimpleNamespace(name=name, type=SimpleNamespace(name=pg_type))
+    for name, pg_type in [("game_id", "text"), ("event_idx", "int4"), ("shot_distance", "numeric"),
+                          ("is_home", "bool"), ("game_date", "date"), ("ingested_at_utc", "timestamptz")]
+]
+
+
+def _event(game_id, idx, distance=None):
+    return (game_id, idx, None if distance is None else Decimal(distance), idx % 2 == 0,
+            date(2023, 10, 24), datetime(2023, 10, 25, 3, idx % 60, tzinfo=UTC))
+
+
+class FakeConnection:
+    """Connection whose statements stream ``rows_by_args[args]`` through a cursor."""
+
+    def __init__(self, rows_by_args, columns=("game_id", "event_idx"), seasons=("2022-23", "2023-24")):
+        self.rows_by_args = rows_by_args
+        self.columns, self.seasons = columns, seasons
+        self.fetchval = AsyncMock(return_value=() in rows_by_args)  # rows outside any season
+        self.fetch_sizes = []
+        self.prepared = []
+        self.transaction = MagicMock(return_value=AsyncMock())
+
+    async def fetch(self, sql, *args):
+        if sql == TABLE_COLUMNS_QUERY:
+            return [{"column_name": c} for c in self.columns]
+        return [{"season": s} for s in self.seasons]
+
+    async def prepare(self, sql):
+        self.prepared.append(sql)
+        connection = self
+
+        class Statement:
+            def get_attributes(self):
+                return ATTRIBUTES
+
+            async def cursor(self, *args):
+                rows = list(connection.rows_by_args[args])
+
+                async def fetch(n):
+                    connection.fetch_sizes.append(n)
+                    chunk, rows[:] = rows[:n], rows[n:]
+                    return chunk
+
+                return SimpleNamespace(fetch=fetch)
+
+        return Statement()
+
+
+def _pool(conn):
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    return SimpleNamespace(acquire=acquire)
+
+
+@pytest.fixture
+def npz_only():
+    with patch.object(export_tables, "resolve_format", return_value="npz"):
+        yield
+
+
+class TestExportFilter:
+    """WHERE clauses over games."""
+
+    def test_binds_each_filter_in_order(self):
+        filters = ExportFilter(seasons=("2023-24",), start_date=date(2023, 11, 1), team="bos")
+
+        assert filters.games_where() == (
+            "g.season = ANY($1::text[]) AND g.game_date_local >= $2 "
+            "AND (g.home_team_tricode = $3 OR g.away_team_tricode = $3)",
+            [["2023-24"], date(2023, 11, 1), "BOS"],
+        )
+        assert filters.games_where("2023-24")[0].startswith("g.season = $1 AND")
+        assert ExportFilter().games_where() == ("TRUE", []) and not ExportFilter()
+
+    def test_parquet_without_pyarrow_is_an_error(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            with pytest.raises(ExportError, match="pyarrow"):
+                resolve_format("parquet")
+            assert resolve_format("auto") == "npz"
+        with pytest.raises(ExportError):
+            resolve_format("csv")
+
+
+class TestTableExporter:
+    """Streaming, partitioning and the manifest."""
+
+    @pytest.mark.asyncio
+    async def test_streams_each_season_in_chunks_to_npz(self, tmp_path, npz_only):
+        rows = {
+            ("2022-23",): [_event("0022200001", i, "12.5" if i % 3 else None) for i in range(5)],
+            ("2023-24",): [_event("0022300001", i, "3") for i in range(2)],
+        }
+        conn = FakeConnection(rows)
+        exporter = TableExporter(tmp_path, fmt="npz", chunk_rows=2, workers=2)
+
+        with patch.object(export_tables, "get_performance_pool", AsyncMock(return_value=_pool(conn))):
+            result = await exporter.export_table("pbp_events", ExportFilter(seasons=("2022-23", "2023-24")))
+
+        assert result.rows == 7 and [f.season for f in result.files] == ["2022-23", "2023-24"]
+        assert set(conn.fetch_sizes) == {2}  # never more than one chunk in memory
+        assert all("WHERE t.game_id IN (SELECT g.game_id FROM games g WHERE g.season = $1)" in sql
+                   for sql in conn.prepared)
+        conn.transaction.assert_called_with(isolation="repeatable_read", readonly=True)
+
+        path = tmp_path / "pbp_events" / "season=2022-23" / "pbp_events.npz"
+        columns = read_npz_export(path)
+        assert columns["event_idx"].tolist() == [0, 1, 2, 3, 4]
+        assert columns["shot_distance"].tolist() == [None, 12.5, 12.5, None, 12.5]
+        assert columns["game_date"].dtype == np.dtype("datetime64[D]")
+        assert columns["ingested_at_utc"][0] == np.datetime64("2023-10-25T03:00")
+
+        manifest = json.loads((tmp_path / "pbp_events" / "_manifest.json").read_text())
+        first = manifest["files"][0]
+        assert (manifest["rows"], first["rows"], len(first["row_groups"])) == (7, 5, 3)
+        assert first["row_groups"][0]["event_idx"] == {"min": 0, "max": 1, "null_count": 0}
+        assert first["row_groups"][0]["shot_distance"]["null_count"] == 1
+        assert first["row_groups"][0]["game_id"]["min"] == "0022200001"
+
+    @pytest.mark.asyncio
+    async def test_rows_without_a_season_are_exported_as_unknown(self, tmp_path, npz_only):
+        rows = {("2023-24",): [_event("0022300001", 0)], (): [_event("bogus", 0), _event("bogus", 1)]}
+        conn = FakeConnection(rows, seasons=("2023-24", None, "unknown"))
+
+        with patch.object(export_tables, "get_performance_pool", AsyncMock(return_value=_pool(conn))):
+            result = await TableExporter(tmp_path, fmt="npz").export_table("pbp_events")
+
+        assert [(f.season, f.rows) for f in result.files] == [("2023-24", 1), ("unknown", 2)]
+        assert "WHERE NOT EXISTS (SELECT 1 FROM games g WHERE g.game_id = t.game_id" in conn.prepared[-1]
+        assert (tmp_path / "pbp_events" / "season=unknown" / "pbp_events.npz").exists()
+
+    @pytest.mark.asyncio
+    async def test_failed_partition_leaves_no_file(self, tmp_path, npz_only):
+        conn = FakeConnection({("2023-24",): [_event("0022300001", 0)]}, seasons=("2023-24",))
+
+        with patch.object(export_tables, "get_performance_pool", AsyncMock(return_value=_pool(conn))), \
+             patch.object(export_tables._NpzSink, "_write", side_effect=ConnectionError("lost")):
+            with pytest.raises(ConnectionError):
+                await TableExporter(tmp_path, fmt="npz").export_table("pbp_events")
+
+        assert not list((tmp_path / "pbp_events").rglob("*.npz*"))
+
+    @pytest.mark.asyncio
+    async def test_filters_need_a_game_id_column(self, tmp_path, npz_only):
+        conn = FakeConnection({}, columns=("season", "team_tricode"))
+
+        with patch.object(export_tables, "get_performance_pool", AsyncMock(return_value=_pool(conn))):
+            with pytest.raises(ExportError, match="game_id"):
+                await TableExporter(tmp_path).export_table("team_season_summary", ExportFilter(team="LAL"))
+            conn.columns = ()
+            with pytest.raises(ExportError, match="does not exist"):
+                await TableExporter(tmp_path).export_table("nope")
+
+    @pytest.mark.asyncio
+    async def test_parquet_row_groups_follow_chunks(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        conn = FakeConnection({(): [_event("0022300001", i, "1.5") for i in range(5)]})
+
+        with patch.object(export_tables, "get_performance_pool", AsyncMock(return_value=_pool(conn))):
+            result = await TableExporter(tmp_path, fmt="parquet", chunk_rows=2).export_query(
+                "events", "SELECT * FROM pbp_events")
+
+        metadata = pq.ParquetFile(result.files[0].path).metadata
+        assert metadata.num_row_groups == 3 and metadata.num_rows == 5
+        assert metadata.row_group(0).column(1).statistics.max == 1
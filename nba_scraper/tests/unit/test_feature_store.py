@@ -0,0 +1,163 @@
+"""Tests for the per-(game, team) feature store."""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from nba_scraper.features import (
+    FEATURE_COLUMNS,
+    FEATURE_NAMES,
+    FeatureMatrix,
+    FeatureStore,
+    FeatureStoreError,
+    read_features,
+)
+from nba_scraper.features.columns import FEATURE_ROWS_QUERY, ROLE_LABEL
+from nba_scraper.features.store import ALIGNMENT
+from nba_scraper.pipelines import derive
+from nba_scraper.pipelines.derive import DerivePipeline
+
+
+def _rows(game_id, season, game_date, home="LAL", away="BOS", value=1.0):
+    rows = []
+    for is_home in (True, False):
+        row = {
+            "game_id": game_id, "season": season, "game_date": game_date, "is_home": is_home,
+            "team_tricode": home if is_home else away, "opponent_tricode": away if is_home else home,
+        }
+        row.update({name: value + i for i, name in enumerate(FEATURE_NAMES)})
+        row["q1_pace48_expected"] = None
+        row["label_win"] = is_home
+        rows.append(row)
+    return rows
+
+
+def _season(season, year, games=3):
+    return [row for n in range(games)
+            for row in _rows(f"00{year % 100}{n:06d}", season, date(year, 11, 1 + n))]
+
+
+class TestFeatureColumns:
+    """Column layout and the rows query."""
+
+    def test_labels_follow_features_and_every_column_is_selected(self):
+        roles = [column.role for column in FEATURE_COLUMNS]
+        assert roles == sorted(roles, key=lambda role: role == ROLE_LABEL)
+        assert len(set(FEATURE_NAMES)) == len(FEATURE_NAMES)
+        for name in FEATURE_NAMES:
+            assert f" AS {name}," in FEATURE_ROWS_QUERY or f" AS {name}\n" in FEATURE_ROWS_QUERY
+        assert "opp_travel_days_rest" in FEATURE_NAMES and "opp_q1_efg_actual" in FEATURE_NAMES
+
+
+class TestFeatureStore:
+    """File layout, zero-copy loads and incremental updates."""
+
+    def test_round_trip_maps_aligned_arrays(self, tmp_path):
+        store = FeatureStore(tmp_path / "features.nbaf")
+        store.update(FeatureMatrix.from_rows(_season("2023-24", 2023)))
+
+        matrix, header = read_features(store.path)
+
+        assert header["rows"] == len(matrix) == 6
+        assert header["seasons"] == {"2023-24": [0, 6]}
+        assert all(entry["offset"] % ALIGNMENT == 0 for entry in header["arrays"])
+        assert not matrix.values.flags.owndata and not matrix.values.flags.writeable  # read-only mapping
+        assert matrix.columns == FEATURE_NAMES
+        assert np.isnan(matrix.column("q1_pace48_expected")).all()
+        assert matrix.column("label_win").tolist() == [0.0, 1.0] * 3  # BOS sorts before LAL
+        assert matrix.keys["game_date"][0] == np.datetime64("2023-11-01")
+        assert matrix.features.shape[1] + matrix.labels.shape[1] == len(FEATURE_NAMES)
+
+    def test_update_replaces_games_and_keeps_seasons_contiguous(self, tmp_path):
+        store = FeatureStore(tmp_path / "features.nbaf")
+        store.update(FeatureMatrix.from_rows(_season("2023-24", 2023)))
+        store.update(FeatureMatrix.from_rows(_season("2022-23", 2022) + _season("2024-25", 2024)))
+
+        corrected = FeatureMatrix.from_rows(_rows("0023000001", "2023-24", date(2023, 11, 2), value=50.0))
+        store.update(corrected, game_ids=["0023000001", "0023000002"])  # the second game was removed
+
+        matrix = store.load()
+        assert matrix.keys["season"].tolist() == [b"2022-23"] * 6 + [b"2023-24"] * 4 + [b"2024-25"] * 6
+        assert (matrix.keys["game_date"][1:] >= matrix.keys["game_date"][:-1]).all()
+        assert matrix.column("q1_possessions")[matrix.keys["game_id"] == b"0023000001"].tolist() == [50.0, 50.0]
+        assert b"0023000002" not in matrix.keys["game_id"]
+
+        recent = store.load(["2023-24", "2024-25"])
+        assert len(recent) == 10 and not recent.values.flags.owndata  # one slice of the mapping
+        gapped = store.load(["2022-23", "2024-25"])
+        assert set(gapped.keys["season"].tolist()) == {b"2022-23", b"2024-25"}
+        assert len(store.load(["1999-00"])) == 0
+
+    def test_recomputed_games_replace_the_file_under_open_readers(self, tmp_path):
+        store = FeatureStore(tmp_path / "features.nbaf")
+        store.update(FeatureMatrix.from_rows(_season("2023-24", 2023)))
+        inode = store.path.stat().st_ino
+        _, before = read_features(store.path)
+        reader = store.load()
+
+        # Same keys, new values: still a new file renamed over the old one
+        store.update(FeatureMatrix.from_rows(_rows("0023000001", "2023-24", date(2023, 11, 2), value=50.0)))
+        matrix, header = read_features(store.path)
+        assert store.path.stat().st_ino != inode
+        assert header["written_at"] > before["written_at"]
+        assert matrix.column("q1_possessions").tolist() == [1.0, 1.0, 50.0, 50.0, 1.0, 1.0]
+        # A reader mapping the old file keeps its consistent copy
+        assert reader.column("q1_possessions").tolist() == [1.0] * 6
+
+    def test_concurrent_writers_keep_every_game(self, tmp_path):
+        store = FeatureStore(tmp_path / "features.nbaf")
+        batches = [FeatureMatrix.from_rows(_season(f"{year}-{(year + 1) % 100:02d}", year, games=2))
+                   for year in range(2010, 2022)]
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(store.update, batches))
+
+        assert len(store.load()) == 4 * len(batches)
+
+    def test_schema_change_drops_stored_rows(self, tmp_path):
+        store = FeatureStore(tmp_path / "features.nbaf")
+        store.update(FeatureMatrix.from_rows(_season("2023-24", 2023)))
+
+        narrow = FeatureMatrix.from_rows(_season("2022-23", 2022, games=1), FEATURE_COLUMNS[:3])
+        narrow.schema_hash = "other"
+        store.update(narrow)
+
+        matrix, header = read_features(store.path)
+        assert len(matrix) == 2 and matrix.columns == FEATURE_NAMES[:3]
+        assert header["schema_hash"] == "other"
+
+    def test_rejects_foreign_files(self, tmp_path):
+        path = tmp_path / "features.nbaf"
+        path.write_bytes(b"PAR1" + json.dumps({}).encode())
+
+        with pytest.raises(FeatureStoreError):
+            FeatureStore(path).load()
+
+
+class TestDeriveRefresh:
+    """DerivePipeline writes the games it derived."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_features_writes_rows_from_the_derived_tables(self, tmp_path):
+        store = FeatureStore(tmp_path / "features.nbaf")
+        games = ["0023000001", "0023000002"]
+        conn = MagicMock()
+        conn.fetch = AsyncMock(return_value=_rows(games[0], "2023-24", date(2023, 11, 1)))
+
+        with patch.object(derive, "ScheduleTravelTransformer"):
+            pipeline = DerivePipeline(feature_store=store)
+        @asynccontextmanager
+        async def pooled_connection():
+            yield conn
+
+        with patch.object(derive, "pooled_connection", pooled_connection):
+            written = await pipeline._refresh_features(games)
+
+        conn.fetch.assert_awaited_once_with(FEATURE_ROWS_QUERY, games)
+        assert written == 2
+        assert store.load().keys["game_id"].tolist() == [games[0].encode()] * 2
@@ -0,0 +1,84 @@
+"""Unit tests for per-game ingestion state."""
+from sqlalchemy import create_engine
+
+from nba_scraper.state.game_state import (
+    GameStageState,
+    STATUS_FAILED,
+    ensure_game_state_table,
+    fingerprint,
+    games_needing_work,
+    get_stage_states,
+    record_stage_states,
+    stage_needs_work,
+)
+
+
+def _engine():
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        ensure_game_state_table(conn)
+    return engine
+
+
+def test_record_and_get_roundtrip():
+    """Test that recorded states are returned per game for the requested stage."""
+    engine = _engine()
+    with engine.begin() as conn:
+        record_stage_states(conn, [
+            GameStageState(game_id="g1", stage="bronze", input_sha1="abc", version="1"),
+            GameStageState(game_id="g2", stage="bronze", status=STATUS_FAILED, last_error="boom"),
+            GameStageState(game_id="g1", stage="silver", version="1"),
+        ])
+        states = get_stage_states(conn, stage="bronze", game_ids=["g1", "g2", "g3"])
+    
+    assert set(states) == {"g1", "g2"}
+    assert states["g1"].input_sha1 == "abc" and states["g1"].ok
+    assert states["g2"].last_error == "boom" and not states["g2"].ok
+
+
+def test_record_overwrites_existing_state():
+    """Test that re-recording a (game, stage) pair replaces the previous outcome."""
+    engine = _engine()
+    with engine.begin() as conn:
+        record_stage_states(conn, [GameStageState(game_id="g1", stage="silver", status=STATUS_FAILED, last_error="x")])
+        record_stage_states(conn, [GameStageState(game_id="g1", stage="silver", version="2")])
+        state = get_stage_states(conn, stage="silver", game_ids=["g1"])["g1"]
+    
+    assert state.ok
+    assert state.version == "2"
+    assert state.last_error is None
+
+
+def test_stage_needs_work():
+    """Test re-run decisions from status, fingerprint and version."""
+    state = GameStageState(game_id="g1", stage="silver", input_sha1="abc", version="1")
+    
+    assert stage_needs_work(None)
+    assert not stage_needs_work(state)
+    assert not stage_needs_work(state, input_sha1="abc", version="1")
+    assert stage_needs_work(state, input_sha1="def")
+    assert stage_needs_work(state, version="2")
+    assert stage_needs_work(GameStageState(game_id="g1", stage="silver", status=STATUS_FAILED))
+
+
+def test_games_needing_work_keeps_order():
+    """Test filtering a game list down to the games whose inputs changed."""
+    engine = _engine()
+    with engine.begin() as conn:
+        record_stage_states(conn, [
+            GameStageState(game_id="g1", stage="silver", input_sha1="a", version="1"),
+            GameStageState(game_id="g2", stage="silver", input_sha1="b", version="1"),
+        ])
+        pending = games_needing_work(
+            conn, stage="silver", game_ids=["g3", "g2", "g1"],
+            version="1", input_sha1s={"g1": "a", "g2": "changed"},
+        )
+    
+    assert pending == ["g3", "g2"]
+
+
+def test_fingerprint_is_stable():
+    """Test that fingerprints depend on every part, including missing ones."""
+    assert fingerprint("abc", "1") == fingerprint("abc", "1")
+    assert fingerprint("abc", "1") != fingerprint("abc", "2")
+    assert fingerprint(None, "1") != fingerprint("None", "1")
@@ -0,0 +1,226 @@
+"""Tests for season partitioning of the event tables."""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from nba_scraper.loaders import partitions
+from nba_scraper.loaders.partitions import (
+    UNKNOWN_SEASON,
+    detach_season,
+    ensure_partition,
+    partition_name,
+    restore_season,
+    season_for_row,
+)
+from nba_scraper.loaders.pbp import PBP_EVENTS_SPEC
+from nba_scraper.loaders.upsert import Column, TableSpec, upsert_rows
+from nba_scraper.tools import rollback_game
+
+_SPEC = TableSpec(
+    table="sample_events",
+    columns=(
+        Column("game_id", "text"),
+        Column("event_num", "int8"),
+        Column("season", "text", getter=season_for_row),
+    ),
+    conflict_keys=("game_id", "event_num", "season"),
+    partition_key="season",
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_partition_cache():
+    partitions._ensured.clear()
+    yield
+    partitions._ensured.clear()
+
+
+def _mock_conn(bounds=None) -> MagicMock:
+    """Connection whose catalog lists ``bounds``: partition -> bound, parent inferred from the name."""
+    conn = MagicMock()
+    conn.statement = MagicMock()
+    conn.statement.fetchrow = AsyncMock(return_value={"inserted": 1, "updated": 0})
+    conn.prepare = AsyncMock(return_value=conn.statement)
+    conn.execute = AsyncMock(return_value="DELETE 0")
+    conn.fetchval = AsyncMock(return_value=0)
+
+    async def fetch(sql, table):
+        return [{"partition": name, "bound": bound}
+                for name, bound in (bounds or {}).items() if name.startswith(f"{table}_")]
+
+    conn.fetch = AsyncMock(side_effect=fetch)
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    return conn
+
+
+def _pool(conn):
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    return SimpleNamespace(acquire=acquire)
+
+
+def _executed(conn) -> list:
+    return [call.args[0] for call in conn.execute.call_args_list]
+
+
+class TestPartitionKeys:
+    """Season derivation and partition naming."""
+
+    def test_season_from_row_or_game_id(self):
+        assert season_for_row({"game_id": "0022300001"}) == "2023-24"
+        assert season_for_row({"game_id": "0022300001", "season": "2022-23"}) == "2022-23"
+        assert season_for_row({"game_id": "bogus"}) == UNKNOWN_SEASON
+
+    def test_partition_name(self):
+        assert partition_name("pbp_events", "2023-24") == "pbp_events_2023_24"
+        with pytest.raises(ValueError):
+            partition_name("pbp_events", "2023'; DROP TABLE games; --")
+
+    def test_event_specs_are_partitioned(self):
+        assert PBP_EVENTS_SPEC.partition_key == "season"
+        assert PBP_EVENTS_SPEC.conflict_keys[-1] == "season"
+
+
+class TestPartitionRouting:
+    """Loaders write each season's rows straight into its partition."""
+
+    @pytest.mark.asyncio
+    async def test_rows_split_by_season(self):
+        conn = _mock_conn()
+        rows = [{"game_id": "0022300001", "event_num": 1}, {"game_id": "0022200001", "event_num": 1},
+                {"game_id": "0022300002", "event_num": 2}, {"game_id": "bogus", "event_num": 3}]
+
+        result = await upsert_rows(conn, _SPEC, rows, strategy="unnest")
+
+        assert result.submitted == 4
+        prepared = [call.args[0] for call in conn.prepare.call_args_list]
+        assert [sql.split("INSERT INTO ")[1].split()[0] for sql in prepared] == [
+            "sample_events_2022_23", "sample_events_2023_24", "sample_events"]
+        # Both 2023-24 rows share one statement
+        assert conn.statement.fetchrow.call_args_list[1].args[0] == ["0022300001", "0022300002"]
+
+    @pytest.mark.asyncio
+    async def test_partition_created_once_per_process(self):
+        conn = _mock_conn()
+        rows = [{"game_id": "0022300001", "event_num": 1}]
+
+        await upsert_rows(conn, _SPEC, rows, strategy="unnest")
+        await upsert_rows(conn, _SPEC, rows, strategy="unnest")
+
+        creates = [sql for sql in _executed(conn) if sql.startswith("CREATE TABLE")]
+        assert creates == [
+            "CREATE TABLE IF NOT EXISTS sample_events_2023_24 "
+            "PARTITION OF sample_events FOR VALUES IN ('2023-24')"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_concurrently_created_partition_is_fine(self):
+        import asyncpg
+
+        conn = _mock_conn()
+        conn.execute.side_effect = asyncpg.exceptions.DuplicateTableError("exists")
+
+        assert await ensure_partition(conn, "pbp_events", "2023-24") == "pbp_events_2023_24"
+
+
+    @pytest.mark.asyncio
+    async def test_rows_in_the_default_partition_move_into_the_new_one(self):
+        import asyncpg
+
+        conn = _mock_conn({"pbp_events_default": "DEFAULT"})
+        conn.execute.side_effect = [asyncpg.exceptions.CheckViolationError("default partition"),
+                                    "CREATE TABLE", "INSERT 0 12", "ALTER TABLE"]
+
+        assert await ensure_partition(conn, "pbp_events", "2023-24") == "pbp_events_2023_24"
+        assert _executed(conn)[1:] == [
+            "CREATE TABLE pbp_events_2023_24 (LIKE pbp_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+            "WITH moved AS (DELETE FROM pbp_events_default WHERE season = $1 RETURNING *) "
+            "INSERT INTO pbp_events_2023_24 SELECT * FROM moved",
+            "ALTER TABLE pbp_events ATTACH PARTITION pbp_events_2023_24 FOR VALUES IN ('2023-24')",
+        ]
+        assert ("pbp_events", "2023-24") in partitions._ensured
+
+    @pytest.mark.asyncio
+    async def test_write_to_a_vanished_partition_clears_the_cache(self):
+        import asyncpg
+
+        conn = _mock_conn()
+        rows = [{"game_id": "0022300001", "event_num": 1}]
+        await upsert_rows(conn, _SPEC, rows, strategy="unnest")
+        conn.statement.fetchrow.side_effect = asyncpg.exceptions.UndefinedTableError("relation does not exist")
+
+        with pytest.raises(asyncpg.exceptions.UndefinedTableError):
+            await upsert_rows(conn, _SPEC, rows, strategy="unnest")
+        assert not partitions._ensured
+
+
+class TestSeasonRebuild:
+    """Detach, restore and rollback of whole seasons."""
+
+    @pytest.mark.asyncio
+    async def test_detach_then_restore(self):
+        conn = _mock_conn({"pbp_events_2023_24": "FOR VALUES IN ('2023-24')", "pbp_events_default": "DEFAULT"})
+
+        with patch.object(partitions, "datetime") as clock:
+            clock.now.return_value.strftime.return_value = "20261018120000"
+            backups = await detach_season(conn, "2023-24", tables=("pbp_events",))
+
+        assert backups == {"pbp_events": "pbp_events_2023_24_detached_20261018120000"}
+        assert _executed(conn) == [
+            "ALTER TABLE pbp_events DETACH PARTITION pbp_events_2023_24",
+            "ALTER TABLE pbp_events_2023_24 RENAME TO pbp_events_2023_24_detached_20261018120000",
+        ]
+
+        conn.execute.reset_mock()
+        await restore_season(conn, "2023-24", backups)
+        assert _executed(conn) == [
+            "ALTER TABLE pbp_events DETACH PARTITION pbp_events_2023_24",
+            "DROP TABLE pbp_events_2023_24",
+            "ALTER TABLE pbp_events_2023_24_detached_20261018120000 RENAME TO pbp_events_2023_24",
+            "ALTER TABLE pbp_events ATTACH PARTITION pbp_events_2023_24 FOR VALUES IN ('2023-24')",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_game_rollback_names_the_partition(self, tmp_path):
+        conn = _mock_conn()
+        conn.fetchval.return_value = 3
+
+        async def fetch(sql, args):
+            if "to_regclass" in sql:
+                return [{"table_name": table} for table in ("pbp_events", "shot_events", "games")]
+            return [{"season": "2023-24"}] if sql.startswith("SELECT season FROM pbp_events") else []
+
+        conn.fetch.side_effect = fetch
+        with patch.object(rollback_game, "get_performance_pool", AsyncMock(return_value=_pool(conn))):
+            result = await rollback_game.GameRollbackTool(ops_dir=str(tmp_path)).rollback_game("0022300001")
+
+        assert result["success"], result["error"]
+        event_deletes = [call.args for call in conn.fetchval.call_args_list
+                         if call.args[0].startswith("WITH deleted") and "_events" in call.args[0]]
+        assert event_deletes == [
+            ("WITH deleted AS (DELETE FROM pbp_events WHERE game_id = ANY($1::text[]) "
+             "AND season = ANY($2::text[]) RETURNING 1) SELECT COUNT(*) FROM deleted",
+             ["0022300001"], ["2023-24"]),
+            ("WITH deleted AS (DELETE FROM shot_events WHERE game_id = ANY($1::text[]) "
+             "AND season = ANY($2::text[]) RETURNING 1) SELECT COUNT(*) FROM deleted",
+             ["0022300001"], ["2023-24"]),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_season_rollback_truncates_partitions(self, tmp_path):
+        partitions._ensured.update({("pbp_events", "2023-24"), ("shot_events", "2023-24")})
+        conn = _mock_conn({"pbp_events_2023_24": "FOR VALUES IN ('2023-24')",
+                           "shot_events_2023_24": "FOR VALUES IN ('2023-24')"})
+        with patch.object(rollback_game, "get_performance_pool", AsyncMock(return_value=_pool(conn))):
+            result = await rollback_game.GameRollbackTool(ops_dir=str(tmp_path)).rollback_season("2023-24")
+
+        assert result["success"], result["error"]
+        assert result["partitions"] == ["pbp_events_2023_24", "shot_events_2023_24"]
+        assert not partitions._ensured
+        assert _executed(conn)[:2] == ["TRUNCATE pbp_events_2023_24", "TRUNCATE shot_events_2023_24"]
+        assert _executed(conn)[-1] == "DELETE FROM games WHERE season = $1"
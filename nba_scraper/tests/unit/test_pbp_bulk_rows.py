@@ -0,0 +1,88 @@
+"""Tests for bulk PbpEventRow construction from a PlayByPlay resultSet."""
+
+import pytest
+
+from nba_scraper.models.enums import EventType, ShotType
+from nba_scraper.models.pbp_rows import PbpEventRow
+
+HEADERS = [
+    "GAME_ID", "EVENTNUM", "EVENTMSGTYPE", "EVENTMSGACTIONTYPE", "PERIOD", "PCTIMESTRING",
+    "HOMEDESCRIPTION", "VISITORDESCRIPTION", "SCORE", "PLAYER1_ID", "PLAYER1_NAME",
+    "PLAYER2_ID", "PLAYER2_NAME",
+]
+
+ROWS = [
+    ["0022300001", 1, 12, 0, 1, "12:00", None, None, None, 0, None, 0, None],
+    ["0022300001", 2, 1, 1, 1, "11:40", "James 25' 3PT Jump Shot", None, "3 - 0", 2544, "LeBron James", 0, None],
+    ["0022300001", 3, 2, 1, 1, "11:21.5", None, "MISS Tatum Layup", None, 1628369, "Jayson Tatum", 0, None],
+    ["0022300001", 4, 4, 0, 1, "11:20", None, None, None, 2544, "LeBron James", 0, None],
+    ["0022300001", 5, 3, 10, 1, "0:03", "James Free Throw 1 of 1", None, "4 - 0", 2544, "LeBron James", 0, None],
+    ["0022300001", 6, 8, 0, 2, "12:00", None, "SUB: Brown FOR Tatum", None, 1628369, "Jayson Tatum",
+     1627759, "Jaylen Brown"],
+]
+
+
+def _result_set(rows=ROWS, headers=HEADERS):
+    return {"name": "PlayByPlay", "headers": headers, "rowSet": rows}
+
+
+def _validated(rows=ROWS, headers=HEADERS):
+    return [PbpEventRow.from_nba_stats("0022300001", dict(zip(headers, row)), "url") for row in rows]
+
+
+class TestBulkFromNbaStats:
+    """Trusted bulk path vs per-row validation."""
+
+    def test_matches_validated_rows(self):
+        rows = PbpEventRow.bulk_from_nba_stats("0022300001", _result_set(), "url")
+        assert rows == _validated()
+
+    def test_stringified_payload_matches(self):
+        stringified = [[str(v) if isinstance(v, int) else v for v in row] for row in ROWS]
+        rows = PbpEventRow.bulk_from_nba_stats("0022300001", _result_set(stringified), "url")
+        assert rows == _validated(stringified)
+
+    def test_derived_fields(self):
+        rows = PbpEventRow.bulk_from_nba_stats("0022300001", _result_set(), "url")
+
+        shot = rows[1]
+        assert shot.event_type == EventType.SHOT_MADE
+        assert shot.shot_type == ShotType.THREE_POINT
+        assert (shot.score_home, shot.score_away) == (3, 0)
+        assert shot.clock_ms_remaining == 700_000
+        assert shot.seconds_elapsed == 20.0
+        assert rows[2].clock_ms_remaining == 681_500
+        assert rows[5].player2_display_name == "Jaylen Brown"
+
+    def test_strict_mode_validates_every_row(self):
+        rows = PbpEventRow.bulk_from_nba_stats("0022300001", _result_set(), "url", strict=True)
+        assert rows == _validated()
+
+    def test_schema_mismatch_uses_strict_path(self):
+        headers = [h for h in HEADERS if h != "EVENTNUM"]
+        trimmed = [row[:1] + row[2:] for row in ROWS]
+
+        rows = PbpEventRow.bulk_from_nba_stats("0022300001", _result_set(trimmed, headers), "url")
+
+        assert rows == _validated(trimmed, headers)
+        assert {row.event_idx for row in rows} == {0}
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        rows = list(ROWS)
+        rows[3] = rows[3][:4] + ["not-a-period"] + rows[3][5:]
+        errors = []
+
+        built = PbpEventRow.bulk_from_nba_stats(
+            "0022300001", _result_set(rows), "url", on_error=lambda idx, e: errors.append(idx)
+        )
+
+        assert errors == [3]
+        assert [row.event_idx for row in built] == [1, 2, 3, 5, 6]
+
+    def test_bad_rows_raise_without_handler(self):
+        rows = [ROWS[0][:4] + [None] + ROWS[0][5:]]
+        with pytest.raises(TypeError):
+            PbpEventRow.bulk_from_nba_stats("0022300001", _result_set(rows), "url")
+
+    def test_empty_result_set(self):
+        assert PbpEventRow.bulk_from_nba_stats("0022300001", {"headers": HEADERS, "rowSet": []}, "url") == []
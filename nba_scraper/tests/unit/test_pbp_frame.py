@@ -0,0 +1,162 @@
+"""Tests for the columnar PbpFrame."""
+
+import numpy as np
+import pytest
+
+from nba_scraper.models.enums import EventType
+from nba_scraper.models.pbp_frame import (
+    DESC_FLAGRANT,
+    DESC_FLAGRANT_1,
+    DESC_INJURY,
+    DESC_OFFENSIVE,
+    PbpFrame,
+    description_flags,
+)
+from nba_scraper.models.pbp_rows import PbpEventRow
+from nba_scraper.transformers.pbp_windows import Q1WindowBuilder
+from nba_scraper.transformers.q1_window import Q1WindowTransformer
+
+
+def _event(event_idx, event_type=EventType.SHOT_MADE, *, game_id="0022300001", period=1,
+           clock="11:00", team="LAL", player="LeBron James", description=None, **kwargs):
+    return PbpEventRow(
+        game_id=game_id,
+        period=period,
+        event_idx=event_idx,
+        time_remaining=clock,
+        event_type=event_type,
+        team_tricode=team,
+        player1_name_slug=player,
+        description=description,
+        source="test",
+        source_url="https://test.com",
+        **kwargs,
+    )
+
+
+class TestFromRows:
+    """Row-to-column conversion."""
+
+    def test_columns_and_interned_strings(self):
+        frame = PbpFrame.from_rows([
+            _event(1, shot_made=True, shot_value=3),
+            _event(2, EventType.FOUL, team="BOS", player=None, clock="10:30"),
+        ])
+
+        assert len(frame) == 2
+        assert frame.event_idx.tolist() == [1, 2]
+        assert frame.clock_ms.tolist() == [660_000, 630_000]
+        assert frame.seconds_elapsed.tolist() == [60.0, 90.0]
+        assert frame.event_type_at(1) == EventType.FOUL
+        assert [frame.team_at(0), frame.team_at(1)] == ["LAL", "BOS"]
+        assert frame.player_at(0) == "LebronJames"
+        assert frame.player_at(1) is None
+        assert frame.shot_made.tolist() == [1, -1]
+        assert frame.shot_value.tolist() == [3, 0]
+
+    def test_missing_clock_is_marked(self):
+        frame = PbpFrame.from_rows([_event(1, clock=None)])
+        assert frame.clock_ms.tolist() == [-1]
+        assert frame.seconds_at(0) is None
+
+    def test_empty(self):
+        assert len(PbpFrame.from_rows([])) == 0
+
+
+class TestDescriptionFlags:
+    """Keyword flags replace free-text descriptions."""
+
+    @pytest.mark.parametrize("description,flag", [
+        ("Flagrant 1 foul", DESC_FLAGRANT | DESC_FLAGRANT_1),
+        ("Player injury timeout", DESC_INJURY),
+        ("Offensive rebound", DESC_OFFENSIVE),
+    ])
+    def test_keywords(self, description, flag):
+        assert description_flags(description) & flag == flag
+
+    def test_no_description(self):
+        assert description_flags(None) == 0
+
+
+class TestFromResultSet:
+    """Direct construction from a PlayByPlayV2 resultSet."""
+
+    def test_matches_row_fields(self):
+        result_set = {
+            "headers": ["GAME_ID", "EVENTNUM", "EVENTMSGTYPE", "PERIOD", "PCTIMESTRING",
+                        "HOMEDESCRIPTION", "VISITORDESCRIPTION", "PLAYER1_NAME",
+                        "PLAYER1_TEAM_ABBREVIATION"],
+            "rowSet": [
+                ["0022300001", 2, 1, 1, "11:40", "James 25' 3PT Jump Shot", None, "LeBron James", "LAL"],
+                ["0022300001", 3, 6, 1, "11:20", None, "Tatum Bad Pass Turnover", "Jayson Tatum", "bos"],
+            ],
+        }
+
+        frame = PbpFrame.from_result_set("0022300001", result_set)
+
+        assert frame.event_idx.tolist() == [2, 3]
+        assert frame.clock_ms.tolist() == [700_000, 680_000]
+        assert frame.event_type_at(1) == EventType.TURNOVER
+        assert frame.shot_value.tolist() == [3, 0]
+        assert frame.team_at(1) == "BOS"
+        assert frame.player_at(0) == "LebronJames"
+
+
+class TestBatchFrames:
+    """Multi-game concatenation, splitting and masks."""
+
+    def test_concat_and_split_games(self):
+        game_a = PbpFrame.from_rows([_event(2, team="LAL"), _event(1, team="LAL")])
+        game_b = PbpFrame.from_rows([_event(1, game_id="g2", team="BOS", player="Jayson Tatum")])
+
+        batch = PbpFrame.concat([game_a, game_b])
+
+        assert len(batch) == 3
+        assert list(batch.teams.values) == ["LAL", "BOS"]
+        games = dict(batch.split_games())
+        assert games["0022300001"].event_idx.tolist() == [2, 1]
+        assert games["g2"].player_at(0) == "JaysonTatum"
+        assert batch.sorted().event_idx.tolist() == [1, 2, 1]
+        assert len(batch.for_game("g2")) == 1
+
+    def test_type_and_clock_masks(self):
+        frame = PbpFrame.from_rows([
+            _event(1, EventType.FOUL, clock="12:00"),
+            _event(2, clock="8:00"),
+            _event(3, EventType.FOUL, clock="7:59"),
+        ])
+
+        assert frame.type_mask(EventType.FOUL).tolist() == [True, False, True]
+        assert frame.clock_window_mask(720_000, 480_000).tolist() == [True, True, False]
+
+    def test_builder_window_mask_matches_rows(self):
+        events = [
+            _event(1, clock="12:00"),
+            _event(2, clock="12:00"),  # duplicate key
+            _event(3, clock="9:00", period=2),
+            _event(4, clock="7:59"),
+            _event(5, EventType.REBOUND, clock="9:00"),
+        ]
+
+        mask = Q1WindowBuilder().window_mask(PbpFrame.from_rows(events))
+        rows = Q1WindowBuilder().build_q1_window_12_8(events)
+
+        assert [events[i].event_idx for i in np.flatnonzero(mask)] == [e.event_idx for e in rows]
+
+
+class TestTransformersAcceptFrames:
+    """Analytics transformers take a PbpFrame in place of rows."""
+
+    def test_q1_window_frame_matches_rows(self):
+        events = [
+            _event(1, EventType.SHOT_MADE, clock="11:30", shot_made=True, shot_value=2),
+            _event(2, EventType.SHOT_MISSED, clock="11:10", team="BOS", player="Jayson Tatum"),
+            _event(3, EventType.REBOUND, clock="11:05", description="Defensive rebound"),
+            _event(4, EventType.TURNOVER, clock="10:40", team="BOS", player="Jayson Tatum"),
+        ]
+        transformer = Q1WindowTransformer()
+
+        from_rows = transformer.transform(events, "https://test.com")
+        from_frame = transformer.transform(PbpFrame.from_rows(events), "https://test.com")
+
+        assert from_frame.model_dump() == from_rows.model_dump()
@@ -0,0 +1,228 @@
+"""Tests for on-court player impact attribution."""
+
+import random
+from collections import defaultdict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from nba_scraper.models.enums import EventType
+from nba_scraper.models.pbp_frame import PbpFrame
+from nba_scraper.pipelines import analytics_pipeline
+from nba_scraper.pipelines.analytics_pipeline import (
+    LINEUP_PLAYERS_QUERY,
+    PLAYER_EVENTS_QUERY,
+    PLAYER_GAME_IMPACT_SPEC,
+    AnalyticsPipeline,
+)
+from nba_scraper.transformers.player_impact import (
+    IMPACT_COUNT_COLUMNS,
+    PlayerImpactAccumulator,
+    impact_metrics,
+    on_court_intervals,
+    period_starters,
+    player_game_counts,
+)
+from nba_scraper.transformers.possessions import ensure_possessions, possession_starts
+
+ROSTERS = {"LAL": list(range(1, 10)), "BOS": list(range(11, 20))}
+
+_PLAYS = [
+    (EventType.SHOT_MADE, 2), (EventType.SHOT_MADE, 3), (EventType.SHOT_MISSED, 2),
+    (EventType.FREE_THROW_MADE, 1), (EventType.FREE_THROW_MISSED, 1), (EventType.REBOUND, 0),
+    (EventType.TURNOVER, 0), (EventType.FOUL, 0),
+]
+
+
+def _event(game_id, period, idx, clock_ms, event_type, team, player1=None, player2=None, shot_value=None):
+    return {
+        "game_id": game_id, "period": period, "event_idx": idx, "clock_ms_remaining": clock_ms,
+        "time_remaining": f"{clock_ms // 60_000}:{clock_ms // 1000 % 60:02d}",
+        "event_type": event_type.value, "team_tricode": team, "shot_value": shot_value,
+        "player1_id": player1, "player2_id": player2,
+    }
+
+
+def _simulate(rng, game_id="0022300001", periods=4, plays_per_period=60):
+    """Events with substitutions plus the true on-court sets at every event."""
+    rows, on_court, listed = [], [], {}
+    idx = 0
+    for period in range(1, periods + 1):
+        court = {team: rng.sample(roster, 5) for team, roster in ROSTERS.items()}
+        period_players = {team: set(players) for team, players in court.items()}
+        clock = 720_000
+        for _ in range(plays_per_period):
+            clock -= rng.randint(1_000, 11_000)
+            team = rng.choice(list(ROSTERS))
+            if rng.random() < 0.12:
+                leaving = rng.choice(court[team])
+                entering = rng.choice([p for p in ROSTERS[team] if p not in court[team]])
+                rows.append(_event(game_id, period, idx, clock, EventType.SUBSTITUTION, team, leaving, entering))
+                on_court.append({t: set(c) for t, c in court.items()})
+                court[team] = [entering if p == leaving else p for p in court[team]]
+                period_players[team].add(entering)
+            else:
+                event_type, value = rng.choice(_PLAYS)
+                rows.append(_event(game_id, period, idx, clock, event_type, team,
+                                   rng.choice(court[team]), shot_value=value or None))
+                on_court.append({t: set(c) for t, c in court.items()})
+            idx += 1
+        for team, players in period_players.items():
+            listed[(game_id, period, team)] = sorted(players)
+    return rows, on_court, listed
+
+
+def _reference(rows, on_court):
+    """Nested-loop reference: scan every event for every player on court."""
+    frame = ensure_possessions(PbpFrame.from_rows(rows))
+    starts = possession_starts(frame)
+    starts[0] = True
+    totals = defaultdict(lambda: defaultdict(float))
+    for i, (row, court) in enumerate(zip(rows, on_court)):
+        if row["event_type"] == EventType.SUBSTITUTION.value:
+            continue
+        points = (row["shot_value"] if row["event_type"] == "SHOT_MADE" else
+                  1 if row["event_type"] == "FREE_THROW_MADE" else 0)
+        offense = frame.teams[int(frame.offense[i])]
+        for team, players in court.items():
+            for player in players:
+                key = (player, team)
+                if row["team_tricode"] == team:
+                    totals[key]["points_for_on"] += points
+                else:
+                    totals[key]["points_against_on"] += points
+                if starts[i] and offense == team:
+                    totals[key]["possessions_on"] += 1
+                elif starts[i] and offense is not None:
+                    totals[key]["opp_possessions_on"] += 1
+    return totals
+
+
+class TestOnCourtIntervals:
+    """Interval reconstruction from starters and substitutions."""
+
+    def test_substitutions_split_time_on_court(self):
+        rows = [
+            _event("g1", 1, 0, 700_000, EventType.SHOT_MADE, "LAL", 1, shot_value=2),
+            _event("g1", 1, 1, 600_000, EventType.SUBSTITUTION, "LAL", 1, 6),
+            _event("g1", 1, 2, 500_000, EventType.SHOT_MADE, "BOS", 11, shot_value=3),
+        ]
+        frame = PbpFrame.from_rows(rows)
+        starters = {(0, 1): {frame.teams.lookup("LAL"): [1, 2, 3, 4, 5]}}
+
+        intervals = on_court_intervals(frame, starters)
+
+        spans = {int(p): (int(s), int(e), float(sec)) for p, s, e, sec in
+                 zip(intervals.player_id, intervals.start, intervals.end, intervals.seconds)}
+        assert spans[1] == (0, 1, 120.0)
+        assert spans[6] == (2, 3, 600.0)
+        assert spans[2] == (0, 3, 720.0)
+
+    def test_starters_inferred_from_first_appearance(self):
+        rows = [
+            _event("g1", 1, 0, 700_000, EventType.SHOT_MADE, "LAL", 1, shot_value=2),
+            _event("g1", 1, 1, 690_000, EventType.SUBSTITUTION, "LAL", 2, 6),
+            _event("g1", 1, 2, 680_000, EventType.SHOT_MISSED, "LAL", 6, shot_value=2),
+            _event("g1", 1, 3, 670_000, EventType.TURNOVER, "LAL", 3),
+        ]
+        frame = PbpFrame.from_rows(rows)
+        lal = frame.teams.lookup("LAL")
+
+        assert period_starters(frame) == {(0, 1): {lal: [1, 2, 3]}}
+        with_stints = period_starters(frame, {("g1", 1, "LAL"): [1, 2, 3, 4, 5, 6]})
+        assert with_stints == {(0, 1): {lal: [1, 2, 3, 4, 5]}}
+
+
+class TestPlayerImpact:
+    """Prefix-sum attribution against a nested-loop reference."""
+
+    def test_matches_nested_loop_reference(self):
+        rows, on_court, listed = _simulate(random.Random(3))
+        frame = PbpFrame.from_rows(rows)
+
+        result = player_game_counts(frame, period_starters(frame, listed))
+
+        expected = _reference(rows, on_court)
+        column = {name: i for i, name in enumerate(IMPACT_COUNT_COLUMNS)}
+        actual = {
+            (int(player), frame.teams[int(team)]): counts
+            for player, team, counts in zip(result.player_id, result.team, result.counts)
+        }
+        for key, sums in expected.items():
+            for name, value in sums.items():
+                assert actual[key][column[name]] == pytest.approx(value), (key, name)
+        # Five players per team on court all game
+        by_team = defaultdict(float)
+        for (player, team), counts in actual.items():
+            by_team[team] += counts[column["seconds_on"]]
+        assert by_team == {"LAL": pytest.approx(5 * 4 * 720.0), "BOS": pytest.approx(5 * 4 * 720.0)}
+
+    def test_metrics(self):
+        counts = np.zeros((1, len(IMPACT_COUNT_COLUMNS)))
+        values = dict(possessions_on=50, opp_possessions_on=50, points_for_on=60, points_against_on=50,
+                      team_usage_on=50, team_possessions=100, opp_possessions=100, team_points=110,
+                      opp_points=105, points=20, field_goals_attempted=14, free_throws_attempted=5,
+                      turnovers=3)
+        for name, value in values.items():
+            counts[0, IMPACT_COUNT_COLUMNS.index(name)] = value
+
+        metrics = {name: float(values[0]) for name, values in impact_metrics(counts).items()}
+
+        assert metrics["usage_pct"] == pytest.approx((14 + 0.44 * 5 + 3) / 50)
+        assert metrics["true_shooting_pct"] == pytest.approx(20 / (2 * (14 + 0.44 * 5)))
+        assert metrics["plus_minus_on"] == 10
+        assert metrics["plus_minus_off"] == -5
+        assert metrics["on_off_net_rating"] == pytest.approx(20.0 - (-10.0))
+
+    def test_season_totals_accumulate_across_batches(self):
+        rng = random.Random(5)
+        games = [_simulate(rng, game_id=f"00223{i:05d}", periods=2, plays_per_period=30) for i in range(4)]
+        accumulator = PlayerImpactAccumulator()
+
+        game_rows = []
+        for batch in (games[:2], games[2:]):
+            rows = [row for game, _, _ in batch for row in game]
+            listed = {key: players for _, _, stints in batch for key, players in stints.items()}
+            game_rows += accumulator.add_frame(PbpFrame.from_rows(rows), listed)
+
+        season = {(row["player_id"], row["team_tricode"]): row for row in accumulator.rows()}
+        for key, row in season.items():
+            mine = [r for r in game_rows if (r["player_id"], r["team_tricode"]) == key]
+            assert row["games"] == len(mine)
+            assert row["plus_minus_on"] == pytest.approx(sum(r["plus_minus_on"] for r in mine))
+
+
+class TestPlayerAnalyticsPipeline:
+    """compute_player_analytics wiring."""
+
+    @pytest.mark.asyncio
+    async def test_streams_game_batches_and_writes_impact_rows(self):
+        rng = random.Random(11)
+        games = [_simulate(rng, game_id=f"00223{i:05d}", periods=1, plays_per_period=20) for i in range(3)]
+
+        async def fetch(query, *args):
+            if query == PLAYER_EVENTS_QUERY:
+                return [row for rows, _, _ in games for row in rows if row["game_id"] in args[0]]
+            if query == LINEUP_PLAYERS_QUERY:
+                return [{"game_id": g, "period": p, "team_tricode": t, "player_ids": players}
+                        for _, _, listed in games for (g, p, t), players in listed.items() if g in args[0]]
+            return [{"game_id": rows[0]["game_id"]} for rows, _, _ in games]
+
+        conn = MagicMock()
+        conn.fetch = AsyncMock(side_effect=fetch)
+        conn.fetchrow = AsyncMock(return_value=[3])
+        upsert = AsyncMock()
+
+        with patch.object(analytics_pipeline, "get_connection", AsyncMock(return_value=conn)), \
+             patch.object(analytics_pipeline, "upsert_rows", upsert):
+            result = await AnalyticsPipeline(batch_size=2).compute_player_analytics(player_ids=[1, 11])
+
+        assert result.success, result.error
+        assert result.metrics_computed == {"player_usage_rates", "player_efficiency", "player_plus_minus"}
+        assert upsert.await_count == 2
+        assert all(call.args[1] is PLAYER_GAME_IMPACT_SPEC for call in upsert.await_args_list)
+        written = [row for call in upsert.await_args_list for row in call.args[2]]
+        assert {row["player_id"] for row in written} <= {"1", "11"}
+        assert {(row["player_id"], row["team_tricode"]) for row in result.player_season} == \
+            {(row["player_id"], row["team_tricode"]) for row in written}
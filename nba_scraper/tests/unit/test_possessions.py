@@ -0,0 +1,189 @@
+"""Tests for the streaming possession engine."""
+
+import numpy as np
+
+from nba_scraper.models.enums import EventType
+from nba_scraper.models.pbp_frame import PbpFrame
+from nba_scraper.transformers.possessions import (
+    PossessionTracker,
+    annotate_possessions,
+    ensure_possessions,
+    possession_starts,
+    possessions_by_team,
+)
+
+
+def _run(events, period=1):
+    """Step a fresh LAL/BOS tracker over (clock_ms, event_type, team) tuples."""
+    tracker = PossessionTracker(["LAL", "BOS"])
+    return tracker, [tracker.step(period, clock, event_type, team) for clock, event_type, team in events]
+
+
+def _ids(marks):
+    return [mark.possession_id for mark in marks]
+
+
+def _offense(marks):
+    return [mark.offense for mark in marks]
+
+
+class TestPossessionTracker:
+    """State machine rules."""
+
+    def test_made_shot_hands_ball_over(self):
+        _, marks = _run([
+            (700000, EventType.JUMP_BALL, "LAL"),
+            (690000, EventType.SHOT_MADE, "LAL"),
+            (670000, EventType.SHOT_MISSED, "BOS"),
+        ])
+        assert _ids(marks) == [0, 0, 1]
+        assert _offense(marks) == ["LAL", "LAL", "BOS"]
+        assert marks[2].start_ms == 690000
+
+    def test_and_one_stays_in_scoring_possession(self):
+        _, marks = _run([
+            (690000, EventType.SHOT_MADE, "LAL"),
+            (690000, EventType.FOUL, "BOS"),
+            (690000, EventType.FREE_THROW_MADE, "LAL"),
+            (670000, EventType.SHOT_MISSED, "BOS"),
+        ])
+        assert _ids(marks) == [0, 0, 0, 1]
+        assert _offense(marks)[-1] == "BOS"
+
+    def test_missed_and_one_goes_to_rebound(self):
+        _, marks = _run([
+            (690000, EventType.SHOT_MADE, "LAL"),
+            (690000, EventType.FOUL, "BOS"),
+            (690000, EventType.FREE_THROW_MISSED, "LAL"),
+            (688000, EventType.REBOUND, "LAL"),
+        ])
+        assert _ids(marks) == [0, 0, 0, 0]
+
+    def test_free_throw_trip_ends_after_last_make(self):
+        _, marks = _run([
+            (600000, EventType.SHOT_MISSED, "LAL"),
+            (600000, EventType.FOUL, "BOS"),
+            (600000, EventType.FREE_THROW_MADE, "LAL"),
+            (600000, EventType.FREE_THROW_MADE, "LAL"),
+            (590000, EventType.TURNOVER, "BOS"),
+        ])
+        assert _ids(marks) == [0, 0, 0, 0, 1]
+
+    def test_offensive_rebound_keeps_possession(self):
+        _, marks = _run([
+            (600000, EventType.SHOT_MISSED, "LAL"),
+            (598000, EventType.REBOUND, "LAL"),
+            (590000, EventType.SHOT_MISSED, "LAL"),
+            (588000, EventType.REBOUND, "BOS"),
+        ])
+        assert _ids(marks) == [0, 0, 0, 1]
+        assert marks[3].start_ms == 588000
+
+    def test_offensive_foul_and_its_turnover_end_one_possession(self):
+        tracker, marks = _run([
+            (600000, EventType.SHOT_MISSED, "LAL"),
+            (598000, EventType.REBOUND, "LAL"),
+            (590000, EventType.FOUL, "LAL"),
+            (590000, EventType.TURNOVER, "LAL"),
+            (580000, EventType.SHOT_MADE, "BOS"),
+        ])
+        assert _ids(marks) == [0, 0, 0, 0, 1]
+        assert tracker.current_team == "LAL"
+
+    def test_dead_ball_events_do_not_settle_a_change(self):
+        _, marks = _run([
+            (600000, EventType.SHOT_MADE, "LAL"),
+            (600000, EventType.TIMEOUT, "BOS"),
+            (600000, EventType.SUBSTITUTION, "BOS"),
+            (590000, EventType.SHOT_MISSED, "BOS"),
+        ])
+        assert _ids(marks) == [0, 0, 0, 1]
+
+    def test_new_period_starts_new_possession(self):
+        tracker = PossessionTracker(["LAL", "BOS"])
+        first = tracker.step(1, 1000, EventType.SHOT_MISSED, "LAL")
+        end = tracker.step(1, 0, EventType.PERIOD_END, None)
+        begin = tracker.step(2, 720000, EventType.PERIOD_BEGIN, None)
+        shot = tracker.step(2, 700000, EventType.SHOT_MISSED, "BOS")
+
+        assert first.possession_id == end.possession_id == 0
+        assert begin.possession_id == shot.possession_id == 1
+        assert begin.offense is None
+        assert shot.offense == "BOS"
+        assert shot.start_ms == 720000
+
+    def test_resyncs_to_shooting_team(self):
+        tracker, marks = _run([
+            (600000, EventType.SHOT_MISSED, "LAL"),
+            (590000, EventType.SHOT_MISSED, "BOS"),  # the rebound row is missing
+        ])
+        assert _ids(marks) == [0, 1]
+        assert tracker.possession_changes == 1
+
+    def test_teamless_live_events_are_counted_as_unknown(self):
+        tracker = PossessionTracker()
+        mark = tracker.step(1, 600000, EventType.SHOT_MADE, None)
+        assert mark.offense is None
+        assert tracker.unknown_possessions == 1
+
+
+class TestAnnotatePossessions:
+    """Frame annotation."""
+
+    def _row(self, game_id, event_idx, event_type, team, clock_ms, period=1):
+        return {
+            "game_id": game_id,
+            "period": period,
+            "event_idx": event_idx,
+            "clock_ms_remaining": clock_ms,
+            "event_type": event_type,
+            "team_tricode": team,
+        }
+
+    def _rows(self, game_id):
+        return [
+            self._row(game_id, 1, EventType.JUMP_BALL, "LAL", 720000),
+            self._row(game_id, 2, EventType.SHOT_MADE, "LAL", 700000),
+            self._row(game_id, 3, EventType.SHOT_MISSED, "BOS", 690000),
+            self._row(game_id, 4, EventType.REBOUND, "BOS", 688000),
+            self._row(game_id, 5, EventType.TURNOVER, "BOS", 680000),
+            self._row(game_id, 6, EventType.SHOT_MISSED, "LAL", 670000),
+        ]
+
+    def test_matches_streaming_tracker(self):
+        frame = annotate_possessions(PbpFrame.from_rows(self._rows("g1")))
+        _, marks = _run([(r["clock_ms_remaining"], r["event_type"], r["team_tricode"]) for r in self._rows("g1")])
+
+        assert frame.possession.tolist() == _ids(marks)
+        assert [frame.teams[code] for code in frame.offense.tolist()] == _offense(marks)
+        assert frame.possession_start_ms.tolist() == [mark.start_ms for mark in marks]
+
+    def test_multi_game_frames_keep_row_order(self):
+        rows = self._rows("g1") + self._rows("g2")
+        shuffled = rows[::-1]
+        frame = annotate_possessions(PbpFrame.from_rows(shuffled))
+        expected = annotate_possessions(PbpFrame.from_rows(rows))
+
+        assert frame.possession.tolist() == expected.possession.tolist()[::-1]
+        assert possessions_by_team(frame) == {
+            ("g1", "LAL"): 2, ("g1", "BOS"): 1, ("g2", "LAL"): 2, ("g2", "BOS"): 1,
+        }
+
+    def test_annotations_survive_take_and_concat(self):
+        frame = annotate_possessions(PbpFrame.from_rows(self._rows("g1")))
+        other = annotate_possessions(PbpFrame.from_rows(self._rows("g2")[::-1]))
+        merged = PbpFrame.concat([frame, other])
+
+        assert merged.has_possessions
+        assert ensure_possessions(merged) is merged
+        window = merged.take(merged.possession == 1)
+        assert {window.teams[code] for code in window.offense.tolist()} == {"BOS"}
+
+    def test_possession_starts(self):
+        frame = annotate_possessions(PbpFrame.from_rows(self._rows("g1")))
+        assert np.flatnonzero(possession_starts(frame)).tolist() == [2, 5]
+
+    def test_unannotated_frame(self):
+        frame = PbpFrame.from_rows(self._rows("g1"))
+        assert not frame.has_possessions
+        assert PbpFrame.empty().has_possessions
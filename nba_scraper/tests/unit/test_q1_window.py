@@ -6,6 +6,7 @@ from typing import List
 from nba_scraper.models.pbp_rows import PbpEventRow
 from nba_scraper.models.derived_rows import Q1WindowRow
 from nba_scraper.models.enums import EventType
+from nba_scraper.models.pbp_frame import PbpFrame
 from nba_scraper.transformers.q1_window import Q1WindowTransformer, TeamStats
 
 
@@ -276,6 +277,44 @@ class TestQ1WindowTransformer:
         # Should return None due to insufficient team variety
         assert result is None
 
+    def test_transform_batch_matches_per_game(self):
+        """Batch mode over several games gives the per-game rows."""
+        games = []
+        for n, game_id in enumerate(["0022300001", "0022300002", "0022300003"]):
+            events = [
+                self._create_pbp_event(1, EventType.JUMP_BALL, 0, "BOS"),
+                self._create_pbp_event(2, EventType.SHOT_MADE, 30 + n, "BOS", True, 2),
+                self._create_pbp_event(3, EventType.SHOT_MISSED, 60, "LAL", False, 3),
+                self._create_pbp_event(4, EventType.REBOUND, 62, "LAL", description="Offensive rebound"),
+                self._create_pbp_event(5, EventType.FOUL, 90 + n, "BOS"),
+                self._create_pbp_event(6, EventType.FREE_THROW_MADE, 90 + n, "LAL", True, 1),
+                self._create_pbp_event(7, EventType.TURNOVER, 150, "BOS", is_transition=n == 1),
+            ]
+            games.append([event.model_copy(update={"game_id": game_id}) for event in events])
+
+        per_game = [self.transformer.transform(events, self.base_source_url) for events in games]
+        batch = self.transformer.transform_batch(
+            PbpFrame.from_rows([event for events in games for event in events]), self.base_source_url
+        )
+
+        assert batch == per_game
+        assert [row.game_id for row in batch] == ["0022300001", "0022300002", "0022300003"]
+
+    def test_transform_batch_skips_games_without_two_teams(self):
+        """Games that fail the two-team check don't block the rest of the batch."""
+        two_teams = [
+            self._create_pbp_event(1, EventType.SHOT_MADE, 60, "LAL", True, 2),
+            self._create_pbp_event(2, EventType.SHOT_MADE, 120, "BOS", True, 3),
+        ]
+        one_team = [
+            event.model_copy(update={"game_id": "0022300002", "team_tricode": "LAL"})
+            for event in two_teams
+        ]
+
+        rows = self.transformer.transform_batch(PbpFrame.from_rows(two_teams + one_team), self.base_source_url)
+
+        assert [row.game_id for row in rows] == ["0022300001"]
+
 
 class TestTeamStats:
     """Test cases for TeamStats helper class."""
@@ -0,0 +1,184 @@
+"""Tests for the set-based game rollback tool."""
+
+import json
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from nba_scraper.tools import rollback_game
+from nba_scraper.tools.rollback_game import (
+    ARCHIVE_MANIFEST,
+    ROLLBACK_TABLES,
+    SEASON_AGGREGATES_TABLE,
+    GameRollbackTool,
+)
+
+GAME_IDS = ["0022300001", "0022300002", "0022200005"]
+
+
+def _mock_conn(present=("pbp_events", "shot_events", "games"), deleted=4,
+               seasons=("2023-24", "unknown")) -> MagicMock:
+    async def fetch(sql, names):
+        if "to_regclass" in sql:
+            return [{"table_name": t} for t in names if t in present]
+        if sql.startswith(("SELECT DISTINCT season ", "SELECT season FROM")):
+            return [{"season": season} for season in seasons]
+        return []
+
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=fetch)
+    conn.fetchval = AsyncMock(return_value=deleted)
+    conn.execute = AsyncMock(return_value=f"INSERT 0 {deleted}")
+    conn.copy_from_table = AsyncMock()
+    conn.copy_to_table = AsyncMock(return_value=f"COPY {deleted}")
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    return conn
+
+
+def _pool(conn):
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    return SimpleNamespace(acquire=acquire)
+
+
+@pytest.fixture
+def use_conn():
+    def install(conn):
+        return patch.object(rollback_game, "get_performance_pool", AsyncMock(return_value=_pool(conn)))
+
+    return install
+
+
+class TestBatchRollback:
+    """One statement per table per batch, children before games."""
+
+    @pytest.mark.asyncio
+    async def test_deletes_each_table_once_in_dependency_order(self, tmp_path, use_conn):
+        conn = _mock_conn()
+
+        with use_conn(conn):
+            result = await GameRollbackTool(ops_dir=str(tmp_path)).rollback_multiple_games(GAME_IDS)
+
+        statements = [call.args for call in conn.fetchval.call_args_list]
+        assert [sql.split()[5] for sql, *_ in statements] == ["pbp_events", "shot_events", "games"]
+        pbp_sql, ids, seasons = statements[0]
+        assert "DELETE FROM pbp_events WHERE game_id = ANY($1::text[]) AND season = ANY($2::text[])" in pbp_sql
+        # Seasons come from the stored rows, not from the game ids
+        assert ids == GAME_IDS and seasons == ["2023-24", "unknown"]
+        assert statements[-1][1:] == (GAME_IDS,)
+        conn.transaction.assert_called_once()
+
+        assert result["successful_rollbacks"] == 3 and result["failed_rollbacks"] == 0
+        deleted = result["total_records_deleted"]
+        assert {table: deleted[table] for table in ("pbp_events", "shot_events", "games")} == {
+            "pbp_events": 4, "shot_events": 4, "games": 4}
+        assert sum(deleted.values()) == 12
+        assert (tmp_path / "batch_rollback_log.txt").exists()
+
+    @pytest.mark.asyncio
+    async def test_unresolved_seasons_drop_the_partition_filter(self, tmp_path, use_conn):
+        conn = _mock_conn(seasons=())
+
+        with use_conn(conn):
+            await GameRollbackTool(ops_dir=str(tmp_path)).rollback_multiple_games(GAME_IDS)
+
+        pbp_sql, *args = conn.fetchval.call_args_list[0].args
+        assert "DELETE FROM pbp_events WHERE game_id = ANY($1::text[]) RETURNING 1" in pbp_sql
+        assert args == [GAME_IDS]
+
+    @pytest.mark.asyncio
+    async def test_clears_ingest_state_and_derived_rows(self, tmp_path, use_conn):
+        conn = _mock_conn(present=[table for table, _ in ROLLBACK_TABLES] + [SEASON_AGGREGATES_TABLE],
+                          seasons=("2023-24",))
+
+        with use_conn(conn):
+            result = await GameRollbackTool(ops_dir=str(tmp_path)).rollback_multiple_games(GAME_IDS)
+
+        statements = {call.args[0].split()[5]: call.args for call in conn.fetchval.call_args_list}
+        for table in ("q1_window_12_8", "early_shocks", "team_game_stats", "player_game_impact",
+                      "game_results", "player_game_box"):
+            assert statements[table][1:] == (GAME_IDS,)
+        # Bronze state stays: the raw payloads are still on disk
+        assert "game_id = ANY($1::text[]) AND stage <> 'bronze'" in statements["game_ingest_state"][0]
+        # Running sums of the affected seasons are dropped for the analytics pipeline to rebuild
+        assert statements[SEASON_AGGREGATES_TABLE][1:] == (["2023-24"],)
+        assert result["total_records_deleted"][SEASON_AGGREGATES_TABLE] == 4
+
+    @pytest.mark.asyncio
+    async def test_batches_fail_independently(self, tmp_path, use_conn):
+        conn = _mock_conn()
+        conn.fetchval.side_effect = [4, 4, 4, RuntimeError("deadlock detected")]
+
+        with use_conn(conn):
+            result = await GameRollbackTool(ops_dir=str(tmp_path)).rollback_multiple_games(
+                GAME_IDS, batch_size=2)
+
+        assert result["successful_rollbacks"] == 2 and result["failed_rollbacks"] == 1
+        assert result["failed_games"] == [{"game_id": "0022200005", "error": "deadlock detected"}]
+        assert conn.transaction.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_dry_run_only_counts(self, tmp_path, use_conn):
+        conn = _mock_conn()
+
+        with use_conn(conn):
+            result = await GameRollbackTool(ops_dir=str(tmp_path)).rollback_multiple_games(
+                GAME_IDS, dry_run=True, archive=True)
+
+        assert all(call.args[0].startswith("SELECT COUNT(*)") for call in conn.fetchval.call_args_list)
+        assert result["archives"] == [] and result["total_records_deleted"]["games"] == 4
+
+
+class TestArchive:
+    """Deleted rows are kept as binary COPY files and can be restored."""
+
+    @pytest.mark.asyncio
+    async def test_archive_then_restore(self, tmp_path, use_conn):
+        conn = _mock_conn()
+        tool = GameRollbackTool(ops_dir=str(tmp_path))
+
+        with use_conn(conn):
+            result = await tool.rollback_multiple_games(GAME_IDS, archive=True)
+
+        executed = [call.args[0] for call in conn.execute.call_args_list]
+        assert executed[0] == "CREATE TEMP TABLE _rollback_pbp_events (LIKE pbp_events) ON COMMIT DROP"
+        assert executed[1].startswith("WITH deleted AS (DELETE FROM pbp_events WHERE game_id = ANY($1::text[])")
+        assert executed[1].endswith("INSERT INTO _rollback_pbp_events SELECT * FROM deleted")
+        archive_dir = result["archives"][0]
+        # Written beside the final directory, which only appears once the batch committed
+        staging = Path(archive_dir).with_name(f".{Path(archive_dir).name}.tmp")
+        conn.copy_from_table.assert_any_call(
+            "_rollback_games", output=f"{staging}/games.copy", format="binary")
+        assert not staging.exists()
+
+        manifest = json.loads((Path(archive_dir) / ARCHIVE_MANIFEST).read_text())
+        assert manifest["game_ids"] == GAME_IDS
+        assert [t["table"] for t in manifest["tables"]] == ["games", "shot_events", "pbp_events"]
+
+        with use_conn(conn):
+            restored = await tool.restore_archive(archive_dir)
+
+        assert restored == {"games": 4, "shot_events": 4, "pbp_events": 4}
+        assert [call.args[0] for call in conn.copy_to_table.call_args_list] == [
+            "games", "shot_events", "pbp_events"]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_leaves_no_archive(self, tmp_path, use_conn):
+        conn = _mock_conn()
+        conn.copy_from_table.side_effect = lambda stage, output, format: Path(output).write_bytes(b"")
+        conn.transaction.return_value.__aexit__.side_effect = RuntimeError("could not serialize access")
+
+        with use_conn(conn):
+            result = await GameRollbackTool(ops_dir=str(tmp_path)).rollback_multiple_games(
+                GAME_IDS, archive=True)
+
+        assert result["archives"] == [] and result["failed_rollbacks"] == 3
+        assert list((tmp_path / "rollback_archive").iterdir()) == []
+
+    def test_games_are_deleted_last(self):
+        assert ROLLBACK_TABLES[-1][0] == "games"
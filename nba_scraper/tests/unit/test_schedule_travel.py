@@ -708,4 +708,87 @@ BOS,TD Garden,America/New_York,42.366,-71.062,6"""
     
     result = transformer.transform(games, "test-url")
     # Just verify it runs without error - specific logic testing would need more setup
-    assert isinstance(result, list)
\ No newline at end of file
+    assert isinstance(result, list)
+
+class TestVenueMatrixAndWhatIf:
+    """Precomputed venue matrices and array-level recomputation."""
+
+    def setup_method(self):
+        venues_csv = (
+            "team_id,arena_name,arena_tz,lat,lon,altitude_m\n"
+            "LAL,Crypto.com Arena,America/Los_Angeles,34.0430,-118.2675,89\n"
+            "BOS,TD Garden,America/New_York,42.3662,-71.0621,5\n"
+            "DEN,Ball Arena,America/Denver,39.7487,-105.0077,1609\n"
+        )
+        with patch('builtins.open', mock_open(read_data=venues_csv)):
+            self.transformer = ScheduleTravelTransformer(venues_csv_path=Path("test_venues.csv"))
+
+    def _game(self, game_id: str, when: datetime, home: str, away: str) -> GameRow:
+        return GameRow(
+            game_id=game_id,
+            season="2023-24",
+            game_date_utc=when,
+            game_date_local=when.date(),
+            arena_tz="America/New_York",
+            home_team_tricode=home,
+            away_team_tricode=away,
+            source="test",
+            source_url="https://test.com"
+        )
+
+    def test_matrix_matches_scalar_travel_leg(self):
+        matrix = self.transformer.venue_matrix
+        venues = self.transformer.venues
+        for src in venues:
+            for dst in venues:
+                leg = self.transformer._calculate_travel_leg(venues[src], venues[dst])
+                i, j = matrix.index[src], matrix.index[dst]
+                assert matrix.distance_km[i, j] == pytest.approx(leg.distance_km, abs=1e-6)
+                assert matrix.timezone_shift_hours[i, j] == leg.timezone_shift_hours
+                assert matrix.altitude_change_m[i, j] == leg.altitude_change_m
+        assert matrix.distance_km.diagonal().tolist() == [0.0, 0.0, 0.0]
+
+    def test_input_order_does_not_matter(self):
+        games = [
+            self._game("001", datetime(2024, 1, 10, 20, 0), "LAL", "BOS"),
+            self._game("002", datetime(2024, 1, 11, 19, 0), "DEN", "LAL"),
+            self._game("003", datetime(2024, 1, 13, 19, 0), "BOS", "DEN"),
+            self._game("004", datetime(2024, 1, 14, 19, 0), "LAL", "DEN"),
+        ]
+        forward = self.transformer.transform(games, "u")
+        backward = self.transformer.transform(games[::-1], "u")
+
+        key = lambda r: (r.game_id, r.team_tricode)
+        assert sorted(forward, key=key) == sorted(backward, key=key)
+        assert {key(r) for r in forward} == {
+            ("002", "LAL"), ("003", "BOS"), ("003", "DEN"), ("004", "LAL"), ("004", "DEN"),
+        }
+
+    def test_what_if_relocated_game(self):
+        from nba_scraper.transformers.schedule_travel import derive_travel
+
+        games = [
+            self._game("001", datetime(2024, 1, 10, 20, 0), "LAL", "BOS"),
+            self._game("002", datetime(2024, 1, 12, 19, 0), "DEN", "LAL"),
+        ]
+        schedule = self.transformer.schedule_arrays(games)
+        baseline = self.transformer.rows(schedule, derive_travel(schedule, self.transformer.venue_matrix), "u")
+
+        # Play game 002 in Los Angeles instead of Denver
+        venue = schedule.venue.copy()
+        venue[schedule.game == 1] = self.transformer.venue_matrix.index["LAL"]
+        moved = schedule._replace(venue=venue)
+        what_if = self.transformer.rows(moved, derive_travel(moved, self.transformer.venue_matrix), "u")
+
+        [lal_baseline] = [r for r in baseline if r.team_tricode == "LAL"]
+        [lal_what_if] = [r for r in what_if if r.team_tricode == "LAL"]
+        assert lal_baseline.altitude_change_m == 1520
+        assert lal_what_if.travel_distance_km == 0.0
+        assert lal_what_if.altitude_change_m == 0.0
+
+    def test_missing_venue_skips_row(self):
+        games = [
+            self._game("001", datetime(2024, 1, 10, 20, 0), "LAL", "BOS"),
+            self._game("002", datetime(2024, 1, 11, 19, 0), "PHX", "LAL"),
+        ]
+        assert self.transformer.transform(games, "u") == []
@@ -1,6 +1,6 @@
 """Unit tests for scheduler jobs."""
 from datetime import datetime, timezone, date
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from sqlalchemy import create_engine
 
 
@@ -193,6 +193,40 @@ def test_run_backfill_continues_on_chunk_error():
                     assert pipeline_calls[0] == 3
 
 
+def test_run_backfill_counts_chunk_once_when_failure_cannot_be_recorded():
+    """A database error while marking a failed chunk does not abort the backfill."""
+    from nba_scraper.schedule import jobs
+    from nba_scraper.state.game_state import STATUS_FAILED
+    from nba_scraper.state.watermarks import ensure_tables
+    
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        ensure_tables(conn)
+    
+    record = jobs.record_stage_states
+    
+    def flaky_record(conn, states):
+        if any(state.status == STATUS_FAILED for state in states):
+            raise Exception("connection reset")
+        record(conn, states)
+    
+    def mock_pipeline(gids):
+        if gids == ["0022400002"]:
+            raise Exception("Chunk 2 failed")
+    
+    with patch.object(jobs, '_get_sync_engine', return_value=engine), \
+         patch('nba_scraper.utils.season_utils.season_bounds', return_value=(date(2024, 10, 1), date(2024, 10, 3))), \
+         patch.object(jobs, 'discover_game_ids_for_date_range',
+                      side_effect=[["0022400001"], ["0022400002"], ["0022400003"]]), \
+         patch.object(jobs, 'record_stage_states', side_effect=flaky_record), \
+         patch('nba_scraper.cli_pipeline.run_pipeline_for_games', mock_pipeline):
+        rc = jobs.run_backfill("2024-25", since_game_id=None, chunk_days=1)
+    
+    assert rc == 1
+    with engine.begin() as conn:
+        assert jobs.get_watermark(conn, stage="backfill", key="2024-25") == "0022400003"
+
+
 def test_run_backfill_from_scratch():
     """Test that run_backfill starts from beginning when no watermark exists."""
     from nba_scraper.schedule import jobs
@@ -224,6 +258,77 @@ def test_run_backfill_from_scratch():
                         assert watermark == "0022400002"
 
 
+def test_run_backfill_retries_failed_games_below_watermark():
+    """Test that games whose last attempt failed are retried even below the watermark."""
+    from nba_scraper.schedule import jobs
+    from nba_scraper.state.watermarks import ensure_tables, get_watermark
+    from nba_scraper.state.game_state import get_stage_states
+    
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        ensure_tables(conn)
+    
+    with patch.object(jobs, '_get_sync_engine', return_value=engine):
+        # Two chunks: the first fails, the second succeeds and moves the watermark past it
+        with patch('nba_scraper.utils.season_utils.season_bounds', return_value=(date(2024, 10, 1), date(2024, 10, 2))):
+            def mock_discovery(start, end):
+                return ["0022400001"] if start == date(2024, 10, 1) else ["0022400002"]
+            
+            with patch.object(jobs, 'discover_game_ids_for_date_range', side_effect=mock_discovery):
+                def failing_pipeline(gids):
+                    if gids == ["0022400001"]:
+                        raise Exception("API timeout")
+                
+                with patch('nba_scraper.cli_pipeline.run_pipeline_for_games', failing_pipeline):
+                    assert jobs.run_backfill("2024-25", since_game_id=None, chunk_days=1) == 1
+                
+                with engine.begin() as conn:
+                    assert get_watermark(conn, stage="backfill", key="2024-25") == "0022400002"
+                    states = get_stage_states(conn, stage="backfill", game_ids=["0022400001", "0022400002"])
+                    assert states["0022400001"].status == "failed"
+                    assert states["0022400001"].last_error == "API timeout"
+                    assert states["0022400002"].ok
+                
+                # The next run retries only the failed game
+                seen = {"games": []}
+                with patch('nba_scraper.cli_pipeline.run_pipeline_for_games', lambda gids: seen["games"].extend(gids)):
+                    assert jobs.run_backfill("2024-25", since_game_id=None, chunk_days=1) == 0
+                
+                assert seen["games"] == ["0022400001"]
+                with engine.begin() as conn:
+                    # Watermark never moves backwards
+                    assert get_watermark(conn, stage="backfill", key="2024-25") == "0022400002"
+                    assert get_stage_states(conn, stage="backfill", game_ids=["0022400001"])["0022400001"].ok
+
+
+def test_run_backfill_reprocesses_after_version_bump():
+    """Test that bumping the backfill stage version re-runs already processed games."""
+    from nba_scraper.schedule import jobs
+    from nba_scraper.state.watermarks import ensure_tables
+    
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        ensure_tables(conn)
+    
+    with patch.object(jobs, '_get_sync_engine', return_value=engine):
+        with patch('nba_scraper.utils.season_utils.season_bounds', return_value=(date(2024, 10, 1), date(2024, 10, 1))):
+            with patch.object(jobs, 'discover_game_ids_for_date_range', return_value=["0022400001", "0022400002"]):
+                seen = {"games": []}
+                
+                def mock_pipeline(gids):
+                    seen["games"].extend(gids)
+                
+                with patch('nba_scraper.cli_pipeline.run_pipeline_for_games', mock_pipeline):
+                    jobs.run_backfill("2024-25", since_game_id=None, chunk_days=1)
+                    jobs.run_backfill("2024-25", since_game_id=None, chunk_days=1)
+                    assert seen["games"] == ["0022400001", "0022400002"]
+                    
+                    with patch.dict(jobs.STAGE_VERSIONS, {"backfill": "2"}):
+                        jobs.run_backfill("2024-25", since_game_id=None, chunk_days=1)
+                    
+                    assert seen["games"] == ["0022400001", "0022400002"] * 2
+
+
 def test_dates_in_chunks():
     """Test the _dates_in_chunks utility function."""
     from nba_scraper.schedule.jobs import _dates_in_chunks
@@ -267,3 +372,118 @@ def test_yesterday_et():
     test_time = datetime(2025, 10, 8, 14, 0, 0, tzinfo=timezone.utc)
     result = _yesterday_et(test_time)
     assert result == date(2025, 10, 7)
+
+
+class _AsyncPool:
+    """Pool whose connections report the state tables as present."""
+
+    def __init__(self):
+        self.conn = MagicMock()
+        self.conn.fetchval = AsyncMock(return_value=True)
+        self.conn.execute = AsyncMock()
+        self.conn.transaction = MagicMock(return_value=AsyncMock())
+
+    def acquire(self):
+        from contextlib import asynccontextmanager
+
+        @asynccontextmanager
+        async def acquire():
+            yield self.conn
+
+        return acquire()
+
+
+def _patch_async_state(jobs, pool, watermark=None, states=None):
+    """Patch the pool and async state helpers; returns the save mocks."""
+    from contextlib import ExitStack
+
+    saved = {"watermarks": AsyncMock(), "states": AsyncMock()}
+    stack = ExitStack()
+    stack.enter_context(patch.object(jobs, "get_performance_pool", AsyncMock(return_value=pool)))
+    stack.enter_context(patch.object(jobs, "fetch_watermark", AsyncMock(return_value=watermark)))
+    stack.enter_context(patch.object(jobs, "fetch_stage_states", AsyncMock(return_value=states or {})))
+    stack.enter_context(patch.object(jobs, "save_watermarks", saved["watermarks"]))
+    stack.enter_context(patch.object(jobs, "save_stage_states", saved["states"]))
+    stack.enter_context(patch.object(jobs, "_state_tables_ready", False))
+    return stack, saved
+
+
+def test_run_daily_async_checks_tables_once():
+    """Test that the async daily job checks the state tables only on its first run."""
+    import asyncio
+    from nba_scraper.schedule import jobs
+
+    pool = _AsyncPool()
+    stack, saved = _patch_async_state(jobs, pool)
+    with stack, patch.object(jobs, '_yesterday_et', return_value=date(2025, 10, 7)), \
+         patch.object(jobs, 'discover_game_ids_for_date', return_value=["0022400001"]), \
+         patch.object(jobs, '_run_pipeline_async', AsyncMock()):
+        assert asyncio.run(jobs.run_daily_async()) == 0
+        assert asyncio.run(jobs.run_daily_async()) == 0
+
+    assert pool.conn.fetchval.call_count == 1
+    pool.conn.execute.assert_not_called()  # tables present: no DDL
+    saved["watermarks"].assert_called_with(pool.conn, [("schedule", "daily", "2025-10-07")])
+
+
+def test_run_backfill_async_runs_chunks_concurrently():
+    """Test that chunks overlap and state/watermark are committed in one batch."""
+    import asyncio
+    from nba_scraper.schedule import jobs
+
+    pool = _AsyncPool()
+    stack, saved = _patch_async_state(jobs, pool, watermark="0022400001")
+    in_flight = {"now": 0, "peak": 0}
+    with stack, patch('nba_scraper.utils.season_utils.season_bounds',
+                      return_value=(date(2024, 10, 1), date(2024, 10, 4))):
+        def mock_discovery(start, end):
+            return [f"00224000{start.day:02d}"]
+
+        async def slow_pipeline(gids):
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            try:
+                await asyncio.sleep(0.05)
+                if gids == ["0022400003"]:
+                    raise Exception("API timeout")
+            finally:
+                in_flight["now"] -= 1
+
+        with patch.object(jobs, 'discover_game_ids_for_date_range', side_effect=mock_discovery), \
+             patch.object(jobs, '_run_pipeline_async', slow_pipeline):
+            rc = asyncio.run(jobs.run_backfill_async("2024-25", chunk_days=1, max_concurrent=4, commit_every=10))
+
+    assert rc == 1
+    assert in_flight["peak"] == 3  # the three pending chunks ran side by side
+    # Chunk 1 sits at the watermark and is skipped; one commit at the end
+    saved["states"].assert_called_once()
+    states = {s.game_id: s.status for s in saved["states"].call_args.args[1]}
+    assert states == {"0022400002": "ok", "0022400003": "failed", "0022400004": "ok"}
+    saved["watermarks"].assert_called_once_with(pool.conn, [("backfill", "2024-25", "0022400004")])
+
+
+def test_run_backfill_async_watermark_waits_for_earlier_chunks():
+    """Test that a finished chunk does not move the watermark past one still running."""
+    import asyncio
+    from nba_scraper.schedule import jobs
+
+    pool = _AsyncPool()
+    stack, saved = _patch_async_state(jobs, pool)
+    with stack, patch('nba_scraper.utils.season_utils.season_bounds',
+                      return_value=(date(2024, 10, 1), date(2024, 10, 2))):
+        def mock_discovery(start, end):
+            return ["0022400001"] if start == date(2024, 10, 1) else ["0022400002"]
+
+        async def pipeline(gids):
+            # The first chunk finishes last
+            await asyncio.sleep(0.3 if gids == ["0022400001"] else 0)
+
+        with patch.object(jobs, 'discover_game_ids_for_date_range', side_effect=mock_discovery), \
+             patch.object(jobs, '_run_pipeline_async', pipeline):
+            assert asyncio.run(jobs.run_backfill_async("2024-25", chunk_days=1, commit_every=1)) == 0
+
+    first, second = saved["states"].call_args_list
+    assert [s.game_id for s in first.args[1]] == ["0022400002"]
+    assert [s.game_id for s in second.args[1]] == ["0022400001"]
+    # Only the second commit, with both chunks done, writes the watermark
+    saved["watermarks"].assert_called_once_with(pool.conn, [("backfill", "2024-25", "0022400002")])
@@ -0,0 +1,138 @@
+"""Tests for the set-based season processing plan."""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, UTC
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from nba_scraper.state import processing_plan
+from nba_scraper.state.processing_plan import GameProcessingPlan, build_processing_plan, plan_season
+
+TIPOFF = datetime(2024, 1, 15, 0, 30, tzinfo=UTC)
+
+
+def _row(game_id, *, ingested=True, status="FINAL", events=100, shots=80, located=80,
+         pbp_ingested_at=TIPOFF + timedelta(days=1)):
+    return {
+        "game_id": game_id,
+        "ingested": ingested,
+        "status": status if ingested else None,
+        "game_date_utc": TIPOFF if ingested else None,
+        "event_count": events,
+        "shot_count": shots,
+        "located_shot_count": located,
+        "pbp_ingested_at": pbp_ingested_at,
+    }
+
+
+def _pooled(conn):
+    @asynccontextmanager
+    async def pooled_connection():
+        yield conn
+
+    return patch("nba_scraper.db.pooled_connection", pooled_connection)
+
+
+class TestGameProcessingPlan:
+    """Reason derivation from plan rows."""
+
+    def test_complete_final_game_needs_nothing(self):
+        plan = GameProcessingPlan.from_row(_row("g1"))
+        assert plan.reasons == []
+        assert not plan.needs_processing
+
+    def test_unknown_game_is_not_ingested(self):
+        plan = GameProcessingPlan.from_row(_row("g1", ingested=False, events=0, shots=0, located=0))
+        assert plan.reasons == ["not_ingested"]
+
+    def test_not_final_and_missing_pbp(self):
+        plan = GameProcessingPlan.from_row(
+            _row("g1", status="LIVE", events=0, shots=0, located=0, pbp_ingested_at=None)
+        )
+        assert plan.reasons == ["not_final", "missing_pbp"]
+
+    def test_missing_shot_coordinates(self):
+        plan = GameProcessingPlan.from_row(_row("g1", located=0))
+        assert plan.reasons == ["missing_shots"]
+
+    def test_pbp_captured_before_game_end_is_stale(self):
+        plan = GameProcessingPlan.from_row(_row("g1", pbp_ingested_at=TIPOFF + timedelta(hours=1)))
+        assert plan.reasons == ["stale_source"]
+
+    def test_status_comparison_is_case_insensitive(self):
+        assert GameProcessingPlan.from_row(_row("g1", status="Final")).reasons == []
+
+
+class TestProcessingPlan:
+    """Bulk planning and the dry-run report."""
+
+    @pytest.mark.asyncio
+    async def test_plan_uses_one_query(self):
+        conn = MagicMock()
+        conn.fetch = AsyncMock(return_value=[_row("g1"), _row("g2", status="LIVE"), _row("g3", located=0)])
+
+        plans = await build_processing_plan(conn, ["g1", "g2", "g3"], processing_plan.PROCESSING_PLAN_QUERY)
+
+        assert [plan.game_id for plan in plans if plan.needs_processing] == ["g2", "g3"]
+        conn.fetch.assert_awaited_once()
+        assert conn.fetch.await_args.args[1] == ["g1", "g2", "g3"]
+
+    @pytest.mark.asyncio
+    async def test_no_games_skips_database(self):
+        conn = MagicMock()
+        conn.fetch = AsyncMock()
+
+        assert await build_processing_plan(conn, []) == []
+        conn.fetch.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_plan_season_report(self):
+        conn = MagicMock()
+        conn.fetch = AsyncMock(side_effect=[
+            [{"game_id": g} for g in ("g1", "g2", "g3")],
+            [{"column_name": "event_type"}],
+            [_row("g1"), _row("g2", status="LIVE", located=0), _row("g3", located=0)],
+        ])
+
+        with _pooled(conn):
+            report = await plan_season("2023-24")
+
+        assert conn.fetch.await_args_list[0].args == (
+            "SELECT DISTINCT game_id FROM games WHERE season = $1 ORDER BY game_id", "2023-24")
+        assert report["total_games"] == 3
+        assert report["games_needing_processing"] == 2
+        assert report["reasons"] == {"not_final": 1, "missing_shots": 2}
+        assert [game["game_id"] for game in report["games"]] == ["g2", "g3"]
+
+    def test_plan_query_is_set_based(self):
+        assert "unnest($1::text[])" in processing_plan.PROCESSING_PLAN_QUERY
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("columns, expected", [
+        (["game_id", "event_idx", "event_type", "shot_x"], processing_plan.PROCESSING_PLAN_QUERY),
+        (["game_id", "event_num", "action_type", "shot_x", "season"],
+         processing_plan.FOUNDATION_PROCESSING_PLAN_QUERY),
+    ])
+    async def test_plan_query_follows_schema(self, columns, expected):
+        conn = MagicMock()
+        conn.fetch = AsyncMock(side_effect=[[{"column_name": c} for c in columns], [_row("g1")]])
+
+        await build_processing_plan(conn, ["g1"])
+
+        assert conn.fetch.await_args.args[0] == expected
+
+    def test_season_plan_command_prints_report(self):
+        from typer.testing import CliRunner
+
+        from nba_scraper import cli
+
+        report = {"season": "2023-24", "total_games": 2, "games_needing_processing": 1,
+                  "games_up_to_date": 1, "reasons": {"missing_pbp": 1},
+                  "games": [{"game_id": "g1", "status": None, "reasons": ["missing_pbp"]}]}
+        with patch.object(processing_plan, "plan_season", AsyncMock(return_value=report)):
+            result = CliRunner().invoke(cli.app, ["season-plan", "--season", "2023-24", "--show-games"])
+
+        assert result.exit_code == 0, result.output
+        assert "Needing processing: 1" in result.output
+        assert "g1 [-]: missing_pbp" in result.output
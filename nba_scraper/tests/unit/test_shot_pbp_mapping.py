@@ -0,0 +1,96 @@
+"""Tests for shot-to-PBP matching and vectorized shot distances."""
+
+import pytest
+
+from nba_scraper.models.pbp import PbpEvent
+from nba_scraper.models.shots import ShotEvent
+from nba_scraper.transformers.shots import (
+    match_shots_to_pbp,
+    shot_distances_ft,
+    transform_shots,
+)
+
+GAME_ID = "0022300001"
+
+
+def _pbp(event_num, clock, player1_id=None, action_type=None, period=1):
+    return PbpEvent(
+        game_id=GAME_ID,
+        event_num=event_num,
+        period=period,
+        clock=clock,
+        player1_id=player1_id,
+        action_type=action_type,
+    )
+
+
+def _shot(player_id, made=1, event_num=None, clock_ms=None, loc=(0, 0), period=1):
+    return ShotEvent(
+        game_id=GAME_ID,
+        player_id=player_id,
+        period=period,
+        shot_made_flag=made,
+        loc_x=loc[0],
+        loc_y=loc[1],
+        event_num=event_num,
+        clock_ms_remaining=clock_ms,
+    )
+
+
+class TestMatchShotsToPbp:
+    """Direct and time-based shot matching."""
+
+    def test_event_num_matches_directly(self):
+        matches = match_shots_to_pbp([_shot(7, event_num=2)], [_pbp(1, "11:40"), _pbp(2, "11:20")])
+        assert [event_num for _, event_num in matches] == [2]
+
+    def test_falls_back_to_clock_and_shooter(self):
+        pbp_rows = [
+            _pbp(1, "11:20", player1_id=8, action_type=2),
+            _pbp(2, "11:20", player1_id=9, action_type=2),
+            _pbp(3, "11:20", player1_id=9, action_type=1),
+        ]
+        matches = match_shots_to_pbp([_shot(9, made=0, clock_ms=680_000)], pbp_rows)
+        assert [event_num for _, event_num in matches] == [2]
+
+    def test_closest_clock_wins_and_events_are_claimed_once(self):
+        pbp_rows = [_pbp(1, "11:21", player1_id=7), _pbp(2, "11:20", player1_id=7)]
+        shots = [_shot(7, clock_ms=680_000), _shot(7, clock_ms=680_000)]
+
+        matches = match_shots_to_pbp(shots, pbp_rows)
+
+        assert [event_num for _, event_num in matches] == [2, 1]
+
+    def test_outside_tolerance_or_period_is_unmatched(self):
+        pbp_rows = [_pbp(1, "11:20", player1_id=7), _pbp(2, "11:30", player1_id=7, period=2)]
+        shots = [_shot(7, clock_ms=690_000)]
+        assert match_shots_to_pbp(shots, pbp_rows) == []
+
+    def test_non_shot_events_are_ignored(self):
+        pbp_rows = [_pbp(1, "11:20", player1_id=7, action_type=6)]  # foul
+        assert match_shots_to_pbp([_shot(7, clock_ms=680_000)], pbp_rows) == []
+
+    def test_empty_inputs(self):
+        assert match_shots_to_pbp([], [_pbp(1, "11:20")]) == []
+        assert match_shots_to_pbp([_shot(7, event_num=1)], []) == []
+
+
+class TestShotDistances:
+    """Vectorized distance calculation."""
+
+    def test_distance_in_feet(self):
+        distances = shot_distances_ft([30, -220, 0], [40, 0, 0])
+        assert distances.tolist() == pytest.approx([5.0, 22.0, 0.0])
+
+
+class TestTransformShotsClock:
+    """Shot clock extraction for time-based linking."""
+
+    def test_clock_from_minutes_and_seconds(self):
+        raw = [{
+            "PLAYER_ID": 201939, "TEAM_ID": 1610612744, "PERIOD": 2,
+            "SHOT_MADE_FLAG": 1, "LOC_X": 10, "LOC_Y": 20,
+            "MINUTES_REMAINING": 3, "SECONDS_REMAINING": 7,
+        }]
+        (shot,) = transform_shots(raw, game_id=GAME_ID)
+        assert shot.clock_ms_remaining == 187_000
@@ -0,0 +1,182 @@
+"""Tests for lineup stint reconstruction from substitutions."""
+
+import random
+from collections import defaultdict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from nba_scraper.loaders.lineups import LINEUP_STINTS_SPEC
+from nba_scraper.models.enums import EventType
+from nba_scraper.pipelines import lineup_stints
+from nba_scraper.pipelines.lineup_stints import (
+    DELETE_STINTS,
+    STINT_EVENTS_QUERY,
+    STINT_GAMES_QUERY,
+    rebuild_lineup_stints,
+)
+from nba_scraper.transformers.stints import (
+    StintBuilder,
+    build_lineup_stints,
+    starters_from_boxscore,
+    starters_from_bref,
+)
+
+TEAM_IDS = {"LAL": 1610612747, "BOS": 1610612738}
+ROSTERS = {"LAL": list(range(1, 11)), "BOS": list(range(11, 21))}
+
+
+def _event(period, clock_ms, event_type, team, player1=None, player2=None, shot_value=None, **extra):
+    return {"period": period, "clock_ms_remaining": clock_ms, "event_type": event_type.value,
+            "team_tricode": team, "player1_id": player1 and str(player1),
+            "player2_id": player2 and str(player2), "shot_value": shot_value, **extra}
+
+
+def _by_lineup(stints):
+    return {(s.team_id, s.period, tuple(s.lineup)): (s.seconds_played, s.plus_minus) for s in stints}
+
+
+def _simulate(rng, periods=4, plays=80):
+    """Events with substitutions, starters, and true (seconds, plus/minus) per lineup."""
+    events, starters = [], {}
+    truth = defaultdict(lambda: [0.0, 0])
+    for period in range(1, periods + 1):
+        court = {team: rng.sample(roster, 5) for team, roster in ROSTERS.items()}
+        if period == 1:
+            starters = {team: list(players) for team, players in court.items()}
+        length = 720.0 if period <= 4 else 300.0
+        now = 0.0
+        for i in range(plays):
+            later = min(length, now + rng.uniform(0.5, length / plays * 1.6))
+            for team, players in court.items():
+                truth[(TEAM_IDS[team], period, tuple(sorted(players)))][0] += later - now
+            now = later
+            clock = int(round((length - now) * 1000))
+            team = rng.choice(list(ROSTERS))
+            if rng.random() < 0.15:
+                leaving = rng.choice(court[team])
+                entering = rng.choice([p for p in ROSTERS[team] if p not in court[team]])
+                events.append(_event(period, clock, EventType.SUBSTITUTION, team, leaving, entering))
+                court[team] = [entering if p == leaving else p for p in court[team]]
+            else:
+                event_type, value = rng.choice([(EventType.SHOT_MADE, 2), (EventType.SHOT_MADE, 3),
+                                                (EventType.SHOT_MISSED, 2), (EventType.FREE_THROW_MADE, None),
+                                                (EventType.REBOUND, None)])
+                events.append(_event(period, clock, event_type, team, rng.choice(court[team]), shot_value=value))
+                points = value if event_type == EventType.SHOT_MADE else 1 if event_type == EventType.FREE_THROW_MADE else 0
+                for side, players in court.items():
+                    key = (TEAM_IDS[side], period, tuple(sorted(players)))
+                    truth[key][1] += points if side == team else -points
+        for team, players in court.items():
+            truth[(TEAM_IDS[team], period, tuple(sorted(players)))][0] += length - now
+    return events, starters, truth
+
+
+class TestStintBuilder:
+    """Stint boundaries, durations and plus/minus."""
+
+    def test_matches_simulated_lineups_with_known_starters(self):
+        for seed in range(5):
+            events, starters, truth = _simulate(random.Random(seed), periods=1)
+
+            stints = _by_lineup(build_lineup_stints(events, "g1", TEAM_IDS, starters))
+
+            expected = {key: (int(round(sec)), pm) for key, (sec, pm) in truth.items() if round(sec) or pm}
+            assert {k: v for k, v in stints.items() if v != (0, 0)} == expected
+
+    def test_starters_inferred_from_first_appearance_in_every_period(self):
+        events = [
+            _event(1, 700_000, EventType.SHOT_MADE, "LAL", 1, shot_value=2),
+            _event(1, 690_000, EventType.REBOUND, "LAL", 2),
+            _event(1, 680_000, EventType.SUBSTITUTION, "LAL", 3, 6),  # 3 never seen before: a starter
+            _event(1, 600_000, EventType.SHOT_MADE, "LAL", 4, shot_value=3),
+            _event(1, 500_000, EventType.TURNOVER, "LAL", 5),
+        ]
+
+        stints = _by_lineup(build_lineup_stints(events, "g1", {"LAL": 1}))
+
+        assert stints == {
+            (1, 1, (1, 2, 3, 4, 5)): (40, 2),
+            (1, 1, (1, 2, 4, 5, 6)): (680, 3),
+        }
+
+    def test_missing_substitution_replaces_least_recently_seen(self):
+        starters = {"LAL": [1, 2, 3, 4, 5]}
+        events = [_event(1, 700_000 - i * 10_000, EventType.REBOUND, "LAL", p) for i, p in enumerate([2, 3, 4, 5])]
+        events.append(_event(1, 600_000, EventType.SHOT_MADE, "LAL", 9, shot_value=2))  # 9 was never subbed in
+
+        builder = StintBuilder("g1", {"LAL": 1}, starters)
+        for event in events:
+            builder.add(event)
+        stints = _by_lineup(builder.finish())
+
+        assert builder.inferred_subs == 1
+        assert stints == {(1, 1, (1, 2, 3, 4, 5)): (120, 0), (1, 1, (2, 3, 4, 5, 9)): (600, 2)}
+
+    def test_bench_technical_does_not_put_player_on_court(self):
+        starters = {"LAL": [1, 2, 3, 4, 5]}
+        events = [
+            _event(1, 700_000, EventType.FOUL, "LAL", 9, description="T.FOUL Technical"),
+            _event(1, 690_000, EventType.TECHNICAL_FOUL, "LAL", 10),
+        ]
+
+        stints = _by_lineup(build_lineup_stints(events, "g1", {"LAL": 1}, starters))
+
+        assert stints == {(1, 1, (1, 2, 3, 4, 5)): (720, 0)}
+
+    def test_starter_sources(self):
+        boxscore = [{"team_abbreviation": "lal", "player_id": 2544}, {"team_abbreviation": "LAL", "player_id": None}]
+        bref = {"home": [{"player": "LeBron James"}, {"player": "Unknown Guy"}], "away": [{"player": "Jayson Tatum"}]}
+
+        assert starters_from_boxscore(boxscore) == {"LAL": [2544]}
+        assert starters_from_bref(bref, "LAL", "BOS", {"LebronJames": 2544, "JaysonTatum": 1628369}) == {
+            "LAL": [2544], "BOS": [1628369],
+        }
+
+
+class TestRebuildLineupStints:
+    """Bulk rebuild from stored play-by-play."""
+
+    @pytest.mark.asyncio
+    async def test_batches_replace_stints_per_game(self):
+        events, starters, _ = _simulate(random.Random(1), periods=2, plays=30)
+        games = ["0022300001", "0022300002", "0022300003"]
+        rows = [
+            {**event, "game_id": game_id, "event_idx": i,
+             "time_remaining": f"{event['clock_ms_remaining'] // 60_000}:{event['clock_ms_remaining'] // 1000 % 60:02d}"}
+            for game_id in games[:2] for i, event in enumerate(events)
+        ]
+
+        async def fetch(query, batch):
+            if query == STINT_GAMES_QUERY:
+                return [{"game_id": g, "home_team_tricode": "LAL", "away_team_tricode": "BOS",
+                         "home_team_id": str(TEAM_IDS["LAL"]), "away_team_id": str(TEAM_IDS["BOS"])}
+                        for g in batch]
+            if query == STINT_EVENTS_QUERY:
+                return [row for row in rows if row["game_id"] in batch]
+            return [{"game_id": g, "team_tricode": team, "player_id": str(p), "player_name_slug": None}
+                    for g in batch for team, players in starters.items() for p in players]
+
+        conn = MagicMock()
+        conn.fetch = AsyncMock(side_effect=fetch)
+        conn.execute = AsyncMock()
+        conn.transaction = MagicMock(return_value=AsyncMock())
+        upsert = AsyncMock()
+
+        with patch.object(lineup_stints, "upsert_lineups", upsert):
+            result = await rebuild_lineup_stints(conn, games, batch_size=2)
+
+        assert (result.games, result.games_skipped) == (2, 1)
+        conn.execute.assert_awaited_once_with(DELETE_STINTS, games[:2])
+        (stints,) = [call.args[1] for call in upsert.await_args_list]
+        assert {s.game_id for s in stints} == set(games[:2])
+        assert result.stints == len(stints)
+        # Each period's lineups cover both teams' full 12 minutes
+        seconds = defaultdict(int)
+        for s in stints:
+            seconds[(s.game_id, s.team_id, s.period)] += s.seconds_played
+        assert all(abs(total - 720) <= 10 for total in seconds.values())
+
+    def test_spec_writes_plus_minus(self):
+        assert "plus_minus" in LINEUP_STINTS_SPEC.column_names
+        assert "plus_minus" in LINEUP_STINTS_SPEC.update_columns
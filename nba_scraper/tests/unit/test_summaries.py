@@ -0,0 +1,248 @@
+"""Tests for the materialized season summaries."""
+
+import re
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from nba_scraper.loaders import games as games_loader
+from nba_scraper.loaders import pbp as pbp_loader
+from nba_scraper.loaders import summaries
+from nba_scraper.loaders.summaries import (
+    FOUNDATION_GAME_RESULTS,
+    FOUNDATION_PER_GAME_TABLES,
+    FOUNDATION_PLAYER_GAME_BOX,
+    GAME_KEYS_QUERY,
+    GAME_RESULTS,
+    HEAD_TO_HEAD_SUMMARY,
+    PER_GAME_TABLES,
+    PLAYER_GAME_BOX,
+    PLAYER_SEASON_SUMMARY,
+    SUMMARY_TABLES,
+    TEAM_ROLLING_FORM,
+    TEAM_SEASON_SUMMARY,
+    check_summaries,
+    per_game_tables,
+    refresh_summaries,
+)
+from nba_scraper.loaders.upsert import UpsertResult
+from nba_scraper.models.games import Game
+from nba_scraper.pipelines import analytics_pipeline
+from nba_scraper.pipelines.analytics_pipeline import (
+    MATCHUP_RECENT_QUERY,
+    MATCHUP_SUMMARY_QUERY,
+    AnalyticsPipeline,
+)
+from nba_scraper.state.processing_plan import PBP_COLUMNS_QUERY
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+FULL_PBP_COLUMNS = [{"column_name": "event_type"}, {"column_name": "shot_value"}]
+FOUNDATION_PBP_COLUMNS = [{"column_name": "action_type"}, {"column_name": "team_id"}]
+
+
+def _ddl_columns(path, table):
+    """Column names of ``table`` in a DDL file."""
+    body = re.search(rf"CREATE TABLE (?:IF NOT EXISTS )?{table} \((.*?)\n\)", path.read_text(), re.S).group(1)
+    return {m.group(1) for m in re.finditer(r"^\s+([a-z_0-9]+) [A-Z]", body, re.M)}
+
+
+def _conn(fetch=None):
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=fetch)
+    conn.execute = AsyncMock()
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    return conn
+
+
+def _executed(conn, table):
+    """Key arrays passed to the table's delete and insert, in call order."""
+    calls = [call.args for call in conn.execute.await_args_list]
+    deletes = [args[1:] for args in calls if args[0] == table.delete_sql]
+    inserts = [args[1:] for args in calls if args[0] == table.insert_sql]
+    assert deletes == inserts
+    return deletes
+
+
+class TestSummaryTables:
+    """Generated statements."""
+
+    @pytest.mark.parametrize("table", PER_GAME_TABLES + FOUNDATION_PER_GAME_TABLES + SUMMARY_TABLES,
+                             ids=lambda t: t.name)
+    def test_statements_bind_one_array_per_scope_key(self, table):
+        for sql in (table.delete_sql, table.insert_sql):
+            assert set(re.findall(r"\$(\d+)", sql)) == {str(i + 1) for i in range(len(table.scope_keys))}
+        assert "{scope}" not in table.insert_sql
+        assert set(re.findall(r"\$(\d+)", table.check_sql)) == {"1"}
+        assert table.insert_sql.startswith(f"INSERT INTO {table.name} ({', '.join(table.columns)})")
+
+    @pytest.mark.parametrize("table", PER_GAME_TABLES + FOUNDATION_PER_GAME_TABLES, ids=lambda t: t.name)
+    def test_check_names_the_games_season_next_to_partitioned_events(self, table):
+        expected, stored = table.check_sql.split("stored AS")
+        assert "JOIN pbp_events e" in expected
+        assert "WHERE ($1::text[] IS NULL OR g.season = ANY($1::text[])) AND" in expected
+        assert f"FROM {table.name} WHERE ($1::text[] IS NULL OR season = ANY($1::text[]))" in stored
+
+    @pytest.mark.parametrize("tables, ddl", [
+        (PER_GAME_TABLES, "schema.sql"),
+        (FOUNDATION_PER_GAME_TABLES, "db_migrations_foundations.sql"),
+    ])
+    @pytest.mark.parametrize("alias, source", [("g", "games"), ("e", "pbp_events")])
+    def test_per_game_queries_read_existing_columns(self, tables, ddl, alias, source):
+        columns = _ddl_columns(PROJECT_ROOT / ddl, source)
+        for table in tables:
+            read = set(re.findall(rf"\b{alias}\.([a-z_0-9]+)", table.select))
+            assert read and read <= columns, (table.name, read - columns)
+
+    @pytest.mark.parametrize("spec, source", [
+        (games_loader.GAMES_SPEC, "games"),
+        (pbp_loader.PBP_EVENTS_SPEC, "pbp_events"),
+    ])
+    def test_hooked_loaders_write_the_foundation_layout(self, spec, source):
+        # upsert_game/upsert_pbp refresh with FOUNDATION_PER_GAME_TABLES on this layout
+        columns = _ddl_columns(PROJECT_ROOT / "db_migrations_foundations.sql", source)
+        assert set(spec.column_names) <= columns
+
+    def test_foundation_tables_share_the_full_schema_shape(self):
+        for full, foundation in zip(PER_GAME_TABLES, FOUNDATION_PER_GAME_TABLES):
+            assert (foundation.name, foundation.scope_keys, foundation.columns) == (
+                full.name, full.scope_keys, full.columns)
+        assert "(1610612747, 'LAL')" in FOUNDATION_GAME_RESULTS.select
+        assert "0, 0, 0," in FOUNDATION_PLAYER_GAME_BOX.select
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("columns, tables", [
+        (FULL_PBP_COLUMNS, PER_GAME_TABLES),
+        (FOUNDATION_PBP_COLUMNS, FOUNDATION_PER_GAME_TABLES),
+    ])
+    async def test_per_game_tables_follow_the_pbp_layout(self, columns, tables):
+        conn = _conn(fetch=[columns])
+
+        assert await per_game_tables(conn) == tables
+        conn.fetch.assert_awaited_once_with(PBP_COLUMNS_QUERY)
+
+    def test_rolling_form_covers_each_window(self):
+        assert "unnest(ARRAY[5, 10])" in TEAM_ROLLING_FORM.insert_sql
+        assert TEAM_ROLLING_FORM.scope_keys == TEAM_SEASON_SUMMARY.scope_keys
+
+
+class TestRefreshSummaries:
+    """Key-scoped incremental refresh."""
+
+    @pytest.mark.asyncio
+    async def test_recomputes_keys_before_and_after_the_change(self):
+        # The game was stored against PHX and is now corrected to BOS
+        before = [("2023-24", "LAL", "PHX", None), ("2023-24", None, None, "2544")]
+        after = [("2023-24", "LAL", "BOS", None), ("2023-24", None, None, "2544"),
+                 ("2023-24", None, None, "1628369")]
+        conn = _conn(fetch=[FULL_PBP_COLUMNS, before, after])
+
+        result = await refresh_summaries(conn, ["0022300001", "0022300001"])
+
+        assert [call.args for call in conn.fetch.await_args_list] == [
+            (PBP_COLUMNS_QUERY,)] + [(GAME_KEYS_QUERY, ["0022300001"])] * 2
+        for table in PER_GAME_TABLES:
+            assert _executed(conn, table) == [(["0022300001"],)]
+        team_keys = (["2023-24"] * 3, ["BOS", "LAL", "PHX"])
+        assert _executed(conn, TEAM_SEASON_SUMMARY) == [team_keys]
+        assert _executed(conn, TEAM_ROLLING_FORM) == [team_keys]
+        assert _executed(conn, HEAD_TO_HEAD_SUMMARY) == [(["2023-24", "2023-24"], ["BOS", "LAL"], ["LAL", "PHX"])]
+        assert _executed(conn, PLAYER_SEASON_SUMMARY) == [(["2023-24", "2023-24"], ["1628369", "2544"])]
+        assert (result.games, result.team_keys, result.pair_keys, result.player_keys) == (1, 3, 2, 2)
+        # Per-game rows are rebuilt before the summaries that aggregate them
+        order = [call.args[0] for call in conn.execute.await_args_list]
+        assert order.index(PLAYER_GAME_BOX.insert_sql) < order.index(TEAM_SEASON_SUMMARY.delete_sql)
+
+    @pytest.mark.asyncio
+    async def test_game_not_final_only_clears_its_rows(self):
+        conn = _conn(fetch=[FOUNDATION_PBP_COLUMNS, [], []])
+
+        result = await refresh_summaries(conn, ["0022300002"])
+
+        assert {call.args[0] for call in conn.execute.await_args_list} == {
+            statement for table in FOUNDATION_PER_GAME_TABLES for statement in (table.delete_sql, table.insert_sql)
+        }
+        assert result.team_keys == result.player_keys == 0
+
+    @pytest.mark.asyncio
+    async def test_check_reports_mismatched_keys(self):
+        async def fetch(query, *args):
+            if query == PBP_COLUMNS_QUERY:
+                return FULL_PBP_COLUMNS
+            assert args == (["2023-24"],)
+            return [("2023-24", "LAL")] if query == TEAM_SEASON_SUMMARY.check_sql else []
+
+        result = await check_summaries(_conn(fetch=fetch), ["2023-24"])
+
+        assert not result.consistent
+        assert result.mismatches[TEAM_SEASON_SUMMARY.name] == [("2023-24", "LAL")]
+        assert set(result.mismatches) == {table.name for table in PER_GAME_TABLES + SUMMARY_TABLES}
+
+
+class TestLoaderRefresh:
+    """upsert_game / upsert_pbp hooks."""
+
+    GAME = Game(game_id="0022300001", season="2023-24", game_date="2023-10-24",
+                home_team_id=1610612747, away_team_id=1610612756)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("upserted,refreshed", [
+        (UpsertResult(submitted=1, updated=1), True),
+        (UpsertResult(submitted=1), False),
+        (UpsertResult(submitted=1, exact=False), True),
+    ])
+    async def test_upsert_game_refreshes_changed_games(self, upserted, refreshed):
+        refresh = AsyncMock()
+        with patch.object(games_loader, "upsert_rows", AsyncMock(return_value=upserted)), \
+             patch.object(games_loader, "refresh_summaries", refresh):
+            await games_loader.upsert_game(MagicMock(), self.GAME, refresh=True)
+
+        assert refresh.await_count == int(refreshed)
+
+    @pytest.mark.asyncio
+    async def test_upsert_pbp_refreshes_each_game_once(self):
+        rows = [SimpleNamespace(game_id=game_id) for game_id in ("g2", "g1", "g2")]
+        refresh = AsyncMock()
+        conn = MagicMock()
+        with patch.object(pbp_loader, "upsert_rows", AsyncMock(return_value=UpsertResult(submitted=3, inserted=3))), \
+             patch.object(pbp_loader, "refresh_summaries", refresh):
+            await pbp_loader.upsert_pbp(conn, rows, refresh=True)
+
+        refresh.assert_awaited_once_with(conn, ["g1", "g2"])
+
+    @pytest.mark.asyncio
+    async def test_refresh_follows_setting_by_default(self):
+        refresh = AsyncMock()
+        with patch.object(games_loader, "upsert_rows", AsyncMock(return_value=UpsertResult(submitted=1, inserted=1))), \
+             patch.object(games_loader, "refresh_summaries", refresh), \
+             patch.object(summaries, "get_settings", return_value=SimpleNamespace(REFRESH_SUMMARIES=False)):
+            await games_loader.upsert_game(MagicMock(), self.GAME)
+
+        refresh.assert_not_awaited()
+
+
+class TestMatchupLookup:
+    """compute_matchup_analytics reads the pair summaries."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("last_n,query,args", [
+        (None, MATCHUP_SUMMARY_QUERY, ("1610612747", "1610612738", "2023-24")),
+        (5, MATCHUP_RECENT_QUERY, ("1610612747", "1610612738", "2023-24", 5)),
+    ])
+    async def test_reads_summary_or_recent_results(self, last_n, query, args):
+        conn = MagicMock()
+        conn.fetchrow = AsyncMock(return_value={
+            "total_games": 4, "team1_wins": 3, "team2_wins": 1,
+            "team1_avg_points": 112.5, "team2_avg_points": 105.0, "avg_margin": 9.5,
+        })
+
+        with patch.object(analytics_pipeline, "get_connection", AsyncMock(return_value=conn)):
+            result = await AnalyticsPipeline().compute_matchup_analytics(
+                1610612747, 1610612738, season="2023-24", last_n_games=last_n)
+
+        conn.fetchrow.assert_awaited_once_with(query, *args)
+        assert result["head_to_head"] == {
+            "total_games": 4, "team1_wins": 3, "team2_wins": 1,
+            "team1_avg_points": 112.5, "team2_avg_points": 105.0, "avg_margin": 9.5,
+        }
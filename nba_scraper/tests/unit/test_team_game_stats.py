@@ -0,0 +1,247 @@
+"""Tests for the NumPy team_game_stats engine."""
+
+import inspect
+import random
+import re
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from nba_scraper.models.enums import EventType
+from nba_scraper.pipelines import analytics_pipeline
+from nba_scraper.pipelines.analytics_pipeline import (
+    TEAM_GAME_STATS_SPEC,
+    TEAM_STATS_EVENTS_QUERY,
+    AnalyticsPipeline,
+    diff_team_game_stats,
+)
+from nba_scraper.transformers.team_game_stats import aggregate_team_game_stats
+
+_EVENTS = [e.value for e in (
+    EventType.SHOT_MADE, EventType.SHOT_MISSED, EventType.FREE_THROW_MADE, EventType.FREE_THROW_MISSED,
+    EventType.REBOUND, EventType.ASSIST, EventType.TURNOVER, EventType.STEAL, EventType.BLOCK,
+    EventType.FOUL, EventType.SUBSTITUTION, EventType.TIMEOUT,
+)]
+
+
+SCHEMA_SQL = Path(__file__).resolve().parents[2] / "schema.sql"
+
+
+def _schema_columns(table):
+    """Column names of ``table`` in schema.sql, and its primary key."""
+    body = re.search(rf"CREATE TABLE {table} \((.*?)\n\);", SCHEMA_SQL.read_text(), re.S).group(1)
+    columns = {m.group(1) for m in re.finditer(r"^\s+([a-z_0-9]+) [A-Z]", body, re.M)}
+    primary_key = re.search(r"PRIMARY KEY \(([^)]*)\)", body)
+    if primary_key is None:  # declared inline on its column
+        return columns, tuple(re.findall(r"^\s+([a-z_0-9]+) \w+ PRIMARY KEY", body, re.M))
+    return columns, tuple(column.strip() for column in primary_key.group(1).split(","))
+
+
+def _sql_reference(games, events):
+    """Row-at-a-time evaluation of the SQL engine's CASE expressions."""
+    groups = defaultdict(list)
+    for game in games:
+        mine = [e for e in events if e["game_id"] == game["game_id"]]
+        if not mine:
+            groups[(game["game_id"], game["away_team_tricode"])] = []  # LEFT JOIN null row
+        for e in mine:
+            team = game["home_team_tricode"] if e["is_home"] else game["away_team_tricode"]
+            groups[(game["game_id"], team)].append(e)
+
+    duration = {g["game_id"]: g["duration_minutes"] for g in games}
+    rows = {}
+    for (game_id, team), evs in groups.items():
+        if team is None:
+            continue
+
+        def count(pred):
+            return sum(1 for e in evs if pred(e))
+
+        points = sum(
+            e["shot_value"] if e["event_type"] == "SHOT_MADE" and e["shot_value"] in (1, 2, 3)
+            else 1 if e["event_type"] == "FREE_THROW_MADE" else 0
+            for e in evs
+        )
+        shot = lambda e: e["event_type"] in ("SHOT_MADE", "SHOT_MISSED")
+        fga = count(lambda e: shot(e) and e["shot_value"] in (2, 3))
+        tov = count(lambda e: e["event_type"] == "TURNOVER")
+        possessions = max(1, fga + tov)
+        minutes = duration[game_id]
+        oreb = count(lambda e: e["event_type"] == "REBOUND" and e["rebound_type"] == "OFFENSIVE")
+        dreb = count(lambda e: e["event_type"] == "REBOUND" and e["rebound_type"] == "DEFENSIVE")
+        rows[(game_id, team)] = {
+            "points": points,
+            "fgm": count(lambda e: e["event_type"] == "SHOT_MADE" and e["shot_value"] in (2, 3)),
+            "fga": fga,
+            "fg3m": count(lambda e: e["event_type"] == "SHOT_MADE" and e["shot_value"] == 3),
+            "fg3a": count(lambda e: shot(e) and e["shot_value"] == 3),
+            "ftm": count(lambda e: e["event_type"] == "FREE_THROW_MADE"),
+            "fta": count(lambda e: e["event_type"] in ("FREE_THROW_MADE", "FREE_THROW_MISSED")),
+            "oreb": oreb,
+            "dreb": dreb,
+            "reb": oreb + dreb,
+            "ast": count(lambda e: e["event_type"] == "ASSIST"),
+            "stl": count(lambda e: e["event_type"] == "STEAL"),
+            "blk": count(lambda e: e["event_type"] == "BLOCK"),
+            "tov": tov,
+            "pf": count(lambda e: e["event_type"] == "FOUL"),
+            "possessions_estimated": possessions,
+            "pace": possessions * 48.0 / minutes if minutes and minutes > 0 else 0,
+            "offensive_rating": points * 100.0 / possessions,
+        }
+    return rows
+
+
+def _workload(rng, n_games=12, events_per_game=80):
+    games = [
+        {"game_id": f"00223{i:05d}", "home_team_tricode": f"H{i}", "away_team_tricode": f"A{i}",
+         "home_team_id": None if i == 3 else f"16{i}", "away_team_id": f"26{i}",
+         "duration_minutes": [48, 53, 0, None][i % 4]}
+        for i in range(n_games)
+    ]
+    events = [
+        {"game_id": game["game_id"], "is_home": rng.random() < 0.5,
+         "event_type": rng.choice(_EVENTS), "shot_value": rng.choice([None, 1, 2, 2, 3]),
+         "rebound_type": rng.choice([None, "OFFENSIVE", "DEFENSIVE"])}
+        for i, game in enumerate(games) if i != 5  # one game without events
+        for _ in range(events_per_game)
+    ]
+    rng.shuffle(events)
+    return games, events
+
+
+class TestTeamGameStatsEngine:
+    """NumPy engine against the SQL engine's semantics."""
+
+    def test_matches_sql_reference_when_fed_in_chunks(self):
+        games, events = _workload(random.Random(42))
+        chunks = [events[i:i + 97] for i in range(0, len(events), 97)]
+
+        rows = aggregate_team_game_stats(games, chunks)
+
+        actual = {(row["game_id"], row["team_tricode"]): row for row in rows}
+        expected = _sql_reference(games, events)
+        assert diff_team_game_stats(expected, actual) == []
+        # Event-less game keeps its away row; rows carry the game's team ids, even a missing one
+        assert (games[5]["game_id"], "A5") in actual
+        assert actual[(games[3]["game_id"], "H3")]["team_id"] is None
+        assert actual[(games[3]["game_id"], "A3")]["team_id"] == "263"
+
+    def test_diff_reports_missing_rows_and_changed_values(self):
+        expected = {("g1", "H"): {"points": 10, "pace": 95.0}, ("g1", "A"): {"points": 8}}
+        actual = {("g1", "H"): {"points": 11, "pace": 95.0}}
+
+        mismatches = diff_team_game_stats(expected, actual)
+
+        assert {"game_id": "g1", "team_tricode": "H", "column": "points", "expected": 10, "actual": 11} in mismatches
+        assert {"game_id": "g1", "team_tricode": "A", "column": None, "expected": True, "actual": False} in mismatches
+
+    @pytest.mark.asyncio
+    async def test_pipeline_streams_events_and_bulk_writes(self):
+        games, events = _workload(random.Random(7), n_games=6, events_per_game=20)
+        chunks = [events[:50], events[50:], []]
+
+        cursor = MagicMock()
+        cursor.fetch = AsyncMock(side_effect=chunks)
+        conn = MagicMock()
+        conn.fetch = AsyncMock(return_value=games)
+        conn.cursor = AsyncMock(return_value=cursor)
+        conn.transaction = MagicMock(return_value=AsyncMock())
+        upsert = AsyncMock(return_value=MagicMock(inserted=8, updated=0))
+
+        with patch.object(analytics_pipeline, "upsert_rows", upsert):
+            await AnalyticsPipeline(team_stats_engine="numpy")._compute_team_game_stats(conn, "g.status = 'FINAL'", [])
+
+        conn.cursor.assert_awaited_once_with(TEAM_STATS_EVENTS_QUERY, [g["game_id"] for g in games])
+        assert cursor.fetch.await_count == 3
+        spec, rows = upsert.await_args.args[1:]
+        assert spec is TEAM_GAME_STATS_SPEC
+        assert diff_team_game_stats(_sql_reference(games, events),
+                                    {(r["game_id"], r["team_tricode"]): r for r in rows}) == []
+        conn.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_compare_engines_releases_its_connection(self):
+        stored = [{"game_id": "g1", "team_tricode": "BOS", "points": 100}]
+        conn = MagicMock()
+        conn.fetch = AsyncMock(side_effect=lambda sql, *args: [{"game_id": "g1"}] if "FROM games" in sql else stored)
+        conn.transaction = MagicMock(return_value=MagicMock(start=AsyncMock(), rollback=AsyncMock()))
+        released = []
+
+        @asynccontextmanager
+        async def pooled_connection():
+            try:
+                yield conn
+            finally:
+                released.append(conn)
+
+        pipeline = AnalyticsPipeline()
+        with patch.object(analytics_pipeline, "pooled_connection", pooled_connection), \
+             patch.object(pipeline, "_compute_team_game_stats_sql", AsyncMock()), \
+             patch.object(pipeline, "_compute_team_game_stats_numpy", AsyncMock()):
+            comparison = await pipeline.compare_team_stats_engines(season="2023-24")
+
+        assert released == [conn]
+        assert comparison.games == 1 and comparison.mismatches == []
+        assert conn.transaction.return_value.rollback.await_count == 2
+
+    def test_unknown_engine_rejected(self):
+        with pytest.raises(ValueError):
+            AnalyticsPipeline(team_stats_engine="duckdb")
+
+
+class TestTeamGameStatsSchema:
+    """Both engines target the real team_game_stats, pbp_events and games columns."""
+
+    def test_spec_matches_table(self):
+        columns, primary_key = _schema_columns("team_game_stats")
+
+        assert set(TEAM_GAME_STATS_SPEC.column_names) <= columns
+        assert {name for name, _ in TEAM_GAME_STATS_SPEC.update_exprs} <= columns
+        assert TEAM_GAME_STATS_SPEC.conflict_keys == primary_key == ("game_id", "team_tricode")
+
+    @pytest.mark.parametrize("alias, table", [("p", "pbp_events"), ("g", "games")])
+    def test_queries_read_existing_columns(self, alias, table):
+        columns, _ = _schema_columns(table)
+        sql = TEAM_STATS_EVENTS_QUERY + analytics_pipeline.TEAM_STATS_GAMES_QUERY
+        sql_engine = inspect.getsource(AnalyticsPipeline._compute_team_game_stats_sql)
+
+        read = set(re.findall(rf"\b{alias}\.([a-z_0-9]+)", sql + sql_engine))
+        assert read and read <= columns
+
+
+class TestTeamKey:
+    """Every team_game_stats step keys teams the way the engines write them: by tricode."""
+
+    @pytest.mark.asyncio
+    async def test_tracked_possessions_update_engine_rows(self):
+        game = {"game_id": "g1", "home_team_tricode": "BOS", "away_team_tricode": "NYK",
+                "home_team_id": "1610612738", "away_team_id": "1610612752", "duration_minutes": 48}
+        plays = [("BOS", "SHOT_MADE"), ("NYK", "SHOT_MISSED"), ("BOS", "REBOUND"), ("BOS", "SHOT_MADE")]
+        events = [
+            {"game_id": "g1", "period": 1, "event_idx": i, "time_remaining": f"11:{59 - 10 * i:02d}",
+             "seconds_elapsed": 1 + 10 * i, "event_type": event_type, "team_tricode": team, "description": ""}
+            for i, (team, event_type) in enumerate(plays)
+        ]
+        conn = MagicMock()
+        conn.fetch = AsyncMock(side_effect=[[{"game_id": "g1"}], events])
+        conn.execute = AsyncMock()
+
+        await AnalyticsPipeline()._compute_tracked_possessions(conn, "g.status = 'FINAL'", [])
+
+        sql, game_ids, teams, *_ = conn.execute.await_args.args
+        assert sql == analytics_pipeline.TRACKED_POSSESSIONS_UPDATE
+        assert "tgs.team_tricode = u.team_tricode" in sql
+        engine_keys = {(row["game_id"], row["team_tricode"]) for row in aggregate_team_game_stats(
+            [game], [[{"game_id": "g1", "is_home": team == "BOS", "event_type": event_type,
+                       "shot_value": 2, "rebound_type": None} for team, event_type in plays]])}
+        assert set(zip(game_ids, teams)) and set(zip(game_ids, teams)) <= engine_keys
+
+    def test_defensive_rating_joins_on_tricode(self):
+        source = inspect.getsource(AnalyticsPipeline._compute_team_pace_efficiency)
+        assert "tgs1.team_tricode != tgs2.team_tricode" in source
+        assert "team_game_stats.team_tricode = os.team_tricode" in source
+        assert "team_id" not in source
@@ -0,0 +1,220 @@
+"""Tests for the metadata-driven upsert compiler and prepared statement cache."""
+
+from enum import Enum
+from typing import List, Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pydantic import BaseModel
+
+from nba_scraper.loaders import upsert
+from nba_scraper.loaders.lineups import LINEUP_STINTS_SPEC
+from nba_scraper.loaders.refs import REF_ASSIGNMENTS_SPEC
+from nba_scraper.loaders.upsert import (
+    Column,
+    StatementCache,
+    TableSpec,
+    choose_strategy,
+    compile_upsert,
+    row_values,
+    upsert_rows,
+)
+from nba_scraper.models.lineups import LineupStint
+
+
+class _Kind(str, Enum):
+    SHOT = "SHOT"
+
+
+class _Row(BaseModel):
+    game_id: str
+    event_idx: int
+    kind: _Kind
+    distance: Optional[float] = None
+    players: List[int] = []
+    source: str = "test"
+
+
+_SPEC = TableSpec.from_model(
+    "sample_events",
+    _Row,
+    conflict_keys=("game_id", "event_idx"),
+    rename={"players": "player_ids"},
+)
+
+
+def _mock_conn(inserted: int = 0, updated: int = 0) -> MagicMock:
+    conn = MagicMock()
+    conn.statement = MagicMock()
+    conn.statement.fetchrow = AsyncMock(return_value={"inserted": inserted, "updated": updated})
+    conn.prepare = AsyncMock(return_value=conn.statement)
+    conn.execute = AsyncMock()
+    conn.executemany = AsyncMock()
+    conn.copy_records_to_table = AsyncMock()
+    return conn
+
+
+class TestTableSpec:
+    """Spec construction from Pydantic row models."""
+
+    def test_types_follow_annotations(self):
+        types = {column.name: column.pg_type for column in _SPEC.columns}
+        assert types == {
+            "game_id": "text",
+            "event_idx": "int8",
+            "kind": "text",
+            "distance": "float8",
+            "player_ids": "int8[]",
+            "source": "text",
+        }
+
+    def test_provenance_is_updated_but_not_compared(self):
+        assert "source" in _SPEC.effective_update_columns
+        assert "source" not in _SPEC.compared_columns
+
+    def test_unmapped_annotation_is_rejected(self):
+        class _Bad(BaseModel):
+            payload: dict
+
+        with pytest.raises(TypeError):
+            TableSpec.from_model("bad", _Bad, conflict_keys=("payload",))
+
+    def test_ref_assignments_map_crew_position(self):
+        assert "crew_position" in REF_ASSIGNMENTS_SPEC.column_names
+        assert "position" not in REF_ASSIGNMENTS_SPEC.column_names
+
+
+class TestCompile:
+    """SQL generation."""
+
+    def test_compiled_once_per_strategy(self):
+        assert compile_upsert(_SPEC, "unnest") is compile_upsert(_SPEC, "unnest")
+
+    def test_unnest_sql_is_diff_aware(self):
+        sql = compile_upsert(_SPEC, "unnest")
+        assert "unnest($1::text[], $2::int8[]" in sql
+        assert "player_ids::int8[]" in sql  # arrays travel as text literals
+        assert "EXCLUDED.distance IS DISTINCT FROM sample_events.distance" in sql
+        assert "EXCLUDED.source IS DISTINCT FROM" not in sql
+        assert "RETURNING (xmax = 0) AS inserted" in sql
+
+    def test_untyped_spec_uses_plain_values(self):
+        spec = TableSpec.from_columns("t", [("a", None), ("b", None)], ("a",))
+        assert choose_strategy(spec, 10_000) == "executemany"
+        assert "VALUES ($1, $2)" in compile_upsert(spec, "executemany")
+        with pytest.raises(ValueError):
+            compile_upsert(spec, "unnest")
+
+    def test_key_only_spec_does_nothing_on_conflict(self):
+        spec = TableSpec.from_columns("t", [("a", "int8")], ("a",))
+        assert "ON CONFLICT (a) DO NOTHING" in compile_upsert(spec, "unnest")
+
+    def test_strategy_by_batch_size(self):
+        assert choose_strategy(_SPEC, 1) == "values"
+        assert choose_strategy(_SPEC, 500) == "unnest"
+        assert choose_strategy(_SPEC, upsert.COPY_MIN_ROWS) == "copy"
+
+
+class TestRowValues:
+    """Value extraction and coercion."""
+
+    def test_model_row_is_coerced(self):
+        row = _Row(game_id="g", event_idx=3, kind=_Kind.SHOT, players=[1, 2])
+        assert row_values(_SPEC, row) == ("g", 3, "SHOT", None, "{1,2}", "test")
+
+    def test_dict_row_with_defaults_and_getters(self):
+        spec = TableSpec.from_columns(
+            "t",
+            [
+                ("id", "int4"),
+                Column("source", "text", default="nba_stats"),
+                Column("doubled", "float8", getter=lambda r: int(r["id"]) * 2),
+            ],
+            ("id",),
+        )
+        assert row_values(spec, {"id": "7"}) == (7, "nba_stats", 14.0)
+
+    def test_lineup_array_literal(self):
+        stint = LineupStint(game_id="g", team_id=1, period=1, lineup=[5, 4, 3, 2, 1], seconds_played=9)
+        by_name = dict(zip(LINEUP_STINTS_SPEC.column_names, row_values(LINEUP_STINTS_SPEC, stint)))
+        assert by_name["lineup_player_ids"] == "{5,4,3,2,1}"
+
+
+class TestUpsertRows:
+    """Execution through cached prepared statements."""
+
+    @pytest.mark.asyncio
+    async def test_statement_prepared_once_per_connection(self):
+        conn = _mock_conn(inserted=2)
+        rows = [_Row(game_id="g", event_idx=i, kind=_Kind.SHOT) for i in range(2)]
+
+        await upsert_rows(conn, _SPEC, rows)
+        result = await upsert_rows(conn, _SPEC, rows)
+
+        assert conn.prepare.await_count == 1
+        assert conn.statement.fetchrow.await_count == 2
+        assert result.inserted == 2 and result.strategies == {"unnest": 1}
+
+    @pytest.mark.asyncio
+    async def test_duplicates_collapse_to_last_row(self):
+        conn = _mock_conn(inserted=1)
+        rows = [
+            _Row(game_id="g", event_idx=1, kind=_Kind.SHOT, distance=1.0),
+            _Row(game_id="g", event_idx=1, kind=_Kind.SHOT, distance=2.0),
+        ]
+
+        result = await upsert_rows(conn, _SPEC, rows)
+
+        assert result.submitted == 1
+        args = conn.statement.fetchrow.await_args.args
+        assert args[3] == 2.0
+
+    @pytest.mark.asyncio
+    async def test_copy_strategy_stages_then_merges(self):
+        conn = _mock_conn(inserted=3)
+        rows = [_Row(game_id="g", event_idx=i, kind=_Kind.SHOT) for i in range(3)]
+
+        result = await upsert_rows(conn, _SPEC, rows, strategy="copy")
+
+        assert "CREATE TEMP TABLE IF NOT EXISTS _upsert_stage_sample_events" in conn.execute.await_args.args[0]
+        stage, = conn.copy_records_to_table.await_args.args
+        assert stage == "_upsert_stage_sample_events"
+        assert len(conn.copy_records_to_table.await_args.kwargs["records"]) == 3
+        assert result.inserted == 3
+
+    @pytest.mark.asyncio
+    async def test_untyped_rows_use_executemany(self):
+        conn = _mock_conn()
+        spec = TableSpec.from_columns("t", [("a", None), ("b", None)], ("a",))
+
+        result = await upsert_rows(conn, spec, [{"a": 1, "b": 2}, {"a": 2, "b": 3}])
+
+        conn.executemany.assert_awaited_once()
+        assert conn.executemany.await_args.args[1] == [(1, 2), (2, 3)]
+        assert result.exact is False
+
+    @pytest.mark.asyncio
+    async def test_empty_rows_skip_database(self):
+        conn = _mock_conn()
+        result = await upsert_rows(conn, _SPEC, [])
+        assert result.submitted == 0
+        conn.prepare.assert_not_awaited()
+
+
+class TestStatementCache:
+    """Cache bookkeeping."""
+
+    @pytest.mark.asyncio
+    async def test_pool_proxy_is_unwrapped(self):
+        cache = StatementCache()
+        raw = _mock_conn()
+        raw._con = None  # a raw asyncpg connection has no proxy target
+        proxy = MagicMock(_con=raw)
+        proxy.prepare = raw.prepare
+
+        await cache.prepare(proxy, _SPEC, "values")
+        await cache.prepare(raw, _SPEC, "values")
+
+        assert raw.prepare.await_count == 1
+        cache.invalidate(raw)
+        assert cache.size(raw) == 0